@@ -7,8 +7,7 @@ import json
 import sqlite3
 from datetime import datetime, timedelta
 import platform
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from live_chart import LiveChart
 
 class CustomBooleanControl(tk.Canvas):
     def __init__(self, parent, *args, **kwargs):
@@ -97,6 +96,8 @@ class NiftyApp:
         self.root.title("Nifty Option Chain Viewer")
         self.root.geometry("1600x600")
         self.nifty_client = NiftyOptionChain()
+        # One persistent graph window per option type, reused across selections
+        self.graph_views = {}
         self.setup_database()
         self.setup_tabs()
         self.setup_ui()
@@ -230,53 +231,49 @@ def on_tab_changed(self, event):
     def plot_graph(self, table_name, strike_price, option_type):
         today = datetime.now().strftime('%Y-%m-%d')
         
-        # Fetch data for the selected strike price
+        view = self.graph_views.get(option_type)
+        if view is None or not view['window'].winfo_exists():
+            # Create the window, figure and canvas once per option type
+            graph_window = tk.Toplevel(self.root)
+            chart = LiveChart(graph_window, figsize=(10, 6), panels=[{
+                'ylabel': 'Open Interest',
+                'series': [('oi', 'Open Interest', 'blue')],
+                'twin_ylabel': 'Change in OI / LTP',
+                'twin_series': [('changein_oi', 'Change in OI', 'orange'), ('ltp', 'LTP', 'red')]
+            }])
+            view = {'window': graph_window, 'chart': chart, 'strike': None, 'last_time': ''}
+            self.graph_views[option_type] = view
+        
+        chart = view['chart']
+        if view['strike'] != strike_price:
+            view['strike'] = strike_price
+            view['last_time'] = ''
+            chart.clear()
+            chart.axes[0].set_title(f"{option_type} Strike Price {strike_price} - OI, Change in OI, and LTP")
+            view['window'].title(f"{option_type} Strike Price {strike_price} Graph")
+        
+        # Fetch only rows newer than what is already plotted
         self.cursor.execute(f"""
             SELECT date_time, oi, changein_oi, ltp FROM {table_name}
-            WHERE strike_price = ? AND date_time LIKE ?
+            WHERE strike_price = ? AND date_time LIKE ? AND date_time > ?
             ORDER BY date_time
-        """, (strike_price, f"{today}%"))
+        """, (strike_price, f"{today}%", view['last_time']))
         
         data = self.cursor.fetchall()
         
         if not data:
-            messagebox.showwarning("No Data", f"No data available for {option_type} strike price {strike_price} for today.")
+            if not view['last_time']:
+                messagebox.showwarning("No Data", f"No data available for {option_type} strike price {strike_price} for today.")
             return
 
-        # Prepare data for plotting
-        dates = [datetime.strptime(row[0], '%Y-%m-%d %H:%M:%S') for row in data]
-        oi_values = [row[1] for row in data]
-        changein_oi_values = [row[2] for row in data]
-        ltp_values = [row[3] for row in data]
-
-        # Create a new window for the graph
-        graph_window = tk.Toplevel(self.root)
-        graph_window.title(f"{option_type} Strike Price {strike_price} Graph")
-        
-        # Create a figure and axis
-        fig, ax1 = plt.subplots(figsize=(10, 6))
-
-        # Plot OI
-        ax1.set_xlabel('Time')
-        ax1.set_ylabel('Open Interest', color='blue')
-        ax1.plot(dates, oi_values, color='blue', label='Open Interest')
-        ax1.tick_params(axis='y', labelcolor='blue')
-
-        # Create a second y-axis for Change in OI and LTP
-        ax2 = ax1.twinx()
-        ax2.set_ylabel('Change in OI / LTP', color='red')
-        ax2.plot(dates, changein_oi_values, color='orange', label='Change in OI')
-        ax2.plot(dates, ltp_values, color='red', label='LTP')
-        ax2.tick_params(axis='y', labelcolor='red')
-
-        # Add legends
-        fig.tight_layout()
-        ax1.legend(loc='upper left')
-        ax2.legend(loc='upper right')
-
-        # Show the plot
-        plt.title(f"{option_type} Strike Price {strike_price} - OI, Change in OI, and LTP")
-        plt.show()
+        # Append the new points to the existing lines
+        dates = [row[0] for row in data]
+        chart.append('oi', dates, [row[1] for row in data])
+        chart.append('changein_oi', dates, [row[2] for row in data])
+        chart.append('ltp', dates, [row[3] for row in data])
+        view['last_time'] = dates[-1]
+        chart.refresh()
+        view['window'].lift()
 
     def setup_ui(self):
         # Main container
@@ -1,38 +1,270 @@
+"""Browser dashboard for the NIFTY option chain database.
+
+Lets several people watch the chain without each running a Tk client (and
+its own fetch cycle).  Point it at the collector's database and open
+http://<host>:8050:
+
+    python app.py --db E:/nifty_data.db --host 0.0.0.0
+
+Every browser polls only the latest snapshot id, which the collector pushes
+over its snapshot stream (nse_pubsub.py); ``MAX(date_time)`` is only
+queried when the stream is silent, e.g. outside market hours.  Chain
+data lives in a process-wide ``ChainCache`` that reads each day once and
+then only appends rows newer than what it holds, and the figures are
+memoized on (symbol, expiry, latest snapshot id, ...), so any number of
+viewers cost one small query per new snapshot.  Full-day series are drawn
+with WebGL (Scattergl).
+"""
+import argparse
+import queue
+import threading
+import time
+from functools import lru_cache
+
 import dash
 from dash import dcc, html
-from dash.dependencies import Input, Output
-import plotly.express as px
+from dash.dependencies import Input, Output, State
 import pandas as pd
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from nse_collector import DB_PATH, HEARTBEAT_TIMEOUT, connect
+from nse_pubsub import PUBSUB_PORT, start_subscriber_thread
+
+SYMBOL = 'NIFTY'
+# How often browsers check for a new snapshot (the collector writes every 5 minutes)
+POLL_SECONDS = 30
+# Strikes either side of the money offered in the strike dropdown
+STRIKE_CHOICES = 15
+CHAIN_COLUMNS = ('date_time', 'strike_price', 'option_type', 'expiry_date', 'open_interest',
+                 'changein_oi', 'volume', 'iv', 'ltp', 'underlying_value')
+
+
+class ChainCache:
+    """One DataFrame per (expiry, day), shared by every callback and viewer.
+
+    A day is read once; later snapshots only fetch rows newer than the
+    last one held.  Connections are read-only and per thread (Dash serves
+    callbacks from a thread pool).
+    """
+
+    def __init__(self, db_path, stream_port=PUBSUB_PORT):
+        self.db_path = db_path
+        self.frames = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        # Snapshot ids pushed by the collector; None disables the stream
+        self.updates = start_subscriber_thread(port=stream_port) if stream_port else None
+        self.streamed = None
+        self.streamed_at = 0.0
+
+    def conn(self):
+        if getattr(self.local, 'conn', None) is None:
+            self.local.conn = connect(self.db_path, readonly=True)
+        return self.local.conn
+
+    def latest_snapshot(self):
+        """Newest snapshot id from the stream, or from the database when the stream is silent"""
+        if self.updates is not None:
+            with self.lock:
+                while True:
+                    try:
+                        meta, _ = self.updates.get_nowait()
+                    except queue.Empty:
+                        break
+                    self.streamed, self.streamed_at = meta['date_time'], time.monotonic()
+                if self.streamed and time.monotonic() - self.streamed_at < HEARTBEAT_TIMEOUT.total_seconds():
+                    return self.streamed
+        row = self.conn().execute("SELECT MAX(date_time) FROM nifty_option_chain_data").fetchone()
+        return row[0] if row else None
 
-# Sample data
-df = px.data.gapminder()
+    def expiries(self, day):
+        rows = self.conn().execute("""
+            SELECT DISTINCT expiry_date FROM nifty_option_chain_data
+            WHERE date_time = (SELECT MAX(date_time) FROM nifty_option_chain_data
+                               WHERE date_time LIKE :day)
+        """, {'day': f"{day}%"}).fetchall()
+        return sorted((r[0] for r in rows), key=lambda e: pd.to_datetime(e, format='%d-%b-%Y'))
 
-# Initialize Dash app
-app = dash.Dash(__name__)
+    def day_frame(self, expiry, day, snapshot_id):
+        """All rows of ``day`` for ``expiry`` up to and including ``snapshot_id``"""
+        with self.lock:
+            cached = self.frames.get((expiry, day))
+            last = cached['date_time'].iloc[-1] if cached is not None and not cached.empty else None
+            if last is None or last < snapshot_id:
+                new = pd.read_sql_query(f"""
+                    SELECT {', '.join(CHAIN_COLUMNS)} FROM nifty_option_chain_data
+                    WHERE date_time LIKE :day AND date_time > :after AND date_time <= :upto
+                    AND expiry_date = :expiry
+                    ORDER BY date_time
+                """, self.conn(), params={'day': f"{day}%", 'after': last or '', 'upto': snapshot_id,
+                                          'expiry': expiry})
+                cached = new if cached is None else pd.concat([cached, new], ignore_index=True)
+                # Keep only the current day per expiry
+                self.frames = {k: v for k, v in self.frames.items() if k[0] != expiry or k[1] == day}
+                self.frames[(expiry, day)] = cached
+        return cached[cached['date_time'] <= snapshot_id]
+
+
+cache = None
+
+
+# --- Memoized views; the snapshot id in the key makes stale entries unreachable ---
+@lru_cache(maxsize=64)
+def series_by_snapshot(symbol, expiry, snapshot_id):
+    """Spot and PCR per snapshot for the day of ``snapshot_id``"""
+    df = cache.day_frame(expiry, snapshot_id[:10], snapshot_id)
+    oi = df.pivot_table(index='date_time', columns='option_type', values='open_interest', aggfunc='sum')
+    series = pd.DataFrame({
+        'spot': df.groupby('date_time')['underlying_value'].first(),
+        'pcr': oi.get('PE') / oi.get('CE').where(oi.get('CE') > 0),
+    })
+    series.index = pd.to_datetime(series.index)
+    return series
+
+
+@lru_cache(maxsize=64)
+def latest_chain(symbol, expiry, snapshot_id):
+    df = cache.day_frame(expiry, snapshot_id[:10], snapshot_id)
+    latest = df[df['date_time'] == df['date_time'].max()]
+    return latest.pivot_table(index='strike_price', columns='option_type',
+                              values=['open_interest', 'changein_oi', 'volume', 'iv', 'ltp'])
+
+
+@lru_cache(maxsize=256)
+def strike_series(symbol, expiry, snapshot_id, strike):
+    df = cache.day_frame(expiry, snapshot_id[:10], snapshot_id)
+    df = df[df['strike_price'] == strike]
+    return {option_type: part.assign(date_time=pd.to_datetime(part['date_time']))
+            for option_type, part in df.groupby('option_type')}
+
+
+@lru_cache(maxsize=64)
+def overview_figure(symbol, expiry, snapshot_id):
+    series = series_by_snapshot(symbol, expiry, snapshot_id)
+    fig = make_subplots(specs=[[{'secondary_y': True}]])
+    fig.add_trace(go.Scattergl(x=series.index, y=series['spot'], name='Spot', mode='lines'))
+    fig.add_trace(go.Scattergl(x=series.index, y=series['pcr'], name='PCR', mode='lines'),
+                  secondary_y=True)
+    fig.update_layout(title=f"{symbol} spot and PCR ({expiry})", margin=dict(t=40, b=20),
+                      uirevision=expiry)
+    fig.update_yaxes(title_text='Spot', secondary_y=False)
+    fig.update_yaxes(title_text='PCR', secondary_y=True)
+    return fig
+
+
+@lru_cache(maxsize=64)
+def oi_figure(symbol, expiry, snapshot_id):
+    chain = latest_chain(symbol, expiry, snapshot_id)
+    fig = go.Figure()
+    for option_type, color in (('CE', '#d62728'), ('PE', '#2ca02c')):
+        if ('open_interest', option_type) in chain:
+            fig.add_trace(go.Bar(x=chain.index, y=chain[('open_interest', option_type)],
+                                 name=f"{option_type} OI", marker_color=color))
+    fig.update_layout(title=f"Open interest by strike at {snapshot_id[11:16]}", barmode='group',
+                      margin=dict(t=40, b=20), uirevision=expiry)
+    return fig
+
+
+@lru_cache(maxsize=256)
+def strike_figure(symbol, expiry, snapshot_id, strike):
+    legs = strike_series(symbol, expiry, snapshot_id, strike)
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.06,
+                        subplot_titles=('LTP', 'Open interest'))
+    for option_type, leg in legs.items():
+        fig.add_trace(go.Scattergl(x=leg['date_time'], y=leg['ltp'], name=f"{option_type} LTP",
+                                   mode='lines'), row=1, col=1)
+        fig.add_trace(go.Scattergl(x=leg['date_time'], y=leg['open_interest'], name=f"{option_type} OI",
+                                   mode='lines'), row=2, col=1)
+    fig.update_layout(title=f"{strike:g} through the day", margin=dict(t=60, b=20),
+                      uirevision=f"{expiry}-{strike}")
+    return fig
+
+
+# --- App ---
+app = dash.Dash(__name__, title="NIFTY option chain")
 
-# Layout
 app.layout = html.Div([
-    html.H1("Dash Plotly Example"),
-    dcc.Dropdown(
-        id='country-dropdown',
-        options=[{'label': country, 'value': country} for country in df['country'].unique()],
-        value='India',
-        clearable=False
-    ),
-    dcc.Graph(id='line-chart')
+    html.H1("NIFTY Option Chain"),
+    html.Div([
+        dcc.Dropdown(id='expiry-dropdown', clearable=False, placeholder="Expiry",
+                     style={'width': '200px'}),
+        dcc.Dropdown(id='strike-dropdown', clearable=False, placeholder="Strike",
+                     style={'width': '200px'}),
+        html.Span(id='snapshot-label', style={'marginLeft': '20px'}),
+    ], style={'display': 'flex', 'gap': '10px', 'alignItems': 'center'}),
+    dcc.Store(id='snapshot-id'),
+    dcc.Interval(id='poll', interval=POLL_SECONDS * 1000),
+    dcc.Graph(id='overview-chart'),
+    dcc.Graph(id='oi-chart'),
+    dcc.Graph(id='strike-chart'),
 ])
 
-# Callback to update graph
-@app.callback(
-    Output('line-chart', 'figure'),
-    [Input('country-dropdown', 'value')]
-)
-def update_graph(selected_country):
-    filtered_df = df[df['country'] == selected_country]
-    fig = px.line(filtered_df, x='year', y='gdpPercap', title=f'GDP per Capita of {selected_country}')
-    fig.show()
-    return fig
 
-# Run the app
+@app.callback(Output('snapshot-id', 'data'), Input('poll', 'n_intervals'), State('snapshot-id', 'data'))
+def poll_snapshot(_, current):
+    """The only per-viewer check: has a newer snapshot been stored?"""
+    latest = cache.latest_snapshot()
+    return dash.no_update if latest == current else latest
+
+
+@app.callback(Output('expiry-dropdown', 'options'), Output('expiry-dropdown', 'value'),
+              Input('snapshot-id', 'data'), State('expiry-dropdown', 'value'))
+def update_expiries(snapshot_id, selected):
+    if not snapshot_id:
+        return [], None
+    expiries = cache.expiries(snapshot_id[:10])
+    value = selected if selected in expiries else (expiries[0] if expiries else None)
+    return [{'label': e, 'value': e} for e in expiries], value
+
+
+@app.callback(Output('strike-dropdown', 'options'), Output('strike-dropdown', 'value'),
+              Input('snapshot-id', 'data'), Input('expiry-dropdown', 'value'),
+              State('strike-dropdown', 'value'))
+def update_strikes(snapshot_id, expiry, selected):
+    if not snapshot_id or not expiry:
+        return [], None
+    strikes = latest_chain(SYMBOL, expiry, snapshot_id).index
+    spot = series_by_snapshot(SYMBOL, expiry, snapshot_id)['spot'].iloc[-1]
+    atm = int(abs(strikes - spot).argmin())
+    choices = list(strikes[max(0, atm - STRIKE_CHOICES):atm + STRIKE_CHOICES + 1])
+    value = selected if selected in choices else strikes[atm]
+    return [{'label': f"{s:g}", 'value': s} for s in choices], value
+
+
+@app.callback(Output('overview-chart', 'figure'), Output('oi-chart', 'figure'),
+              Output('snapshot-label', 'children'),
+              Input('snapshot-id', 'data'), Input('expiry-dropdown', 'value'))
+def update_chain_charts(snapshot_id, expiry):
+    if not snapshot_id or not expiry:
+        return go.Figure(), go.Figure(), "No data yet"
+    return (overview_figure(SYMBOL, expiry, snapshot_id), oi_figure(SYMBOL, expiry, snapshot_id),
+            f"Latest snapshot: {snapshot_id}")
+
+
+@app.callback(Output('strike-chart', 'figure'),
+              Input('snapshot-id', 'data'), Input('expiry-dropdown', 'value'),
+              Input('strike-dropdown', 'value'))
+def update_strike_chart(snapshot_id, expiry, strike):
+    if not snapshot_id or not expiry or strike is None:
+        return go.Figure()
+    return strike_figure(SYMBOL, expiry, snapshot_id, float(strike))
+
+
+def main(argv=None):
+    global cache
+    parser = argparse.ArgumentParser(description="Web dashboard for the option chain database")
+    parser.add_argument('--db', default=DB_PATH, help="SQLite database written by the collector")
+    parser.add_argument('--host', default='127.0.0.1', help="0.0.0.0 to serve the whole desk")
+    parser.add_argument('--port', type=int, default=8050)
+    parser.add_argument('--stream-port', type=int, default=PUBSUB_PORT,
+                        help="Collector snapshot stream port (0: always poll the database)")
+    parser.add_argument('--debug', action='store_true')
+    args = parser.parse_args(argv)
+
+    cache = ChainCache(args.db, args.stream_port)
+    app.run(host=args.host, port=args.port, debug=args.debug)
+
+
 if __name__ == '__main__':
-    app.run_server(debug=True,port=8050)
+    main()
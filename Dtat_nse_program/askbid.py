@@ -10,6 +10,9 @@ import platform
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
+from nse_collector import extract_option_chain_data
+from nse_microstructure import MicrostructureTracker
+
 
 class CustomBooleanControl(tk.Canvas):
     def __init__(self, parent, *args, **kwargs):
@@ -30,6 +33,9 @@ class CustomTreeview(ttk.Treeview):
         self.tag_configure('atm', background='#FFFFD1')
         self.tag_configure('above_atm', background='#F8F8F8')
         self.tag_configure('below_atm', background='#F0F0F0')
+        # Configured last so they win over the ATM shading
+        self.tag_configure('illiquid', foreground='#999999')
+        self.tag_configure('imbalance_surge', background='#FFD8A8')
 
     def insert(self, parent_iid, index, **kwargs):
         """Override insert method to handle cell styling"""
@@ -105,6 +111,7 @@ class NiftyApp:
         self.root.title("Nifty Option Chain Viewer")
         self.root.geometry("1800x1000")  # Set geometry to 1000x1000
         self.nifty_client = NiftyOptionChain()
+        self.microstructure = MicrostructureTracker()
         self.setup_database()  # Initialize the database first
         self.setup_ui()        # Then set up the UI
         self.setup_async_loop()
@@ -425,7 +432,8 @@ class NiftyApp:
         pe_frame.grid(row=0, column=1, sticky="nsew", padx=(2, 5), pady=5)
 
         # Create treeviews with columns for ask/bid data
-        columns = ("Strike", "Bid Qty", "Bid Price", "Ask Price", "Ask Qty", "LTP")
+        columns = ("Strike", "Bid Qty", "Bid Price", "Ask Price", "Ask Qty", "LTP",
+                   "Spread bps", "Imbalance", "Liquidity")
 
         # CE Treeview
         self.ce_askbid_tree = CustomTreeview(ce_frame, columns=columns, show="headings", height=15)
@@ -611,6 +619,22 @@ class NiftyApp:
             
 
 
+    @staticmethod
+    def quote_columns(quotes, strike, option_type):
+        """Spread (bps), book imbalance and liquidity score cells for one leg"""
+        if (strike, option_type) not in quotes.index:
+            return ("-", "-", "-")
+        q = quotes.loc[(strike, option_type)]
+        return tuple("-" if pd.isna(v) else fmt.format(v) for v, fmt in (
+            (q['rel_spread_bps'], "{:.0f}"), (q['book_imbalance'], "{:+.2f}"), (q['liquidity_score'], "{:.0f}")))
+
+    @staticmethod
+    def quote_tags(quotes, strike, option_type):
+        if (strike, option_type) not in quotes.index:
+            return []
+        q = quotes.loc[(strike, option_type)]
+        return (["illiquid"] if not q['tradable'] else []) + (["imbalance_surge"] if q['imbalance_surge'] else [])
+
     def process_and_display_data(self, data):
         try:
             data = json.loads(data)
@@ -631,6 +655,9 @@ class NiftyApp:
 
             # Initialize strike_data dictionary
             strike_data = {item["strikePrice"]: item for item in data["records"]["data"] if item["expiryDate"] == current_expiry}
+            # Spread, book imbalance and liquidity score for the whole chain in one pass
+            quotes = self.microstructure.update(extract_option_chain_data(data, current_expiry, current_time))
+            quotes = quotes.set_index(['strike_price', 'option_type'])
 
             ce_data_list = []
             pe_data_list = []
@@ -660,8 +687,8 @@ class NiftyApp:
                         ce_data.get("askPrice", 0),
                         ce_data.get("askQty", 0),
                         ce_data.get("lastPrice", 0)
-                    )
-                    ce_askbid_item = self.ce_askbid_tree.insert("", "end", values=ce_askbid_values, tags=["atm" if strike == atm_strike else "above_atm" if strike > atm_strike else "below_atm"])
+                    ) + self.quote_columns(quotes, strike, "CE")
+                    ce_askbid_item = self.ce_askbid_tree.insert("", "end", values=ce_askbid_values, tags=["atm" if strike == atm_strike else "above_atm" if strike > atm_strike else "below_atm"] + self.quote_tags(quotes, strike, "CE"))
 
                     self.insert_ce_data(
                         current_time, strike,
@@ -711,8 +738,8 @@ class NiftyApp:
                         pe_data.get("askPrice", 0),
                         pe_data.get("askQty", 0),
                         pe_data.get("lastPrice", 0)
-                    )
-                    pe_askbid_item = self.pe_askbid_tree.insert("", "end", values=pe_askbid_values, tags=["atm" if strike == atm_strike else "above_atm" if strike > atm_strike else "below_atm"])
+                    ) + self.quote_columns(quotes, strike, "PE")
+                    pe_askbid_item = self.pe_askbid_tree.insert("", "end", values=pe_askbid_values, tags=["atm" if strike == atm_strike else "above_atm" if strike > atm_strike else "below_atm"] + self.quote_tags(quotes, strike, "PE"))
 
                     self.insert_pe_data(
                         current_time, strike,
@@ -0,0 +1,11 @@
+"""Benchmarks for the ingest, analysis and rendering hot paths.
+
+Run from Dtat_nse_program:
+
+    python -m benchmarks                      # 1-day and 1-month databases
+    python -m benchmarks --sizes day,month,year
+    python -m benchmarks --only parse,query --repeat 10
+
+Results are appended to benchmarks/results/results.jsonl and each run is
+compared with the previous one on the same machine.
+"""
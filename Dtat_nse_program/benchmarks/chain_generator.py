@@ -0,0 +1,156 @@
+"""Synthetic but realistic NIFTY option chains for the benchmarks.
+
+The spot follows a random walk, IV has a smile around the money, LTPs are
+Black-Scholes prices at that IV, OI drifts and volume accumulates through
+the day.  The same generator produces the raw NSE JSON (for the parser
+benchmarks) and ready-made rows in ``OPTION_COLUMNS`` order (for building
+1-day, 1-month and 1-year databases quickly).
+
+    gen = ChainGenerator(strikes=100, expiries=2, snapshots_per_day=75)
+    raw = gen.raw_snapshot(datetime(2025, 6, 12, 10, 0))
+    gen.build_database('bench.db', days=21)
+"""
+import math
+import sqlite3
+from datetime import date, datetime, time, timedelta
+
+import numpy as np
+
+from nse_collector import INSERT_OPTION_QUERY, setup_database
+from nse_greeks import RISK_FREE_RATE, norm_cdf
+
+STRIKE_STEP = 50
+MARKET_OPEN = time(9, 15)
+SNAPSHOT_MINUTES = 5
+
+
+def trading_days(start, count):
+    """``count`` weekdays starting at ``start``"""
+    days = []
+    day = start
+    while len(days) < count:
+        if day.weekday() < 5:
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+def weekly_expiries(day, count):
+    """The next ``count`` Thursday expiries on or after ``day``"""
+    first = day + timedelta(days=(3 - day.weekday()) % 7)
+    return [first + timedelta(weeks=i) for i in range(count)]
+
+
+class ChainGenerator:
+    def __init__(self, strikes=100, expiries=2, snapshots_per_day=75, spot=24500.0, seed=0):
+        self.strikes = strikes
+        self.expiries = expiries
+        self.snapshots_per_day = snapshots_per_day
+        self.spot = spot
+        self.rng = np.random.default_rng(seed)
+        self.day = None
+        self.oi = None
+        self.volume = None
+
+    def snapshot_times(self, day):
+        start = datetime.combine(day, MARKET_OPEN)
+        return [start + timedelta(minutes=SNAPSHOT_MINUTES * i) for i in range(self.snapshots_per_day)]
+
+    def _step(self, when):
+        """Advance the market to ``when`` and return the chain as arrays"""
+        n = self.strikes * self.expiries * 2
+        if self.day != when.date():
+            # New day: OI carries over with some noise, volume restarts
+            self.day = when.date()
+            if self.oi is None:
+                self.oi = self.rng.integers(5_000, 5_000_000, n).astype(float)
+            self.volume = np.zeros(n)
+        self.spot *= math.exp(self.rng.normal(0, 0.0012))
+
+        atm = round(self.spot / STRIKE_STEP) * STRIKE_STEP
+        strike_row = atm + STRIKE_STEP * (np.arange(self.strikes) - self.strikes // 2)
+        expiry_dates = weekly_expiries(when.date(), self.expiries)
+
+        strike = np.tile(np.repeat(strike_row, 2), self.expiries).astype(float)
+        is_call = np.tile([True, False], self.strikes * self.expiries)
+        expiry_index = np.repeat(np.arange(self.expiries), self.strikes * 2)
+        settle = [datetime.combine(e, time(15, 30)) for e in expiry_dates]
+        tte = np.array([max((s - when).total_seconds(), 60) / (365 * 24 * 3600) for s in settle])[expiry_index]
+
+        moneyness = np.log(strike / self.spot)
+        iv = 12.0 + 60.0 * moneyness ** 2 + self.rng.normal(0, 0.3, n)
+        sigma = iv / 100
+        d1 = (np.log(self.spot / strike) + (RISK_FREE_RATE + sigma ** 2 / 2) * tte) / (sigma * np.sqrt(tte))
+        d2 = d1 - sigma * np.sqrt(tte)
+        discount = strike * np.exp(-RISK_FREE_RATE * tte)
+        call = self.spot * norm_cdf(d1) - discount * norm_cdf(d2)
+        put = discount * norm_cdf(-d2) - self.spot * norm_cdf(-d1)
+        ltp = np.round(np.maximum(np.where(is_call, call, put), 0.05), 2)
+
+        change_oi = np.round(self.oi * self.rng.normal(0, 0.01, n))
+        self.oi = np.maximum(self.oi + change_oi, 0)
+        # Near-the-money strikes trade the most
+        self.volume += self.rng.poisson(2_000 * np.exp(-80 * moneyness ** 2) + 5)
+        spread = np.maximum(np.round(ltp * 0.002, 2), 0.05)
+
+        return {
+            'strike': strike, 'is_call': is_call, 'expiry_index': expiry_index,
+            'expiry_dates': [e.strftime('%d-%b-%Y') for e in expiry_dates],
+            'oi': self.oi.astype(np.int64), 'change_oi': change_oi.astype(np.int64),
+            'volume': self.volume.astype(np.int64), 'iv': np.round(iv, 2), 'ltp': ltp,
+            'net_change': np.round(ltp * self.rng.normal(0, 0.05, n), 2),
+            'buy_qty': self.rng.integers(1_000, 500_000, n), 'sell_qty': self.rng.integers(1_000, 500_000, n),
+            'bid_qty': self.rng.integers(75, 20_000, n), 'ask_qty': self.rng.integers(75, 20_000, n),
+            'bid': np.maximum(ltp - spread, 0.05), 'ask': ltp + spread,
+            'spot': round(self.spot, 2),
+        }
+
+    def rows(self, when):
+        """One snapshot as rows in nse_collector.OPTION_COLUMNS order"""
+        c = self._step(when)
+        stamp = when.strftime('%Y-%m-%d %H:%M:%S')
+        expiry = [c['expiry_dates'][i] for i in c['expiry_index']]
+        option_type = np.where(c['is_call'], 'CE', 'PE')
+        return list(zip(
+            [stamp] * len(expiry), c['strike'].tolist(), option_type.tolist(), expiry,
+            c['oi'].tolist(), c['change_oi'].tolist(), c['volume'].tolist(), c['iv'].tolist(),
+            c['ltp'].tolist(), c['net_change'].tolist(), c['buy_qty'].tolist(), c['sell_qty'].tolist(),
+            c['bid_qty'].tolist(), c['bid'].tolist(), c['ask_qty'].tolist(), c['ask'].tolist(),
+            [c['spot']] * len(expiry)))
+
+    def raw_snapshot(self, when):
+        """One snapshot shaped like NSE's option-chain-indices response"""
+        c = self._step(when)
+        data = []
+        for i in range(0, len(c['strike']), 2):
+            entry = {'strikePrice': float(c['strike'][i]),
+                     'expiryDate': c['expiry_dates'][c['expiry_index'][i]]}
+            for j, side in ((i, 'CE'), (i + 1, 'PE')):
+                entry[side] = {
+                    'strikePrice': float(c['strike'][j]), 'expiryDate': entry['expiryDate'],
+                    'underlying': 'NIFTY', 'openInterest': int(c['oi'][j]),
+                    'changeinOpenInterest': int(c['change_oi'][j]),
+                    'totalTradedVolume': int(c['volume'][j]), 'impliedVolatility': float(c['iv'][j]),
+                    'lastPrice': float(c['ltp'][j]), 'change': float(c['net_change'][j]),
+                    'totalBuyQuantity': int(c['buy_qty'][j]), 'totalSellQuantity': int(c['sell_qty'][j]),
+                    'bidQty': int(c['bid_qty'][j]), 'bidprice': float(c['bid'][j]),
+                    'askQty': int(c['ask_qty'][j]), 'askPrice': float(c['ask'][j]),
+                    'underlyingValue': c['spot'],
+                }
+            data.append(entry)
+        return {'records': {'expiryDates': c['expiry_dates'], 'data': data,
+                            'timestamp': when.strftime('%d-%b-%Y %H:%M:%S'),
+                            'underlyingValue': c['spot']}}
+
+    def build_database(self, path, days, start=date(2025, 1, 1)):
+        """Write ``days`` trading days of snapshots to a collector-style DB"""
+        conn = sqlite3.connect(path)
+        try:
+            setup_database(conn)
+            conn.execute("PRAGMA synchronous=OFF")
+            for day in trading_days(start, days):
+                for when in self.snapshot_times(day):
+                    conn.executemany(INSERT_OPTION_QUERY, self.rows(when))
+                conn.commit()
+        finally:
+            conn.close()
@@ -0,0 +1,100 @@
+"""Check nse_backtest.sql_signals against SQL_QUERY on a synthetic day.
+
+The backtest re-expresses SQL_QUERY's rules as pandas column operations.
+This builds one trading day with ``ChainGenerator``, runs both and
+compares
+
+- which strikes are in the top volume per window and type,
+- their volume, OI, LTP and IV aggregates,
+- the signal, on rows where both take the previous values from the same
+  window (the SQL takes LAG after the top-volume filter, see the
+  nse_backtest docstring, so a strike re-entering the top 3 differs).
+
+    python -m benchmarks.check_backtest
+    python -m benchmarks.check_backtest --strikes 40 --seed 3
+
+Exits with status 1 when anything differs.
+"""
+import argparse
+import os
+import sys
+import tempfile
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.chain_generator import ChainGenerator
+from nse_backtest import KEYS, build_windows, load_chain, sql_signals
+from nse_collector import connect
+from nse_queries import SQL_QUERY, day_params
+
+DAY = date(2025, 1, 1)
+ROW_KEYS = ['time_window', 'option_type', 'strike_price']
+# Columns both produce, compared to within TOLERANCE
+VALUE_COLUMNS = ('total_volume', 'total_oi', 'ltp', 'iv')
+TOLERANCE = 1e-6
+
+
+def compare(db_path, day=DAY):
+    """List of mismatch descriptions (empty when the two agree) and the compared signal counts"""
+    conn = connect(db_path, readonly=True)
+    try:
+        sql = pd.read_sql_query(SQL_QUERY, conn, params=day_params(day.isoformat()))
+        chain = load_chain(conn, day.isoformat(), day.isoformat())
+    finally:
+        conn.close()
+
+    w = build_windows(chain)
+    w['prev_window'] = w.groupby(KEYS, sort=False)['time_window'].shift(1)
+    py = sql_signals(w)
+    # Previous window in which the strike was also in the top volume
+    py = py.assign(prev_top_window=py.groupby(KEYS, sort=False)['time_window'].shift(1),
+                   time_window=py['time_window'].dt.strftime('%H:%M'))
+
+    merged = sql.merge(py, on=ROW_KEYS, how='outer', suffixes=('_sql', ''), indicator=True)
+    problems = []
+    for side, label in (('left_only', 'only in SQL_QUERY'), ('right_only', 'only in sql_signals')):
+        extra = merged[merged['_merge'] == side]
+        if len(extra):
+            problems.append(f"{len(extra)} top-volume rows {label}, e.g. "
+                            f"{extra[ROW_KEYS].head(3).to_dict('records')}")
+    both = merged[merged['_merge'] == 'both']
+
+    for col in VALUE_COLUMNS:
+        bad = ~np.isclose(both[col + '_sql'].astype(float), both[col].astype(float), rtol=TOLERANCE, equal_nan=True)
+        if bad.any():
+            problems.append(f"{col} differs on {int(bad.sum())} rows")
+
+    same_prev = (both['prev_top_window'] == both['prev_window']) | \
+        (both['prev_top_window'].isna() & both['prev_window'].isna())
+    checked = both[same_prev]
+    bad = checked[checked['signal_sql'] != checked['signal']]
+    if len(bad):
+        problems.append(f"signal differs on {len(bad)} of {len(checked)} rows, e.g. "
+                        f"{bad[ROW_KEYS + ['signal_sql', 'signal']].head(3).to_dict('records')}")
+    return problems, checked['signal'].value_counts()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare sql_signals with SQL_QUERY on a synthetic day")
+    parser.add_argument('--strikes', type=int, default=40)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, 'check.db')
+        ChainGenerator(strikes=args.strikes, expiries=2, seed=args.seed).build_database(db_path, 1, start=DAY)
+        problems, signals = compare(db_path)
+
+    print("Signals compared: " + ", ".join(f"{name} {count}" for name, count in signals.items()))
+    for problem in problems:
+        print(f"MISMATCH: {problem}")
+    if problems:
+        return 1
+    print("sql_signals matches SQL_QUERY")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
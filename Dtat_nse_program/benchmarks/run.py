@@ -0,0 +1,330 @@
+"""Benchmark runner: time each stage at several database sizes.
+
+Stages and what they call:
+
+    parse     json.loads of a raw chain, extract_option_chain_data
+              (dashboard and collector versions)
+    insert    insert_data_to_db and nse_collector.store_snapshot of one snapshot
+    query     SQL_QUERY, IV_ANALYSIS_QUERY, VOLUME_ANALYSIS_QUERY and the
+              latest-snapshot lookup, for the newest day in the database
+    greeks    nse_greeks.bs_greeks over the newest day's chain
+    treeview  NiftyApp.display_table with the SQL_QUERY result (needs a display)
+
+Databases are generated once per size and cached in the temp directory.
+"""
+import argparse
+import importlib.util
+import io
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import tempfile
+import time
+import types
+from contextlib import redirect_stdout
+from datetime import datetime
+
+import pandas as pd
+
+from benchmarks.chain_generator import ChainGenerator
+import nse_collector
+from nse_greeks import bs_greeks, time_to_expiry
+from nse_queries import SQL_QUERY, IV_ANALYSIS_QUERY, VOLUME_ANALYSIS_QUERY, day_params
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PROGRAM_DIR = os.path.dirname(HERE)
+DASHBOARD_SCRIPT = os.path.join(PROGRAM_DIR, 'nse_data_06-06-2025.py')
+
+# Trading days in each database size
+SIZES = {'day': 1, 'month': 21, 'year': 250}
+STAGES = ['parse', 'insert', 'query', 'greeks', 'treeview']
+
+CACHE_DIR = os.path.join(tempfile.gettempdir(), 'nse_benchmarks')
+RESULTS_PATH = os.path.join(HERE, 'results', 'results.jsonl')
+
+# Median slower than the previous run by more than this factor is flagged
+REGRESSION_RATIO = 1.10
+
+# Timestamp used for benchmark inserts so they can be removed afterwards,
+# from every table the insert stages write to
+INSERT_MARKER = datetime(2099, 1, 1, 10, 0)
+MARKER_TABLES = ('nifty_option_chain_data', 'signal_comparison', 'snapshot_metrics')
+
+
+def load_dashboard():
+    """Import nse_data_06-06-2025.py (not importable by name) as a module"""
+    spec = importlib.util.spec_from_file_location('nse_data_dashboard', DASHBOARD_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    with redirect_stdout(io.StringIO()):
+        spec.loader.exec_module(module)
+    return module
+
+
+def database_for(size, strikes, expiries, snapshots):
+    """Path of the cached database for a size, generating it if needed"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    days = SIZES[size]
+    path = os.path.join(CACHE_DIR, f"chain_{days}d_{strikes}s_{expiries}e_{snapshots}n.db")
+    if not os.path.exists(path):
+        print(f"Generating {size} database ({days} days) at {path} ...")
+        started = time.perf_counter()
+        ChainGenerator(strikes, expiries, snapshots).build_database(path + '.tmp', days)
+        os.replace(path + '.tmp', path)
+        print(f"  done in {time.perf_counter() - started:.1f}s")
+    return path
+
+
+def measure(fn, repeat, setup=None):
+    """Run ``fn`` ``repeat`` times; returns the list of wall times.
+
+    Output printed by the code under test is swallowed, not timed away.
+    """
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        with redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - started)
+    return times
+
+
+# --- Stages ---
+def parse_benchmarks(ctx):
+    gen = ChainGenerator(ctx.strikes, ctx.expiries, ctx.snapshots)
+    raw = gen.raw_snapshot(datetime(2025, 6, 12, 10, 0))
+    text = json.dumps(raw)
+    expiry = raw['records']['expiryDates'][0]
+    dashboard = ctx.dashboard
+    return {
+        'parse/json_loads': lambda: json.loads(text),
+        'parse/dashboard_extract': lambda: dashboard.extract_option_chain_data(raw, expiry),
+        'parse/collector_extract': lambda: nse_collector.extract_option_chain_data(
+            raw, expiry, '2025-06-12 10:00:00'),
+    }
+
+
+def insert_benchmarks(ctx):
+    rows = ChainGenerator(ctx.strikes, ctx.expiries, ctx.snapshots).rows(INSERT_MARKER)
+    dashboard = ctx.dashboard
+
+    def dashboard_insert():
+        dashboard.DB_PATH = ctx.db_path
+        dashboard.insert_data_to_db(rows)
+
+    def collector_insert():
+        conn = sqlite3.connect(ctx.db_path)
+        try:
+            nse_collector.store_snapshot(conn, rows, nse_collector.compute_snapshot_metrics(rows))
+        finally:
+            conn.close()
+
+    return {
+        'insert/dashboard_insert': (dashboard_insert, ctx.remove_marker),
+        'insert/collector_store_snapshot': (collector_insert, ctx.remove_marker),
+    }
+
+
+def query_benchmarks(ctx):
+    params = day_params(ctx.last_day)
+
+    def run(query, query_params=None):
+        def fn():
+            pd.read_sql_query(query, ctx.conn, params=query_params)
+        return fn
+
+    return {
+        'query/sql_query': run(SQL_QUERY, params),
+        'query/iv_analysis_query': run(IV_ANALYSIS_QUERY, params),
+        'query/volume_analysis_query': run(VOLUME_ANALYSIS_QUERY, params),
+        'query/latest_snapshot': run("""
+            SELECT * FROM nifty_option_chain_data
+            WHERE date_time = (SELECT MAX(date_time) FROM nifty_option_chain_data)
+        """),
+    }
+
+
+def greeks_benchmarks(ctx):
+    chain = pd.read_sql_query("""
+        SELECT date_time, strike_price, option_type, expiry_date, iv, underlying_value
+        FROM nifty_option_chain_data WHERE date_time LIKE :day
+    """, ctx.conn, params=day_params(ctx.last_day))
+
+    def vectorized():
+        bs_greeks(chain['underlying_value'], chain['strike_price'],
+                  time_to_expiry(chain['date_time'], chain['expiry_date']),
+                  chain['iv'], chain['option_type'] == 'CE')
+
+    return {'greeks/day_chain_vectorized': vectorized}
+
+
+def treeview_benchmarks(ctx):
+    try:
+        import tkinter as tk
+        from tkinter import ttk
+        root = tk.Tk()
+        root.withdraw()
+    except Exception as e:
+        print(f"Skipping treeview benchmarks: {e}")
+        return {}
+    ctx.cleanups.append(root.destroy)
+    df = pd.read_sql_query(SQL_QUERY, ctx.conn, params=day_params(ctx.last_day))
+    frame = ttk.Frame(root)
+    # display_table only needs the frame/table lists, not a whole NiftyApp
+    app = types.SimpleNamespace(frames=[frame], tables=[None])
+
+    def populate():
+        ctx.dashboard.NiftyApp.display_table(app, frame, df)
+        root.update_idletasks()
+
+    return {'treeview/display_table': populate}
+
+
+STAGE_BENCHMARKS = {
+    'parse': (parse_benchmarks, False),
+    'insert': (insert_benchmarks, True),
+    'query': (query_benchmarks, True),
+    'greeks': (greeks_benchmarks, False),
+    'treeview': (treeview_benchmarks, False),
+}
+
+
+class Context:
+    """Per-size state shared by the stage setups"""
+
+    def __init__(self, args, dashboard, size):
+        self.strikes = args.strikes
+        self.expiries = args.expiries
+        self.snapshots = args.snapshots
+        self.dashboard = dashboard
+        self.size = size
+        self.db_path = database_for(size, args.strikes, args.expiries, args.snapshots)
+        self.conn = sqlite3.connect(self.db_path)
+        # Databases cached before the collector wrote signal_comparison
+        nse_collector.setup_database(self.conn)
+        self.rows = self.conn.execute("SELECT COUNT(*) FROM nifty_option_chain_data").fetchone()[0]
+        last = self.conn.execute("SELECT MAX(date_time) FROM nifty_option_chain_data "
+                                 "WHERE date_time < '2099'").fetchone()[0]
+        self.last_day = last[:10]
+        self.cleanups = []
+
+    def remove_marker(self):
+        for table in MARKER_TABLES:
+            self.conn.execute(f"DELETE FROM {table} WHERE date_time LIKE '2099%'")
+        self.conn.commit()
+
+    def close(self):
+        self.remove_marker()
+        for cleanup in self.cleanups:
+            cleanup()
+        self.conn.close()
+
+
+# --- Results ---
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROGRAM_DIR,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def load_results(path=RESULTS_PATH):
+    if not os.path.exists(path):
+        return []
+    with open(path) as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+def save_results(records, path=RESULTS_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'a') as fh:
+        for record in records:
+            fh.write(json.dumps(record) + '\n')
+
+
+def compare(records, previous):
+    """Print each benchmark next to its previous median on this machine"""
+    last = {}
+    for record in previous:
+        if record['machine'] == platform.node():
+            last[(record['benchmark'], record['size'])] = record
+    if not last:
+        print("\nNo previous run on this machine to compare with")
+        return 0
+
+    regressions = 0
+    print(f"\n{'benchmark':40} {'size':6} {'median':>10} {'previous':>10} {'ratio':>7}")
+    for record in records:
+        before = last.get((record['benchmark'], record['size']))
+        if not before:
+            continue
+        ratio = record['median'] / before['median'] if before['median'] else float('inf')
+        flag = ''
+        if ratio > REGRESSION_RATIO:
+            flag = '  SLOWER'
+            regressions += 1
+        elif ratio < 1 / REGRESSION_RATIO:
+            flag = '  faster'
+        print(f"{record['benchmark']:40} {record['size']:6} {record['median'] * 1000:9.2f}ms "
+              f"{before['median'] * 1000:9.2f}ms {ratio:6.2f}x{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark ingest, analysis and rendering")
+    parser.add_argument('--sizes', default='day,month', help="Comma list of " + ', '.join(SIZES))
+    parser.add_argument('--only', default=','.join(STAGES), help="Comma list of stages")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--strikes', type=int, default=100, help="Strikes per expiry")
+    parser.add_argument('--expiries', type=int, default=2)
+    parser.add_argument('--snapshots', type=int, default=75, help="Snapshots per day")
+    parser.add_argument('--no-save', action='store_true', help="Do not append to the results file")
+    args = parser.parse_args(argv)
+
+    sizes = [s for s in args.sizes.split(',') if s]
+    stages = [s for s in args.only.split(',') if s]
+    unknown = [s for s in sizes if s not in SIZES] + [s for s in stages if s not in STAGE_BENCHMARKS]
+    if unknown:
+        print(f"Unknown size or stage: {', '.join(unknown)}")
+        return 2
+
+    dashboard = load_dashboard()
+    run_id = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    commit = git_commit()
+    records = []
+    for index, size in enumerate(sizes):
+        ctx = Context(args, dashboard, size)
+        print(f"\n== {size}: {ctx.rows:,} rows ==")
+        try:
+            for stage in stages:
+                setup, per_size = STAGE_BENCHMARKS[stage]
+                # Size-independent stages only run once
+                if not per_size and index > 0:
+                    continue
+                for name, bench in setup(ctx).items():
+                    fn, before = bench if isinstance(bench, tuple) else (bench, None)
+                    times = measure(fn, args.repeat, before)
+                    record = {
+                        'run_id': run_id, 'commit': commit, 'machine': platform.node(),
+                        'python': platform.python_version(), 'benchmark': name,
+                        'size': size if per_size else '-', 'db_rows': ctx.rows,
+                        'strikes': args.strikes, 'expiries': args.expiries,
+                        'snapshots': args.snapshots, 'repeat': args.repeat,
+                        'min': min(times), 'median': statistics.median(times),
+                    }
+                    records.append(record)
+                    print(f"{name:40} min {record['min'] * 1000:9.2f}ms  "
+                          f"median {record['median'] * 1000:9.2f}ms")
+        finally:
+            ctx.close()
+
+    regressions = compare(records, load_results())
+    if not args.no_save:
+        save_results(records)
+        print(f"\nSaved {len(records)} results to {RESULTS_PATH}")
+    return 1 if regressions else 0
@@ -0,0 +1,308 @@
+"""Per-stage timings and counters for the fetch/store/display cycle.
+
+When a 5-minute cycle overruns, the print log does not say whether NSE,
+parsing, SQLite or Treeview rendering was slow.  The dashboards time each
+stage into a ``CycleMetrics`` registry, which keeps
+
+- a histogram per stage (lifetime buckets, plus the last ``window``
+  observations for recent quantiles),
+- counters such as rows processed and payload bytes,
+- gauges such as database size and queue depths (callables evaluated when
+  read, so they are always current).
+
+Between ``begin_cycle`` and ``end_cycle`` a stage entered several times
+(three analysis queries, three grid renders) is summed and observed once,
+so its histogram holds per-cycle times, and counters are also tallied for
+that cycle alone.
+
+``serve`` exposes the registry in Prometheus text format on localhost and
+``summary`` gives a one-line version for a status bar.
+
+    metrics = CycleMetrics()
+    metrics.serve(9108)
+    metrics.gauge_fn('db_size_bytes', lambda: db_size(DB_PATH))
+    with metrics.stage('fetch'):
+        data = await fetch()
+    metrics.inc('rows_total', len(rows), stage='parse')
+
+    with metrics.cycle():
+        ...                                    # stages of one refresh
+
+    $ curl -s localhost:9108/metrics
+"""
+import bisect
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Seconds; NSE fetches take seconds, inserts and Treeview fills milliseconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Observations kept per series for the recent quantiles (~a week of 5-minute cycles)
+WINDOW = 500
+QUANTILES = (0.5, 0.9, 0.99)
+PREFIX = 'nse_'
+
+
+class RollingHistogram:
+    """Bucketed lifetime counts plus a bounded window of recent values"""
+
+    def __init__(self, buckets=BUCKETS, window=WINDOW):
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * (len(self.buckets) + 1)  # last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.last = None
+        self.recent = deque(maxlen=window)
+
+    def observe(self, value):
+        self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.last = value
+        self.recent.append(value)
+
+    def cumulative(self):
+        """(upper bound, count <= bound) pairs ending with +Inf"""
+        total = 0
+        pairs = []
+        for bound, n in zip(self.buckets + (math.inf,), self.bucket_counts):
+            total += n
+            pairs.append((bound, total))
+        return pairs
+
+    def quantile(self, q):
+        """Quantile of the recent window (nearest rank), None when empty"""
+        if not self.recent:
+            return None
+        values = sorted(self.recent)
+        return values[min(len(values) - 1, max(0, math.ceil(q * len(values)) - 1))]
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_format_value(v)}"' for k, v in pairs) + '}'
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        if math.isinf(value):
+            return '+Inf' if value > 0 else '-Inf'
+        return repr(value)
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def db_size(path):
+    """Bytes on disk for a SQLite database including its WAL; 0 if missing"""
+    total = 0
+    for suffix in ('', '-wal'):
+        try:
+            total += os.path.getsize(path + suffix)
+        except OSError:
+            pass
+    return total
+
+
+class CycleMetrics:
+    """Thread-safe registry of stage histograms, counters and gauges"""
+
+    def __init__(self, buckets=BUCKETS, window=WINDOW):
+        self.buckets = buckets
+        self.window = window
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+        self.gauge_fns = {}
+        # Stage seconds of the open cycle (None outside one) and counter
+        # increments of the current or last cycle
+        self.pending = None
+        self.cycle_counts = {}
+        self.server = None
+
+    # --- Recording ---
+    def observe(self, name, value, **labels):
+        key = _key(name, labels)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = RollingHistogram(self.buckets, self.window)
+            histogram.observe(value)
+
+    def begin_cycle(self):
+        with self.lock:
+            self.pending = {}
+            self.cycle_counts = {}
+
+    def end_cycle(self):
+        """Observe each stage's total for the cycle; no-op outside a cycle"""
+        with self.lock:
+            pending, self.pending = self.pending, None
+        for name, seconds in (pending or {}).items():
+            self.observe('stage_seconds', seconds, stage=name)
+
+    @contextmanager
+    def cycle(self):
+        self.begin_cycle()
+        try:
+            yield
+        finally:
+            self.end_cycle()
+
+    def observe_stage(self, name, seconds):
+        with self.lock:
+            if self.pending is not None:
+                self.pending[name] = self.pending.get(name, 0.0) + seconds
+                return
+        self.observe('stage_seconds', seconds, stage=name)
+
+    @contextmanager
+    def stage(self, name):
+        """Time the block into ``stage_seconds{stage=name}``, even if it raises"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_stage(name, time.perf_counter() - started)
+
+    def timed(self, name):
+        """Decorator form of ``stage`` for methods"""
+        def decorator(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.stage(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def inc(self, name, value=1, **labels):
+        key = _key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+            if self.pending is not None:
+                self.cycle_counts[key] = self.cycle_counts.get(key, 0) + value
+
+    def set_gauge(self, name, value, **labels):
+        with self.lock:
+            self.gauges[_key(name, labels)] = value
+
+    def gauge_fn(self, name, fn, **labels):
+        """Gauge read from ``fn()`` whenever metrics are rendered"""
+        with self.lock:
+            self.gauge_fns[_key(name, labels)] = fn
+
+    # --- Reading ---
+    def _gauge_values(self):
+        with self.lock:
+            values = dict(self.gauges)
+            fns = dict(self.gauge_fns)
+        for key, fn in fns.items():
+            try:
+                values[key] = fn()
+            except Exception as e:
+                print(f"Error reading gauge {key[0]}: {e}")
+        return values
+
+    def summary(self, stages=None):
+        """One line for a status bar: last time, recent p90 and the last cycle's rows per stage"""
+        with self.lock:
+            timed = [(dict(labels)['stage'], h) for (name, labels), h in self.histograms.items()
+                     if name == 'stage_seconds']
+            counters = dict(self.cycle_counts)
+        if stages is not None:
+            order = {stage: i for i, stage in enumerate(stages)}
+            timed = sorted((s for s in timed if s[0] in order), key=lambda s: order[s[0]])
+        if not timed:
+            return "No cycles timed yet"
+        parts = []
+        for stage, h in timed:
+            text = f"{stage} {h.last:.2f}s (p90 {h.quantile(0.9):.2f}s"
+            rows = counters.get(_key('rows_total', {'stage': stage}))
+            parts.append(text + (f", {rows:,.0f} rows)" if rows else ")"))
+        payload = counters.get(_key('payload_bytes_total', {}))
+        if payload:
+            parts.append(f"{payload / 1e6:.1f} MB fetched")
+        return " | ".join(parts)
+
+    def render(self):
+        """All metrics in Prometheus text exposition format"""
+        gauges = self._gauge_values()
+        with self.lock:
+            histograms = {k: (h.cumulative(), h.sum, h.count, [(q, h.quantile(q)) for q in QUANTILES])
+                          for k, h in self.histograms.items()}
+            counters = dict(self.counters)
+
+        lines = []
+        for name in sorted({k[0] for k in histograms}):
+            metric = PREFIX + name
+            lines.append(f"# TYPE {metric} histogram")
+            for (n, labels), (buckets, total, count, _) in sorted(histograms.items()):
+                if n != name:
+                    continue
+                for bound, cumulative in buckets:
+                    lines.append(f"{metric}_bucket{_format_labels(labels, [('le', float(bound))])} {cumulative}")
+                lines.append(f"{metric}_sum{_format_labels(labels)} {total!r}")
+                lines.append(f"{metric}_count{_format_labels(labels)} {count}")
+            # Quantiles over the rolling window, as a separate summary family
+            lines.append(f"# TYPE {metric}_recent summary")
+            for (n, labels), (_, _, _, quantiles) in sorted(histograms.items()):
+                if n != name:
+                    continue
+                for q, value in quantiles:
+                    lines.append(f"{metric}_recent{_format_labels(labels, [('quantile', q)])} {value!r}")
+
+        for kind, values in (('counter', counters), ('gauge', gauges)):
+            for name in sorted({k[0] for k in values}):
+                metric = PREFIX + name
+                lines.append(f"# TYPE {metric} {kind}")
+                for (n, labels), value in sorted(values.items()):
+                    if n == name and value is not None:
+                        lines.append(f"{metric}{_format_labels(labels)} {float(value)!r}")
+        return '\n'.join(lines) + '\n'
+
+    # --- HTTP endpoint ---
+    def serve(self, port, host='127.0.0.1'):
+        """Serve ``/metrics`` from a daemon thread; returns the server or None"""
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # scrapes every few seconds would flood the console
+
+        try:
+            self.server = ThreadingHTTPServer((host, port), Handler)
+        except OSError as e:
+            print(f"Metrics endpoint not started on {host}:{port}: {e}")
+            return None
+        self.server.daemon_threads = True
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        print(f"Metrics at http://{host}:{self.server.server_port}/metrics")
+        return self.server
+
+    def shutdown(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
@@ -1,56 +1,55 @@
-import pandas as pd
-import yfinance as yf
 import numpy as np
-from tkinter import Tk, Text, Scrollbar, VERTICAL, RIGHT, Y, END, Label
-from datetime import datetime, timedelta
+from tkinter import Tk, Text, Scrollbar, VERTICAL, RIGHT, Y, END
 
-def calculate_volatility(stock_data):
-    # Calculate daily returns
-    stock_data['Returns'] = stock_data['Close'].pct_change()
-    
-    # Calculate the rolling standard deviation of returns (21 trading days ≈ 1 month)
-    stock_data['Volatility'] = stock_data['Returns'].rolling(window=21).std() * np.sqrt(252)
-    
-    return stock_data
+from nse_collector import DB_PATH, connect
+from nse_volatility import (BarCache, ESTIMATORS, HV_WINDOW, SNAPSHOT_SYMBOL, YF_SYMBOL,
+                            atm_iv, realized_vol)
+
+
+def load_volatility(conn):
+    """Daily bars and rolling volatility; yfinance bars are only fetched when missing"""
+    cache = BarCache(conn)
+    cache.update_yfinance(YF_SYMBOL, '1d')
+    cache.update_from_snapshots(conn, '1d')
+    bars = cache.bars(YF_SYMBOL, '1d')
+    if bars.empty:
+        # Offline: fall back to bars built from our own chain snapshots
+        bars = cache.bars(SNAPSHOT_SYMBOL, '1d')
+    volatility = realized_vol(bars, HV_WINDOW)
+    volatility['atm_iv'] = atm_iv(conn).reindex(volatility.index.normalize()).to_numpy()
+    return bars.join(volatility)
 
-def fetch_nifty_data():
-    # Fetch historical data for Nifty index for the last 3 months
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=90)  # approximately 3 months
-    
-    nifty = yf.Ticker("^NSEI")
-    stock_data = nifty.history(start=start_date, end=end_date)
-    return stock_data
 
 def display_volatility():
-    stock_data = fetch_nifty_data()
-    volatility_data = calculate_volatility(stock_data)
-    
-    # Calculate average volatility
-    avg_volatility = volatility_data['Volatility'].mean()
-    
-    # Format the data for display
-    volatility_str = "Date\t\tClose\t\tVolatility\n"
-    volatility_str += "=" * 50 + "\n"
-    
+    conn = connect(DB_PATH)
+    try:
+        volatility_data = load_volatility(conn)
+    finally:
+        conn.close()
+
+    columns = ESTIMATORS + ('atm_iv',)
+    volatility_str = "Date\t\tClose\t\t" + "\t".join(c[:12] for c in columns) + "\n"
+    volatility_str += "=" * 100 + "\n"
+
     for index, row in volatility_data.iterrows():
         date_str = index.strftime('%Y-%m-%d')
-        close = f"{row['Close']:.2f}"
-        vol = f"{row['Volatility']*100:.2f}%" if not np.isnan(row['Volatility']) else "N/A"
-        volatility_str += f"{date_str}\t{close}\t\t{vol}\n"
-    
+        close = f"{row['close']:.2f}"
+        vols = "\t".join(f"{row[c]*100:.2f}%" if not np.isnan(row[c]) else "N/A" for c in columns)
+        volatility_str += f"{date_str}\t{close}\t\t{vols}\n"
+
     # Add average volatility at the bottom
-    volatility_str += "\n" + "=" * 50 + "\n"
-    volatility_str += f"Average Volatility: {avg_volatility*100:.2f}%"
-    
+    volatility_str += "\n" + "=" * 100 + "\n"
+    for c in columns:
+        volatility_str += f"Average {c}: {volatility_data[c].mean()*100:.2f}%\n"
+
     # Clear existing text and insert new data
     text_box.delete(1.0, END)
     text_box.insert(END, volatility_str)
 
 # Initialize Tkinter window
 root = Tk()
-root.title("Nifty 3-Month Historical Volatility")
-root.geometry("600x400")  # Set window size
+root.title("Nifty Historical Volatility")
+root.geometry("1000x400")  # Set window size
 
 # Create a Textbox with a Scrollbar
 scrollbar = Scrollbar(root, orient=VERTICAL)
@@ -63,4 +62,4 @@ text_box.pack(expand=True, fill='both')
 display_volatility()
 
 # Start the Tkinter main loop
-root.mainloop()
\ No newline at end of file
+root.mainloop()
@@ -0,0 +1,79 @@
+"""Deferred imports for the Tk dashboards.
+
+pandas, matplotlib, aiohttp and scipy together take several seconds to
+import on the trading desktops, and none of them is needed to draw the
+first window.  ``lazy_import`` returns a stand-in that imports the real
+module the first time an attribute is used, so existing ``pd.`` /
+``plt.`` call sites keep working unchanged:
+
+    pd = lazy_import('pandas')
+    ...
+    df = pd.read_sql_query(query, conn)   # pandas is imported here
+
+``preload`` warms the heavy modules on a background thread once the window
+is up, so the first chart or greeks click does not pay the import either.
+"""
+import importlib
+import queue
+import sys
+import threading
+import time
+
+
+class LazyModule:
+    """Module proxy that imports ``name`` on first attribute access"""
+
+    def __init__(self, name):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            module = importlib.import_module(self.__dict__['_name'])
+            self.__dict__['_module'] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'loaded' if self.__dict__['_module'] is not None else 'not loaded'
+        return f"<lazy module '{self.__dict__['_name']}' ({state})>"
+
+
+def lazy_import(name):
+    """Return the module if it is already imported, else a LazyModule"""
+    if name in sys.modules:
+        return sys.modules[name]
+    return LazyModule(name)
+
+
+def preload(names):
+    """Import ``names`` one by one on a daemon thread.
+
+    Returns a ``queue.Queue`` of ``(name, seconds, error)`` tuples followed
+    by a final ``(None, total_seconds, None)``; drain it from ``after()`` to
+    show progress without touching Tk from the worker thread.
+    """
+    status = queue.Queue()
+
+    def run():
+        started = time.perf_counter()
+        for name in names:
+            t0 = time.perf_counter()
+            try:
+                importlib.import_module(name)
+                status.put((name, time.perf_counter() - t0, None))
+            except Exception as e:
+                status.put((name, time.perf_counter() - t0, e))
+        status.put((None, time.perf_counter() - started, None))
+
+    threading.Thread(target=run, daemon=True).start()
+    return status
@@ -0,0 +1,194 @@
+"""Persistent, incrementally updated matplotlib charts for the Tk dashboards.
+
+The analysis windows used to build a new ``Figure`` and a new
+``FigureCanvasTkAgg`` on every click or cycle.  ``LiveChart`` creates the
+figure, canvas and Line2D artists once; new points are appended to the
+existing lines and redrawn with blitting, and long series are decimated to
+the pixel width of the axes before they are handed to matplotlib.
+
+    chart = LiveChart(frame, panels=[
+        {'title': 'LTP', 'ylabel': 'LTP',
+         'series': [('ce', 'CE LTP', 'blue'), ('pe', 'PE LTP', 'red')]},
+    ])
+    chart.append('ce', times, values)
+    chart.refresh()
+"""
+import tkinter as tk
+from datetime import datetime
+
+import numpy as np
+import matplotlib.dates as mdates
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+# Fraction of the data range added above/below when limits need to grow
+Y_MARGIN = 0.1
+
+
+def to_num(x):
+    """Convert datetimes / timestamp strings to matplotlib date numbers"""
+    x = np.asarray(x)
+    if x.size == 0:
+        return np.empty(0)
+    if x.dtype.kind in 'fiu':
+        return x.astype(float)
+    if x.dtype.kind in 'OU' and isinstance(x.flat[0], str):
+        x = np.array([datetime.strptime(v, '%Y-%m-%d %H:%M:%S') for v in x])
+    return mdates.date2num(x)
+
+
+def downsample_minmax(x, y, buckets):
+    """Reduce ``(x, y)`` to at most ``2 * buckets`` points.
+
+    Each bucket keeps its minimum and maximum sample so spikes survive the
+    reduction; the result stays in x order.  O(N log N).
+    """
+    n = len(x)
+    if buckets <= 0 or n <= 2 * buckets:
+        return x, y
+    bucket = (np.arange(n) * buckets) // n
+    order = np.lexsort((y, bucket))
+    sorted_bucket = bucket[order]
+    starts = np.searchsorted(sorted_bucket, np.arange(buckets), side='left')
+    ends = np.searchsorted(sorted_bucket, np.arange(buckets), side='right') - 1
+    keep = np.unique(np.concatenate((order[starts], order[ends])))
+    return x[keep], y[keep]
+
+
+class LiveChart:
+    """A set of stacked panels whose lines can be appended to in place.
+
+    ``panels`` is a list of dicts with ``title``, ``ylabel``, ``series`` and
+    optionally ``twin_series``/``twin_ylabel`` for a secondary y-axis.  Each
+    series is ``(key, label, color)``; keys must be unique across the chart.
+    """
+
+    def __init__(self, master, panels, figsize=(10, 8), time_axis=True):
+        self.figure = Figure(figsize=figsize)
+        self.canvas = FigureCanvasTkAgg(self.figure, master)
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.time_axis = time_axis
+
+        self.lines = {}
+        self.data = {}
+        self.axes = []
+        for i, panel in enumerate(panels):
+            ax = self.figure.add_subplot(len(panels), 1, i + 1)
+            ax.set_title(panel.get('title', ''), fontsize=10)
+            ax.set_ylabel(panel.get('ylabel', ''), fontsize=9)
+            ax.grid(True)
+            self._add_series(ax, panel['series'])
+            handles = list(ax.get_lines())
+            if panel.get('twin_series'):
+                twin = ax.twinx()
+                twin.set_ylabel(panel.get('twin_ylabel', ''), fontsize=9)
+                self._add_series(twin, panel['twin_series'])
+                handles += list(twin.get_lines())
+            ax.legend(handles, [h.get_label() for h in handles], loc='upper left', fontsize=8)
+            if time_axis:
+                ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M'))
+                ax.tick_params(axis='x', rotation=45)
+        self.figure.tight_layout()
+
+        self.background = None
+        self._needs_full_draw = True
+        # Window resizes and full redraws invalidate the saved background
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+        self.canvas.draw()
+
+    def _add_series(self, ax, series):
+        for key, label, color in series:
+            (line,) = ax.plot([], [], color=color, label=label, linewidth=2, animated=True)
+            self.lines[key] = line
+            self.data[key] = (np.empty(0), np.empty(0))
+        if ax not in self.axes:
+            self.axes.append(ax)
+
+    def _on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        for line in self.lines.values():
+            self.figure.draw_artist(line)
+
+    def clear(self):
+        for key in self.data:
+            self.data[key] = (np.empty(0), np.empty(0))
+        self._needs_full_draw = True
+
+    def set_data(self, key, x, y):
+        """Replace a series"""
+        self.data[key] = (to_num(x) if self.time_axis else np.asarray(x, dtype=float),
+                          np.asarray(y, dtype=float))
+        self._needs_full_draw = True
+
+    def append(self, key, x, y):
+        """Append one point or a sequence of points to a series"""
+        if np.ndim(y) == 0:
+            x, y = [x], [y]
+        new_x = to_num(x) if self.time_axis else np.asarray(x, dtype=float)
+        old_x, old_y = self.data[key]
+        self.data[key] = (np.concatenate((old_x, new_x)),
+                          np.concatenate((old_y, np.asarray(y, dtype=float))))
+
+    def last_x(self, key):
+        x = self.data[key][0]
+        return x[-1] if len(x) else None
+
+    def _pixel_width(self, ax):
+        return max(int(ax.get_window_extent().width), 1)
+
+    def _update_limits(self):
+        """Grow axis limits to fit the data; return True when any changed.
+
+        All panels share one x range so stacked time series line up.
+        """
+        changed = False
+        xs = [x for x, _ in self.data.values() if len(x)]
+        if xs:
+            x_lo = min(x.min() for x in xs)
+            x_hi = max(x.max() for x in xs)
+            cur_x = self.axes[0].get_xlim()
+            if self._needs_full_draw or x_lo < cur_x[0] or x_hi > cur_x[1]:
+                # Leave headroom on the right so appends rarely force a relayout
+                span = max(x_hi - x_lo, 1e-3)
+                for ax in self.axes:
+                    ax.set_xlim(x_lo, x_hi + span * 0.1)
+                changed = True
+
+        for ax in self.axes:
+            ys = [self.data[k][1] for k, line in self.lines.items()
+                  if line.axes is ax and len(self.data[k][1])]
+            if not ys:
+                continue
+            y_all = np.concatenate(ys)
+            y_all = y_all[np.isfinite(y_all)]
+            if y_all.size == 0:
+                continue
+            y_lo, y_hi = y_all.min(), y_all.max()
+            cur_y = ax.get_ylim()
+            if self._needs_full_draw or y_lo < cur_y[0] or y_hi > cur_y[1]:
+                margin = max(y_hi - y_lo, abs(y_hi) * 0.01, 1e-6) * Y_MARGIN
+                ax.set_ylim(y_lo - margin, y_hi + margin)
+                changed = True
+        return changed
+
+    def refresh(self):
+        """Push the current data to the artists and redraw.
+
+        Only the lines are re-rendered (blit) unless the axes limits moved,
+        in which case one full draw refreshes ticks and the background.
+        """
+        for key, line in self.lines.items():
+            x, y = self.data[key]
+            x, y = downsample_minmax(x, y, self._pixel_width(line.axes))
+            line.set_data(x, y)
+
+        if self._update_limits() or self.background is None:
+            self._needs_full_draw = False
+            self.canvas.draw()
+            return
+
+        self.canvas.restore_region(self.background)
+        for line in self.lines.values():
+            self.figure.draw_artist(line)
+        self.canvas.blit(self.figure.bbox)
+        self.canvas.flush_events()
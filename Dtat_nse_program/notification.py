@@ -1,25 +1,26 @@
-from plyer import notification
-import time
+"""Send test alerts through nse_alerts to check desktop / webhook delivery.
 
-# First notification
-notification.notify(
-    title="Notification 1",
-    message="bullish",
-    timeout=5  # Duration in seconds
-)
-time.sleep(2)  # Wait for 2 seconds before showing the next notification
+    python notification.py
+    python notification.py --webhook http://127.0.0.1:8000/alerts
+"""
+import argparse
 
-# Second notification
-notification.notify(
-    title="Notification 2",
-    message="This is the second message!",
-    timeout=5
-)
-time.sleep(2)  # Wait for 2 seconds before showing the next notification
+from nse_alerts import AlertDispatcher, AlertEngine
 
-# Third notification
-notification.notify(
-    title="Notification 3",
-    message="This is the third message!",
-    timeout=5
-)
\ No newline at end of file
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Send test alerts")
+    parser.add_argument('--webhook', default=None, help="Also POST the alerts to this URL")
+    args = parser.parse_args(argv)
+
+    dispatcher = AlertDispatcher(webhook_url=args.webhook)
+    engine = AlertEngine(dispatcher=dispatcher)
+    # Queued at once; the dispatcher thread delivers them one after another
+    engine.notify("Notification 1", "bullish")
+    engine.notify("Notification 2", "This is the second message!")
+    engine.notify("Notification 3", "This is the third message!")
+    dispatcher.close(timeout=30)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,372 @@
+"""Rule-based alerts on each stored option chain snapshot.
+
+Rules keep their own state and look at one snapshot at a time, so each
+evaluation costs a pass over a couple of hundred rows:
+
+    pcr_cross       PCR crosses one of ``levels`` between two snapshots
+    oi_zscore       a strike's OI change is ``threshold`` standard deviations
+                    away from its own recent OI changes
+    iv_jump         near-the-money IV moves by at least ``points``
+    sustained_signal
+                    SQL_QUERY's 'STRONG BUY' fires on the same strike for
+                    ``snapshots`` snapshots in a row
+    imbalance_surge a tradable strike's buy/sell book imbalance is ``surge_z``
+                    standard deviations from its rolling mean (nse_microstructure)
+
+Alerts go through ``AlertEngine``, which drops repeats of the same rule and
+strike within ``cooldown_minutes`` and caps the total at
+``max_per_minute``, then hands them to an ``AlertDispatcher`` whose worker
+thread shows desktop notifications (plyer) and/or POSTs JSON to a local
+webhook, so a slow notifier never holds up collection.
+
+    engine = AlertEngine(load_rules('alerts.json'), AlertDispatcher(webhook_url=...))
+    collector.add_listener(engine.on_snapshot)
+
+A rules file is a JSON list of ``{"rule": <name>, <option>: <value>, ...}``;
+without one DEFAULT_RULES is used.
+"""
+import json
+import math
+import queue
+import threading
+import time
+import urllib.request
+from collections import deque
+from datetime import datetime
+from typing import NamedTuple
+
+from nse_backtest import SQL_RULE_PARAMS
+from nse_collector import compute_snapshot_metrics
+from nse_microstructure import MicrostructureTracker
+
+DEFAULT_RULES = [
+    {'rule': 'pcr_cross', 'levels': [0.7, 1.0, 1.3]},
+    {'rule': 'oi_zscore', 'threshold': 3.0},
+    {'rule': 'iv_jump', 'points': 2.0},
+    {'rule': 'sustained_signal', 'snapshots': 3},
+]
+
+# The same rule and strike alert again only after this long
+COOLDOWN_MINUTES = 15
+MAX_ALERTS_PER_MINUTE = 6
+WEBHOOK_TIMEOUT = 5
+
+
+class Alert(NamedTuple):
+    rule: str
+    key: str  # what the alert is about, e.g. '24500 CE'; used for dedupe
+    title: str
+    message: str
+    date_time: str
+    severity: str = 'info'
+
+
+def chain_by_strike(rows):
+    """{(strike, option_type): row} for rows in nse_collector.OPTION_COLUMNS order"""
+    return {(row[1], row[2]): row for row in rows}
+
+
+# --- Rules ---
+class PcrCross:
+    name = 'pcr_cross'
+
+    def __init__(self, levels=(0.7, 1.0, 1.3)):
+        self.levels = sorted(levels)
+        self.previous = None
+
+    def evaluate(self, rows, metrics):
+        pcr = metrics['pcr']
+        previous, self.previous = self.previous, pcr
+        if previous is None:
+            return []
+        alerts = []
+        for level in self.levels:
+            if previous < level <= pcr:
+                direction = 'above'
+            elif pcr < level <= previous:
+                direction = 'below'
+            else:
+                continue
+            alerts.append(Alert(
+                self.name, f"{level:g} {direction}", f"PCR crossed {direction} {level:g}",
+                f"PCR {previous:.2f} -> {pcr:.2f} (spot {metrics['underlying_value']})",
+                metrics['date_time'], 'warning'))
+        return alerts
+
+
+class OiZScore:
+    name = 'oi_zscore'
+
+    def __init__(self, threshold=3.0, window=20, min_history=5):
+        self.threshold = threshold
+        self.window = window
+        self.min_history = min_history
+        self.last_oi = {}
+        self.changes = {}
+
+    def evaluate(self, rows, metrics):
+        alerts = []
+        for key, row in chain_by_strike(rows).items():
+            oi = row[4] or 0
+            last = self.last_oi.get(key)
+            self.last_oi[key] = oi
+            if last is None:
+                continue
+            change = oi - last
+            history = self.changes.setdefault(key, deque(maxlen=self.window))
+            if len(history) >= self.min_history:
+                mean = sum(history) / len(history)
+                std = math.sqrt(sum((c - mean) ** 2 for c in history) / (len(history) - 1))
+                z = (change - mean) / std if std > 0 else 0.0
+                if abs(z) >= self.threshold:
+                    strike, option_type = key
+                    alerts.append(Alert(
+                        self.name, f"{strike:g} {option_type}",
+                        f"OI {'spike' if z > 0 else 'drop'} {strike:g} {option_type}",
+                        f"OI change {change:+,.0f} is {z:+.1f} sd from recent ({last:,.0f} -> {oi:,.0f})",
+                        row[0], 'warning'))
+            history.append(change)
+        return alerts
+
+
+class IvJump:
+    name = 'iv_jump'
+
+    def __init__(self, points=2.0, strikes_from_atm=5, strike_step=50):
+        self.points = points
+        self.band = strikes_from_atm * strike_step
+        self.last_iv = {}
+
+    def evaluate(self, rows, metrics):
+        spot = metrics['underlying_value']
+        alerts = []
+        for key, row in chain_by_strike(rows).items():
+            iv = row[7] or 0
+            last = self.last_iv.get(key)
+            if iv > 0:
+                self.last_iv[key] = iv
+            # Far strikes have noisy IVs; only watch the ones near the money
+            if not last or iv <= 0 or abs(key[0] - spot) > self.band:
+                continue
+            if abs(iv - last) >= self.points:
+                strike, option_type = key
+                alerts.append(Alert(
+                    self.name, f"{strike:g} {option_type}",
+                    f"IV {'jump' if iv > last else 'drop'} {strike:g} {option_type}",
+                    f"IV {last:.2f} -> {iv:.2f} ({iv - last:+.2f} points), spot {spot}",
+                    row[0]))
+        return alerts
+
+
+class SustainedSignal:
+    """SQL_QUERY's STRONG BUY rule, kept up to date one snapshot at a time.
+
+    LTP and OI changes are against the previous snapshot, the moving
+    averages are over the last 3 and 6 snapshots (SQL_QUERY's 5 and 15
+    minute windows) and only the top ``top_n`` strikes by volume per option
+    type are considered, as in the query.
+    """
+    name = 'sustained_signal'
+
+    def __init__(self, snapshots=3, params=None):
+        self.snapshots = snapshots
+        self.params = dict(SQL_RULE_PARAMS, **(params or {}))
+        self.history = {}  # key -> deque of (ltp, oi, volume)
+        self.streaks = {}
+
+    def strong_buy(self, history):
+        p = self.params
+        if len(history) < 7:
+            return False
+        ltp = [h[0] for h in history]
+        volume = [h[2] for h in history]
+        (prev_ltp, prev_oi, _), (cur_ltp, cur_oi, _) = history[-2], history[-1]
+        if prev_ltp <= 0 or prev_oi <= 0:
+            return False
+
+        def mean(values):
+            return sum(values) / len(values)
+        return (100.0 * (cur_ltp - prev_ltp) / prev_ltp > p['buy_ltp_pct']
+                and 100.0 * (cur_oi - prev_oi) / prev_oi > p['buy_oi_pct']
+                and mean(ltp[-3:]) > mean(ltp[-4:-1]) * p['ma5_ratio']
+                and mean(volume[-3:]) > mean(volume[-4:-1]) * p['vol_ma5_ratio']
+                and mean(ltp[-6:]) > mean(ltp[-7:-1]) * p['ma15_ratio'])
+
+    def evaluate(self, rows, metrics):
+        chain = chain_by_strike(rows)
+        for key, row in chain.items():
+            self.history.setdefault(key, deque(maxlen=7)).append((row[8] or 0, row[4] or 0, row[6] or 0))
+
+        top = set()
+        for option_type in ('CE', 'PE'):
+            ranked = sorted((k for k in chain if k[1] == option_type),
+                            key=lambda k: chain[k][6] or 0, reverse=True)
+            top.update(ranked[:self.params['top_n']])
+
+        alerts = []
+        for key in chain:
+            if key in top and self.strong_buy(self.history[key]):
+                self.streaks[key] = self.streaks.get(key, 0) + 1
+            else:
+                self.streaks[key] = 0
+            if self.streaks[key] == self.snapshots:
+                strike, option_type = key
+                alerts.append(Alert(
+                    self.name, f"{strike:g} {option_type}",
+                    f"STRONG BUY {option_type} {strike:g} sustained",
+                    f"STRONG BUY {option_type} for {self.snapshots} snapshots in a row, "
+                    f"LTP {chain[key][8]}, OI {chain[key][4]:,}",
+                    chain[key][0], 'critical'))
+        return alerts
+
+
+class ImbalanceSurge:
+    """Order book imbalance surges, on strikes liquid enough to act on"""
+    name = 'imbalance_surge'
+
+    def __init__(self, surge_z=3.0, span=12, min_history=6):
+        self.tracker = MicrostructureTracker(span, surge_z, min_history)
+
+    def evaluate(self, rows, metrics):
+        quotes = self.tracker.update(rows)
+        alerts = []
+        for q in quotes[quotes['imbalance_surge'] & quotes['tradable']].itertuples():
+            side = 'buy' if q.imbalance_z > 0 else 'sell'
+            alerts.append(Alert(
+                self.name, f"{q.strike_price:g} {q.option_type}",
+                f"{side.capitalize()} imbalance {q.strike_price:g} {q.option_type}",
+                f"Book imbalance {q.book_imbalance:+.2f} is {q.imbalance_z:+.1f} sd from recent, "
+                f"spread {q.rel_spread_bps:.0f} bps, bid {q.bid_price} / ask {q.ask_price}",
+                q.date_time, 'warning'))
+        return alerts
+
+
+RULE_TYPES = {rule.name: rule for rule in (PcrCross, OiZScore, IvJump, SustainedSignal, ImbalanceSurge)}
+
+
+def build_rules(specs=None):
+    """Rule objects from a list of ``{"rule": name, **options}`` dicts"""
+    rules = []
+    for spec in DEFAULT_RULES if specs is None else specs:
+        options = dict(spec)
+        name = options.pop('rule')
+        if name not in RULE_TYPES:
+            raise ValueError(f"Unknown alert rule {name!r}, expected one of {sorted(RULE_TYPES)}")
+        rules.append(RULE_TYPES[name](**options))
+    return rules
+
+
+def load_rules(path=None):
+    if path is None:
+        return build_rules()
+    with open(path) as fh:
+        return build_rules(json.load(fh))
+
+
+# --- Dispatch ---
+def desktop_sink(alert):
+    from plyer import notification
+    notification.notify(title=alert.title, message=alert.message, timeout=10)
+
+
+def webhook_sink(url):
+    def send(alert):
+        body = json.dumps(alert._asdict()).encode()
+        request = urllib.request.Request(url, data=body, headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request, timeout=WEBHOOK_TIMEOUT) as resp:
+            resp.read()
+    return send
+
+
+def console_sink(alert):
+    print(f"ALERT [{alert.severity}] {alert.date_time} {alert.title}: {alert.message}")
+
+
+class AlertDispatcher:
+    """Delivers alerts to the sinks from a worker thread"""
+
+    def __init__(self, desktop=True, webhook_url=None, console=True):
+        self.sinks = []
+        if console:
+            self.sinks.append(console_sink)
+        if desktop:
+            try:
+                import plyer  # noqa: F401
+                self.sinks.append(desktop_sink)
+            except ImportError:
+                print("plyer is not installed - desktop notifications disabled")
+        if webhook_url:
+            self.sinks.append(webhook_sink(webhook_url))
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def send(self, alert):
+        """Queue an alert; returns immediately"""
+        self.queue.put(alert)
+
+    def close(self, timeout=5):
+        self.queue.put(None)
+        self.thread.join(timeout)
+
+    def _run(self):
+        while True:
+            alert = self.queue.get()
+            if alert is None:
+                return
+            for sink in self.sinks:
+                try:
+                    sink(alert)
+                except Exception as e:
+                    print(f"Error delivering alert '{alert.title}': {e}")
+
+
+class AlertEngine:
+    def __init__(self, rules=None, dispatcher=None, cooldown_minutes=COOLDOWN_MINUTES,
+                 max_per_minute=MAX_ALERTS_PER_MINUTE):
+        self.rules = build_rules() if rules is None else rules
+        self.dispatcher = dispatcher or AlertDispatcher()
+        self.cooldown = cooldown_minutes * 60
+        self.max_per_minute = max_per_minute
+        self.last_sent = {}
+        self.sent_times = deque()
+        self.suppressed = 0
+        # submit() is called from the worker and, via notify(), the Tk thread
+        self.lock = threading.Lock()
+
+    def on_snapshot(self, rows, metrics=None):
+        """Evaluate every rule on one snapshot; fits Collector.add_listener"""
+        if not rows:
+            return []
+        metrics = metrics or compute_snapshot_metrics(rows)
+        alerts = []
+        for rule in self.rules:
+            try:
+                alerts.extend(rule.evaluate(rows, metrics))
+            except Exception as e:
+                print(f"Error in alert rule {rule.name}: {e}")
+        return [alert for alert in alerts if self.submit(alert)]
+
+    def submit(self, alert, now=None):
+        """Dispatch unless it is a repeat within the cooldown or over the rate limit"""
+        now = time.monotonic() if now is None else now
+        key = (alert.rule, alert.key)
+        with self.lock:
+            last = self.last_sent.get(key)
+            if last is not None and now - last < self.cooldown:
+                return False
+            while self.sent_times and now - self.sent_times[0] >= 60:
+                self.sent_times.popleft()
+            if len(self.sent_times) >= self.max_per_minute:
+                self.suppressed += 1
+                print(f"Alert rate limit reached, dropped '{alert.title}' ({self.suppressed} dropped so far)")
+                return False
+            self.last_sent[key] = now
+            self.sent_times.append(now)
+        self.dispatcher.send(alert)
+        return True
+
+    def notify(self, title, message, severity='info'):
+        """Send a one-off alert (e.g. market closed) through the same limits"""
+        return self.submit(Alert('notice', title, title, message,
+                                 datetime.now().strftime('%Y-%m-%d %H:%M:%S'), severity))
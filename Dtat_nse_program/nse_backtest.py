@@ -0,0 +1,376 @@
+"""Vectorized backtest of the option-chain signal rules.
+
+``SQL_QUERY`` and ``VOLUME_ANALYSIS_QUERY`` (nse_queries.py) turn
+volume / OI / LTP percentage changes into signals ('STRONG BUY CE',
+'CALL Unwinding', 'Strong Buy Signal', ...) but only for one hardcoded day
+inside SQLite.  This module re-expresses both rule sets as pandas/NumPy
+column operations over any date range of the stored chain, turns each
+signal into a trade on the stored LTP and reports hit rate and P&L per
+signal.  Thresholds are plain dicts so grids of them can be swept across a
+process pool.
+
+    python nse_backtest.py --start 2025-06-02 --end 2025-06-27
+    python nse_backtest.py --rule volume --start 2025-06-02 --end 2025-06-27 --sweep
+
+Differences from the live SQL: moving averages and previous values are
+taken per trading day from the previous time window of the same strike
+(the SQL takes LAG after filtering to the top-volume strikes, so a strike
+dropping out of the top 3 for a window skips a step), and the nearest
+expiry is chosen by date rather than by sorting the expiry text.
+``python -m benchmarks.check_backtest`` compares ``sql_signals`` with
+SQL_QUERY on a synthetic day.
+"""
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from nse_collector import DB_PATH, connect
+
+# SQL_QUERY thresholds (percentages and moving-average ratios)
+SQL_RULE_PARAMS = {
+    'top_n': 3,              # strikes per option type and window (vol_rank <= 3)
+    'unwind_ltp_pct': -1.0,  # LTP change below this ...
+    'unwind_oi_pct': -1.0,   # ... with OI change below this = unwinding
+    'buy_ltp_pct': 15.0,     # LTP change above this ...
+    'buy_oi_pct': 15.0,      # ... with OI change above this = strong buy
+    'ma5_ratio': 1.1,        # ma_5min > prev_ma_5min * ratio
+    'vol_ma5_ratio': 1.2,    # vol_ma_5min > prev_vol_ma_5min * ratio
+    'ma15_ratio': 1.05,      # ma_15min > prev_ma_15min * ratio
+}
+
+# VOLUME_ANALYSIS_QUERY thresholds
+VOLUME_RULE_PARAMS = {
+    'top_strikes': 16,       # strikes by day volume, CE and PE together
+    'volume_spike_pct': 100.0,
+    'oi_build_pct': 10.0,
+    'oi_strong_pct': 20.0,
+    'high_percentile': 0.8,
+    'low_percentile': 0.2,
+}
+
+# Signal -> (option type to trade, direction).  'same' trades the strike and
+# type the signal fired on; +1 buys the option, -1 writes it.
+SQL_SIGNAL_TRADES = {
+    'STRONG BUY CE': ('same', 1),
+    'STRONG BUY PE': ('same', 1),
+    'CALL Unwinding': ('PE', 1),   # action: BUY PE - Unwinding Signal
+    'PUT Unwinding': ('CE', 1),    # action: BUY CE - PUT Unwinding
+}
+VOLUME_SIGNAL_TRADES = {
+    'Strong Buy Signal': ('same', 1),
+    'Strong Sell Signal': ('same', -1),
+    'Potential Breakout': ('same', 1),
+    'Potential Reversal': ('same', -1),
+}
+
+# Exit after this many 5-minute windows (or at the last window of the day)
+HOLD_WINDOWS = 3
+
+# Parameter grids used by --sweep
+SQL_SWEEP_GRID = {
+    'buy_ltp_pct': [5.0, 10.0, 15.0, 20.0],
+    'buy_oi_pct': [5.0, 10.0, 15.0, 20.0],
+    'ma5_ratio': [1.0, 1.05, 1.1],
+    'unwind_ltp_pct': [-1.0, -3.0, -5.0],
+}
+VOLUME_SWEEP_GRID = {
+    'volume_spike_pct': [25.0, 50.0, 100.0, 200.0],
+    'oi_build_pct': [5.0, 10.0, 15.0],
+    'oi_strong_pct': [15.0, 20.0, 30.0],
+    'high_percentile': [0.7, 0.8, 0.9],
+}
+
+KEYS = ['day', 'strike_price', 'option_type']
+
+
+# --- Loading ---
+def load_chain(conn, start_date, end_date):
+    """Read the nearest-expiry chain between two dates (inclusive)"""
+    end_exclusive = (datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
+    query = """
+    SELECT date_time, strike_price, option_type, expiry_date,
+           open_interest, volume, ltp, iv
+    FROM nifty_option_chain_data
+    WHERE date_time >= ? AND date_time < ?
+    """
+    df = pd.read_sql_query(query, conn, params=(start_date, end_exclusive))
+    if df.empty:
+        return df
+
+    df['date_time'] = pd.to_datetime(df['date_time'])
+    df['day'] = df['date_time'].dt.normalize()
+    df['expiry'] = pd.to_datetime(df['expiry_date'], format='%d-%b-%Y', errors='coerce')
+
+    # Nearest expiry still live on each day
+    live = df[df['expiry'] >= df['day']]
+    nearest = live.groupby('day')['expiry'].min().rename('nearest_expiry')
+    df = df.join(nearest, on='day')
+    return df[df['expiry'] == df['nearest_expiry']].drop(columns=['nearest_expiry'])
+
+
+def group_rolling_mean(values, group_start, k):
+    """Trailing mean over the last ``k`` rows of each group.
+
+    Rows must be sorted by group then time; ``group_start[i]`` is the row
+    index where row i's group begins.  Matches SQL
+    ``ROWS BETWEEN k-1 PRECEDING AND CURRENT ROW`` including the shorter
+    windows at the start of each group.
+    """
+    values = np.nan_to_num(np.asarray(values, dtype=float))
+    cs = np.concatenate(([0.0], np.cumsum(values)))
+    idx = np.arange(len(values))
+    lo = np.maximum(idx - k + 1, group_start)
+    return (cs[idx + 1] - cs[lo]) / (idx + 1 - lo)
+
+
+def build_windows(chain):
+    """Aggregate the chain to one row per day, minute, strike and type.
+
+    Adds the moving averages and previous-window values both rule sets use.
+    """
+    chain = chain.assign(time_window=chain['date_time'].dt.floor('min'))
+    w = (chain.groupby(KEYS + ['time_window'], sort=True)
+         .agg(total_volume=('volume', 'sum'), total_oi=('open_interest', 'sum'),
+              ltp=('ltp', 'mean'), iv=('iv', 'mean'))
+         .reset_index())
+
+    # Position of each row's group start, for the vectorized rolling means
+    new_group = np.ones(len(w), dtype=bool)
+    if len(w) > 1:
+        new_group[1:] = (w[KEYS].values[1:] != w[KEYS].values[:-1]).any(axis=1)
+    group_start = np.maximum.accumulate(np.where(new_group, np.arange(len(w)), 0))
+
+    w['ma_5min'] = group_rolling_mean(w['ltp'], group_start, 3)
+    w['ma_15min'] = group_rolling_mean(w['ltp'], group_start, 6)
+    w['ma_30min'] = group_rolling_mean(w['ltp'], group_start, 10)
+    w['vol_ma_5min'] = group_rolling_mean(w['total_volume'], group_start, 3)
+    w['vol_ma_15min'] = group_rolling_mean(w['total_volume'], group_start, 6)
+
+    g = w.groupby(KEYS, sort=False)
+    for col in ['total_volume', 'total_oi', 'ltp', 'iv', 'ma_5min', 'ma_15min', 'vol_ma_5min']:
+        w[f'prev_{col}'] = g[col].shift(1)
+
+    w['volume_pct_change'] = pct_change(w['total_volume'], w['prev_total_volume'])
+    w['oi_pct_change'] = pct_change(w['total_oi'], w['prev_total_oi'])
+    w['ltp_pct_change'] = pct_change(w['ltp'], w['prev_ltp'])
+
+    # Exit prices for the simulation: LTP HOLD_WINDOWS later, else the day's last
+    w['last_ltp'] = g['ltp'].transform('last')
+    return w
+
+
+def pct_change(current, previous):
+    """100 * (current - previous) / previous, NaN when previous is not > 0"""
+    previous = previous.where(previous > 0)
+    return 100.0 * (current - previous) / previous
+
+
+# --- Rules ---
+def sql_signals(w, params=None):
+    """SQL_QUERY's ``signal`` column, for the top-volume strikes per window"""
+    p = dict(SQL_RULE_PARAMS, **(params or {}))
+    rank = w.groupby(['day', 'time_window', 'option_type'])['total_volume'].rank(
+        method='first', ascending=False)
+    top = w[rank <= p['top_n']]
+
+    is_ce = top['option_type'] == 'CE'
+    has_prev = (top['prev_ltp'] > 0) & (top['prev_total_oi'] > 0)
+    unwinding = has_prev & (top['ltp_pct_change'] < p['unwind_ltp_pct']) & \
+        (top['oi_pct_change'] < p['unwind_oi_pct'])
+    strong_buy = has_prev & (top['ltp_pct_change'] > p['buy_ltp_pct']) & \
+        (top['oi_pct_change'] > p['buy_oi_pct']) & \
+        (top['ma_5min'] > top['prev_ma_5min'] * p['ma5_ratio']) & \
+        (top['vol_ma_5min'] > top['prev_vol_ma_5min'] * p['vol_ma5_ratio']) & \
+        (top['ma_15min'] > top['prev_ma_15min'] * p['ma15_ratio'])
+
+    # Same precedence as the SQL CASE
+    signal = np.select(
+        [top['prev_total_volume'].isna(), unwinding & is_ce, unwinding & ~is_ce,
+         strong_buy & is_ce, strong_buy & ~is_ce],
+        ['Insufficient data', 'CALL Unwinding', 'PUT Unwinding', 'STRONG BUY CE', 'STRONG BUY PE'],
+        default='No Clear Signal')
+    return top.assign(signal=signal)
+
+
+def volume_signals(w, params=None):
+    """VOLUME_ANALYSIS_QUERY's ``trading_signal`` column"""
+    p = dict(VOLUME_RULE_PARAMS, **(params or {}))
+    day_volume = w.groupby(KEYS)['total_volume'].sum()
+    day_rank = day_volume.groupby(level='day').rank(method='first', ascending=False)
+    top_pairs = day_rank[day_rank <= p['top_strikes']].index
+    top = w[pd.MultiIndex.from_frame(w[KEYS]).isin(top_pairs)]
+
+    g = top.groupby(['day', 'time_window'])['total_volume']
+    n = g.transform('count')
+    percentile = ((g.rank(method='min') - 1) / (n - 1)).where(n > 1, 0.0)
+
+    vol_chg = top['volume_pct_change'].round(2)
+    oi_chg = top['oi_pct_change'].round(2)
+    spike = vol_chg > p['volume_spike_pct']
+    volume_signal = np.select(
+        [spike & (oi_chg > p['oi_build_pct']), spike & (oi_chg < -p['oi_build_pct']),
+         spike & (oi_chg.abs() <= p['oi_build_pct']),
+         percentile > p['high_percentile'], percentile < p['low_percentile']],
+        ['New Position Building', 'Position Squaring Off', 'High Volume - Neutral OI',
+         'Unusually High Volume', 'Unusually Low Volume'],
+        default='Normal Volume')
+    oi_signal = np.select(
+        [oi_chg > p['oi_strong_pct'], oi_chg < -p['oi_strong_pct'],
+         oi_chg > p['oi_build_pct'], oi_chg < -p['oi_build_pct']],
+        ['Strong OI Build-up', 'Strong OI Unwinding', 'Moderate OI Build-up', 'Moderate OI Unwinding'],
+        default='Neutral OI')
+
+    build_up = np.isin(oi_signal, ['Strong OI Build-up', 'Moderate OI Build-up'])
+    unwind = np.isin(oi_signal, ['Strong OI Unwinding', 'Moderate OI Unwinding'])
+    signal = np.select(
+        [(volume_signal == 'New Position Building') & build_up,
+         (volume_signal == 'Position Squaring Off') & unwind,
+         (volume_signal == 'Unusually High Volume') & (oi_chg > 0),
+         (volume_signal == 'Unusually Low Volume') & (oi_chg < 0)],
+        ['Strong Buy Signal', 'Strong Sell Signal', 'Potential Breakout', 'Potential Reversal'],
+        default='Monitor')
+    return top.assign(volume_percentile=percentile, volume_signal=volume_signal,
+                      oi_signal=oi_signal, signal=signal)
+
+
+RULES = {
+    'sql': (sql_signals, SQL_SIGNAL_TRADES, SQL_RULE_PARAMS, SQL_SWEEP_GRID),
+    'volume': (volume_signals, VOLUME_SIGNAL_TRADES, VOLUME_RULE_PARAMS, VOLUME_SWEEP_GRID),
+}
+
+
+# --- Simulation ---
+def simulate_trades(w, signals, signal_trades, hold_windows=HOLD_WINDOWS):
+    """Enter at the signal window's LTP and exit ``hold_windows`` later.
+
+    Trades the instrument given by ``signal_trades`` on the same strike;
+    returns one row per trade with ``pnl`` in option points.
+    """
+    entries = signals[signals['signal'].isin(list(signal_trades))]
+    if entries.empty:
+        return entries.assign(traded_type=[], direction=[], entry_ltp=[], exit_ltp=[], pnl=[], pnl_pct=[])
+
+    traded = entries['signal'].map({s: t for s, (t, _) in signal_trades.items()})
+    entries = entries.assign(
+        traded_type=np.where(traded == 'same', entries['option_type'], traded),
+        direction=entries['signal'].map({s: d for s, (_, d) in signal_trades.items()}))
+
+    # Entry and exit LTP for every instrument and window
+    prices = w[KEYS + ['time_window', 'ltp', 'last_ltp']].copy()
+    prices['exit_ltp'] = prices.groupby(KEYS, sort=False)['ltp'].shift(-hold_windows)
+    prices['exit_ltp'] = prices['exit_ltp'].fillna(prices['last_ltp'])
+    prices = prices.rename(columns={'option_type': 'traded_type', 'ltp': 'entry_ltp'})
+
+    trades = entries[['day', 'time_window', 'strike_price', 'option_type', 'signal',
+                      'traded_type', 'direction']].merge(
+        prices[['day', 'time_window', 'strike_price', 'traded_type', 'entry_ltp', 'exit_ltp']],
+        on=['day', 'time_window', 'strike_price', 'traded_type'], how='inner')
+    trades = trades[trades['entry_ltp'] > 0]
+    trades['pnl'] = trades['direction'] * (trades['exit_ltp'] - trades['entry_ltp'])
+    trades['pnl_pct'] = 100.0 * trades['pnl'] / trades['entry_ltp']
+    return trades
+
+
+def summarize(trades):
+    """Per-signal trade count, hit rate and P&L"""
+    if trades.empty:
+        return pd.DataFrame(columns=['signal', 'trades', 'hit_rate', 'avg_pnl', 'total_pnl', 'avg_pnl_pct'])
+    summary = trades.groupby('signal').agg(
+        trades=('pnl', 'size'), hit_rate=('pnl', lambda s: (s > 0).mean()),
+        avg_pnl=('pnl', 'mean'), total_pnl=('pnl', 'sum'), avg_pnl_pct=('pnl_pct', 'mean'))
+    return summary.reset_index().round(4)
+
+
+def backtest(windows, rule='sql', params=None, hold_windows=HOLD_WINDOWS):
+    """Run one rule set with one parameter set; returns (summary, trades)"""
+    rule_fn, signal_trades = RULES[rule][:2]
+    signals = rule_fn(windows, params)
+    trades = simulate_trades(windows, signals, signal_trades, hold_windows)
+    return summarize(trades), trades
+
+
+# --- Parameter sweep ---
+_worker_windows = None
+
+
+def _init_worker(windows):
+    # Each process receives the aggregated windows once, not once per task
+    global _worker_windows
+    _worker_windows = windows
+
+
+def _run_params(task):
+    rule, params, hold_windows = task
+    _, trades = backtest(_worker_windows, rule, params, hold_windows)
+    result = dict(params)
+    result['trades'] = len(trades)
+    result['hit_rate'] = float((trades['pnl'] > 0).mean()) if len(trades) else 0.0
+    result['total_pnl'] = float(trades['pnl'].sum()) if len(trades) else 0.0
+    result['avg_pnl_pct'] = float(trades['pnl_pct'].mean()) if len(trades) else 0.0
+    return result
+
+
+def expand_grid(grid):
+    """Every combination of a {param: [values]} grid as a list of dicts"""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+
+def sweep(windows, rule='sql', grid=None, hold_windows=HOLD_WINDOWS, workers=None):
+    """Backtest every parameter combination across a process pool.
+
+    Returns one row per combination, best total P&L first.
+    """
+    grid = grid or RULES[rule][3]
+    tasks = [(rule, params, hold_windows) for params in expand_grid(grid)]
+    workers = workers or os.cpu_count() or 1
+    print(f"Sweeping {len(tasks)} parameter sets on {workers} processes")
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(windows,)) as pool:
+        results = list(pool.map(_run_params, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+    return pd.DataFrame(results).sort_values('total_pnl', ascending=False, ignore_index=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backtest the option-chain signal rules")
+    parser.add_argument('--db', default=DB_PATH, help="SQLite database path")
+    parser.add_argument('--start', required=True, help="First day, YYYY-MM-DD")
+    parser.add_argument('--end', required=True, help="Last day, YYYY-MM-DD")
+    parser.add_argument('--rule', choices=sorted(RULES), default='sql')
+    parser.add_argument('--hold', type=int, default=HOLD_WINDOWS, help="Windows to hold each trade")
+    parser.add_argument('--sweep', action='store_true', help="Sweep the threshold grid")
+    parser.add_argument('--workers', type=int, default=None, help="Processes for --sweep")
+    parser.add_argument('--out', default=None, help="Write the result table to this CSV")
+    args = parser.parse_args(argv)
+
+    conn = connect(args.db, readonly=True)
+    try:
+        chain = load_chain(conn, args.start, args.end)
+    finally:
+        conn.close()
+    if chain.empty:
+        print(f"No option chain data between {args.start} and {args.end}")
+        return
+
+    windows = build_windows(chain)
+    print(f"Loaded {len(chain)} rows, {windows['day'].nunique()} days, {len(windows)} windows")
+
+    if args.sweep:
+        result = sweep(windows, args.rule, hold_windows=args.hold, workers=args.workers)
+        print(result.head(20).to_string(index=False))
+    else:
+        result, trades = backtest(windows, args.rule, hold_windows=args.hold)
+        print(result.to_string(index=False))
+        print(f"Total trades: {len(trades)}  P&L: {trades['pnl'].sum():.2f} points")
+    if args.out:
+        result.to_csv(args.out, index=False)
+        print(f"Saved {args.out}")
+
+
+if __name__ == "__main__":
+    main()
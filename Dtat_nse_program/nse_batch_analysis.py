@@ -0,0 +1,318 @@
+"""Recompute the dashboard analyses for a range of days on all CPU cores.
+
+The GUI runs ``SQL_QUERY``, ``IV_ANALYSIS_QUERY``, ``VOLUME_ANALYSIS_QUERY``
+and the PCR / greeks analyses for one day at a time in its own process.
+This runner splits a date range into work units (one per day, or one per
+expiry week), runs the same pipeline for each unit in a
+``ProcessPoolExecutor`` and merges the results into summary tables:
+
+    signal_history          SQL_QUERY rows, one per window/strike/type
+    iv_signal_history       IV_ANALYSIS_QUERY rows
+    volume_signal_history   VOLUME_ANALYSIS_QUERY rows
+    pcr_history             PCR and spot per snapshot
+    atm_greeks_history      ATM CE/PE greeks per snapshot
+    daily_summary           one row per day
+
+Every worker opens its own read-only connection (or reads the day's
+Parquet file into a private in-memory database), so units share nothing
+and the run scales with the number of cores.
+
+    python nse_batch_analysis.py --start 2025-01-01 --end 2025-06-30
+    python nse_batch_analysis.py --start 2025-06-02 --end 2025-06-27 --by expiry --workers 8
+    python nse_batch_analysis.py --start 2025-06-02 --end 2025-06-27 --export-parquet E:/chain_parquet
+    python nse_batch_analysis.py --start 2025-06-02 --end 2025-06-27 --source E:/chain_parquet
+"""
+import argparse
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from nse_collector import DB_PATH, OPTION_COLUMNS, connect
+from nse_greeks import bs_greeks, time_to_expiry
+from nse_queries import SQL_QUERY, IV_ANALYSIS_QUERY, VOLUME_ANALYSIS_QUERY, day_params
+
+ANALYSIS_DB_PATH = 'E:/nifty_analysis.db'
+
+QUERY_TABLES = {
+    'signal_history': SQL_QUERY,
+    'iv_signal_history': IV_ANALYSIS_QUERY,
+    'volume_signal_history': VOLUME_ANALYSIS_QUERY,
+}
+RESULT_TABLES = list(QUERY_TABLES) + ['pcr_history', 'atm_greeks_history', 'daily_summary']
+
+# Snapshot rows for the day's nearest expiry, as the analysis queries pick it
+SNAPSHOT_QUERY = """
+SELECT date_time, strike_price, option_type, expiry_date,
+       open_interest, volume, iv, ltp, underlying_value
+FROM nifty_option_chain_data
+WHERE date_time LIKE :day
+AND expiry_date = (
+    SELECT expiry_date
+    FROM nifty_option_chain_data
+    WHERE date_time LIKE :day
+    ORDER BY expiry_date
+    LIMIT 1
+)
+"""
+
+STRIKE_STEP = 50
+
+
+# --- Work units ---
+def trading_days(conn, start_date, end_date):
+    """Days between start and end (inclusive) that have chain data, with expiry"""
+    end_exclusive = (datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
+    df = pd.read_sql_query("""
+        SELECT DISTINCT substr(date_time, 1, 10) AS day, expiry_date
+        FROM nifty_option_chain_data
+        WHERE date_time >= ? AND date_time < ?
+    """, conn, params=(start_date, end_exclusive))
+    if df.empty:
+        return df
+    # Nearest expiry on or after each day groups the days into expiry weeks
+    df['expiry'] = pd.to_datetime(df['expiry_date'], format='%d-%b-%Y', errors='coerce')
+    df = df[df['expiry'] >= pd.to_datetime(df['day'])]
+    return df.sort_values('expiry').groupby('day', as_index=False).first().sort_values('day')
+
+
+def work_units(days, by='day'):
+    """Split days into ``(label, [days])`` units, per day or per expiry"""
+    if by == 'expiry':
+        return [(expiry, group['day'].tolist()) for expiry, group in days.groupby('expiry_date', sort=False)]
+    return [(day, [day]) for day in days['day']]
+
+
+# --- Worker side ---
+_source = None
+_conn = None
+
+
+def _init_worker(source):
+    # One read-only connection per worker process, opened once
+    global _source, _conn
+    _source = source
+    if not os.path.isdir(source):
+        _conn = connect(source, readonly=True)
+
+
+def _day_connection(day):
+    """Connection holding ``day``: the shared DB, or the day's Parquet file"""
+    if _conn is not None:
+        return _conn, False
+    chain = pd.read_parquet(os.path.join(_source, f"{day}.parquet"))
+    conn = sqlite3.connect(':memory:')
+    chain.to_sql('nifty_option_chain_data', conn, index=False)
+    return conn, True
+
+
+def pcr_by_snapshot(snapshot):
+    """Total OI per side, PCR and spot for every snapshot of a day"""
+    oi = snapshot.pivot_table(index='date_time', columns='option_type',
+                              values='open_interest', aggfunc='sum').reindex(columns=['CE', 'PE'])
+    spot = snapshot.groupby('date_time')['underlying_value'].first()
+    pcr = pd.DataFrame({
+        'underlying_value': spot,
+        'total_ce_oi': oi['CE'],
+        'total_pe_oi': oi['PE'],
+    })
+    pcr['pcr'] = (pcr['total_pe_oi'] / pcr['total_ce_oi'].where(pcr['total_ce_oi'] > 0)).round(4)
+    return pcr.reset_index()
+
+
+def atm_greeks(snapshot):
+    """Greeks of the ATM CE and PE for every snapshot of a day"""
+    atm = (snapshot['underlying_value'] / STRIKE_STEP).round() * STRIKE_STEP
+    rows = snapshot[snapshot['strike_price'] == atm].copy()
+    if rows.empty:
+        return rows
+    greeks = bs_greeks(rows['underlying_value'], rows['strike_price'],
+                       time_to_expiry(rows['date_time'], rows['expiry_date']),
+                       rows['iv'], rows['option_type'] == 'CE')
+    for name, values in greeks.items():
+        rows[name] = np.round(values, 6)
+    return rows[['date_time', 'strike_price', 'option_type', 'expiry_date', 'underlying_value',
+                 'iv', 'ltp', 'delta', 'gamma', 'theta', 'vega']]
+
+
+def daily_summary(day, results):
+    """One summary row from a day's analysis tables"""
+    pcr = results['pcr_history']
+    signals = results['signal_history']
+    iv = results['iv_signal_history']
+    volume = results['volume_signal_history']
+    greeks = results['atm_greeks_history']
+    if pcr.empty:
+        return pd.DataFrame()
+
+    def count(df, column, value):
+        return int((df[column] == value).sum()) if not df.empty else 0
+
+    return pd.DataFrame([{
+        'day': day,
+        'expiry_date': greeks['expiry_date'].iloc[0] if not greeks.empty else None,
+        'snapshots': len(pcr),
+        'spot_open': pcr['underlying_value'].iloc[0],
+        'spot_close': pcr['underlying_value'].iloc[-1],
+        'spot_high': pcr['underlying_value'].max(),
+        'spot_low': pcr['underlying_value'].min(),
+        'pcr_open': pcr['pcr'].iloc[0],
+        'pcr_close': pcr['pcr'].iloc[-1],
+        'pcr_min': pcr['pcr'].min(),
+        'pcr_max': pcr['pcr'].max(),
+        'strong_buy_ce': count(signals, 'signal', 'STRONG BUY CE'),
+        'strong_buy_pe': count(signals, 'signal', 'STRONG BUY PE'),
+        'call_unwinding': count(signals, 'signal', 'CALL Unwinding'),
+        'put_unwinding': count(signals, 'signal', 'PUT Unwinding'),
+        'iv_reversal_signals': count(iv, 'trading_signal', 'Strong Reversal Signal'),
+        'volume_buy_signals': count(volume, 'trading_signal', 'Strong Buy Signal'),
+        'volume_sell_signals': count(volume, 'trading_signal', 'Strong Sell Signal'),
+        'atm_ce_iv': greeks.loc[greeks['option_type'] == 'CE', 'iv'].mean() if not greeks.empty else None,
+        'atm_pe_iv': greeks.loc[greeks['option_type'] == 'PE', 'iv'].mean() if not greeks.empty else None,
+    }])
+
+
+def analyze_day(day):
+    """Run the whole pipeline for one day; returns {table: DataFrame}"""
+    conn, temporary = _day_connection(day)
+    try:
+        params = day_params(day)
+        results = {table: pd.read_sql_query(query, conn, params=params)
+                   for table, query in QUERY_TABLES.items()}
+        snapshot = pd.read_sql_query(SNAPSHOT_QUERY, conn, params=params)
+    finally:
+        if temporary:
+            conn.close()
+
+    results['pcr_history'] = pcr_by_snapshot(snapshot) if not snapshot.empty else pd.DataFrame()
+    results['atm_greeks_history'] = atm_greeks(snapshot) if not snapshot.empty else pd.DataFrame()
+    results['daily_summary'] = daily_summary(day, results)
+    for table, df in results.items():
+        if not df.empty and 'day' not in df.columns:
+            df.insert(0, 'day', day)
+    return results
+
+
+def analyze_unit(unit):
+    """Worker entry point: analyse every day of a unit"""
+    label, days = unit
+    started = time.perf_counter()
+    merged = {table: [] for table in RESULT_TABLES}
+    errors = []
+    for day in days:
+        try:
+            for table, df in analyze_day(day).items():
+                if not df.empty:
+                    merged[table].append(df)
+        except Exception as e:
+            errors.append(f"{day}: {e}")
+    results = {table: pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+               for table, frames in merged.items()}
+    return label, results, errors, time.perf_counter() - started
+
+
+# --- Driver ---
+def run(source, units, workers=None):
+    """Analyse all units in parallel; returns merged {table: DataFrame}"""
+    workers = workers or os.cpu_count() or 1
+    merged = {table: [] for table in RESULT_TABLES}
+    print(f"Analysing {len(units)} units on {workers} processes")
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(source,)) as pool:
+        for label, results, errors, seconds in pool.map(analyze_unit, units):
+            for error in errors:
+                print(f"Error analysing {error}")
+            rows = sum(len(df) for df in results.values())
+            print(f"{label}: {rows} rows in {seconds:.1f}s")
+            for table, df in results.items():
+                if not df.empty:
+                    merged[table].append(df)
+    return {table: pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+            for table, frames in merged.items()}
+
+
+def save_results(results, out_path, days):
+    """Replace the analysed days in the summary database"""
+    conn = sqlite3.connect(out_path)
+    try:
+        for table, df in results.items():
+            if df.empty:
+                continue
+            exists = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?",
+                                  (table,)).fetchone()
+            if exists:
+                conn.executemany(f"DELETE FROM {table} WHERE day = ?", [(day,) for day in days])
+            df.to_sql(table, conn, if_exists='append', index=False)
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_day ON {table} (day)")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def export_parquet(db_path, out_dir, days):
+    """Write one Parquet file per day for Parquet-backed runs"""
+    os.makedirs(out_dir, exist_ok=True)
+    conn = connect(db_path, readonly=True)
+    try:
+        for day in days:
+            df = pd.read_sql_query(
+                f"SELECT {', '.join(OPTION_COLUMNS)} FROM nifty_option_chain_data WHERE date_time LIKE :day",
+                conn, params=day_params(day))
+            df.to_parquet(os.path.join(out_dir, f"{day}.parquet"), index=False)
+            print(f"Exported {day}: {len(df)} rows")
+    finally:
+        conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch option chain analysis across CPU cores")
+    parser.add_argument('--start', required=True, help="First day, YYYY-MM-DD")
+    parser.add_argument('--end', required=True, help="Last day, YYYY-MM-DD")
+    parser.add_argument('--db', default=DB_PATH, help="Option chain database (lists the days to run)")
+    parser.add_argument('--source', default=None,
+                        help="Read chains from this database or Parquet directory (default: --db)")
+    parser.add_argument('--by', choices=['day', 'expiry'], default='day', help="Work unit size")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument('--out', default=ANALYSIS_DB_PATH, help="SQLite file for the summary tables")
+    parser.add_argument('--export-parquet', default=None, metavar='DIR',
+                        help="Export the days to Parquet files and exit")
+    args = parser.parse_args(argv)
+
+    if args.source and os.path.isdir(args.source):
+        # Parquet runs list the days from the file names
+        files = sorted(f[:-len('.parquet')] for f in os.listdir(args.source) if f.endswith('.parquet'))
+        day_list = [d for d in files if args.start <= d <= args.end]
+        days = pd.DataFrame({'day': day_list})
+        if args.by == 'expiry':
+            print("Parquet runs are split per day")
+    else:
+        conn = connect(args.db, readonly=True)
+        try:
+            days = trading_days(conn, args.start, args.end)
+        finally:
+            conn.close()
+    if days.empty:
+        print(f"No option chain data between {args.start} and {args.end}")
+        return
+
+    if args.export_parquet:
+        export_parquet(args.db, args.export_parquet, days['day'].tolist())
+        return
+
+    started = time.perf_counter()
+    source = args.source or args.db
+    by = 'day' if os.path.isdir(source) else args.by
+    results = run(source, work_units(days, by), args.workers)
+    save_results(results, args.out, days['day'].tolist())
+    print(f"Analysed {len(days)} days in {time.perf_counter() - started:.1f}s -> {args.out}")
+    summary = results['daily_summary']
+    if not summary.empty:
+        print(summary[['day', 'spot_close', 'pcr_close', 'strong_buy_ce', 'strong_buy_pe',
+                       'volume_buy_signals']].to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,467 @@
+"""Headless NSE option chain collector.
+
+Owns fetching, parsing, storage and derived metrics for the NIFTY option
+chain so that any number of dashboards can attach as readers instead of
+each one polling NSE and writing to the database on its own.
+
+Run it once per machine:
+
+    python nse_collector.py --db E:/nifty_data.db
+
+Dashboards open the same database; it is switched to WAL mode so readers
+never block the collector's writes.  `collector_alive` lets a dashboard
+check whether it should skip its own fetch cycle.  Each stored snapshot is
+also published on a localhost socket (see nse_pubsub.py) for consumers that
+need it without polling the database.
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+from datetime import datetime, time, timedelta
+
+from lazy_modules import lazy_import
+from nse_pubsub import PUBSUB_PORT, SnapshotPublisher
+
+# Dashboards import this module only for collector_alive; keep aiohttp off
+# their startup path
+aiohttp = lazy_import('aiohttp')
+
+DB_PATH = 'E:/nifty_data.db'
+
+NSE_OC_URL = "https://www.nseindia.com/option-chain"
+NSE_API_URL = 'https://www.nseindia.com/api/option-chain-indices?symbol=NIFTY'
+NSE_HEADERS = {
+    'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'accept-language': 'en,gu;q=0.9,hi;q=0.8',
+    'accept-encoding': 'gzip, deflate, br'
+}
+
+MARKET_START = time(9, 0)
+MARKET_END = time(15, 40)
+CYCLE_MINUTES = 5
+
+# A collector that has not written a heartbeat for this long is considered dead
+HEARTBEAT_TIMEOUT = timedelta(minutes=2 * CYCLE_MINUTES)
+
+OPTION_COLUMNS = (
+    'date_time', 'strike_price', 'option_type', 'expiry_date', 'open_interest', 'changein_oi',
+    'volume', 'iv', 'ltp', 'net_change', 'total_buy_quantity', 'total_sell_quantity',
+    'bid_qty', 'bid_price', 'ask_qty', 'ask_price', 'underlying_value'
+)
+
+INSERT_OPTION_QUERY = '''
+INSERT INTO nifty_option_chain_data (
+    {0}
+) VALUES ({1})
+'''.format(', '.join(OPTION_COLUMNS), ', '.join('?' * len(OPTION_COLUMNS)))
+
+# Placeholder signal rows the dashboards fill in later (see
+# nse_data_06-06-2025.py check_signal_sustainability)
+SIGNAL_COMPARISON_QUERY = '''
+INSERT INTO signal_comparison (
+    date_time, strike_price, option_type, ltp, oi, volume,
+    ma_5min, ma_15min, ma_30min, vol_ma_5min, vol_ma_15min,
+    signal_type, signal_strength, created_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+
+def is_market_hours(now=None):
+    current_time = (now or datetime.now()).time()
+    return MARKET_START <= current_time <= MARKET_END
+
+
+def next_cycle_time(now=None):
+    """Return the next 5-minute boundary, or the next market open"""
+    now = now or datetime.now()
+    if now.time() < MARKET_START:
+        return datetime.combine(now.date(), MARKET_START)
+    if now.time() > MARKET_END:
+        return datetime.combine(now.date() + timedelta(days=1), MARKET_START)
+    minutes = (now.minute // CYCLE_MINUTES + 1) * CYCLE_MINUTES
+    return now.replace(minute=0, second=0, microsecond=0) + timedelta(minutes=minutes)
+
+
+# --- Database ---
+def connect(db_path=DB_PATH, readonly=False):
+    """Open the option database.
+
+    Writers switch the file to WAL journaling (a persistent setting), so
+    readers opened with ``readonly=True`` never block the collector.
+    """
+    if readonly:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, timeout=30)
+    else:
+        conn = sqlite3.connect(db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def setup_database(conn):
+    """Create the chain, snapshot metrics, signal comparison and collector status tables"""
+    cursor = conn.cursor()
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS nifty_option_chain_data (
+        date_time TEXT,
+        strike_price REAL,
+        option_type TEXT,
+        expiry_date TEXT,
+        open_interest INTEGER,
+        changein_oi INTEGER,
+        volume INTEGER,
+        iv REAL,
+        ltp REAL,
+        net_change REAL,
+        total_buy_quantity INTEGER,
+        total_sell_quantity INTEGER,
+        bid_qty INTEGER,
+        bid_price REAL,
+        ask_qty INTEGER,
+        ask_price REAL,
+        underlying_value REAL
+    )
+    ''')
+    # Every dashboard filters on the latest date_time and on strike history
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_chain_date_time
+    ON nifty_option_chain_data (date_time)
+    ''')
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_chain_strike
+    ON nifty_option_chain_data (strike_price, option_type, date_time)
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS snapshot_metrics (
+        date_time TEXT PRIMARY KEY,
+        expiry_date TEXT,
+        underlying_value REAL,
+        total_ce_oi INTEGER,
+        total_pe_oi INTEGER,
+        total_ce_volume INTEGER,
+        total_pe_volume INTEGER,
+        pcr REAL,
+        max_ce_oi_strike REAL,
+        max_pe_oi_strike REAL,
+        max_ce_volume_strike REAL,
+        max_pe_volume_strike REAL
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS signal_comparison (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        date_time TEXT,
+        strike_price REAL,
+        option_type TEXT,
+        ltp REAL,
+        oi REAL,
+        volume REAL,
+        ma_5min REAL,
+        ma_15min REAL,
+        ma_30min REAL,
+        vol_ma_5min REAL,
+        vol_ma_15min REAL,
+        signal_type TEXT,
+        signal_strength INTEGER,
+        created_at TEXT
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS collector_status (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        pid INTEGER,
+        started_at TEXT,
+        heartbeat TEXT,
+        last_snapshot TEXT,
+        rows_inserted INTEGER
+    )
+    ''')
+    conn.commit()
+
+
+def collector_alive(conn, now=None):
+    """Return True when a collector process has written a recent heartbeat"""
+    try:
+        row = conn.execute("SELECT heartbeat FROM collector_status WHERE id = 1").fetchone()
+    except sqlite3.Error:
+        return False
+    if not row or not row[0]:
+        return False
+    heartbeat = datetime.strptime(row[0], '%Y-%m-%d %H:%M:%S')
+    return (now or datetime.now()) - heartbeat < HEARTBEAT_TIMEOUT
+
+
+def write_heartbeat(conn, started_at, last_snapshot=None, rows_inserted=0):
+    conn.execute('''
+    INSERT INTO collector_status (id, pid, started_at, heartbeat, last_snapshot, rows_inserted)
+    VALUES (1, ?, ?, ?, ?, ?)
+    ON CONFLICT(id) DO UPDATE SET
+        pid = excluded.pid,
+        started_at = excluded.started_at,
+        heartbeat = excluded.heartbeat,
+        last_snapshot = COALESCE(excluded.last_snapshot, collector_status.last_snapshot),
+        rows_inserted = collector_status.rows_inserted + excluded.rows_inserted
+    ''', (os.getpid(), started_at, datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+          last_snapshot, rows_inserted))
+    conn.commit()
+
+
+# --- Parsing ---
+def extract_option_chain_data(raw_data, expiry_date=None, current_time=None):
+    """Flatten the NSE response into rows matching OPTION_COLUMNS.
+
+    When ``expiry_date`` is not given the nearest listed expiry is used.
+    """
+    records = (raw_data or {}).get('records') or {}
+    data = records.get('data') or []
+    if not data:
+        print("Error: No option chain records in NSE response")
+        return []
+
+    if expiry_date is None:
+        expiry_dates = records.get('expiryDates') or []
+        expiry_date = expiry_dates[0] if expiry_dates else None
+    current_time = current_time or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    underlying_value = records.get('underlyingValue', 0.0)
+
+    rows = []
+    for row in data:
+        if not isinstance(row, dict) or row.get('expiryDate') != expiry_date:
+            continue
+        for option_type in ('CE', 'PE'):
+            leg = row.get(option_type)
+            if not leg or not leg.get('strikePrice'):
+                continue
+            rows.append((
+                current_time,
+                leg.get('strikePrice'),
+                option_type,
+                expiry_date,
+                leg.get('openInterest', 0),
+                leg.get('changeinOpenInterest', 0),
+                leg.get('totalTradedVolume', 0),
+                leg.get('impliedVolatility', 0.0),
+                leg.get('lastPrice', 0.0),
+                leg.get('change', 0.0),
+                leg.get('totalBuyQuantity', 0),
+                leg.get('totalSellQuantity', 0),
+                leg.get('bidQty', 0),
+                leg.get('bidprice', 0.0),
+                leg.get('askQty', 0),
+                leg.get('askPrice', 0.0),
+                underlying_value
+            ))
+    return rows
+
+
+def compute_snapshot_metrics(rows):
+    """Derive the chain-wide figures every dashboard recomputes on its own"""
+    if not rows:
+        return None
+    totals = {'CE': [0, 0], 'PE': [0, 0]}
+    max_oi = {'CE': (-1, None), 'PE': (-1, None)}
+    max_volume = {'CE': (-1, None), 'PE': (-1, None)}
+    for row in rows:
+        strike, option_type, oi, volume = row[1], row[2], row[4] or 0, row[6] or 0
+        totals[option_type][0] += oi
+        totals[option_type][1] += volume
+        if oi > max_oi[option_type][0]:
+            max_oi[option_type] = (oi, strike)
+        if volume > max_volume[option_type][0]:
+            max_volume[option_type] = (volume, strike)
+
+    ce_oi, pe_oi = totals['CE'][0], totals['PE'][0]
+    return {
+        'date_time': rows[0][0],
+        'expiry_date': rows[0][3],
+        'underlying_value': rows[0][16],
+        'total_ce_oi': ce_oi,
+        'total_pe_oi': pe_oi,
+        'total_ce_volume': totals['CE'][1],
+        'total_pe_volume': totals['PE'][1],
+        'pcr': pe_oi / ce_oi if ce_oi > 0 else 0.0,
+        'max_ce_oi_strike': max_oi['CE'][1],
+        'max_pe_oi_strike': max_oi['PE'][1],
+        'max_ce_volume_strike': max_volume['CE'][1],
+        'max_pe_volume_strike': max_volume['PE'][1],
+    }
+
+
+def carry_forward_iv(conn, rows):
+    """Replace zero IVs with the strike's IV in the previous stored snapshot.
+
+    NSE reports 0 for options that have not traded; the dashboards kept the
+    last known IV instead, so the collector does the same.
+    """
+    if not rows or all(row[7] for row in rows):
+        return rows
+    previous = {(strike, option_type): iv for strike, option_type, iv in conn.execute('''
+        SELECT strike_price, option_type, iv FROM nifty_option_chain_data
+        WHERE date_time = (SELECT MAX(date_time) FROM nifty_option_chain_data WHERE date_time < ?)
+    ''', (rows[0][0],))}
+    return [row if row[7] else row[:7] + (previous.get((row[1], row[2])) or 0,) + row[8:]
+            for row in rows]
+
+
+def signal_comparison_rows(rows, created_at=None):
+    """One 'No Signal' signal_comparison row per option, as NiftyApp writes them"""
+    created_at = created_at or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    return [(row[0], row[1], row[2], row[8], row[4], row[6], 0, 0, 0, 0, 0, 'No Signal', 0, created_at)
+            for row in rows]
+
+
+def store_snapshot(conn, rows, metrics):
+    """Write one snapshot, its signal rows and its metrics in a single transaction"""
+    with conn:
+        conn.executemany(INSERT_OPTION_QUERY, rows)
+        conn.executemany(SIGNAL_COMPARISON_QUERY, signal_comparison_rows(rows))
+        if metrics:
+            columns = list(metrics.keys())
+            conn.execute(
+                "INSERT OR REPLACE INTO snapshot_metrics ({0}) VALUES ({1})".format(
+                    ', '.join(columns), ', '.join('?' * len(columns))),
+                [metrics[c] for c in columns]
+            )
+
+
+# --- Fetching ---
+class NseClient:
+    """Keeps one aiohttp session and the NSE cookies across cycles"""
+
+    def __init__(self):
+        self.session = None
+        self.cookies = {}
+
+    async def initialize_session(self):
+        if self.session is None:
+            self.session = aiohttp.ClientSession()
+        async with self.session.get(NSE_OC_URL, headers=NSE_HEADERS, timeout=10) as resp:
+            if resp.status != 200:
+                raise Exception(f"Error accessing NSE website: {resp.status}")
+            self.cookies = {k: v.value for k, v in resp.cookies.items()}
+
+    async def fetch_option_chain(self, retry=True):
+        if self.session is None or not self.cookies:
+            await self.initialize_session()
+        async with self.session.get(NSE_API_URL, headers=NSE_HEADERS, cookies=self.cookies, timeout=30) as resp:
+            if resp.status == 401 and retry:
+                # Cookies expired, refresh them once; a second 401 is a block
+                await self.initialize_session()
+                return await self.fetch_option_chain(retry=False)
+            if resp.status != 200:
+                raise Exception(f"Error fetching option chain data: {resp.status}")
+            return await resp.json(content_type=None)
+
+    async def close(self):
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+
+class Collector:
+    """Fetch -> parse -> store -> derive loop with a heartbeat for readers"""
+
+    def __init__(self, db_path=DB_PATH, expiry_date=None, publisher=None):
+        self.db_path = db_path
+        self.expiry_date = expiry_date
+        self.publisher = publisher
+        self.client = NseClient()
+        self.conn = connect(db_path)
+        setup_database(self.conn)
+        self.started_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.listeners = []
+
+    def add_listener(self, callback):
+        """Register ``callback(rows, metrics)`` to run after each stored snapshot"""
+        self.listeners.append(callback)
+
+    async def run_once(self):
+        raw_data = await self.client.fetch_option_chain()
+        rows = extract_option_chain_data(raw_data, self.expiry_date)
+        if not rows:
+            print("No data extracted from NSE response")
+            write_heartbeat(self.conn, self.started_at)
+            return rows, None
+        rows = carry_forward_iv(self.conn, rows)
+        metrics = compute_snapshot_metrics(rows)
+        store_snapshot(self.conn, rows, metrics)
+        write_heartbeat(self.conn, self.started_at, rows[0][0], len(rows))
+        print(f"Stored {len(rows)} rows at {rows[0][0]} (PCR {metrics['pcr']:.2f})")
+        for callback in self.listeners:
+            try:
+                callback(rows, metrics)
+            except Exception as e:
+                print(f"Error in collector listener: {e}")
+        return rows, metrics
+
+    async def run_forever(self):
+        if self.publisher:
+            await self.publisher.start()
+            self.add_listener(self.publisher.publish)
+        try:
+            while True:
+                if is_market_hours():
+                    try:
+                        await self.run_once()
+                    except Exception as e:
+                        print(f"Error in collector cycle: {e}")
+                        await self.client.close()
+                else:
+                    write_heartbeat(self.conn, self.started_at)
+                    if self.publisher:
+                        self.publisher.heartbeat()
+                # Wake up at least once per heartbeat window so readers see us alive
+                now = datetime.now()
+                delay = (next_cycle_time(now) - now).total_seconds()
+                await asyncio.sleep(max(1.0, min(delay, HEARTBEAT_TIMEOUT.total_seconds() / 2)))
+        finally:
+            if self.publisher:
+                await self.publisher.close()
+            await self.client.close()
+            self.conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless NSE option chain collector")
+    parser.add_argument('--db', default=DB_PATH, help="SQLite database path")
+    parser.add_argument('--expiry', default=None, help="Expiry to collect, e.g. 19-Jun-2025 (default: nearest)")
+    parser.add_argument('--once', action='store_true', help="Collect a single snapshot and exit")
+    parser.add_argument('--port', type=int, default=PUBSUB_PORT, help="Localhost port for the snapshot stream")
+    parser.add_argument('--no-publish', action='store_true', help="Do not publish snapshots on a socket")
+    parser.add_argument('--alert-rules', default=None, help="JSON alert rules file (default: nse_alerts.DEFAULT_RULES)")
+    parser.add_argument('--webhook', default=None, help="Also POST alerts as JSON to this URL")
+    parser.add_argument('--no-desktop', action='store_true', help="No desktop notifications for alerts")
+    parser.add_argument('--no-alerts', action='store_true', help="Do not evaluate alert rules")
+    parser.add_argument('--no-positioning', action='store_true',
+                        help="Do not store max pain / OI walls / GEX per snapshot")
+    args = parser.parse_args(argv)
+
+    publisher = None if args.no_publish or args.once else SnapshotPublisher(port=args.port)
+    collector = Collector(args.db, args.expiry, publisher)
+    if not args.no_alerts:
+        # Imported here so dashboards importing this module skip pandas
+        from nse_alerts import AlertDispatcher, AlertEngine, load_rules
+        dispatcher = AlertDispatcher(desktop=not args.no_desktop, webhook_url=args.webhook)
+        collector.add_listener(AlertEngine(load_rules(args.alert_rules), dispatcher).on_snapshot)
+    if not args.no_positioning:
+        from nse_positioning import PositioningTracker
+        collector.add_listener(PositioningTracker(collector.conn).on_snapshot)
+    if args.once:
+        async def run_single():
+            try:
+                await collector.run_once()
+            finally:
+                await collector.client.close()
+                collector.conn.close()
+        asyncio.run(run_single())
+    else:
+        print(f"Collector started (pid {os.getpid()}) writing to {args.db}")
+        try:
+            asyncio.run(collector.run_forever())
+        except KeyboardInterrupt:
+            print("Collector stopped")
+
+
+if __name__ == "__main__":
+    main()
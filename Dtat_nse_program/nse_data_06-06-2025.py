@@ -1,16 +1,35 @@
 import sqlite3
 import asyncio
-import aiohttp
+import json
 from datetime import datetime, time, timedelta
 import tkinter as tk
 from tkinter import ttk, messagebox
-import pandas as pd
 import nest_asyncio
+from cycle_metrics import CycleMetrics, db_size
+from lazy_modules import lazy_import
+from nse_collector import collector_alive
+from nse_profiling import Profiler
+from nse_queries import SQL_QUERY, IV_ANALYSIS_QUERY, VOLUME_ANALYSIS_QUERY, day_params
+
+# Imported on first use so the window appears before pandas/aiohttp load
+pd = lazy_import('pandas')
+aiohttp = lazy_import('aiohttp')
 
 nest_asyncio.apply()
 
 DB_PATH = 'E:/nifty_data.db'
-EXPIRY_DATE = '19-Jun-2025'
+# None = nearest listed expiry, as nse_collector.py stores by default; when
+# pinning an expiry here pass the same one to nse_collector.py --expiry
+EXPIRY_DATE = None
+# Trading day shown in the analysis grids
+ANALYSIS_DATE = '2025-06-12'
+
+# Stage timings for each cycle; scrape http://127.0.0.1:9108/metrics
+METRICS_PORT = 9108
+CYCLE_STAGES = ('fetch', 'parse', 'store', 'signals', 'query', 'render', 'cycle')
+metrics = CycleMetrics()
+# Off unless --profile DIR / NSE_PROFILE is given (see nse_profiling.py)
+profiler = Profiler()
 
 # Style configuration
 GREEN_BG = '#90EE90'  # Light green background
@@ -53,6 +72,14 @@ def get_next_update_time():
     
     return next_update
 
+def collector_running():
+    """True when nse_collector.py is already fetching into DB_PATH"""
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        return collector_alive(conn)
+    finally:
+        conn.close()
+
 # Create signal comparison table
 def create_signal_comparison_table():
     conn = sqlite3.connect(DB_PATH)
@@ -101,7 +128,7 @@ def insert_signal_comparison_data(row_data):
 
 # Function to check signal sustainability
 def check_signal_sustainability(strike_price, option_type, current_time):
-    conn = sqlite3.connect(DB_PATH)
+    conn = profiler.connect(DB_PATH)
     cursor = conn.cursor()
     
     # Get last 5 records for the same strike and option type
@@ -125,574 +152,6 @@ def check_signal_sustainability(strike_price, option_type, current_time):
     signal_type = records[0][11]  # signal_type column
     return all(record[11] == signal_type for record in records)
 
-# SQL query to get top volume strikes with time-wise data
-SQL_QUERY = """
-WITH timeframes AS (
-    SELECT 
-        strftime('%H:%M', date_time) as time_window,
-        strike_price,
-        option_type,
-        SUM(volume) AS total_volume,
-        SUM(open_interest) AS total_oi,
-        AVG(ltp) AS ltp,
-        AVG(iv) AS iv,
-        COUNT(*) as data_points,
-        -- Calculate 5-minute, 15-minute, and 30-minute moving averages
-        AVG(AVG(ltp)) OVER (
-            PARTITION BY strike_price, option_type 
-            ORDER BY strftime('%H:%M', date_time) 
-            ROWS BETWEEN 2 PRECEDING AND CURRENT ROW
-        ) as ma_5min,
-        AVG(AVG(ltp)) OVER (
-            PARTITION BY strike_price, option_type 
-            ORDER BY strftime('%H:%M', date_time) 
-            ROWS BETWEEN 5 PRECEDING AND CURRENT ROW
-        ) as ma_15min,
-        AVG(AVG(ltp)) OVER (
-            PARTITION BY strike_price, option_type 
-            ORDER BY strftime('%H:%M', date_time) 
-            ROWS BETWEEN 9 PRECEDING AND CURRENT ROW
-        ) as ma_30min,
-        -- Calculate volume moving averages
-        AVG(SUM(volume)) OVER (
-            PARTITION BY strike_price, option_type 
-            ORDER BY strftime('%H:%M', date_time) 
-            ROWS BETWEEN 2 PRECEDING AND CURRENT ROW
-        ) as vol_ma_5min,
-        AVG(SUM(volume)) OVER (
-            PARTITION BY strike_price, option_type 
-            ORDER BY strftime('%H:%M', date_time) 
-            ROWS BETWEEN 5 PRECEDING AND CURRENT ROW
-        ) as vol_ma_15min
-    FROM nifty_option_chain_data
-    WHERE date_time LIKE '2025-06-12%'
-    AND expiry_date = (
-        SELECT expiry_date 
-        FROM nifty_option_chain_data 
-        WHERE date_time LIKE '2025-06-12%'
-        ORDER BY expiry_date 
-        LIMIT 1
-    )
-    GROUP BY time_window, strike_price, option_type
-),
-ranked_options AS (
-    SELECT *,
-        ROW_NUMBER() OVER (PARTITION BY time_window, option_type ORDER BY total_volume DESC) AS vol_rank
-    FROM timeframes
-),
-top_options AS (
-    SELECT * FROM ranked_options WHERE vol_rank <= 3
-),
-option_with_lag AS (
-    SELECT 
-        t.*,
-        LAG(t.total_volume) OVER (PARTITION BY t.strike_price, t.option_type ORDER BY t.time_window) AS prev_volume,
-        LAG(t.total_oi) OVER (PARTITION BY t.strike_price, t.option_type ORDER BY t.time_window) AS prev_oi,
-        LAG(t.ltp) OVER (PARTITION BY t.strike_price, t.option_type ORDER BY t.time_window) AS prev_ltp,
-        LAG(t.iv) OVER (PARTITION BY t.strike_price, t.option_type ORDER BY t.time_window) AS prev_iv,
-        LAG(t.ma_5min) OVER (PARTITION BY t.strike_price, t.option_type ORDER BY t.time_window) AS prev_ma_5min,
-        LAG(t.ma_15min) OVER (PARTITION BY t.strike_price, t.option_type ORDER BY t.time_window) AS prev_ma_15min,
-        LAG(t.ma_30min) OVER (PARTITION BY t.strike_price, t.option_type ORDER BY t.time_window) AS prev_ma_30min,
-        LAG(t.vol_ma_5min) OVER (PARTITION BY t.strike_price, t.option_type ORDER BY t.time_window) AS prev_vol_ma_5min,
-        LAG(t.vol_ma_15min) OVER (PARTITION BY t.strike_price, t.option_type ORDER BY t.time_window) AS prev_vol_ma_15min,
-        -- Get opposite option data
-        p.total_volume as opposite_volume,
-        p.total_oi as opposite_oi,
-        p.ltp as opposite_ltp,
-        p.iv as opposite_iv,
-        p.ma_5min as opposite_ma_5min,
-        p.ma_15min as opposite_ma_15min,
-        p.ma_30min as opposite_ma_30min,
-        p.vol_ma_5min as opposite_vol_ma_5min,
-        p.vol_ma_15min as opposite_vol_ma_15min
-    FROM top_options t
-    LEFT JOIN top_options p ON 
-        t.time_window = p.time_window 
-        AND t.strike_price = p.strike_price 
-        AND t.option_type != p.option_type
-),
-option_analysis AS (
-    SELECT 
-        *,
-        CASE
-            WHEN option_type = 'CE' AND opposite_oi > 0 AND opposite_ltp > 0 AND opposite_iv > 0 THEN
-                CASE
-                    WHEN total_oi > opposite_oi * 1.5 AND total_volume > opposite_volume * 1.5 
-                         AND ltp > opposite_ltp * 1.2 AND iv > opposite_iv * 1.1
-                    THEN 'Strong CE Dominance'
-                    WHEN total_oi < opposite_oi * 0.7 AND total_volume < opposite_volume * 0.7 
-                         AND ltp < opposite_ltp * 0.8 AND iv < opposite_iv * 0.9
-                    THEN 'Strong PE Dominance'
-                    WHEN ABS(total_oi - opposite_oi) / opposite_oi < 0.2 
-                         AND ABS(total_volume - opposite_volume) / opposite_volume < 0.2
-                    THEN 'Neutral - Both Options Balanced'
-                    ELSE 'Mixed Signals'
-                END
-            WHEN option_type = 'PE' AND opposite_oi > 0 AND opposite_ltp > 0 AND opposite_iv > 0 THEN
-                CASE
-                    WHEN total_oi > opposite_oi * 1.5 AND total_volume > opposite_volume * 1.5 
-                         AND ltp > opposite_ltp * 1.2 AND iv > opposite_iv * 1.1
-                    THEN 'Strong PE Dominance'
-                    WHEN total_oi < opposite_oi * 0.7 AND total_volume < opposite_volume * 0.7 
-                         AND ltp < opposite_ltp * 0.8 AND iv < opposite_iv * 0.9
-                    THEN 'Strong CE Dominance'
-                    WHEN ABS(total_oi - opposite_oi) / opposite_oi < 0.2 
-                         AND ABS(total_volume - opposite_volume) / opposite_volume < 0.2
-                    THEN 'Neutral - Both Options Balanced'
-                    ELSE 'Mixed Signals'
-                END
-            ELSE 'Insufficient Opposite Data'
-        END as option_dominance
-    FROM option_with_lag
-)
-SELECT 
-    time_window,
-    option_type,
-    strike_price,
-    total_volume,
-    prev_volume,
-    ROUND(
-        CASE 
-            WHEN prev_volume > 0 THEN 100.0 * (total_volume - prev_volume) / prev_volume 
-            ELSE NULL 
-        END, 2
-    ) AS volume_pct_change,
-    total_oi,
-    prev_oi,
-    ROUND(
-        CASE 
-            WHEN prev_oi > 0 THEN 100.0 * (total_oi - prev_oi) / prev_oi 
-            ELSE NULL 
-        END, 2
-    ) AS oi_pct_change,
-    ltp,
-    prev_ltp,
-    ROUND(
-        CASE 
-            WHEN prev_ltp > 0 THEN 100.0 * (ltp - prev_ltp) / prev_ltp 
-            ELSE NULL 
-        END, 2
-    ) AS ltp_pct_change,
-    iv,
-    prev_iv,
-    ROUND(
-        CASE 
-            WHEN prev_iv > 0 THEN 100.0 * (iv - prev_iv) / prev_iv 
-            ELSE NULL 
-        END, 2
-    ) AS iv_pct_change,
-    -- Opposite option data
-    opposite_volume,
-    opposite_oi,
-    opposite_ltp,
-    opposite_iv,
-    option_dominance,
-    CASE
-        WHEN prev_volume IS NOT NULL THEN
-            CASE
-                -- CALL Unwinding Signal
-                WHEN option_type = 'CE' 
-                     AND prev_ltp > 0 AND prev_oi > 0
-                     AND 100.0 * (ltp - prev_ltp) / prev_ltp < -1
-                     AND 100.0 * (total_oi - prev_oi) / prev_oi < -1
-                THEN 'CALL Unwinding'
-                
-                -- PUT Unwinding Signal
-                WHEN option_type = 'PE' 
-                     AND prev_ltp > 0 AND prev_oi > 0
-                     AND 100.0 * (ltp - prev_ltp) / prev_ltp < -1
-                     AND 100.0 * (total_oi - prev_oi) / prev_oi < -1
-                THEN 'PUT Unwinding'
-                
-                -- Strong Buy CE Signal with Sustainability Check
-                WHEN option_type = 'CE' 
-                     AND prev_ltp > 0 AND prev_oi > 0
-                     -- Current period increase
-                     AND 100.0 * (ltp - prev_ltp) / prev_ltp > 15
-                     AND 100.0 * (total_oi - prev_oi) / prev_oi > 15
-                     -- Sustainability check over 5 minutes
-                     AND ma_5min > prev_ma_5min * 1.1
-                     -- Volume confirmation
-                     AND vol_ma_5min > prev_vol_ma_5min * 1.2
-                     -- Trend confirmation (15 min)
-                     AND ma_15min > prev_ma_15min * 1.05
-                THEN 'STRONG BUY CE'
-                
-                -- Strong Buy PE Signal with Sustainability Check
-                WHEN option_type = 'PE' 
-                     AND prev_ltp > 0 AND prev_oi > 0
-                     -- Current period increase
-                     AND 100.0 * (ltp - prev_ltp) / prev_ltp > 15
-                     AND 100.0 * (total_oi - prev_oi) / prev_oi > 15
-                     -- Sustainability check over 5 minutes
-                     AND ma_5min > prev_ma_5min * 1.1
-                     -- Volume confirmation
-                     AND vol_ma_5min > prev_vol_ma_5min * 1.2
-                     -- Trend confirmation (15 min)
-                     AND ma_15min > prev_ma_15min * 1.05
-                THEN 'STRONG BUY PE'
-                
-                ELSE 'No Clear Signal'
-            END
-        ELSE 'Insufficient data'
-    END AS signal,
-    CASE
-        -- CALL Unwinding Action
-        WHEN option_type = 'CE' 
-             AND prev_ltp > 0 AND prev_oi > 0
-             AND 100.0 * (ltp - prev_ltp) / prev_ltp < -1
-             AND 100.0 * (total_oi - prev_oi) / prev_oi < -1
-        THEN 'BUY PE - Unwinding Signal'
-        
-        -- PUT Unwinding Action (Buy CE)
-        WHEN option_type = 'PE' 
-             AND prev_ltp > 0 AND prev_oi > 0
-             AND 100.0 * (ltp - prev_ltp) / prev_ltp < -1
-             AND 100.0 * (total_oi - prev_oi) / prev_oi < -1
-        THEN 'BUY CE - PUT Unwinding'
-        
-        -- Strong Buy CE Action
-        WHEN option_type = 'CE' 
-             AND prev_ltp > 0 AND prev_oi > 0
-             AND 100.0 * (ltp - prev_ltp) / prev_ltp > 15
-             AND 100.0 * (total_oi - prev_oi) / prev_oi > 15
-        THEN 'STRONG BUY CE'
-        
-        -- Strong Buy PE Action
-        WHEN option_type = 'PE' 
-             AND prev_ltp > 0 AND prev_oi > 0
-             AND 100.0 * (ltp - prev_ltp) / prev_ltp > 15
-             AND 100.0 * (total_oi - prev_oi) / prev_oi > 15
-        THEN 'STRONG BUY PE'
-        
-        ELSE 'No Clear Action'
-    END AS action
-FROM option_analysis
-ORDER BY time_window, option_type, volume_pct_change DESC;
-"""
-
-# Add new SQL query for IV analysis
-IV_ANALYSIS_QUERY = """
-WITH top_strikes AS (
-    SELECT 
-        strike_price,
-        option_type,
-        SUM(volume) as total_volume
-    FROM nifty_option_chain_data
-    WHERE date_time LIKE '2025-06-12%'
-    GROUP BY strike_price, option_type
-    ORDER BY total_volume DESC
-    LIMIT 16  -- 8 for CE and 8 for PE
-),
-iv_data AS (
-    SELECT 
-        strftime('%H:%M', date_time) as time_window,
-        i.strike_price,
-        i.option_type,
-        AVG(i.iv) as avg_iv,
-        AVG(i.ltp) as avg_ltp,
-        SUM(i.volume) as total_volume,
-        SUM(i.open_interest) as total_oi,
-        COUNT(*) as data_points,
-        -- Calculate IV moving averages
-        AVG(AVG(i.iv)) OVER (
-            PARTITION BY i.strike_price, i.option_type 
-            ORDER BY strftime('%H:%M', i.date_time) 
-            ROWS BETWEEN 2 PRECEDING AND CURRENT ROW
-        ) as iv_ma_5min,
-        AVG(AVG(i.iv)) OVER (
-            PARTITION BY i.strike_price, i.option_type 
-            ORDER BY strftime('%H:%M', i.date_time) 
-            ROWS BETWEEN 5 PRECEDING AND CURRENT ROW
-        ) as iv_ma_15min,
-        -- Calculate volume moving averages
-        AVG(SUM(i.volume)) OVER (
-            PARTITION BY i.strike_price, i.option_type 
-            ORDER BY strftime('%H:%M', i.date_time) 
-            ROWS BETWEEN 2 PRECEDING AND CURRENT ROW
-        ) as vol_ma_5min,
-        AVG(SUM(i.volume)) OVER (
-            PARTITION BY i.strike_price, i.option_type 
-            ORDER BY strftime('%H:%M', i.date_time) 
-            ROWS BETWEEN 5 PRECEDING AND CURRENT ROW
-        ) as vol_ma_15min,
-        -- Calculate OI moving averages
-        AVG(SUM(i.open_interest)) OVER (
-            PARTITION BY i.strike_price, i.option_type 
-            ORDER BY strftime('%H:%M', i.date_time) 
-            ROWS BETWEEN 2 PRECEDING AND CURRENT ROW
-        ) as oi_ma_5min,
-        AVG(SUM(i.open_interest)) OVER (
-            PARTITION BY i.strike_price, i.option_type 
-            ORDER BY strftime('%H:%M', i.date_time) 
-            ROWS BETWEEN 5 PRECEDING AND CURRENT ROW
-        ) as oi_ma_15min,
-        -- Calculate IV percentiles
-        PERCENT_RANK() OVER (
-            PARTITION BY strftime('%H:%M', i.date_time)
-            ORDER BY i.iv
-        ) as iv_percentile,
-        -- Calculate volume percentiles
-        PERCENT_RANK() OVER (
-            PARTITION BY strftime('%H:%M', i.date_time)
-            ORDER BY SUM(i.volume)
-        ) as volume_percentile,
-        -- Calculate OI percentiles
-        PERCENT_RANK() OVER (
-            PARTITION BY strftime('%H:%M', i.date_time)
-            ORDER BY SUM(i.open_interest)
-        ) as oi_percentile,
-        -- Calculate previous values
-        LAG(AVG(i.iv)) OVER (
-            PARTITION BY i.strike_price, i.option_type 
-            ORDER BY strftime('%H:%M', i.date_time)
-        ) as prev_iv,
-        LAG(AVG(i.ltp)) OVER (
-            PARTITION BY i.strike_price, i.option_type 
-            ORDER BY strftime('%H:%M', i.date_time)
-        ) as prev_ltp,
-        LAG(SUM(i.volume)) OVER (
-            PARTITION BY i.strike_price, i.option_type 
-            ORDER BY strftime('%H:%M', i.date_time)
-        ) as prev_volume,
-        LAG(SUM(i.open_interest)) OVER (
-            PARTITION BY i.strike_price, i.option_type 
-            ORDER BY strftime('%H:%M', i.date_time)
-        ) as prev_oi
-    FROM nifty_option_chain_data i
-    INNER JOIN top_strikes ts 
-        ON i.strike_price = ts.strike_price 
-        AND i.option_type = ts.option_type
-    WHERE i.date_time LIKE '2025-06-12%'
-    AND i.expiry_date = (
-        SELECT expiry_date 
-        FROM nifty_option_chain_data 
-        WHERE date_time LIKE '2025-06-12%'
-        ORDER BY expiry_date 
-        LIMIT 1
-    )
-    GROUP BY time_window, i.strike_price, i.option_type
-),
-iv_with_changes AS (
-    SELECT 
-        *,
-        CASE
-            WHEN prev_iv > 0 THEN
-                ROUND(100.0 * (avg_iv - prev_iv) / prev_iv, 2)
-            ELSE NULL
-        END as iv_pct_change,
-        CASE
-            WHEN prev_volume > 0 THEN
-                ROUND(100.0 * (total_volume - prev_volume) / prev_volume, 2)
-            ELSE NULL
-        END as volume_pct_change,
-        CASE
-            WHEN prev_oi > 0 THEN
-                ROUND(100.0 * (total_oi - prev_oi) / prev_oi, 2)
-            ELSE NULL
-        END as oi_pct_change
-    FROM iv_data
-),
-iv_analysis AS (
-    SELECT 
-        *,
-        CASE
-            WHEN iv_pct_change > 15 THEN 'High IV Spike'
-            WHEN iv_pct_change < -15 THEN 'Low IV Spike'
-            WHEN iv_percentile > 0.8 THEN 'High IV Percentile'
-            WHEN iv_percentile < 0.2 THEN 'Low IV Percentile'
-            ELSE 'Normal IV'
-        END as iv_signal,
-        CASE
-            WHEN avg_ltp > prev_ltp AND iv_pct_change < 0 THEN 'Price Up IV Down'
-            WHEN avg_ltp > prev_ltp AND iv_pct_change > 0 THEN 'Price Up IV Up'
-            WHEN avg_ltp < prev_ltp AND iv_pct_change < 0 THEN 'Price Down IV Down'
-            WHEN avg_ltp < prev_ltp AND iv_pct_change > 0 THEN 'Price Down IV Up'
-            ELSE 'Neutral'
-        END as price_iv_relationship,
-        CASE
-            WHEN option_type = 'CE' AND avg_ltp > prev_ltp AND iv_pct_change > 0 AND oi_pct_change < 0 THEN 'Potential Short Covering'
-            WHEN option_type = 'CE' AND avg_ltp > prev_ltp AND iv_pct_change > 0 AND oi_pct_change > 0 THEN 'Possible Hedging'
-            WHEN option_type = 'CE' AND avg_ltp > prev_ltp AND iv_pct_change > 15 AND volume_pct_change > 100 THEN 'Smart Money Activity'
-            WHEN option_type = 'CE' AND avg_ltp > prev_ltp AND iv_pct_change > 0 AND volume_percentile > 0.8 THEN 'Failed Breakout Risk'
-            ELSE 'Normal Activity'
-        END as market_behavior
-    FROM iv_with_changes
-)
-SELECT 
-    time_window,
-    option_type,
-    strike_price,
-    ROUND(avg_iv, 2) as iv,
-    ROUND(iv_pct_change, 2) as iv_change_pct,
-    ROUND(iv_percentile * 100, 2) as iv_percentile,
-    ROUND(avg_ltp, 2) as ltp,
-    total_volume,
-    total_oi,
-    ROUND(volume_pct_change, 2) as volume_change_pct,
-    ROUND(oi_pct_change, 2) as oi_change_pct,
-    iv_signal,
-    price_iv_relationship,
-    market_behavior,
-    CASE
-        WHEN market_behavior = 'Potential Short Covering' THEN 'Watch for Reversal - Bears Closing Positions'
-        WHEN market_behavior = 'Possible Hedging' THEN 'Institutional Activity - Not Necessarily Bullish'
-        WHEN market_behavior = 'Smart Money Activity' THEN 'High Risk - Possible Fake Rally'
-        WHEN market_behavior = 'Failed Breakout Risk' THEN 'Caution - Market May Reject Level'
-        WHEN iv_signal = 'High IV Spike' AND price_iv_relationship IN ('Price Down IV Up', 'Price Up IV Up') 
-        THEN 'Strong Reversal Signal'
-        WHEN iv_signal = 'Low IV Spike' AND price_iv_relationship IN ('Price Down IV Down', 'Price Up IV Down')
-        THEN 'Potential Continuation'
-        WHEN iv_percentile > 80 AND iv_pct_change > 0
-        THEN 'High IV - Consider Selling'
-        WHEN iv_percentile < 20 AND iv_pct_change < 0
-        THEN 'Low IV - Consider Buying'
-        ELSE 'Monitor'
-    END as trading_signal
-FROM iv_analysis
-ORDER BY time_window, option_type, strike_price;
-"""
-
-# Add new SQL query for volume analysis
-VOLUME_ANALYSIS_QUERY = """
-WITH top_strikes AS (
-    SELECT 
-        strike_price,
-        option_type,
-        SUM(volume) as total_volume
-    FROM nifty_option_chain_data
-    WHERE date_time LIKE '2025-06-12%'
-    GROUP BY strike_price, option_type
-    ORDER BY total_volume DESC
-    LIMIT 16  -- 8 for CE and 8 for PE
-),
-volume_data AS (
-    SELECT 
-        strftime('%H:%M', date_time) as time_window,
-        v.strike_price,
-        v.option_type,
-        SUM(v.volume) as total_volume,
-        SUM(v.open_interest) as total_oi,
-        AVG(v.ltp) as avg_ltp,
-        COUNT(*) as data_points,
-        -- Calculate volume moving averages
-        AVG(SUM(v.volume)) OVER (
-            PARTITION BY v.strike_price, v.option_type 
-            ORDER BY strftime('%H:%M', v.date_time) 
-            ROWS BETWEEN 2 PRECEDING AND CURRENT ROW
-        ) as vol_ma_5min,
-        AVG(SUM(v.volume)) OVER (
-            PARTITION BY v.strike_price, v.option_type 
-            ORDER BY strftime('%H:%M', v.date_time) 
-            ROWS BETWEEN 5 PRECEDING AND CURRENT ROW
-        ) as vol_ma_15min,
-        -- Calculate OI moving averages
-        AVG(SUM(v.open_interest)) OVER (
-            PARTITION BY v.strike_price, v.option_type 
-            ORDER BY strftime('%H:%M', v.date_time) 
-            ROWS BETWEEN 2 PRECEDING AND CURRENT ROW
-        ) as oi_ma_5min,
-        AVG(SUM(v.open_interest)) OVER (
-            PARTITION BY v.strike_price, v.option_type 
-            ORDER BY strftime('%H:%M', v.date_time) 
-            ROWS BETWEEN 5 PRECEDING AND CURRENT ROW
-        ) as oi_ma_15min,
-        -- Calculate volume percentiles
-        PERCENT_RANK() OVER (
-            PARTITION BY strftime('%H:%M', v.date_time)
-            ORDER BY SUM(v.volume)
-        ) as volume_percentile,
-        -- Calculate OI percentiles
-        PERCENT_RANK() OVER (
-            PARTITION BY strftime('%H:%M', v.date_time)
-            ORDER BY SUM(v.open_interest)
-        ) as oi_percentile,
-        -- Calculate previous values
-        LAG(SUM(v.volume)) OVER (
-            PARTITION BY v.strike_price, v.option_type 
-            ORDER BY strftime('%H:%M', v.date_time)
-        ) as prev_volume,
-        LAG(SUM(v.open_interest)) OVER (
-            PARTITION BY v.strike_price, v.option_type 
-            ORDER BY strftime('%H:%M', v.date_time)
-        ) as prev_oi
-    FROM nifty_option_chain_data v
-    INNER JOIN top_strikes ts 
-        ON v.strike_price = ts.strike_price 
-        AND v.option_type = ts.option_type
-    WHERE v.date_time LIKE '2025-06-12%'
-    AND v.expiry_date = (
-        SELECT expiry_date 
-        FROM nifty_option_chain_data 
-        WHERE date_time LIKE '2025-06-12%'
-        ORDER BY expiry_date 
-        LIMIT 1
-    )
-    GROUP BY time_window, v.strike_price, v.option_type
-),
-volume_with_changes AS (
-    SELECT 
-        *,
-        CASE
-            WHEN prev_volume > 0 THEN
-                ROUND(100.0 * (total_volume - prev_volume) / prev_volume, 2)
-            ELSE NULL
-        END as volume_pct_change,
-        CASE
-            WHEN prev_oi > 0 THEN
-                ROUND(100.0 * (total_oi - prev_oi) / prev_oi, 2)
-            ELSE NULL
-        END as oi_pct_change
-    FROM volume_data
-),
-volume_analysis AS (
-    SELECT 
-        *,
-        CASE
-            WHEN volume_pct_change > 100 AND oi_pct_change > 10 THEN 'New Position Building'
-            WHEN volume_pct_change > 100 AND oi_pct_change < -10 THEN 'Position Squaring Off'
-            WHEN volume_pct_change > 100 AND ABS(oi_pct_change) <= 10 THEN 'High Volume - Neutral OI'
-            WHEN volume_percentile > 0.8 THEN 'Unusually High Volume'
-            WHEN volume_percentile < 0.2 THEN 'Unusually Low Volume'
-            ELSE 'Normal Volume'
-        END as volume_signal,
-        CASE
-            WHEN oi_pct_change > 20 THEN 'Strong OI Build-up'
-            WHEN oi_pct_change < -20 THEN 'Strong OI Unwinding'
-            WHEN oi_pct_change > 10 THEN 'Moderate OI Build-up'
-            WHEN oi_pct_change < -10 THEN 'Moderate OI Unwinding'
-            ELSE 'Neutral OI'
-        END as oi_signal
-    FROM volume_with_changes
-)
-SELECT 
-    time_window,
-    option_type,
-    strike_price,
-    total_volume,
-    volume_pct_change,
-    ROUND(volume_percentile * 100, 2) as volume_percentile,
-    total_oi,
-    oi_pct_change,
-    ROUND(oi_percentile * 100, 2) as oi_percentile,
-    ROUND(avg_ltp, 2) as ltp,
-    volume_signal,
-    oi_signal,
-    CASE
-        WHEN volume_signal = 'New Position Building' AND oi_signal IN ('Strong OI Build-up', 'Moderate OI Build-up')
-        THEN 'Strong Buy Signal'
-        WHEN volume_signal = 'Position Squaring Off' AND oi_signal IN ('Strong OI Unwinding', 'Moderate OI Unwinding')
-        THEN 'Strong Sell Signal'
-        WHEN volume_signal = 'Unusually High Volume' AND oi_pct_change > 0
-        THEN 'Potential Breakout'
-        WHEN volume_signal = 'Unusually Low Volume' AND oi_pct_change < 0
-        THEN 'Potential Reversal'
-        ELSE 'Monitor'
-    END as trading_signal
-FROM volume_analysis
-ORDER BY time_window, option_type, strike_price;
-"""
-
 # --- Data Fetching ---
 async def fetch_nse_option_chain():
     url_oc = "https://www.nseindia.com/option-chain"
@@ -718,8 +177,10 @@ async def fetch_nse_option_chain():
                 if resp.status != 200:
                     print(f"Error fetching option chain data: {resp.status}")
                     return None
-                data = await resp.json()
-                print(f"Successfully fetched data from NSE at {datetime.now()}")
+                body = await resp.read()
+                metrics.inc('payload_bytes_total', len(body))
+                data = json.loads(body)
+                print(f"Successfully fetched {len(body):,} bytes from NSE at {datetime.now()}")
                 print("Data keys:", data.keys() if data else "None")
                 return data
     except Exception as e:
@@ -748,6 +209,9 @@ def extract_option_chain_data(raw_data, expiry_date):
             return []
             
         print(f"Processing {len(records)} records from NSE")
+        if expiry_date is None:
+            expiry_dates = raw_data['records'].get('expiryDates') or []
+            expiry_date = expiry_dates[0] if expiry_dates else None
         rows = []
         current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         
@@ -878,9 +342,10 @@ def insert_data_to_db(rows):
     finally:
         conn.close()
 
+@metrics.timed('query')
 def fetch_sql_results():
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = profiler.connect(DB_PATH)
         cursor = conn.cursor()
         
         # Verify table exists and has data
@@ -892,7 +357,7 @@ def fetch_sql_results():
             print("No data in database")
             return pd.DataFrame()
             
-        df = pd.read_sql_query(SQL_QUERY, conn)
+        df = pd.read_sql_query(SQL_QUERY, conn, params=day_params(ANALYSIS_DATE))
         print(f"Successfully fetched {len(df)} rows for analysis")
         return df
     except Exception as e:
@@ -934,6 +399,12 @@ class NiftyApp:
                                     background=GREEN_BG, foreground=DARK_GREEN)
         self.status_label.pack(pady=5)
 
+        # Per-stage timings of the last cycle (see cycle_metrics.py)
+        self.metrics_label = ttk.Label(root, text="", font=('Arial', 9),
+                                       background=GREEN_BG, foreground=DARK_GREEN)
+        self.metrics_label.pack(pady=(0, 5))
+        metrics.gauge_fn('db_size_bytes', lambda: db_size(DB_PATH))
+
         # Create frames for each tab
         self.frames = []
         self.tables = []
@@ -988,8 +459,11 @@ class NiftyApp:
 
         self.run_cycle()
 
+    @metrics.timed('render')
+    @profiler.profiled('render')
     def display_table(self, frame, df):
         try:
+            metrics.inc('rows_total', len(df), stage='render')
             idx = self.frames.index(frame)
             tree = self.tables[idx]
 
@@ -1081,8 +555,11 @@ class NiftyApp:
         except Exception as e:
             print(f"Error in display_table: {e}")
 
+    @metrics.timed('render')
+    @profiler.profiled('render')
     def display_iv_analysis(self, frame, df):
         try:
+            metrics.inc('rows_total', len(df), stage='render')
             idx = self.frames.index(frame)
             tree = self.tables[idx]
 
@@ -1172,8 +649,11 @@ class NiftyApp:
             print("\nDataFrame head:")
             print(df.head())
 
+    @metrics.timed('render')
+    @profiler.profiled('render')
     def display_volume_analysis(self, frame, df):
         try:
+            metrics.inc('rows_total', len(df), stage='render')
             idx = self.frames.index(frame)
             tree = self.tables[idx]
 
@@ -1268,6 +748,17 @@ class NiftyApp:
             print(df.head())
 
     def run_cycle(self):
+        metrics.begin_cycle()
+        with metrics.stage('cycle'), profiler.cycle('cycle'):
+            self.run_cycle_stages()
+        # Queued after this cycle's renders, so their timings are included
+        self.root.after_idle(self.show_metrics)
+
+    def show_metrics(self):
+        metrics.end_cycle()
+        self.metrics_label.config(text=metrics.summary(CYCLE_STAGES))
+
+    def run_cycle_stages(self):
         try:
             current_time = datetime.now()
             
@@ -1275,8 +766,15 @@ class NiftyApp:
             if is_market_hours():
                 print(f"\nRunning data fetch cycle at {current_time}")
                 
-                # Run the fetch and store
-                asyncio.run(self.fetch_store_display())
+                if collector_running():
+                    # The headless collector owns fetching; only read its snapshots
+                    print("Collector process is running - skipping NSE fetch")
+                    df = fetch_sql_results()
+                    if not df.empty:
+                        self.root.after_idle(lambda: self.display_table(self.frames[0], df))
+                else:
+                    # Run the fetch and store
+                    asyncio.run(self.fetch_store_display())
                 
                 # Calculate next update time (5 minutes from now)
                 next_update = current_time + timedelta(minutes=5)
@@ -1304,9 +802,10 @@ class NiftyApp:
                 
                 # Fetch and display IV analysis
                 try:
-                    conn = sqlite3.connect(DB_PATH)
+                    conn = profiler.connect(DB_PATH)
                     print("Executing IV analysis query...")
-                    iv_df = pd.read_sql_query(IV_ANALYSIS_QUERY, conn)
+                    with metrics.stage('query'):
+                        iv_df = pd.read_sql_query(IV_ANALYSIS_QUERY, conn, params=day_params(ANALYSIS_DATE))
                     
                     # Check data availability for volume analysis
                     print("\nChecking data availability...")
@@ -1321,29 +820,30 @@ class NiftyApp:
                     available_dates = cursor.fetchall()
                     print("Available dates in database:", [date[0] for date in available_dates])
                     
-                    # Check data for 2025-06-12
+                    # Check data for the analysis date
                     cursor.execute("""
                         SELECT COUNT(*) as count
                         FROM nifty_option_chain_data
-                        WHERE date_time LIKE '2025-06-12%'
-                    """)
+                        WHERE date_time LIKE :day
+                    """, day_params(ANALYSIS_DATE))
                     count = cursor.fetchone()[0]
-                    print(f"Records found for 2025-06-12: {count}")
+                    print(f"Records found for {ANALYSIS_DATE}: {count}")
                     
                     if count > 0:
-                        # Check expiry dates for 2025-06-12
+                        # Check expiry dates for the analysis date
                         cursor.execute("""
                             SELECT DISTINCT expiry_date
                             FROM nifty_option_chain_data
-                            WHERE date_time LIKE '2025-06-12%'
+                            WHERE date_time LIKE :day
                             ORDER BY expiry_date
-                        """)
+                        """, day_params(ANALYSIS_DATE))
                         expiry_dates = cursor.fetchall()
                         print("Available expiry dates:", [date[0] for date in expiry_dates])
                     
                     # Fetch and display volume analysis
                     print("\nExecuting volume analysis query...")
-                    volume_df = pd.read_sql_query(VOLUME_ANALYSIS_QUERY, conn)
+                    with metrics.stage('query'):
+                        volume_df = pd.read_sql_query(VOLUME_ANALYSIS_QUERY, conn, params=day_params(ANALYSIS_DATE))
                     conn.close()
                     
                     if not iv_df.empty:
@@ -1356,7 +856,7 @@ class NiftyApp:
                         self.root.after_idle(lambda: self.display_volume_analysis(self.frames[2], volume_df))
                         print(f"Displayed {len(volume_df)} rows in volume analysis grid")
                     else:
-                        print("Volume Analysis: No data found for 2025-06-12")
+                        print(f"Volume Analysis: No data found for {ANALYSIS_DATE}")
                         print("Please check if data exists for this date in the database")
                 except Exception as e:
                     print(f"Error in analysis: {e}")
@@ -1391,42 +891,48 @@ class NiftyApp:
     async def fetch_store_display(self):
         try:
             print(f"\nStarting data fetch at {datetime.now()}")
-            raw_data = await fetch_nse_option_chain()
+            with metrics.stage('fetch'):
+                raw_data = await fetch_nse_option_chain()
             
             if not raw_data:
                 print("Failed to fetch data from NSE")
                 return
                 
             print("Raw data structure:", raw_data.keys() if raw_data else "None")
-            rows = extract_option_chain_data(raw_data, EXPIRY_DATE)
+            with metrics.stage('parse'):
+                rows = extract_option_chain_data(raw_data, EXPIRY_DATE)
+            metrics.inc('rows_total', len(rows), stage='parse')
             
             if not rows:
                 print("No data extracted from NSE response")
                 return
                 
             # Store in main table
-            insert_data_to_db(rows)
+            with metrics.stage('store'):
+                insert_data_to_db(rows)
+            metrics.inc('rows_total', len(rows), stage='store')
             print(f"Stored {len(rows)} rows in database at {datetime.now()}")
             
             # Store in signal comparison table
-            for row in rows:
-                signal_data = (
-                    row[0],  # date_time
-                    row[1],  # strike_price
-                    row[2],  # option_type
-                    row[8],  # ltp
-                    row[4],  # oi
-                    row[6],  # volume
-                    0,  # ma_5min (will be calculated)
-                    0,  # ma_15min (will be calculated)
-                    0,  # ma_30min (will be calculated)
-                    0,  # vol_ma_5min (will be calculated)
-                    0,  # vol_ma_15min (will be calculated)
-                    'No Signal',  # signal_type
-                    0,  # signal_strength
-                    datetime.now().strftime('%Y-%m-%d %H:%M:%S')  # created_at
-                )
-                insert_signal_comparison_data(signal_data)
+            with metrics.stage('signals'):
+                for row in rows:
+                    signal_data = (
+                        row[0],  # date_time
+                        row[1],  # strike_price
+                        row[2],  # option_type
+                        row[8],  # ltp
+                        row[4],  # oi
+                        row[6],  # volume
+                        0,  # ma_5min (will be calculated)
+                        0,  # ma_15min (will be calculated)
+                        0,  # ma_30min (will be calculated)
+                        0,  # vol_ma_5min (will be calculated)
+                        0,  # vol_ma_15min (will be calculated)
+                        'No Signal',  # signal_type
+                        0,  # signal_strength
+                        datetime.now().strftime('%Y-%m-%d %H:%M:%S')  # created_at
+                    )
+                    insert_signal_comparison_data(signal_data)
             
             # Always fetch and display latest data
             df = fetch_sql_results()
@@ -1449,7 +955,9 @@ class NiftyApp:
 
 # --- Main ---
 if __name__ == "__main__":
+    profiler.configure_from_args()
     create_signal_comparison_table()
+    metrics.serve(METRICS_PORT)
     root = tk.Tk()
     app = NiftyApp(root)
     root.mainloop()
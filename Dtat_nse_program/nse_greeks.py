@@ -0,0 +1,90 @@
+"""Vectorized Black-Scholes greeks for whole option chains.
+
+Same formulas as ``OptionMonitor.calculate_greeks`` (daily theta, 5%
+risk-free rate) but over NumPy arrays, so a full snapshot or a day of
+snapshots is one call instead of a Python loop per row.  The normal CDF
+uses scipy.special.erfc when scipy is installed and a vectorized NumPy
+approximation otherwise, so batch workers do not need scipy.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+RISK_FREE_RATE = 0.05
+# Floor for time to expiry in years, as in calculate_greeks
+MIN_TTE = 0.00001
+SECONDS_PER_YEAR = 365 * 24 * 60 * 60
+
+# Numerical Recipes erfc coefficients (fractional error below 1.2e-7)
+_ERFC_COEFFS = (0.17087277, -0.82215223, 1.48851587, -1.13520398, 0.27886807,
+                -0.18628806, 0.09678418, 0.37409196, 1.00002368, -1.26551223)
+
+
+def _erfc(x):
+    z = np.abs(x)
+    t = 1.0 / (1.0 + 0.5 * z)
+    poly = np.zeros_like(t)
+    for coeff in _ERFC_COEFFS:
+        poly = poly * t + coeff
+    ans = t * np.exp(-z * z + poly)
+    return np.where(x >= 0, ans, 2.0 - ans)
+
+
+try:
+    from scipy.special import erfc as _erfc
+except ImportError:
+    pass
+
+
+def norm_cdf(x):
+    x = np.asarray(x, dtype=float)
+    return 0.5 * _erfc(-x / math.sqrt(2.0))
+
+
+def norm_pdf(x):
+    x = np.asarray(x, dtype=float)
+    return np.exp(-0.5 * x * x) / math.sqrt(2.0 * math.pi)
+
+
+def time_to_expiry(date_time, expiry_date):
+    """Years from snapshot time(s) to expiry; NSE expiries settle at 15:30"""
+    expiry = pd.to_datetime(expiry_date, format='%d-%b-%Y') + pd.Timedelta(hours=15, minutes=30)
+    seconds = (expiry - pd.to_datetime(date_time)) / pd.Timedelta(seconds=1)
+    return np.maximum(np.asarray(seconds, dtype=float) / SECONDS_PER_YEAR, MIN_TTE)
+
+
+def bs_greeks(spot, strike, tte, iv_pct, is_call, rate=RISK_FREE_RATE):
+    """Delta, gamma, daily theta and vega (per 1 IV point) as arrays.
+
+    ``iv_pct`` is NSE's implied volatility in percent; rows with zero IV
+    get NaN greeks rather than a division error.
+    """
+    spot = np.abs(np.asarray(spot, dtype=float))
+    strike = np.abs(np.asarray(strike, dtype=float))
+    tte = np.maximum(np.asarray(tte, dtype=float), MIN_TTE)
+    sigma = np.asarray(iv_pct, dtype=float) / 100.0
+    sigma = np.where(sigma > 0, sigma, np.nan)
+    is_call = np.asarray(is_call, dtype=bool)
+
+    sqrt_t = np.sqrt(tte)
+    d1 = (np.log(spot / strike) + (rate + sigma ** 2 / 2) * tte) / (sigma * sqrt_t)
+    d2 = d1 - sigma * sqrt_t
+    n_d1 = norm_cdf(np.nan_to_num(d1))
+    n_d2 = norm_cdf(np.nan_to_num(d2))
+    pdf_d1 = norm_pdf(d1)
+    discount = strike * np.exp(-rate * tte)
+
+    delta = np.where(is_call, n_d1, n_d1 - 1)
+    gamma = pdf_d1 / (spot * sigma * sqrt_t)
+    decay = -(spot * sigma * pdf_d1) / (2 * sqrt_t)
+    theta = np.where(is_call, decay - rate * discount * n_d2, decay + rate * discount * (1 - n_d2)) / 365
+    vega = spot * pdf_d1 * sqrt_t / 100
+
+    invalid = np.isnan(sigma)
+    return {
+        'delta': np.where(invalid, np.nan, delta),
+        'gamma': gamma,
+        'theta': np.where(invalid, np.nan, theta),
+        'vega': vega,
+    }
@@ -0,0 +1,127 @@
+"""Bid/ask microstructure of the option chain, per strike and snapshot.
+
+The chain rows already carry the top of book (bid/ask price and quantity)
+and the total buy/sell quantities; this turns them into
+
+    mid, spread, rel_spread_bps    quote width, NaN unless both sides quote
+    microprice                     mid weighted towards the thinner side
+    top_imbalance                  (bid_qty - ask_qty) / (bid_qty + ask_qty)
+    book_imbalance                 same with total buy / sell quantity
+    liquidity_score                0-100 from spread, depth and volume ranks
+    tradable                       two-sided, tight enough and liquid enough
+
+in one vectorized pass over the chain.  ``MicrostructureTracker`` keeps an
+exponentially weighted mean and variance of the book imbalance per strike,
+so a surge (``imbalance_z`` beyond ``surge_z``) is flagged as the snapshot
+arrives:
+
+    tracker = MicrostructureTracker()
+    quotes = tracker.update(chain)          # chain: rows in OPTION_COLUMNS
+    quotes[quotes['tradable']]
+    quotes[quotes['imbalance_surge']]
+"""
+import numpy as np
+import pandas as pd
+
+from nse_collector import OPTION_COLUMNS
+
+# Strikes quoted wider than this (relative to mid) are not tradable
+MAX_SPREAD_BPS = 300.0
+MIN_LIQUIDITY_SCORE = 40.0
+# Relative spread at which the spread part of the score halves
+SPREAD_SCALE_BPS = 50.0
+SCORE_WEIGHTS = {'spread': 0.5, 'depth': 0.3, 'volume': 0.2}
+
+# Rolling imbalance statistics: EWMA span in snapshots (an hour of 5-minute
+# cycles) and how far from normal counts as a surge
+IMBALANCE_SPAN = 12
+SURGE_Z = 3.0
+MIN_HISTORY = 6
+
+
+def _ratio(numerator, denominator):
+    denominator = denominator.where(denominator > 0)
+    return numerator / denominator
+
+
+def quote_metrics(chain):
+    """Microstructure columns for every row of ``chain`` (a DataFrame)"""
+    bid = chain['bid_price'].astype(float)
+    ask = chain['ask_price'].astype(float)
+    bid_qty = chain['bid_qty'].astype(float)
+    ask_qty = chain['ask_qty'].astype(float)
+    two_sided = (bid > 0) & (ask > 0) & (ask >= bid)
+
+    mid = ((bid + ask) / 2).where(two_sided)
+    spread = (ask - bid).where(two_sided)
+    rel_spread_bps = 1e4 * _ratio(spread, mid)
+    microprice = _ratio(bid * ask_qty + ask * bid_qty, bid_qty + ask_qty).where(two_sided)
+    top_imbalance = _ratio(bid_qty - ask_qty, bid_qty + ask_qty)
+    buy = chain['total_buy_quantity'].astype(float)
+    sell = chain['total_sell_quantity'].astype(float)
+    book_imbalance = _ratio(buy - sell, buy + sell)
+
+    # Depth and volume are ranked within the snapshot so the score does not
+    # drift with the time of day
+    spread_score = (1.0 / (1.0 + rel_spread_bps / SPREAD_SCALE_BPS)).fillna(0.0)
+    depth_score = np.minimum(bid_qty, ask_qty).rank(pct=True).fillna(0.0)
+    volume_score = chain['volume'].astype(float).rank(pct=True).fillna(0.0)
+    liquidity_score = 100.0 * (SCORE_WEIGHTS['spread'] * spread_score
+                               + SCORE_WEIGHTS['depth'] * depth_score
+                               + SCORE_WEIGHTS['volume'] * volume_score)
+
+    return chain[['date_time', 'strike_price', 'option_type']].assign(
+        bid_price=bid, ask_price=ask, bid_qty=bid_qty, ask_qty=ask_qty,
+        mid=mid, spread=spread, rel_spread_bps=rel_spread_bps, microprice=microprice,
+        top_imbalance=top_imbalance, book_imbalance=book_imbalance,
+        liquidity_score=liquidity_score,
+        tradable=two_sided & (rel_spread_bps <= MAX_SPREAD_BPS) & (liquidity_score >= MIN_LIQUIDITY_SCORE),
+    )
+
+
+class MicrostructureTracker:
+    """Quote metrics plus per-strike rolling imbalance statistics"""
+
+    def __init__(self, span=IMBALANCE_SPAN, surge_z=SURGE_Z, min_history=MIN_HISTORY):
+        self.alpha = 2.0 / (span + 1)
+        self.surge_z = surge_z
+        self.min_history = min_history
+        # (strike_price, option_type) -> mean, var, count of book_imbalance
+        self.stats = pd.DataFrame(columns=['mean', 'var', 'count'], dtype=float,
+                                  index=pd.MultiIndex.from_tuples([], names=['strike_price', 'option_type']))
+
+    def update(self, chain):
+        """Metrics for one snapshot (DataFrame or OPTION_COLUMNS rows), z-scored
+        against each strike's history before that history is updated"""
+        if not isinstance(chain, pd.DataFrame):
+            chain = pd.DataFrame(chain, columns=OPTION_COLUMNS)
+        quotes = quote_metrics(chain)
+        key = pd.MultiIndex.from_frame(quotes[['strike_price', 'option_type']])
+        x = pd.Series(quotes['book_imbalance'].to_numpy(), index=key)
+        prior = self.stats.reindex(key)
+
+        std = np.sqrt(prior['var'])
+        z = ((x - prior['mean']) / std.where(std > 1e-9)).to_numpy()
+        enough = (prior['count'].fillna(0) >= self.min_history).to_numpy()
+        quotes['imbalance_z'] = np.where(enough, z, np.nan)
+        quotes['imbalance_surge'] = enough & (np.abs(np.nan_to_num(z)) >= self.surge_z)
+
+        # EWMA update; strikes seen for the first time start at their value
+        valid = x.notna()
+        mean = prior['mean'].where(prior['mean'].notna(), x)
+        var = prior['var'].fillna(0.0)
+        delta = x - mean
+        new = pd.DataFrame({
+            'mean': mean + self.alpha * delta,
+            'var': (1 - self.alpha) * (var + self.alpha * delta * delta),
+            'count': prior['count'].fillna(0) + 1,
+        })[valid.to_numpy()]
+        new = new[~new.index.duplicated(keep='last')]
+        self.stats = pd.concat([self.stats[~self.stats.index.isin(new.index)], new])
+        return quotes
+
+
+def tradable_strikes(quotes):
+    """Strikes quoted tightly enough on both CE and PE"""
+    both = quotes[quotes['tradable']].groupby('strike_price')['option_type'].nunique()
+    return both[both == 2].index.tolist()
@@ -0,0 +1,274 @@
+"""Chain-wide positioning per snapshot: max pain, OI walls, GEX/DEX, zero gamma.
+
+``analyze_option_data`` reads support and resistance off one strike's
+history and ``generate_pcr_prediction`` only sees the aggregate PCR.  This
+looks at the whole chain of each snapshot:
+
+    max pain      settlement price that minimises the option writers' payout,
+                  from prefix sums over the sorted strikes (O(N log N))
+    OI walls      highest CE OI strikes above spot, PE OI strikes below it
+    GEX / DEX     dealer gamma (per 1% move) and delta exposure by strike,
+                  calls positive and puts negative, from nse_greeks
+    zero gamma    spot level where net GEX changes sign, found by re-pricing
+                  gamma over a grid of spots in one broadcast
+
+Results go to ``snapshot_positioning`` (one row per snapshot, with the
+change since the previous one) and ``strike_exposure`` (GEX/DEX per strike)
+in the option database.  ``PositioningTracker`` only processes snapshots it
+has not stored yet; the collector runs it as a listener and
+``python nse_positioning.py`` backfills any range of older days.
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from nse_collector import DB_PATH, OPTION_COLUMNS, connect
+from nse_greeks import bs_greeks, time_to_expiry
+
+# NIFTY contract size; exposures are in rupees
+LOT_SIZE = 75
+WALLS = 3
+# Zero-gamma search: spots within this fraction of the current spot
+ZERO_GAMMA_RANGE = 0.05
+ZERO_GAMMA_STEPS = 201
+
+
+def setup_positioning_tables(conn):
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS snapshot_positioning (
+        date_time TEXT PRIMARY KEY,
+        expiry_date TEXT,
+        underlying_value REAL,
+        max_pain REAL,
+        call_wall REAL,
+        put_wall REAL,
+        call_walls TEXT,
+        put_walls TEXT,
+        net_gex REAL,
+        net_dex REAL,
+        zero_gamma REAL,
+        max_pain_change REAL,
+        net_gex_change REAL,
+        net_dex_change REAL
+    )
+    ''')
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS strike_exposure (
+        date_time TEXT,
+        strike_price REAL,
+        ce_oi INTEGER,
+        pe_oi INTEGER,
+        gex REAL,
+        dex REAL,
+        PRIMARY KEY (date_time, strike_price)
+    )
+    ''')
+    conn.commit()
+
+
+# --- Calculations ---
+def max_pain(strikes, ce_oi, pe_oi):
+    """Strike at which expiring options pay their holders the least.
+
+    Payout at settlement S is sum(ce_oi * max(S - K, 0)) +
+    sum(pe_oi * max(K - S, 0)); with strikes sorted both sums are prefix
+    sums, so every candidate S is priced in one pass.
+    """
+    order = np.argsort(strikes)
+    k = np.asarray(strikes, dtype=float)[order]
+    ce = np.asarray(ce_oi, dtype=float)[order]
+    pe = np.asarray(pe_oi, dtype=float)[order]
+    # Calls at strikes below S: S * sum(oi) - sum(oi * K)
+    ce_oi_below = np.cumsum(ce)
+    ce_oik_below = np.cumsum(ce * k)
+    call_payout = k * ce_oi_below - ce_oik_below
+    # Puts at strikes above S: sum(oi * K) - S * sum(oi)
+    pe_oi_above = np.cumsum(pe[::-1])[::-1]
+    pe_oik_above = np.cumsum((pe * k)[::-1])[::-1]
+    put_payout = pe_oik_above - k * pe_oi_above
+    payout = call_payout + put_payout
+    return float(k[np.argmin(payout)]), payout
+
+
+def oi_walls(strikes, ce_oi, pe_oi, spot, n=WALLS):
+    """Top ``n`` CE OI strikes at/above spot and PE OI strikes at/below spot"""
+    strikes = np.asarray(strikes, dtype=float)
+
+    def top(oi, mask):
+        idx = np.flatnonzero(mask)
+        if idx.size == 0:
+            return []
+        best = idx[np.argsort(np.asarray(oi, dtype=float)[idx])[::-1][:n]]
+        return strikes[best].tolist()
+    return top(ce_oi, strikes >= spot), top(pe_oi, strikes <= spot)
+
+
+def exposures(chain, spot, tte):
+    """Per-row GEX (per 1% spot move) and DEX in rupees; puts count negative"""
+    is_call = (chain['option_type'] == 'CE').to_numpy()
+    greeks = bs_greeks(spot, chain['strike_price'], tte, chain['iv'], is_call)
+    oi = chain['open_interest'].to_numpy(dtype=float) * LOT_SIZE
+    sign = np.where(is_call, 1.0, -1.0)
+    gex = sign * np.nan_to_num(greeks['gamma']) * oi * spot * spot * 0.01
+    dex = np.nan_to_num(greeks['delta']) * oi * spot
+    return gex, dex
+
+
+def zero_gamma(chain, spot, tte, span=ZERO_GAMMA_RANGE, steps=ZERO_GAMMA_STEPS):
+    """Spot level where net GEX crosses zero, nearest to the current spot.
+
+    Gamma is re-priced for every row at every grid spot in one
+    (steps x rows) broadcast; None when net GEX has one sign over the range.
+    """
+    grid = spot * np.linspace(1 - span, 1 + span, steps)
+    is_call = (chain['option_type'] == 'CE').to_numpy()
+    greeks = bs_greeks(grid[:, None], chain['strike_price'].to_numpy()[None, :], tte,
+                       chain['iv'].to_numpy()[None, :], is_call[None, :])
+    oi = chain['open_interest'].to_numpy(dtype=float) * LOT_SIZE * np.where(is_call, 1.0, -1.0)
+    net = (np.nan_to_num(greeks['gamma']) * oi).sum(axis=1) * grid * grid * 0.01
+    crossings = np.flatnonzero(np.sign(net[:-1]) * np.sign(net[1:]) < 0)
+    if crossings.size == 0:
+        return None
+    i = crossings[np.argmin(np.abs(grid[crossings] - spot))]
+    # Linear interpolation inside the bracketing grid step
+    return float(grid[i] - net[i] * (grid[i + 1] - grid[i]) / (net[i + 1] - net[i]))
+
+
+def positioning(chain):
+    """Positioning of one snapshot's chain (one expiry) as (summary, per-strike frame)"""
+    date_time = chain['date_time'].iloc[0]
+    expiry = chain['expiry_date'].iloc[0]
+    spot = float(chain['underlying_value'].iloc[0])
+    tte = float(time_to_expiry(date_time, expiry))
+
+    gex, dex = exposures(chain, spot, tte)
+    per_row = chain[['strike_price', 'option_type', 'open_interest']].assign(gex=gex, dex=dex)
+    oi = per_row.pivot_table(index='strike_price', columns='option_type',
+                             values='open_interest', aggfunc='sum').reindex(columns=['CE', 'PE']).fillna(0)
+    by_strike = per_row.groupby('strike_price')[['gex', 'dex']].sum()
+    by_strike['ce_oi'] = oi['CE']
+    by_strike['pe_oi'] = oi['PE']
+
+    pain, _ = max_pain(oi.index.to_numpy(), oi['CE'].to_numpy(), oi['PE'].to_numpy())
+    call_walls, put_walls = oi_walls(oi.index.to_numpy(), oi['CE'].to_numpy(), oi['PE'].to_numpy(), spot)
+    summary = {
+        'date_time': date_time,
+        'expiry_date': expiry,
+        'underlying_value': spot,
+        'max_pain': pain,
+        'call_wall': call_walls[0] if call_walls else None,
+        'put_wall': put_walls[0] if put_walls else None,
+        'call_walls': ','.join(f"{s:g}" for s in call_walls),
+        'put_walls': ','.join(f"{s:g}" for s in put_walls),
+        'net_gex': float(gex.sum()),
+        'net_dex': float(dex.sum()),
+        'zero_gamma': zero_gamma(chain, spot, tte),
+    }
+    return summary, by_strike
+
+
+# --- Incremental tracking ---
+CHANGE_FIELDS = ('max_pain', 'net_gex', 'net_dex')
+
+
+class PositioningTracker:
+    """Computes and stores positioning for snapshots not stored yet"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        setup_positioning_tables(conn)
+
+    def on_snapshot(self, rows, metrics=None):
+        """Collector listener: ``rows`` in OPTION_COLUMNS order"""
+        if rows:
+            return self.update(pd.DataFrame(rows, columns=OPTION_COLUMNS))
+
+    def _neighbour(self, date_time, later):
+        """Nearest stored snapshot of the same trading day before (or after) ``date_time``"""
+        day = date_time[:10]
+        if later:
+            where, order, params = "date_time > ? AND date_time < ?", "ASC", (date_time, f"{day}~")
+        else:
+            where, order, params = "date_time >= ? AND date_time < ?", "DESC", (day, date_time)
+        row = self.conn.execute(f"""
+            SELECT date_time, {', '.join(CHANGE_FIELDS)} FROM snapshot_positioning
+            WHERE {where} ORDER BY date_time {order} LIMIT 1
+        """, params).fetchone()
+        return dict(zip(('date_time',) + CHANGE_FIELDS, row)) if row else None
+
+    def update(self, chain):
+        summary, by_strike = positioning(chain)
+        # Changes are only meaningful against the same trading day, and are
+        # taken from the stored rows so out-of-order backfills stay right
+        previous = self._neighbour(summary['date_time'], later=False)
+        for field in CHANGE_FIELDS:
+            summary[f'{field}_change'] = summary[field] - previous[field] if previous else None
+        self.store(summary, by_strike)
+        return summary
+
+    def store(self, summary, by_strike):
+        columns = list(summary)
+        following = self._neighbour(summary['date_time'], later=True)
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO snapshot_positioning ({0}) VALUES ({1})".format(
+                    ', '.join(columns), ', '.join('?' * len(columns))),
+                [summary[c] for c in columns])
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO strike_exposure VALUES (?, ?, ?, ?, ?, ?)",
+                [(summary['date_time'], float(strike), int(r.ce_oi), int(r.pe_oi), float(r.gex), float(r.dex))
+                 for strike, r in by_strike.iterrows()])
+            if following:
+                # A backfilled snapshot becomes the previous one of the next stored row
+                self.conn.execute(
+                    "UPDATE snapshot_positioning SET {0} WHERE date_time = ?".format(
+                        ', '.join(f"{field}_change = {field} - ?" for field in CHANGE_FIELDS)),
+                    [summary[field] for field in CHANGE_FIELDS] + [following['date_time']])
+
+    def backfill(self, start=None, end=None):
+        """Process stored snapshots in [start, end] not positioned yet, a day at a time, oldest first"""
+        days = [row[0] for row in self.conn.execute("""
+            SELECT DISTINCT substr(date_time, 1, 10) FROM nifty_option_chain_data
+            WHERE date_time >= :start AND date_time < :end ORDER BY 1
+        """, {'start': start or '', 'end': f"{end}~" if end else '~'})]
+        processed = 0
+        for day in days:
+            chain = pd.read_sql_query(f"""
+                SELECT {', '.join('c.' + c for c in OPTION_COLUMNS)} FROM nifty_option_chain_data c
+                WHERE c.date_time >= :day AND c.date_time < :day_end
+                  AND NOT EXISTS (SELECT 1 FROM snapshot_positioning p WHERE p.date_time = c.date_time)
+                ORDER BY c.date_time
+            """, self.conn, params={'day': day, 'day_end': f"{day}~"})
+            for _, snapshot in chain.groupby('date_time', sort=True):
+                # Nearest expiry only, as the collector stores by default
+                expiry = min(snapshot['expiry_date'].unique(), key=lambda e: pd.to_datetime(e, format='%d-%b-%Y'))
+                self.update(snapshot[snapshot['expiry_date'] == expiry].reset_index(drop=True))
+                processed += 1
+        return processed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Max pain, OI walls and gamma exposure per snapshot")
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--start', default=None, help="First day to backfill (YYYY-MM-DD)")
+    parser.add_argument('--end', default=None, help="Last day to backfill (YYYY-MM-DD)")
+    args = parser.parse_args(argv)
+
+    conn = connect(args.db)
+    try:
+        tracker = PositioningTracker(conn)
+        processed = tracker.backfill(args.start, args.end)
+        print(f"Positioned {processed} new snapshots")
+        latest = pd.read_sql_query("""
+            SELECT date_time, underlying_value, max_pain, call_walls, put_walls,
+                   ROUND(net_gex / 1e7, 2) AS net_gex_cr, ROUND(zero_gamma, 1) AS zero_gamma
+            FROM snapshot_positioning ORDER BY date_time DESC LIMIT 10
+        """, conn)
+        print(latest.iloc[::-1].to_string(index=False))
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
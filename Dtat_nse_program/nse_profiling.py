@@ -0,0 +1,257 @@
+"""Opt-in profiling for the dashboard cycles and their SQLite queries.
+
+Off unless asked for, so the dashboards pay nothing by default.  Turn it on
+with an environment variable or a command-line flag:
+
+    NSE_PROFILE=E:/profiles python nse_data_06-06-2025.py
+    python "NIFTY 25022025.py" --profile E:/profiles --profile-mode sample
+    python nse_data_06-06-2025.py --slow-query-ms 50      # query log only
+
+Each profiled cycle writes one file to the profile directory:
+
+- ``cprofile`` mode: ``<label>_<time>_<n>.prof`` (pstats; open with
+  snakeviz, or flameprof for a flamegraph),
+- ``sample`` mode: ``<label>_<time>_<n>.folded`` (collapsed stacks sampled
+  every few ms; feed to flamegraph.pl, speedscope or inferno).
+
+Connections from ``Profiler.connect`` time every SELECT that is read with
+fetchall (which includes pandas.read_sql_query).  Queries slower than the
+threshold are printed with their ``EXPLAIN QUERY PLAN`` and, when a
+profile directory is set, appended to ``slow_queries.log`` there.
+"""
+import argparse
+import cProfile
+import os
+import sqlite3
+import sys
+import textwrap
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+
+PROFILE_ENV = 'NSE_PROFILE'
+PROFILE_MODE_ENV = 'NSE_PROFILE_MODE'
+SLOW_QUERY_ENV = 'NSE_SLOW_QUERY_MS'
+
+MODES = ('cprofile', 'sample')
+# Queries at least this slow are logged with their plan once profiling is on
+DEFAULT_SLOW_QUERY_MS = 100
+SAMPLE_INTERVAL = 0.005
+SLOW_QUERY_LOG = 'slow_queries.log'
+
+
+def parse_profile_args(argv=None):
+    """Profiling options from the command line, falling back to the environment.
+
+    Unknown arguments are ignored so the scripts keep working with any
+    other flags they are given.
+    """
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--profile', metavar='DIR', default=os.environ.get(PROFILE_ENV),
+                        help="Write per-cycle profiles to DIR")
+    parser.add_argument('--profile-mode', choices=MODES,
+                        default=os.environ.get(PROFILE_MODE_ENV, 'cprofile'))
+    parser.add_argument('--slow-query-ms', type=float, default=os.environ.get(SLOW_QUERY_ENV),
+                        help="Log plans of queries slower than this")
+    args, _ = parser.parse_known_args(sys.argv[1:] if argv is None else argv)
+    return args
+
+
+class StackSampler:
+    """Sample one thread's Python stack on a timer into collapsed-stack counts"""
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = Counter()
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.thread.join()
+        return self.counts
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.counts[';'.join(reversed(stack))] += 1
+
+
+class Profiler:
+    """Per-cycle profiles and the slow-query log.
+
+    Scripts create a disabled module-level instance (so methods can be
+    decorated at import time) and call ``configure_from_args`` in main.
+    """
+
+    def __init__(self, out_dir=None, mode='cprofile', slow_query_ms=None, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.cycles = Counter()
+        self.active = threading.local()
+        self.log_lock = threading.Lock()
+        self.configure(out_dir, mode, slow_query_ms)
+
+    def configure(self, out_dir=None, mode='cprofile', slow_query_ms=None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown profile mode {mode!r}, expected one of {MODES}")
+        if slow_query_ms is None and out_dir:
+            slow_query_ms = DEFAULT_SLOW_QUERY_MS
+        self.out_dir = out_dir
+        self.mode = mode
+        self.slow_query_ms = None if slow_query_ms is None else float(slow_query_ms)
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+            print(f"Profiling {mode} cycles into {out_dir}")
+        if self.slow_query_ms is not None:
+            print(f"Logging query plans for queries over {self.slow_query_ms:g} ms")
+
+    def configure_from_args(self, argv=None):
+        args = parse_profile_args(argv)
+        self.configure(args.profile, args.profile_mode, args.slow_query_ms)
+        return self
+
+    @property
+    def enabled(self):
+        return bool(self.out_dir)
+
+    # --- Cycles ---
+    def _output_path(self, label, extension):
+        self.cycles[label] += 1
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        return os.path.join(self.out_dir, f"{label}_{stamp}_{self.cycles[label]:04d}.{extension}")
+
+    @contextmanager
+    def cycle(self, label):
+        """Profile the block and dump its stats; a no-op when disabled.
+
+        Nested cycles on the same thread are folded into the outer one
+        (only one profiler can be active per thread).
+        """
+        if not self.enabled or getattr(self.active, 'label', None):
+            yield
+            return
+        self.active.label = label
+        started = time.perf_counter()
+        if self.mode == 'cprofile':
+            profile = cProfile.Profile()
+            profile.enable()
+        else:
+            sampler = StackSampler(threading.get_ident(), self.interval)
+            sampler.start()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.active.label = None
+            try:
+                if self.mode == 'cprofile':
+                    profile.disable()
+                    path = self._output_path(label, 'prof')
+                    profile.dump_stats(path)
+                else:
+                    counts = sampler.stop()
+                    path = self._output_path(label, 'folded')
+                    with open(path, 'w') as fh:
+                        for stack, count in counts.most_common():
+                            fh.write(f"{stack} {count}\n")
+                print(f"Profiled {label} cycle ({elapsed:.2f}s) -> {path}")
+            except OSError as e:
+                print(f"Error writing profile for {label}: {e}")
+
+    def profiled(self, label):
+        """Decorator form of ``cycle``"""
+        def decorator(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.cycle(label):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    # --- Queries ---
+    def connect(self, path, **kwargs):
+        """sqlite3.connect, timing SELECTs when the slow-query log is on"""
+        if self.slow_query_ms is None:
+            return sqlite3.connect(path, **kwargs)
+        conn = sqlite3.connect(path, factory=ProfiledConnection, **kwargs)
+        conn.profiler = self
+        return conn
+
+    def log_query(self, conn, sql, params, elapsed):
+        ms = elapsed * 1000
+        if ms < self.slow_query_ms:
+            return
+        try:
+            plan = conn.execute_plain(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+        except sqlite3.Error as e:
+            plan = [(0, 0, 0, f"(plan unavailable: {e})")]
+        plan_lines = format_plan(plan)
+        params_line = [f"params: {params!r}"] if params else []
+        # The console gets the start of the query; the log gets all of it
+        print('\n'.join([f"Slow query ({ms:.1f} ms): {' '.join(sql.split())[:120]}"]
+                        + params_line + plan_lines))
+        if self.out_dir:
+            text = '\n'.join([f"[{datetime.now():%Y-%m-%d %H:%M:%S}] {ms:.1f} ms",
+                              textwrap.dedent(sql).strip()] + params_line + plan_lines)
+            with self.log_lock, open(os.path.join(self.out_dir, SLOW_QUERY_LOG), 'a') as fh:
+                fh.write(text + '\n\n')
+
+
+def format_plan(plan):
+    """EXPLAIN QUERY PLAN rows (id, parent, notused, detail) as an indented tree"""
+    depth = {0: 0}
+    lines = []
+    for node_id, parent, _, detail in plan:
+        depth[node_id] = depth.get(parent, 0) + 1
+        lines.append('  ' * depth[node_id] + detail)
+    return lines
+
+
+class ProfiledCursor(sqlite3.Cursor):
+    """Times SELECTs from execute() through fetchall()"""
+
+    def execute(self, sql, params=()):
+        self.query = None
+        started = time.perf_counter()
+        result = super().execute(sql, params)
+        self.elapsed = time.perf_counter() - started
+        if sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+            self.query = (sql, params)
+        return result
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        if self.query is not None:
+            sql, params = self.query
+            self.query = None
+            self.connection.profiler.log_query(
+                self.connection, sql, params, self.elapsed + time.perf_counter() - started)
+        return rows
+
+
+class ProfiledConnection(sqlite3.Connection):
+    profiler = None
+
+    def cursor(self, factory=ProfiledCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def execute_plain(self, sql, params=()):
+        """Untimed execute, used for the plans themselves"""
+        return super().cursor().execute(sql, params)
@@ -0,0 +1,201 @@
+"""Local pub/sub stream of option chain snapshots.
+
+The collector publishes every parsed snapshot (and its derived metrics) to
+a localhost socket; viewers, alerting and the Dash app subscribe and react
+as soon as a snapshot is stored instead of polling ``MAX(date_time)``.
+
+Wire format, all integers big-endian:
+
+    frame    := type:uint8  length:uint32  payload[length]
+    SNAPSHOT := meta_len:uint16  meta_json[meta_len]  row_count:uint32  rows
+    row      := ROW_STRUCT (see below), one per strike and option type
+
+``meta_json`` carries date_time, expiry_date, underlying_value and the
+metrics dict; everything per-row is packed binary.
+"""
+import asyncio
+import json
+import queue
+import struct
+import threading
+
+PUBSUB_HOST = '127.0.0.1'
+PUBSUB_PORT = 8765
+
+MSG_SNAPSHOT = 1
+MSG_HEARTBEAT = 2
+
+FRAME_HEADER = struct.Struct('!BI')
+META_HEADER = struct.Struct('!H')
+ROW_COUNT = struct.Struct('!I')
+# strike, option type (C/P), oi, change in oi, volume, iv, ltp, net change,
+# total buy qty, total sell qty, bid qty, bid price, ask qty, ask price
+ROW_STRUCT = struct.Struct('!dcqqqdddqqqdqd')
+
+# Drop a subscriber whose unsent buffer grows past this many bytes
+MAX_SUBSCRIBER_BACKLOG = 8 * 1024 * 1024
+
+
+def _int(value):
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _float(value):
+    try:
+        return float(value or 0.0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def encode_snapshot(rows, metrics=None):
+    """Pack collector rows (nse_collector.OPTION_COLUMNS order) into one frame"""
+    first = rows[0] if rows else (None,) * 17
+    meta = json.dumps({
+        'date_time': first[0],
+        'expiry_date': first[3],
+        'underlying_value': first[16],
+        'metrics': metrics or {},
+    }, separators=(',', ':')).encode('utf-8')
+
+    parts = [META_HEADER.pack(len(meta)), meta, ROW_COUNT.pack(len(rows))]
+    for row in rows:
+        parts.append(ROW_STRUCT.pack(
+            _float(row[1]), row[2][0].encode('ascii'),
+            _int(row[4]), _int(row[5]), _int(row[6]),
+            _float(row[7]), _float(row[8]), _float(row[9]),
+            _int(row[10]), _int(row[11]), _int(row[12]),
+            _float(row[13]), _int(row[14]), _float(row[15])
+        ))
+    payload = b''.join(parts)
+    return FRAME_HEADER.pack(MSG_SNAPSHOT, len(payload)) + payload
+
+
+def decode_snapshot(payload):
+    """Inverse of encode_snapshot for the payload of a SNAPSHOT frame.
+
+    Returns ``(meta, rows)`` with rows as tuples in OPTION_COLUMNS order.
+    """
+    (meta_len,) = META_HEADER.unpack_from(payload, 0)
+    offset = META_HEADER.size
+    meta = json.loads(payload[offset:offset + meta_len].decode('utf-8'))
+    offset += meta_len
+    (count,) = ROW_COUNT.unpack_from(payload, offset)
+    offset += ROW_COUNT.size
+
+    date_time, expiry, underlying = meta['date_time'], meta['expiry_date'], meta['underlying_value']
+    rows = []
+    for fields in ROW_STRUCT.iter_unpack(payload[offset:offset + count * ROW_STRUCT.size]):
+        option_type = 'CE' if fields[1] == b'C' else 'PE'
+        rows.append((date_time, fields[0], option_type, expiry) + fields[2:] + (underlying,))
+    return meta, rows
+
+
+class SnapshotPublisher:
+    """asyncio server that fans each snapshot frame out to every subscriber"""
+
+    def __init__(self, host=PUBSUB_HOST, port=PUBSUB_PORT):
+        self.host = host
+        self.port = port
+        self.server = None
+        self.subscribers = set()
+        self.last_frame = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._on_connect, self.host, self.port)
+        print(f"Publishing snapshots on {self.host}:{self.port}")
+
+    async def _on_connect(self, reader, writer):
+        # New subscribers get the latest snapshot immediately
+        if self.last_frame:
+            writer.write(self.last_frame)
+        self.subscribers.add(writer)
+        try:
+            # Subscribers never send anything; wait for them to disconnect
+            await reader.read()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.subscribers.discard(writer)
+            writer.close()
+
+    def publish(self, rows, metrics=None):
+        """Send a snapshot to all subscribers without awaiting slow readers"""
+        if not rows:
+            return
+        frame = encode_snapshot(rows, metrics)
+        self.last_frame = frame
+        for writer in list(self.subscribers):
+            if writer.transport.get_write_buffer_size() > MAX_SUBSCRIBER_BACKLOG:
+                print("Dropping subscriber that is not keeping up")
+                self.subscribers.discard(writer)
+                writer.close()
+                continue
+            writer.write(frame)
+
+    def heartbeat(self):
+        for writer in list(self.subscribers):
+            writer.write(FRAME_HEADER.pack(MSG_HEARTBEAT, 0))
+
+    async def close(self):
+        for writer in list(self.subscribers):
+            writer.close()
+        self.subscribers.clear()
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+
+
+async def subscribe(host=PUBSUB_HOST, port=PUBSUB_PORT):
+    """Async generator yielding ``(meta, rows)`` for each published snapshot"""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while True:
+            header = await reader.readexactly(FRAME_HEADER.size)
+            msg_type, length = FRAME_HEADER.unpack(header)
+            payload = await reader.readexactly(length) if length else b''
+            if msg_type == MSG_SNAPSHOT:
+                yield decode_snapshot(payload)
+    finally:
+        writer.close()
+
+
+def start_subscriber_thread(host=PUBSUB_HOST, port=PUBSUB_PORT, retry_seconds=5):
+    """Subscribe from a background thread for Tk dashboards.
+
+    Returns a ``queue.Queue`` of ``(meta, rows)``; drain it from ``after()``.
+    The thread reconnects whenever the collector restarts.
+    """
+    updates = queue.Queue()
+
+    async def run():
+        while True:
+            try:
+                async for snapshot in subscribe(host, port):
+                    updates.put(snapshot)
+            except (OSError, asyncio.IncompleteReadError) as e:
+                print(f"Snapshot stream unavailable ({e}), retrying in {retry_seconds}s")
+            await asyncio.sleep(retry_seconds)
+
+    thread = threading.Thread(target=lambda: asyncio.run(run()), daemon=True)
+    thread.start()
+    return updates
+
+
+def main():
+    """Print a one-line summary of each snapshot as it arrives"""
+    async def tail():
+        async for meta, rows in subscribe():
+            metrics = meta.get('metrics') or {}
+            print(f"{meta['date_time']} spot {meta['underlying_value']} "
+                  f"rows {len(rows)} PCR {metrics.get('pcr', 0):.2f}")
+    try:
+        asyncio.run(tail())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,582 @@
+"""SQL behind the option chain analysis grids.
+
+Shared by the dashboard (nse_data_06-06-2025.py) and the batch runner
+(nse_batch_analysis.py).  Each query analyses one trading day, passed as
+the named parameter ``:day``:
+
+    pd.read_sql_query(SQL_QUERY, conn, params=day_params('2025-06-12'))
+"""
+
+
+def day_params(day):
+    """Query parameters selecting one trading day (YYYY-MM-DD)"""
+    return {'day': f"{day}%"}
+
+
+# SQL query to get top volume strikes with time-wise data
+SQL_QUERY = """
+WITH timeframes AS (
+    SELECT 
+        strftime('%H:%M', date_time) as time_window,
+        strike_price,
+        option_type,
+        SUM(volume) AS total_volume,
+        SUM(open_interest) AS total_oi,
+        AVG(ltp) AS ltp,
+        AVG(iv) AS iv,
+        COUNT(*) as data_points,
+        -- Calculate 5-minute, 15-minute, and 30-minute moving averages
+        AVG(AVG(ltp)) OVER (
+            PARTITION BY strike_price, option_type 
+            ORDER BY strftime('%H:%M', date_time) 
+            ROWS BETWEEN 2 PRECEDING AND CURRENT ROW
+        ) as ma_5min,
+        AVG(AVG(ltp)) OVER (
+            PARTITION BY strike_price, option_type 
+            ORDER BY strftime('%H:%M', date_time) 
+            ROWS BETWEEN 5 PRECEDING AND CURRENT ROW
+        ) as ma_15min,
+        AVG(AVG(ltp)) OVER (
+            PARTITION BY strike_price, option_type 
+            ORDER BY strftime('%H:%M', date_time) 
+            ROWS BETWEEN 9 PRECEDING AND CURRENT ROW
+        ) as ma_30min,
+        -- Calculate volume moving averages
+        AVG(SUM(volume)) OVER (
+            PARTITION BY strike_price, option_type 
+            ORDER BY strftime('%H:%M', date_time) 
+            ROWS BETWEEN 2 PRECEDING AND CURRENT ROW
+        ) as vol_ma_5min,
+        AVG(SUM(volume)) OVER (
+            PARTITION BY strike_price, option_type 
+            ORDER BY strftime('%H:%M', date_time) 
+            ROWS BETWEEN 5 PRECEDING AND CURRENT ROW
+        ) as vol_ma_15min
+    FROM nifty_option_chain_data
+    WHERE date_time LIKE :day
+    AND expiry_date = (
+        SELECT expiry_date 
+        FROM nifty_option_chain_data 
+        WHERE date_time LIKE :day
+        ORDER BY expiry_date 
+        LIMIT 1
+    )
+    GROUP BY time_window, strike_price, option_type
+),
+ranked_options AS (
+    SELECT *,
+        ROW_NUMBER() OVER (PARTITION BY time_window, option_type ORDER BY total_volume DESC) AS vol_rank
+    FROM timeframes
+),
+top_options AS (
+    SELECT * FROM ranked_options WHERE vol_rank <= 3
+),
+option_with_lag AS (
+    SELECT 
+        t.*,
+        LAG(t.total_volume) OVER (PARTITION BY t.strike_price, t.option_type ORDER BY t.time_window) AS prev_volume,
+        LAG(t.total_oi) OVER (PARTITION BY t.strike_price, t.option_type ORDER BY t.time_window) AS prev_oi,
+        LAG(t.ltp) OVER (PARTITION BY t.strike_price, t.option_type ORDER BY t.time_window) AS prev_ltp,
+        LAG(t.iv) OVER (PARTITION BY t.strike_price, t.option_type ORDER BY t.time_window) AS prev_iv,
+        LAG(t.ma_5min) OVER (PARTITION BY t.strike_price, t.option_type ORDER BY t.time_window) AS prev_ma_5min,
+        LAG(t.ma_15min) OVER (PARTITION BY t.strike_price, t.option_type ORDER BY t.time_window) AS prev_ma_15min,
+        LAG(t.ma_30min) OVER (PARTITION BY t.strike_price, t.option_type ORDER BY t.time_window) AS prev_ma_30min,
+        LAG(t.vol_ma_5min) OVER (PARTITION BY t.strike_price, t.option_type ORDER BY t.time_window) AS prev_vol_ma_5min,
+        LAG(t.vol_ma_15min) OVER (PARTITION BY t.strike_price, t.option_type ORDER BY t.time_window) AS prev_vol_ma_15min,
+        -- Get opposite option data
+        p.total_volume as opposite_volume,
+        p.total_oi as opposite_oi,
+        p.ltp as opposite_ltp,
+        p.iv as opposite_iv,
+        p.ma_5min as opposite_ma_5min,
+        p.ma_15min as opposite_ma_15min,
+        p.ma_30min as opposite_ma_30min,
+        p.vol_ma_5min as opposite_vol_ma_5min,
+        p.vol_ma_15min as opposite_vol_ma_15min
+    FROM top_options t
+    LEFT JOIN top_options p ON 
+        t.time_window = p.time_window 
+        AND t.strike_price = p.strike_price 
+        AND t.option_type != p.option_type
+),
+option_analysis AS (
+    SELECT 
+        *,
+        CASE
+            WHEN option_type = 'CE' AND opposite_oi > 0 AND opposite_ltp > 0 AND opposite_iv > 0 THEN
+                CASE
+                    WHEN total_oi > opposite_oi * 1.5 AND total_volume > opposite_volume * 1.5 
+                         AND ltp > opposite_ltp * 1.2 AND iv > opposite_iv * 1.1
+                    THEN 'Strong CE Dominance'
+                    WHEN total_oi < opposite_oi * 0.7 AND total_volume < opposite_volume * 0.7 
+                         AND ltp < opposite_ltp * 0.8 AND iv < opposite_iv * 0.9
+                    THEN 'Strong PE Dominance'
+                    WHEN ABS(total_oi - opposite_oi) / opposite_oi < 0.2 
+                         AND ABS(total_volume - opposite_volume) / opposite_volume < 0.2
+                    THEN 'Neutral - Both Options Balanced'
+                    ELSE 'Mixed Signals'
+                END
+            WHEN option_type = 'PE' AND opposite_oi > 0 AND opposite_ltp > 0 AND opposite_iv > 0 THEN
+                CASE
+                    WHEN total_oi > opposite_oi * 1.5 AND total_volume > opposite_volume * 1.5 
+                         AND ltp > opposite_ltp * 1.2 AND iv > opposite_iv * 1.1
+                    THEN 'Strong PE Dominance'
+                    WHEN total_oi < opposite_oi * 0.7 AND total_volume < opposite_volume * 0.7 
+                         AND ltp < opposite_ltp * 0.8 AND iv < opposite_iv * 0.9
+                    THEN 'Strong CE Dominance'
+                    WHEN ABS(total_oi - opposite_oi) / opposite_oi < 0.2 
+                         AND ABS(total_volume - opposite_volume) / opposite_volume < 0.2
+                    THEN 'Neutral - Both Options Balanced'
+                    ELSE 'Mixed Signals'
+                END
+            ELSE 'Insufficient Opposite Data'
+        END as option_dominance
+    FROM option_with_lag
+)
+SELECT 
+    time_window,
+    option_type,
+    strike_price,
+    total_volume,
+    prev_volume,
+    ROUND(
+        CASE 
+            WHEN prev_volume > 0 THEN 100.0 * (total_volume - prev_volume) / prev_volume 
+            ELSE NULL 
+        END, 2
+    ) AS volume_pct_change,
+    total_oi,
+    prev_oi,
+    ROUND(
+        CASE 
+            WHEN prev_oi > 0 THEN 100.0 * (total_oi - prev_oi) / prev_oi 
+            ELSE NULL 
+        END, 2
+    ) AS oi_pct_change,
+    ltp,
+    prev_ltp,
+    ROUND(
+        CASE 
+            WHEN prev_ltp > 0 THEN 100.0 * (ltp - prev_ltp) / prev_ltp 
+            ELSE NULL 
+        END, 2
+    ) AS ltp_pct_change,
+    iv,
+    prev_iv,
+    ROUND(
+        CASE 
+            WHEN prev_iv > 0 THEN 100.0 * (iv - prev_iv) / prev_iv 
+            ELSE NULL 
+        END, 2
+    ) AS iv_pct_change,
+    -- Opposite option data
+    opposite_volume,
+    opposite_oi,
+    opposite_ltp,
+    opposite_iv,
+    option_dominance,
+    CASE
+        WHEN prev_volume IS NOT NULL THEN
+            CASE
+                -- CALL Unwinding Signal
+                WHEN option_type = 'CE' 
+                     AND prev_ltp > 0 AND prev_oi > 0
+                     AND 100.0 * (ltp - prev_ltp) / prev_ltp < -1
+                     AND 100.0 * (total_oi - prev_oi) / prev_oi < -1
+                THEN 'CALL Unwinding'
+                
+                -- PUT Unwinding Signal
+                WHEN option_type = 'PE' 
+                     AND prev_ltp > 0 AND prev_oi > 0
+                     AND 100.0 * (ltp - prev_ltp) / prev_ltp < -1
+                     AND 100.0 * (total_oi - prev_oi) / prev_oi < -1
+                THEN 'PUT Unwinding'
+                
+                -- Strong Buy CE Signal with Sustainability Check
+                WHEN option_type = 'CE' 
+                     AND prev_ltp > 0 AND prev_oi > 0
+                     -- Current period increase
+                     AND 100.0 * (ltp - prev_ltp) / prev_ltp > 15
+                     AND 100.0 * (total_oi - prev_oi) / prev_oi > 15
+                     -- Sustainability check over 5 minutes
+                     AND ma_5min > prev_ma_5min * 1.1
+                     -- Volume confirmation
+                     AND vol_ma_5min > prev_vol_ma_5min * 1.2
+                     -- Trend confirmation (15 min)
+                     AND ma_15min > prev_ma_15min * 1.05
+                THEN 'STRONG BUY CE'
+                
+                -- Strong Buy PE Signal with Sustainability Check
+                WHEN option_type = 'PE' 
+                     AND prev_ltp > 0 AND prev_oi > 0
+                     -- Current period increase
+                     AND 100.0 * (ltp - prev_ltp) / prev_ltp > 15
+                     AND 100.0 * (total_oi - prev_oi) / prev_oi > 15
+                     -- Sustainability check over 5 minutes
+                     AND ma_5min > prev_ma_5min * 1.1
+                     -- Volume confirmation
+                     AND vol_ma_5min > prev_vol_ma_5min * 1.2
+                     -- Trend confirmation (15 min)
+                     AND ma_15min > prev_ma_15min * 1.05
+                THEN 'STRONG BUY PE'
+                
+                ELSE 'No Clear Signal'
+            END
+        ELSE 'Insufficient data'
+    END AS signal,
+    CASE
+        -- CALL Unwinding Action
+        WHEN option_type = 'CE' 
+             AND prev_ltp > 0 AND prev_oi > 0
+             AND 100.0 * (ltp - prev_ltp) / prev_ltp < -1
+             AND 100.0 * (total_oi - prev_oi) / prev_oi < -1
+        THEN 'BUY PE - Unwinding Signal'
+        
+        -- PUT Unwinding Action (Buy CE)
+        WHEN option_type = 'PE' 
+             AND prev_ltp > 0 AND prev_oi > 0
+             AND 100.0 * (ltp - prev_ltp) / prev_ltp < -1
+             AND 100.0 * (total_oi - prev_oi) / prev_oi < -1
+        THEN 'BUY CE - PUT Unwinding'
+        
+        -- Strong Buy CE Action
+        WHEN option_type = 'CE' 
+             AND prev_ltp > 0 AND prev_oi > 0
+             AND 100.0 * (ltp - prev_ltp) / prev_ltp > 15
+             AND 100.0 * (total_oi - prev_oi) / prev_oi > 15
+        THEN 'STRONG BUY CE'
+        
+        -- Strong Buy PE Action
+        WHEN option_type = 'PE' 
+             AND prev_ltp > 0 AND prev_oi > 0
+             AND 100.0 * (ltp - prev_ltp) / prev_ltp > 15
+             AND 100.0 * (total_oi - prev_oi) / prev_oi > 15
+        THEN 'STRONG BUY PE'
+        
+        ELSE 'No Clear Action'
+    END AS action
+FROM option_analysis
+ORDER BY time_window, option_type, volume_pct_change DESC;
+"""
+
+# Add new SQL query for IV analysis
+IV_ANALYSIS_QUERY = """
+WITH top_strikes AS (
+    SELECT 
+        strike_price,
+        option_type,
+        SUM(volume) as total_volume
+    FROM nifty_option_chain_data
+    WHERE date_time LIKE :day
+    GROUP BY strike_price, option_type
+    ORDER BY total_volume DESC
+    LIMIT 16  -- 8 for CE and 8 for PE
+),
+iv_data AS (
+    SELECT 
+        strftime('%H:%M', date_time) as time_window,
+        i.strike_price,
+        i.option_type,
+        AVG(i.iv) as avg_iv,
+        AVG(i.ltp) as avg_ltp,
+        SUM(i.volume) as total_volume,
+        SUM(i.open_interest) as total_oi,
+        COUNT(*) as data_points,
+        -- Calculate IV moving averages
+        AVG(AVG(i.iv)) OVER (
+            PARTITION BY i.strike_price, i.option_type 
+            ORDER BY strftime('%H:%M', i.date_time) 
+            ROWS BETWEEN 2 PRECEDING AND CURRENT ROW
+        ) as iv_ma_5min,
+        AVG(AVG(i.iv)) OVER (
+            PARTITION BY i.strike_price, i.option_type 
+            ORDER BY strftime('%H:%M', i.date_time) 
+            ROWS BETWEEN 5 PRECEDING AND CURRENT ROW
+        ) as iv_ma_15min,
+        -- Calculate volume moving averages
+        AVG(SUM(i.volume)) OVER (
+            PARTITION BY i.strike_price, i.option_type 
+            ORDER BY strftime('%H:%M', i.date_time) 
+            ROWS BETWEEN 2 PRECEDING AND CURRENT ROW
+        ) as vol_ma_5min,
+        AVG(SUM(i.volume)) OVER (
+            PARTITION BY i.strike_price, i.option_type 
+            ORDER BY strftime('%H:%M', i.date_time) 
+            ROWS BETWEEN 5 PRECEDING AND CURRENT ROW
+        ) as vol_ma_15min,
+        -- Calculate OI moving averages
+        AVG(SUM(i.open_interest)) OVER (
+            PARTITION BY i.strike_price, i.option_type 
+            ORDER BY strftime('%H:%M', i.date_time) 
+            ROWS BETWEEN 2 PRECEDING AND CURRENT ROW
+        ) as oi_ma_5min,
+        AVG(SUM(i.open_interest)) OVER (
+            PARTITION BY i.strike_price, i.option_type 
+            ORDER BY strftime('%H:%M', i.date_time) 
+            ROWS BETWEEN 5 PRECEDING AND CURRENT ROW
+        ) as oi_ma_15min,
+        -- Calculate IV percentiles
+        PERCENT_RANK() OVER (
+            PARTITION BY strftime('%H:%M', i.date_time)
+            ORDER BY i.iv
+        ) as iv_percentile,
+        -- Calculate volume percentiles
+        PERCENT_RANK() OVER (
+            PARTITION BY strftime('%H:%M', i.date_time)
+            ORDER BY SUM(i.volume)
+        ) as volume_percentile,
+        -- Calculate OI percentiles
+        PERCENT_RANK() OVER (
+            PARTITION BY strftime('%H:%M', i.date_time)
+            ORDER BY SUM(i.open_interest)
+        ) as oi_percentile,
+        -- Calculate previous values
+        LAG(AVG(i.iv)) OVER (
+            PARTITION BY i.strike_price, i.option_type 
+            ORDER BY strftime('%H:%M', i.date_time)
+        ) as prev_iv,
+        LAG(AVG(i.ltp)) OVER (
+            PARTITION BY i.strike_price, i.option_type 
+            ORDER BY strftime('%H:%M', i.date_time)
+        ) as prev_ltp,
+        LAG(SUM(i.volume)) OVER (
+            PARTITION BY i.strike_price, i.option_type 
+            ORDER BY strftime('%H:%M', i.date_time)
+        ) as prev_volume,
+        LAG(SUM(i.open_interest)) OVER (
+            PARTITION BY i.strike_price, i.option_type 
+            ORDER BY strftime('%H:%M', i.date_time)
+        ) as prev_oi
+    FROM nifty_option_chain_data i
+    INNER JOIN top_strikes ts 
+        ON i.strike_price = ts.strike_price 
+        AND i.option_type = ts.option_type
+    WHERE i.date_time LIKE :day
+    AND i.expiry_date = (
+        SELECT expiry_date 
+        FROM nifty_option_chain_data 
+        WHERE date_time LIKE :day
+        ORDER BY expiry_date 
+        LIMIT 1
+    )
+    GROUP BY time_window, i.strike_price, i.option_type
+),
+iv_with_changes AS (
+    SELECT 
+        *,
+        CASE
+            WHEN prev_iv > 0 THEN
+                ROUND(100.0 * (avg_iv - prev_iv) / prev_iv, 2)
+            ELSE NULL
+        END as iv_pct_change,
+        CASE
+            WHEN prev_volume > 0 THEN
+                ROUND(100.0 * (total_volume - prev_volume) / prev_volume, 2)
+            ELSE NULL
+        END as volume_pct_change,
+        CASE
+            WHEN prev_oi > 0 THEN
+                ROUND(100.0 * (total_oi - prev_oi) / prev_oi, 2)
+            ELSE NULL
+        END as oi_pct_change
+    FROM iv_data
+),
+iv_analysis AS (
+    SELECT 
+        *,
+        CASE
+            WHEN iv_pct_change > 15 THEN 'High IV Spike'
+            WHEN iv_pct_change < -15 THEN 'Low IV Spike'
+            WHEN iv_percentile > 0.8 THEN 'High IV Percentile'
+            WHEN iv_percentile < 0.2 THEN 'Low IV Percentile'
+            ELSE 'Normal IV'
+        END as iv_signal,
+        CASE
+            WHEN avg_ltp > prev_ltp AND iv_pct_change < 0 THEN 'Price Up IV Down'
+            WHEN avg_ltp > prev_ltp AND iv_pct_change > 0 THEN 'Price Up IV Up'
+            WHEN avg_ltp < prev_ltp AND iv_pct_change < 0 THEN 'Price Down IV Down'
+            WHEN avg_ltp < prev_ltp AND iv_pct_change > 0 THEN 'Price Down IV Up'
+            ELSE 'Neutral'
+        END as price_iv_relationship,
+        CASE
+            WHEN option_type = 'CE' AND avg_ltp > prev_ltp AND iv_pct_change > 0 AND oi_pct_change < 0 THEN 'Potential Short Covering'
+            WHEN option_type = 'CE' AND avg_ltp > prev_ltp AND iv_pct_change > 0 AND oi_pct_change > 0 THEN 'Possible Hedging'
+            WHEN option_type = 'CE' AND avg_ltp > prev_ltp AND iv_pct_change > 15 AND volume_pct_change > 100 THEN 'Smart Money Activity'
+            WHEN option_type = 'CE' AND avg_ltp > prev_ltp AND iv_pct_change > 0 AND volume_percentile > 0.8 THEN 'Failed Breakout Risk'
+            ELSE 'Normal Activity'
+        END as market_behavior
+    FROM iv_with_changes
+)
+SELECT 
+    time_window,
+    option_type,
+    strike_price,
+    ROUND(avg_iv, 2) as iv,
+    ROUND(iv_pct_change, 2) as iv_change_pct,
+    ROUND(iv_percentile * 100, 2) as iv_percentile,
+    ROUND(avg_ltp, 2) as ltp,
+    total_volume,
+    total_oi,
+    ROUND(volume_pct_change, 2) as volume_change_pct,
+    ROUND(oi_pct_change, 2) as oi_change_pct,
+    iv_signal,
+    price_iv_relationship,
+    market_behavior,
+    CASE
+        WHEN market_behavior = 'Potential Short Covering' THEN 'Watch for Reversal - Bears Closing Positions'
+        WHEN market_behavior = 'Possible Hedging' THEN 'Institutional Activity - Not Necessarily Bullish'
+        WHEN market_behavior = 'Smart Money Activity' THEN 'High Risk - Possible Fake Rally'
+        WHEN market_behavior = 'Failed Breakout Risk' THEN 'Caution - Market May Reject Level'
+        WHEN iv_signal = 'High IV Spike' AND price_iv_relationship IN ('Price Down IV Up', 'Price Up IV Up') 
+        THEN 'Strong Reversal Signal'
+        WHEN iv_signal = 'Low IV Spike' AND price_iv_relationship IN ('Price Down IV Down', 'Price Up IV Down')
+        THEN 'Potential Continuation'
+        WHEN iv_percentile > 80 AND iv_pct_change > 0
+        THEN 'High IV - Consider Selling'
+        WHEN iv_percentile < 20 AND iv_pct_change < 0
+        THEN 'Low IV - Consider Buying'
+        ELSE 'Monitor'
+    END as trading_signal
+FROM iv_analysis
+ORDER BY time_window, option_type, strike_price;
+"""
+
+# Add new SQL query for volume analysis
+VOLUME_ANALYSIS_QUERY = """
+WITH top_strikes AS (
+    SELECT 
+        strike_price,
+        option_type,
+        SUM(volume) as total_volume
+    FROM nifty_option_chain_data
+    WHERE date_time LIKE :day
+    GROUP BY strike_price, option_type
+    ORDER BY total_volume DESC
+    LIMIT 16  -- 8 for CE and 8 for PE
+),
+volume_data AS (
+    SELECT 
+        strftime('%H:%M', date_time) as time_window,
+        v.strike_price,
+        v.option_type,
+        SUM(v.volume) as total_volume,
+        SUM(v.open_interest) as total_oi,
+        AVG(v.ltp) as avg_ltp,
+        COUNT(*) as data_points,
+        -- Calculate volume moving averages
+        AVG(SUM(v.volume)) OVER (
+            PARTITION BY v.strike_price, v.option_type 
+            ORDER BY strftime('%H:%M', v.date_time) 
+            ROWS BETWEEN 2 PRECEDING AND CURRENT ROW
+        ) as vol_ma_5min,
+        AVG(SUM(v.volume)) OVER (
+            PARTITION BY v.strike_price, v.option_type 
+            ORDER BY strftime('%H:%M', v.date_time) 
+            ROWS BETWEEN 5 PRECEDING AND CURRENT ROW
+        ) as vol_ma_15min,
+        -- Calculate OI moving averages
+        AVG(SUM(v.open_interest)) OVER (
+            PARTITION BY v.strike_price, v.option_type 
+            ORDER BY strftime('%H:%M', v.date_time) 
+            ROWS BETWEEN 2 PRECEDING AND CURRENT ROW
+        ) as oi_ma_5min,
+        AVG(SUM(v.open_interest)) OVER (
+            PARTITION BY v.strike_price, v.option_type 
+            ORDER BY strftime('%H:%M', v.date_time) 
+            ROWS BETWEEN 5 PRECEDING AND CURRENT ROW
+        ) as oi_ma_15min,
+        -- Calculate volume percentiles
+        PERCENT_RANK() OVER (
+            PARTITION BY strftime('%H:%M', v.date_time)
+            ORDER BY SUM(v.volume)
+        ) as volume_percentile,
+        -- Calculate OI percentiles
+        PERCENT_RANK() OVER (
+            PARTITION BY strftime('%H:%M', v.date_time)
+            ORDER BY SUM(v.open_interest)
+        ) as oi_percentile,
+        -- Calculate previous values
+        LAG(SUM(v.volume)) OVER (
+            PARTITION BY v.strike_price, v.option_type 
+            ORDER BY strftime('%H:%M', v.date_time)
+        ) as prev_volume,
+        LAG(SUM(v.open_interest)) OVER (
+            PARTITION BY v.strike_price, v.option_type 
+            ORDER BY strftime('%H:%M', v.date_time)
+        ) as prev_oi
+    FROM nifty_option_chain_data v
+    INNER JOIN top_strikes ts 
+        ON v.strike_price = ts.strike_price 
+        AND v.option_type = ts.option_type
+    WHERE v.date_time LIKE :day
+    AND v.expiry_date = (
+        SELECT expiry_date 
+        FROM nifty_option_chain_data 
+        WHERE date_time LIKE :day
+        ORDER BY expiry_date 
+        LIMIT 1
+    )
+    GROUP BY time_window, v.strike_price, v.option_type
+),
+volume_with_changes AS (
+    SELECT 
+        *,
+        CASE
+            WHEN prev_volume > 0 THEN
+                ROUND(100.0 * (total_volume - prev_volume) / prev_volume, 2)
+            ELSE NULL
+        END as volume_pct_change,
+        CASE
+            WHEN prev_oi > 0 THEN
+                ROUND(100.0 * (total_oi - prev_oi) / prev_oi, 2)
+            ELSE NULL
+        END as oi_pct_change
+    FROM volume_data
+),
+volume_analysis AS (
+    SELECT 
+        *,
+        CASE
+            WHEN volume_pct_change > 100 AND oi_pct_change > 10 THEN 'New Position Building'
+            WHEN volume_pct_change > 100 AND oi_pct_change < -10 THEN 'Position Squaring Off'
+            WHEN volume_pct_change > 100 AND ABS(oi_pct_change) <= 10 THEN 'High Volume - Neutral OI'
+            WHEN volume_percentile > 0.8 THEN 'Unusually High Volume'
+            WHEN volume_percentile < 0.2 THEN 'Unusually Low Volume'
+            ELSE 'Normal Volume'
+        END as volume_signal,
+        CASE
+            WHEN oi_pct_change > 20 THEN 'Strong OI Build-up'
+            WHEN oi_pct_change < -20 THEN 'Strong OI Unwinding'
+            WHEN oi_pct_change > 10 THEN 'Moderate OI Build-up'
+            WHEN oi_pct_change < -10 THEN 'Moderate OI Unwinding'
+            ELSE 'Neutral OI'
+        END as oi_signal
+    FROM volume_with_changes
+)
+SELECT 
+    time_window,
+    option_type,
+    strike_price,
+    total_volume,
+    volume_pct_change,
+    ROUND(volume_percentile * 100, 2) as volume_percentile,
+    total_oi,
+    oi_pct_change,
+    ROUND(oi_percentile * 100, 2) as oi_percentile,
+    ROUND(avg_ltp, 2) as ltp,
+    volume_signal,
+    oi_signal,
+    CASE
+        WHEN volume_signal = 'New Position Building' AND oi_signal IN ('Strong OI Build-up', 'Moderate OI Build-up')
+        THEN 'Strong Buy Signal'
+        WHEN volume_signal = 'Position Squaring Off' AND oi_signal IN ('Strong OI Unwinding', 'Moderate OI Unwinding')
+        THEN 'Strong Sell Signal'
+        WHEN volume_signal = 'Unusually High Volume' AND oi_pct_change > 0
+        THEN 'Potential Breakout'
+        WHEN volume_signal = 'Unusually Low Volume' AND oi_pct_change < 0
+        THEN 'Potential Reversal'
+        ELSE 'Monitor'
+    END as trading_signal
+FROM volume_analysis
+ORDER BY time_window, option_type, strike_price;
+"""
@@ -0,0 +1,277 @@
+"""Cached index bars and realized volatility estimators.
+
+``historic voltality nifty.py`` used to download 90 days of ^NSEI from
+yfinance on every launch.  ``BarCache`` keeps daily and intraday bars in the
+option database instead and only fetches what is missing.  Bars can come
+from yfinance or be built from our own stored ``underlying_value``
+snapshots, so HV against IV also works offline.
+
+Each bar is stored with the log terms the estimators need (which only
+depend on the bar and the previous close), so an estimate is a rolling mean
+over stored columns and appending a bar never recomputes older ones:
+
+    close_to_close  sample std of ln(C / C_prev)
+    parkinson       high/low range, sigma^2 = mean(ln(H/L)^2) / (4 ln 2)
+    garman_klass    range plus open-to-close drift
+    yang_zhang      overnight + open-to-close + Rogers-Satchell, drift and gap
+                    robust
+
+    cache = BarCache(connect())
+    cache.update_yfinance('^NSEI', '1d')
+    cache.update_from_snapshots(conn)          # symbol 'NIFTY', from the chain
+    realized_vol(cache.bars('NIFTY', '1d'), window=21)
+"""
+import argparse
+import math
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from nse_collector import DB_PATH, connect
+
+YF_SYMBOL = '^NSEI'
+SNAPSHOT_SYMBOL = 'NIFTY'
+TRADING_DAYS = 252
+# NSE cash session, used to annualize intraday bars
+SESSION_MINUTES = 375
+HV_WINDOW = 21
+# yfinance only serves this much intraday history
+YF_INTRADAY_DAYS = 59
+YF_DAILY_DAYS = 90
+# Snapshot bar intervals and their pandas resample arguments.  Hourly bars
+# start at the 09:15 open; no 5m bars, since with 5-minute snapshots each
+# would be a single price (O=H=L=C) and the range estimators would read 0.
+SNAPSHOT_INTERVALS = {
+    '1d': {'rule': '1D'},
+    '1h': {'rule': '60min', 'offset': '15min'},
+    '15m': {'rule': '15min'},
+}
+YF_INTERVALS = ('1d', '1h', '15m', '5m')
+ESTIMATORS = ('close_to_close', 'parkinson', 'garman_klass', 'yang_zhang')
+BAR_COLUMNS = ('ts', 'open', 'high', 'low', 'close', 'overnight', 'open_close', 'close_close', 'hl2', 'rs')
+
+
+def setup_bar_table(conn):
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS index_bars (
+        symbol TEXT,
+        interval TEXT,
+        ts TEXT,
+        open REAL,
+        high REAL,
+        low REAL,
+        close REAL,
+        overnight REAL,
+        open_close REAL,
+        close_close REAL,
+        hl2 REAL,
+        rs REAL,
+        PRIMARY KEY (symbol, interval, ts)
+    )
+    ''')
+    conn.commit()
+
+
+def bar_terms(bars, prev_close=None):
+    """Per-bar log terms of OHLC ``bars``; ``prev_close`` is the close before the first bar"""
+    o, h, l, c = (bars[col].to_numpy(dtype=float) for col in ('open', 'high', 'low', 'close'))
+    prev = np.concatenate([[np.nan if prev_close is None else prev_close], c[:-1]])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        hl = np.log(h / l)
+        return bars.assign(
+            overnight=np.log(o / prev),
+            open_close=np.log(c / o),
+            close_close=np.log(c / prev),
+            hl2=hl * hl,
+            rs=np.log(h / c) * np.log(h / o) + np.log(l / c) * np.log(l / o),
+        )
+
+
+def periods_per_year(interval):
+    if interval.endswith('d'):
+        return TRADING_DAYS
+    minutes = int(interval[:-1]) * (60 if interval.endswith('h') else 1)
+    return TRADING_DAYS * SESSION_MINUTES / minutes
+
+
+def realized_vol(bars, window=HV_WINDOW, interval='1d'):
+    """Annualized rolling volatility by each estimator, from ``bar_terms`` columns"""
+    scale = math.sqrt(periods_per_year(interval))
+    roll = bars[['overnight', 'open_close', 'close_close', 'hl2', 'rs']].rolling(window, min_periods=window)
+    mean = roll.mean()
+    var = roll.var()
+    oc2 = bars['open_close'] ** 2
+    gk = 0.5 * bars['hl2'] - (2 * math.log(2) - 1) * oc2
+    k = 0.34 / (1.34 + (window + 1) / (window - 1))
+    yang_zhang = var['overnight'] + k * var['open_close'] + (1 - k) * mean['rs']
+    out = pd.DataFrame({
+        'close_to_close': np.sqrt(var['close_close']),
+        'parkinson': np.sqrt(mean['hl2'] / (4 * math.log(2))),
+        'garman_klass': np.sqrt(gk.rolling(window, min_periods=window).mean().clip(lower=0)),
+        'yang_zhang': np.sqrt(yang_zhang.clip(lower=0)),
+    }, index=bars.index)
+    return out * scale
+
+
+class BarCache:
+    """OHLC bars per (symbol, interval) in ``index_bars``, appended only when missing"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        setup_bar_table(conn)
+
+    def last_bar(self, symbol, interval):
+        return self.conn.execute("""
+            SELECT ts, close FROM index_bars WHERE symbol = ? AND interval = ?
+            ORDER BY ts DESC LIMIT 1
+        """, (symbol, interval)).fetchone()
+
+    def bars(self, symbol, interval, start=None, end=None):
+        df = pd.read_sql_query(f"""
+            SELECT {', '.join(BAR_COLUMNS)} FROM index_bars
+            WHERE symbol = :symbol AND interval = :interval AND ts >= :start AND ts <= :end
+            ORDER BY ts
+        """, self.conn, params={'symbol': symbol, 'interval': interval,
+                                'start': start or '', 'end': f"{end}~" if end else '~'})
+        df.index = pd.to_datetime(df.pop('ts'))
+        return df
+
+    def append(self, symbol, interval, bars, replace_last=False):
+        """Store OHLC ``bars`` (DatetimeIndex) newer than the last stored bar.
+
+        ``replace_last`` also rewrites the last stored bar when it is in
+        ``bars`` again (today's bar while the session is still open).
+        """
+        last = self.last_bar(symbol, interval)
+        bars = bars.dropna(subset=['open', 'high', 'low', 'close'])
+        if last is not None:
+            ts = bars.index.strftime('%Y-%m-%d %H:%M:%S')
+            bars = bars[ts >= last[0]] if replace_last else bars[ts > last[0]]
+            if replace_last and len(bars) and bars.index[0].strftime('%Y-%m-%d %H:%M:%S') == last[0]:
+                prev = self.conn.execute("""
+                    SELECT close FROM index_bars WHERE symbol = ? AND interval = ? AND ts < ?
+                    ORDER BY ts DESC LIMIT 1
+                """, (symbol, interval, last[0])).fetchone()
+                last = prev and (None, prev[0])
+        if bars.empty:
+            return 0
+        terms = bar_terms(bars, last[1] if last else None)
+        rows = [(symbol, interval, ts.strftime('%Y-%m-%d %H:%M:%S'), *(None if pd.isna(v) else float(v) for v in values))
+                for ts, values in zip(terms.index, terms[list(BAR_COLUMNS[1:])].to_numpy())]
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO index_bars VALUES ({', '.join('?' * (len(BAR_COLUMNS) + 2))})", rows)
+        return len(rows)
+
+    def update_yfinance(self, symbol=YF_SYMBOL, interval='1d', days=None):
+        """Fetch from yfinance only the bars after the last stored one"""
+        try:
+            import yfinance as yf
+        except ImportError:
+            print("yfinance is not installed - using cached bars only")
+            return 0
+        last = self.last_bar(symbol, interval)
+        days = days or (YF_DAILY_DAYS if interval.endswith('d') else YF_INTRADAY_DAYS)
+        start = datetime.now() - timedelta(days=days)
+        if last is not None:
+            start = max(start, datetime.strptime(last[0][:10], '%Y-%m-%d'))
+        try:
+            history = yf.Ticker(symbol).history(start=start, interval=interval)
+        except Exception as e:
+            print(f"Error fetching {symbol} {interval} bars: {e}")
+            return 0
+        if history.empty:
+            return 0
+        history.index = history.index.tz_localize(None)
+        history = history.rename(columns=str.lower)[['open', 'high', 'low', 'close']]
+        added = self.append(symbol, interval, history, replace_last=True)
+        print(f"{symbol} {interval}: {added} bars fetched")
+        return added
+
+    def update_from_snapshots(self, source, interval='1d', symbol=SNAPSHOT_SYMBOL):
+        """Build bars from stored ``underlying_value`` snapshots in ``source`` (a connection)"""
+        last = self.last_bar(symbol, interval)
+        # Rebuild from the start of the last bar's day, which may have been partial
+        after = last[0][:10] if last else ''
+        spot = snapshot_spot(source, after)
+        if spot.empty:
+            return 0
+        bars = spot.resample(**SNAPSHOT_INTERVALS[interval]).ohlc().dropna()
+        return self.append(symbol, interval, bars, replace_last=True)
+
+
+def snapshot_spot(conn, after=''):
+    """Spot per stored snapshot from ``after`` on, as a time-indexed Series"""
+    query = """
+        SELECT date_time, underlying_value FROM snapshot_metrics
+        WHERE date_time >= ? AND underlying_value > 0 ORDER BY date_time
+    """
+    df = pd.read_sql_query(query, conn, params=(after,))
+    if df.empty:
+        # Databases written before snapshot_metrics existed
+        df = pd.read_sql_query("""
+            SELECT date_time, MAX(underlying_value) AS underlying_value FROM nifty_option_chain_data
+            WHERE date_time >= ? AND underlying_value > 0 GROUP BY date_time ORDER BY date_time
+        """, conn, params=(after,))
+    return pd.Series(df['underlying_value'].to_numpy(), index=pd.to_datetime(df['date_time']), name='spot')
+
+
+def atm_iv(conn, start=''):
+    """Average CE/PE IV at the strike nearest spot, at each day's last snapshot"""
+    df = pd.read_sql_query("""
+        WITH last AS (
+            SELECT MAX(date_time) AS date_time FROM nifty_option_chain_data
+            WHERE date_time >= ? GROUP BY substr(date_time, 1, 10)
+        )
+        SELECT c.date_time, c.strike_price, c.iv, c.underlying_value, c.expiry_date
+        FROM nifty_option_chain_data c JOIN last USING (date_time)
+        WHERE c.iv > 0
+    """, conn, params=(start,))
+    if df.empty:
+        return pd.Series(dtype=float, name='atm_iv')
+    df['distance'] = (df['strike_price'] - df['underlying_value']).abs()
+    nearest = df[df['distance'] == df.groupby('date_time')['distance'].transform('min')]
+    iv = nearest.groupby('date_time')['iv'].mean() / 100
+    iv.index = pd.to_datetime(iv.index).normalize()
+    return iv.rename('atm_iv')
+
+
+def hv_vs_iv(cache, conn, symbol=SNAPSHOT_SYMBOL, window=HV_WINDOW):
+    """Daily realized volatility next to ATM IV, both annualized fractions"""
+    hv = realized_vol(cache.bars(symbol, '1d'), window)
+    hv.index = hv.index.normalize()
+    return hv.join(atm_iv(conn), how='left')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cached index bars and realized volatility")
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--interval', default='1d', choices=YF_INTERVALS,
+                        help=f"Snapshot source: {', '.join(SNAPSHOT_INTERVALS)} only")
+    parser.add_argument('--window', type=int, default=HV_WINDOW, help="Bars per estimate")
+    parser.add_argument('--source', choices=('snapshots', 'yfinance'), default='snapshots')
+    args = parser.parse_args(argv)
+    if args.source == 'snapshots' and args.interval not in SNAPSHOT_INTERVALS:
+        parser.error(f"--interval {args.interval} needs --source yfinance")
+
+    conn = connect(args.db)
+    try:
+        cache = BarCache(conn)
+        if args.source == 'yfinance':
+            symbol = YF_SYMBOL
+            cache.update_yfinance(symbol, args.interval)
+        else:
+            symbol = SNAPSHOT_SYMBOL
+            cache.update_from_snapshots(conn, args.interval)
+        if args.source == 'snapshots' and args.interval == '1d':
+            table = hv_vs_iv(cache, conn, symbol, args.window)
+        else:
+            table = realized_vol(cache.bars(symbol, args.interval), args.window, args.interval)
+        print((table.dropna(how='all') * 100).round(2).tail(20).to_string())
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
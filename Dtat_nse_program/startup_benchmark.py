@@ -0,0 +1,103 @@
+"""Startup import benchmark for the dashboard entry points.
+
+Runs a dashboard script's module level (imports and constants, not the
+``__main__`` block) in a fresh interpreter under ``python -X importtime``
+and reports the total import time, the slowest modules and any heavy module
+that was imported eagerly instead of on first use.
+
+    python startup_benchmark.py                    # NIFTY 25022025.py
+    python startup_benchmark.py nse_data_06-06-2025.py --top 15
+    python startup_benchmark.py --budget 0.5      # exit 1 if slower
+
+Run it on a desk machine after changing imports; the first window should
+be up well under a second, and most of that is Tk and ttkbootstrap.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SCRIPT = os.path.join(os.path.dirname(HERE), 'NIFTY 25022025.py')
+
+# These must only be imported on first use (see lazy_modules.py)
+DEFERRED_MODULES = ['pandas', 'matplotlib', 'matplotlib.pyplot', 'scipy',
+                    'scipy.stats', 'scipy.optimize', 'aiohttp', 'live_chart']
+
+CHILD_CODE = """
+import runpy, sys, time
+sys.path.insert(0, {here!r})
+t0 = time.perf_counter()
+runpy.run_path({script!r}, run_name='startup_benchmark')
+print('WALL %.6f' % (time.perf_counter() - t0))
+"""
+
+
+def parse_importtime(stderr):
+    """Return ``{module: (self_us, cumulative_us)}`` from -X importtime output"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+            modules[name.strip()] = (int(self_us), int(cumulative_us))
+        except ValueError:
+            continue
+    return modules
+
+
+def run_benchmark(script):
+    """Import ``script`` in a child interpreter; return (wall seconds, modules)"""
+    code = CHILD_CODE.format(here=HERE, script=os.path.abspath(script))
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            capture_output=True, text=True, cwd=HERE)
+    if result.returncode != 0:
+        # Import errors end up in stderr after the importtime lines
+        tail = [l for l in result.stderr.splitlines() if not l.startswith('import time:')]
+        raise RuntimeError("\n".join(tail[-10:]))
+    wall = None
+    for line in result.stdout.splitlines():
+        if line.startswith('WALL '):
+            wall = float(line.split()[1])
+    return wall, parse_importtime(result.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure dashboard startup imports")
+    parser.add_argument('script', nargs='?', default=DEFAULT_SCRIPT)
+    parser.add_argument('--top', type=int, default=10, help="slowest modules to list")
+    parser.add_argument('--budget', type=float, default=1.0, help="seconds allowed for imports")
+    args = parser.parse_args(argv)
+
+    try:
+        wall, modules = run_benchmark(args.script)
+    except RuntimeError as e:
+        print(f"Could not import {args.script}:\n{e}")
+        return 2
+
+    # Self times add up to the total without counting nested imports twice
+    total_us = sum(modules[name][0] for name in modules)
+    print(f"Script: {os.path.basename(args.script)}")
+    print(f"Module-level wall time: {wall:.3f}s, {len(modules)} modules, "
+          f"{total_us / 1e6:.3f}s importing")
+
+    print(f"\nSlowest {args.top} imports (cumulative):")
+    slowest = sorted(modules.items(), key=lambda item: item[1][1], reverse=True)
+    for name, (self_us, cumulative_us) in slowest[:args.top]:
+        print(f"  {cumulative_us / 1000:9.1f} ms  {name}")
+
+    eager = [name for name in DEFERRED_MODULES if name in modules]
+    if eager:
+        print(f"\nImported eagerly (should be deferred): {', '.join(eager)}")
+    else:
+        print("\nNo deferred module was imported at startup")
+
+    if wall > args.budget:
+        print(f"\nOver budget: {wall:.3f}s > {args.budget:.3f}s")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
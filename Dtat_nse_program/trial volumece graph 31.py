@@ -6,8 +6,7 @@ import json
 import sqlite3
 from datetime import datetime, timedelta
 import platform
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from live_chart import LiveChart
 
 
 class CustomTreeview(ttk.Treeview):
@@ -201,9 +200,12 @@ class NiftyApp:
         self.plot_frame = ttk.Frame(main_container)
         self.plot_frame.place(x=50, y=100, width=600, height=600)
 
-        # Create a canvas for the plots
-        self.canvas = FigureCanvasTkAgg(plt.figure(), master=self.plot_frame)
-        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        # Persistent volume chart; each cycle appends one point per series
+        self.volume_chart = LiveChart(self.plot_frame, figsize=(6, 6), panels=[{
+            'title': 'Top Strike Volume',
+            'ylabel': 'Volume',
+            'series': [('ce_volume', 'Top CE Volume', 'blue'), ('pe_volume', 'Top PE Volume', 'red')]
+        }])
 
     def setup_database(self):
         # Connect to SQLite database (or create it)
@@ -449,6 +451,13 @@ class NiftyApp:
                 trend = self.calculate_trend(strike, volume, prev_pe_data)
                 self.volume_pe_tree.insert("", "end", values=(strike, volume, oi, changein_oi, ltp, chng, trend))
 
+            # Update the volume graph in place
+            if top_ce_data:
+                self.volume_chart.append('ce_volume', current_time, top_ce_data[0][1])
+            if top_pe_data:
+                self.volume_chart.append('pe_volume', current_time, top_pe_data[0][1])
+            self.volume_chart.refresh()
+
         except Exception as e:
             print(f"Error processing data: {str(e)}")  # Log the error
             self.status_label.config(text=f"Error processing data: {str(e)}")
@@ -0,0 +1,88 @@
+"""Hand results from worker threads to the Tk thread.
+
+Tk is not thread-safe: widgets may only be touched from the thread running
+``mainloop``.  Workers build immutable view models (NamedTuples) and
+``post`` them; the bridge drains its queue from ``after()`` on the Tk
+thread and calls the handler registered for each view model type.
+
+When the UI falls behind, bursts are coalesced: for a coalescing type only
+the newest update per ``key`` is applied.  Types registered with
+``coalesce=False`` (log lines, notices) are applied in order, every one.
+
+    bridge = UiBridge(root)
+    bridge.register(StatusView, self.apply_status)
+    bridge.start()
+    ...
+    bridge.post(StatusView("Last Update: 10:15", "green"))   # any thread
+"""
+import queue
+
+# How often the Tk thread checks for updates, and the most it applies per tick
+DRAIN_INTERVAL_MS = 100
+MAX_UPDATES_PER_TICK = 500
+
+
+class UiBridge:
+    def __init__(self, root, interval_ms=DRAIN_INTERVAL_MS):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.updates = queue.Queue()
+        self.handlers = {}
+        self.coalescing = set()
+        self.after_id = None
+
+    def register(self, view_type, handler, coalesce=True):
+        """Call ``handler(view)`` on the Tk thread for each posted ``view_type``"""
+        self.handlers[view_type] = handler
+        if coalesce:
+            self.coalescing.add(view_type)
+        else:
+            self.coalescing.discard(view_type)
+
+    def post(self, view):
+        """Queue a view model; safe to call from any thread"""
+        self.updates.put(view)
+
+    def start(self):
+        if self.after_id is None:
+            self.after_id = self.root.after(self.interval_ms, self._drain)
+
+    def stop(self):
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+    def _drain(self):
+        pending = []
+        try:
+            while len(pending) < MAX_UPDATES_PER_TICK:
+                pending.append(self.updates.get_nowait())
+        except queue.Empty:
+            pass
+
+        for view in coalesce(pending, self.coalescing):
+            handler = self.handlers.get(type(view))
+            if handler is None:
+                print(f"No UI handler for {type(view).__name__}")
+                continue
+            try:
+                handler(view)
+            except Exception as e:
+                print(f"Error applying {type(view).__name__}: {e}")
+
+        self.after_id = self.root.after(self.interval_ms, self._drain)
+
+
+def coalesce(views, coalescing):
+    """Keep the newest view per (type, key) for coalescing types.
+
+    Survivors stay in the position of their newest occurrence so relative
+    order between different kinds of update is preserved.
+    """
+    latest = {}
+    for i, view in enumerate(views):
+        if type(view) in coalescing:
+            latest[(type(view), getattr(view, 'key', None))] = i
+    keep = set(latest.values())
+    return [view for i, view in enumerate(views)
+            if type(view) not in coalescing or i in keep]
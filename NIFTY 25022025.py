@@ -2,16 +2,87 @@ import tkinter as tk
 from tkinter import ttk
 import ttkbootstrap as ttk
 import sqlite3
-import pandas as pd
 from datetime import datetime, timedelta
-import time
 import threading
-import aiohttp
 import json
 import asyncio
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import queue
 import tkinter.messagebox as messagebox
+import os
+import sys
+from typing import NamedTuple
+
+# Shared NSE helpers (collector, pub/sub, charts) live next to the other scripts
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Dtat_nse_program'))
+from cycle_metrics import CycleMetrics, db_size
+from lazy_modules import lazy_import, preload
+from nse_collector import collector_alive, extract_option_chain_data
+from nse_profiling import Profiler
+from ui_bridge import UiBridge
+
+# Heavy modules are imported on first use so the window appears first;
+# run Dtat_nse_program/startup_benchmark.py to check what still loads eagerly
+pd = lazy_import('pandas')
+aiohttp = lazy_import('aiohttp')
+plt = lazy_import('matplotlib.pyplot')
+backend_tkagg = lazy_import('matplotlib.backends.backend_tkagg')
+live_chart = lazy_import('live_chart')
+
+# Warmed on a background thread once the window is showing
+PRELOAD_MODULES = ['pandas', 'aiohttp', 'matplotlib.pyplot',
+                   'matplotlib.backends.backend_tkagg', 'live_chart', 'scipy.stats']
+
+# Open analysis windows pull new snapshots this often
+LIVE_CHART_REFRESH_MS = 60000
+
+# Stage timings of the monitoring loop; scrape http://127.0.0.1:9109/metrics
+# (nse_data_06-06-2025.py uses 9108)
+METRICS_PORT = 9109
+CYCLE_STAGES = ('fetch', 'store', 'alerts', 'summary', 'high_volume', 'display', 'cycle')
+metrics = CycleMetrics()
+# Off unless --profile DIR / NSE_PROFILE is given (see nse_profiling.py)
+profiler = Profiler()
+
+
+# View models built by the monitoring thread and applied on the Tk thread
+class StatusView(NamedTuple):
+    text: str
+    color: str = None
+
+class SpotView(NamedTuple):
+    underlying_value: float
+    atm_strike: int
+
+class CardView(NamedTuple):
+    key: int  # card slot, see OptionMonitor.card_slots
+    strike_price: float
+    oi: float
+    changein_oi: float
+    iv: float
+    ltp: float
+    trends: tuple = None  # OI, change in OI, IV, LTP trend text
+
+class MetricsView(NamedTuple):
+    ce_oi: float
+    pe_oi: float
+    pcr: float
+    pcr_prediction: str
+    ce_strike: float
+    ce_corr: float
+    pe_strike: float
+    pe_corr: float
+    correlation_prediction: str
+
+class PressureView(NamedTuple):
+    text: str
+
+class SummaryView(NamedTuple):
+    text: str
+
+class NoticeView(NamedTuple):
+    title: str
+    message: str
+
 
 class OptionMonitor:
     def __init__(self, root):
@@ -40,6 +111,10 @@ class OptionMonitor:
         self.strike_price_ce21 = None
         self.strike_price_pe21 = None
         
+        # Persistent LTP / Greeks analysis windows (None while closed)
+        self.ltp_view = None
+        self.greeks_view = None
+        
         # Create main container
         self.container = ttk.Frame(root, padding="10")
         self.container.pack(fill=tk.BOTH, expand=True)
@@ -50,15 +125,28 @@ class OptionMonitor:
         # Create cards for each strike price
         self.create_strike_cards()
         
-        # Add event loop initialization
-        self.loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(self.loop)
-        
-        # Start monitoring thread
+        # Worker results reach the widgets only through the bridge
+        self.ui = UiBridge(root)
+        self.ui.register(StatusView, self.apply_status)
+        self.ui.register(SpotView, self.apply_spot)
+        self.ui.register(CardView, self.apply_card)
+        self.ui.register(MetricsView, self.apply_metrics)
+        self.ui.register(PressureView, self.apply_pressure)
+        self.ui.register(SummaryView, self.apply_summary, coalesce=False)
+        self.ui.register(NoticeView, self.apply_notice, coalesce=False)
+        self.ui.start()
+        
+        # Rule alerts and notices are delivered off the Tk thread
+        # (nse_alerts imports pandas, so it loads with the worker)
+        self.alerts = None
+        metrics.gauge_fn('queue_depth', self.ui.updates.qsize, queue='ui')
+        metrics.gauge_fn('db_size_bytes', lambda: db_size('E:/nifty_data.db'))
+        
+        # The monitoring thread owns its own event loop (see monitor_loop)
         self.monitoring = True
-        self.monitor_thread = threading.Thread(target=self.monitor_prices)
-        self.monitor_thread.daemon = True
-        self.monitor_thread.start()
+        self.monitor_thread = None
+        self.loop = None
+        self.stop_event = None
 
         # Add market hours label
         self.market_hours_label = ttk.Label(
@@ -69,6 +157,46 @@ class OptionMonitor:
         )
         self.market_hours_label.pack(pady=2)
 
+        # Startup status while pandas/matplotlib/scipy load in the background
+        self.startup_label = ttk.Label(
+            self.container,
+            text="Loading analysis modules...",
+            font=("Helvetica", 9, "italic"),
+            foreground="gray"
+        )
+        self.startup_label.pack(pady=2)
+
+        # Let the window paint before any heavy import or DB work starts
+        self.root.after(100, self.start_background_work)
+
+    def start_background_work(self):
+        """Start the monitoring thread and warm the deferred imports"""
+        self.preload_status = preload(PRELOAD_MODULES)
+        self.root.after(100, self.poll_preload)
+
+        # Start monitoring thread
+        self.monitor_thread = threading.Thread(target=self.monitor_prices)
+        self.monitor_thread.daemon = True
+        self.monitor_thread.start()
+
+    def poll_preload(self):
+        """Show preload progress; runs on the Tk thread via after()"""
+        try:
+            while True:
+                name, seconds, error = self.preload_status.get_nowait()
+                if name is None:
+                    print(f"Analysis modules loaded in {seconds:.1f}s")
+                    self.startup_label.config(text=f"Ready - analysis modules loaded in {seconds:.1f}s")
+                    self.root.after(5000, self.startup_label.pack_forget)
+                    return
+                if error:
+                    print(f"Could not preload {name}: {error}")
+                else:
+                    self.startup_label.config(text=f"Loaded {name} ({seconds:.1f}s)...")
+        except queue.Empty:
+            pass
+        self.root.after(100, self.poll_preload)
+
     def setup_database(self):
         """Setup the database and create necessary tables"""
         with sqlite3.connect('E:/nifty_data.db') as conn:
@@ -136,9 +264,9 @@ class OptionMonitor:
                     await self.initialize_session()
                     async with self.session.get(self.url_nf, headers=self.headers, 
                                               cookies=self.cookies, timeout=30) as response:
-                        return await response.json()
+                        return await self.read_json(response)
                 elif response.status == 200:
-                    return await response.json()
+                    return await self.read_json(response)
                 else:
                     raise Exception(f"Unexpected status code: {response.status}")
         except Exception as e:
@@ -147,9 +275,14 @@ class OptionMonitor:
             await self.initialize_session()
             raise
 
+    async def read_json(self, response):
+        body = await response.read()
+        metrics.inc('payload_bytes_total', len(body))
+        return json.loads(body)
+
     def get_db_connection(self):
         """Create a new database connection for the current thread"""
-        return sqlite3.connect('E:/nifty_data.db')
+        return profiler.connect('E:/nifty_data.db')
 
     def store_option_data(self, data):
         """Store option chain data with IV handling"""
@@ -166,9 +299,8 @@ class OptionMonitor:
                 current_expiry = data["records"]["expiryDates"][0]
                 
                 # Update spot price and ATM strike in GUI
-                self.spot_price_label.config(text=f"Nifty: {underlying_value:.2f}")
                 atm_strike = self.calculate_atm_strike(underlying_value)
-                self.atm_label.config(text=f"ATM Strike: {atm_strike}")
+                self.ui.post(SpotView(underlying_value, atm_strike))
                 
                 # Get previous IV values
                 prev_iv_query = """
@@ -269,29 +401,42 @@ class OptionMonitor:
                 
                 if stored_count > 0:
                     print(f"Successfully stored {stored_count} records")
-                    self.status_label.config(
-                        text=f"Database Updated Successfully at {current_time} ({stored_count} records)",
-                        foreground="green"
-                    )
+                    self.ui.post(StatusView(
+                        f"Database Updated Successfully at {current_time} ({stored_count} records)",
+                        "green"
+                    ))
                 else:
                     print("No records were stored")
-                    self.status_label.config(
-                        text="Database Update Failed - No records stored",
-                        foreground="red"
-                    )
+                    self.ui.post(StatusView("Database Update Failed - No records stored", "red"))
                 
         except Exception as e:
             print(f"Error in store_option_data: {str(e)}")
-            self.status_label.config(
-                text=f"Database Error: {str(e)}",
-                foreground="red"
-            )
+            self.ui.post(StatusView(f"Database Error: {str(e)}", "red"))
+
+    def post_latest_spot(self):
+        """Spot and ATM labels from the collector's latest snapshot metrics"""
+        try:
+            with self.get_db_connection() as conn:
+                row = conn.execute(
+                    "SELECT underlying_value FROM snapshot_metrics ORDER BY date_time DESC LIMIT 1"
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Error reading snapshot metrics: {e}")
+            return
+        if row and row[0]:
+            self.ui.post(SpotView(row[0], self.calculate_atm_strike(row[0])))
 
     async def fetch_and_store_data(self):
         """Fetch and store option chain data"""
         try:
-            data = await self.get_option_chain_data()
-            self.store_option_data(data)
+            with metrics.stage('fetch'):
+                data = await self.get_option_chain_data()
+            with metrics.stage('store'):
+                self.store_option_data(data)
+            metrics.inc('rows_total', len(data['records']['data']), stage='fetch')
+            if self.alerts is not None:
+                with metrics.stage('alerts'):
+                    self.alerts.on_snapshot(extract_option_chain_data(data))
             print(f"Data stored successfully at {datetime.now()}")
         except Exception as e:
             print(f"Error in fetch_and_store_data: {e}")
@@ -506,7 +651,7 @@ class OptionMonitor:
         LIMIT 2
         """
         
-        with sqlite3.connect('E:/nifty_data.db') as conn:
+        with profiler.connect('E:/nifty_data.db') as conn:
             df = pd.read_sql_query(query, conn)
         
         return df if not df.empty else None
@@ -586,60 +731,97 @@ class OptionMonitor:
             print(f"Error getting high volume strikes: {e}")
 
     def monitor_prices(self):
-        """Monitor prices with verification"""
-        while self.monitoring:
+        """Monitoring thread entry point; never touches Tk widgets"""
+        asyncio.run(self.monitor_loop())
+
+    async def monitor_loop(self):
+        """Fetch, analyse and post view models every 5 minutes"""
+        self.loop = asyncio.get_running_loop()
+        self.stop_event = asyncio.Event()
+        try:
             try:
-                current_time = datetime.now()
-                
-                # Check if it's after market hours (3:40 PM)
-                if current_time.hour > 15 or (current_time.hour == 15 and current_time.minute >= 40):
-                    if not hasattr(self, 'market_closed_shown'):
-                        messagebox.showinfo("Market Status", "Market Closed for Today!")
-                        self.status_label.config(
-                            text="Market Closed - Data collection stopped",
-                            foreground="orange"
-                        )
-                        self.market_closed_shown = True
-                    time.sleep(60)  # Check every minute
-                    continue
-                    
-                # Reset the flag at the start of each day
-                if current_time.hour < 9:
-                    if hasattr(self, 'market_closed_shown'):
-                        delattr(self, 'market_closed_shown')
-                
-                # Run fetch and store in the event loop
-                self.loop.run_until_complete(self.fetch_and_store_data())
-                
-                # Generate and update market summary
-                self.generate_market_summary()
-                
-                # Get high volume strike prices
-                self.get_high_volume_strikes()
-                
-                # Update the display
-                self.update_display()
-                
-                # Wait for 5 minutes
-                time.sleep(300)
-                
+                from nse_alerts import AlertEngine
+                self.alerts = AlertEngine()
             except Exception as e:
-                print(f"Error in monitoring: {e}")
-                self.status_label.config(
-                    text=f"Error: {str(e)}",
-                    foreground="red"
-                )
-                self.loop.run_until_complete(self.initialize_session())
-                time.sleep(5)
+                # Monitoring still works without alerts
+                print(f"Alerts disabled: {e}")
+                self.alerts = None
+            while self.monitoring:
+                try:
+                    current_time = datetime.now()
+                    
+                    # Check if it's after market hours (3:40 PM)
+                    if current_time.hour > 15 or (current_time.hour == 15 and current_time.minute >= 40):
+                        if not hasattr(self, 'market_closed_shown'):
+                            self.ui.post(NoticeView("Market Status", "Market Closed for Today!"))
+                            self.ui.post(StatusView("Market Closed - Data collection stopped", "orange"))
+                            self.market_closed_shown = True
+                        await self.wait(60)  # Check every minute
+                        continue
+                        
+                    # Reset the flag at the start of each day
+                    if current_time.hour < 9:
+                        if hasattr(self, 'market_closed_shown'):
+                            delattr(self, 'market_closed_shown')
+                    
+                    with metrics.cycle(), metrics.stage('cycle'), profiler.cycle('monitor'):
+                        # Fetch and store, unless the headless collector is
+                        # already writing snapshots for us
+                        with self.get_db_connection() as conn:
+                            collector_running = collector_alive(conn)
+                        if collector_running:
+                            print("Collector process is running - skipping NSE fetch")
+                            self.post_latest_spot()
+                        else:
+                            await self.fetch_and_store_data()
+                        
+                        # Generate and update market summary
+                        with metrics.stage('summary'):
+                            self.generate_market_summary()
+                        
+                        # Get high volume strike prices
+                        with metrics.stage('high_volume'):
+                            self.get_high_volume_strikes()
+                        
+                        # Update the display
+                        with metrics.stage('display'):
+                            self.update_display()
+                    print(f"Cycle timings: {metrics.summary(CYCLE_STAGES)}")
+                    
+                    # Wait for 5 minutes
+                    await self.wait(300)
+                    
+                except Exception as e:
+                    print(f"Error in monitoring: {e}")
+                    self.ui.post(StatusView(f"Error: {str(e)}", "red"))
+                    try:
+                        await self.initialize_session()
+                    except Exception as e:
+                        print(f"Error re-initializing session: {e}")
+                    await self.wait(5)
+        finally:
+            await self.cleanup()
+
+    async def wait(self, seconds):
+        """Sleep on the monitoring loop, waking early when monitoring stops"""
+        try:
+            await asyncio.wait_for(self.stop_event.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
 
     def stop_monitoring(self):
         """Stop the monitoring thread and cleanup resources"""
         self.monitoring = False
+        self.ui.stop()
         
-        # Cleanup async resources
-        if hasattr(self, 'loop'):
-            self.loop.run_until_complete(self.cleanup())
-            self.loop.close()
+        # Wake the worker; it closes its aiohttp session on its own loop
+        if self.loop is not None and self.stop_event is not None:
+            try:
+                self.loop.call_soon_threadsafe(self.stop_event.set)
+            except RuntimeError:
+                pass  # loop already finished
+        if self.monitor_thread is not None:
+            self.monitor_thread.join(timeout=5)
 
     def set_strike_prices(self, ce1, pe1, ce2, pe2):
         self.strike_price_ce = ce1
@@ -668,34 +850,27 @@ class OptionMonitor:
                 
                 # Add data validation
                 if df.empty:
-                    self.status_label.config(
-                        text=f"No data available at {current_time}",
-                        foreground="orange"
-                    )
+                    self.ui.post(StatusView(f"No data available at {current_time}", "orange"))
                     return
                 
                 print(f"Data fetched successfully. Rows: {len(df)}")
                 
                 # Update status
-                self.status_label.config(text=f"Last Update: {current_time}")
+                self.ui.post(StatusView(f"Last Update: {current_time}"))
                 
                 # Update each card
-                for option_type, strike_price, card in [
-                    ("CE", self.strike_price_ce, self.ce_card1),
-                    ("PE", self.strike_price_pe, self.pe_card1),
-                    ("CE", self.strike_price_ce21, self.ce_card2),
-                    ("PE", self.strike_price_pe21, self.pe_card2)
-                ]:
+                for slot, (option_type, strike_price) in enumerate([
+                    ("CE", self.strike_price_ce),
+                    ("PE", self.strike_price_pe),
+                    ("CE", self.strike_price_ce21),
+                    ("PE", self.strike_price_pe21)
+                ]):
                     data = df[(df['option_type'] == option_type) & 
                              (df['strike_price'] == strike_price)]
                     
                     if not data.empty:
                         row = data.iloc[0]
-                        card['Strike Price'].config(text=f"Strike Price: {strike_price}")
-                        card['OI'].config(text=f"OI: {row['open_interest']:,.0f}")
-                        card['Change in OI'].config(text=f"Change in OI: {row['changein_oi']:.2f}")
-                        card['IV'].config(text=f"IV: {row['iv']:.2f}%")
-                        card['LTP'].config(text=f"LTP: {row['ltp']:.2f}")
+                        trends = None
                         
                         # Get previous data for trends
                         prev_query = f"""
@@ -710,25 +885,90 @@ class OptionMonitor:
                         
                         if not prev_data.empty:
                             prev_row = prev_data.iloc[0]
-                            card['OI Trend'].config(text=f"OI Trend: {self.determine_trend(row['open_interest'], prev_row['open_interest'])}")
-                            card['Change in OI Trend'].config(text=f"Change in OI Trend: {self.determine_trend(row['changein_oi'], prev_row['changein_oi'])}")
-                            card['IV Trend'].config(text=f"IV Trend: {self.determine_trend(row['iv'], prev_row['iv'])}")
-                            card['LTP Trend'].config(text=f"LTP Trend: {self.determine_trend(row['ltp'], prev_row['ltp'])}")
+                            trends = (
+                                self.determine_trend(row['open_interest'], prev_row['open_interest']),
+                                self.determine_trend(row['changein_oi'], prev_row['changein_oi']),
+                                self.determine_trend(row['iv'], prev_row['iv']),
+                                self.determine_trend(row['ltp'], prev_row['ltp'])
+                            )
+                        
+                        self.ui.post(CardView(
+                            slot, strike_price, float(row['open_interest']), float(row['changein_oi']),
+                            float(row['iv']), float(row['ltp']), trends
+                        ))
         
             # Calculate and update PCR and correlations
             self.calculate_pcr_and_correlations()
             
             # Update pressure analysis
-            pressure_analysis = self.analyze_strike_pressure()
-            self.pressure_text.delete(1.0, tk.END)
-            self.pressure_text.insert(tk.END, pressure_analysis)
+            self.ui.post(PressureView(self.analyze_strike_pressure()))
             
         except Exception as e:
             print(f"Detailed error in update_display: {type(e).__name__}: {str(e)}")
-            self.status_label.config(
-                text=f"Update error: {type(e).__name__}",
-                foreground="red"
-            )
+            self.ui.post(StatusView(f"Update error: {type(e).__name__}", "red"))
+
+    # --- Applied on the Tk thread by UiBridge ---
+    def apply_status(self, view):
+        if view.color:
+            self.status_label.config(text=view.text, foreground=view.color)
+        else:
+            self.status_label.config(text=view.text)
+
+    def apply_spot(self, view):
+        self.spot_price_label.config(text=f"Nifty: {view.underlying_value:.2f}")
+        self.atm_label.config(text=f"ATM Strike: {view.atm_strike}")
+
+    @property
+    def card_slots(self):
+        return (self.ce_card1, self.pe_card1, self.ce_card2, self.pe_card2)
+
+    def apply_card(self, view):
+        card = self.card_slots[view.key]
+        card['Strike Price'].config(text=f"Strike Price: {view.strike_price}")
+        card['OI'].config(text=f"OI: {view.oi:,.0f}")
+        card['Change in OI'].config(text=f"Change in OI: {view.changein_oi:.2f}")
+        card['IV'].config(text=f"IV: {view.iv:.2f}%")
+        card['LTP'].config(text=f"LTP: {view.ltp:.2f}")
+        if view.trends:
+            oi_trend, coi_trend, iv_trend, ltp_trend = view.trends
+            card['OI Trend'].config(text=f"OI Trend: {oi_trend}")
+            card['Change in OI Trend'].config(text=f"Change in OI Trend: {coi_trend}")
+            card['IV Trend'].config(text=f"IV Trend: {iv_trend}")
+            card['LTP Trend'].config(text=f"LTP Trend: {ltp_trend}")
+
+    def apply_metrics(self, view):
+        self.total_ce_oi_label.config(text=f"Total CE OI: {view.ce_oi:,.0f}")
+        self.total_pe_oi_label.config(text=f"Total PE OI: {view.pe_oi:,.0f}")
+        self.pcr_label.config(text=f"PCR: {view.pcr:.2f}")
+        self.pcr_prediction.config(text=view.pcr_prediction)
+        self.ce_correlation_label.config(
+            text=f"CE {view.ce_strike} IV-LTP Correlation: {view.ce_corr:.2f}"
+        )
+        self.pe_correlation_label.config(
+            text=f"PE {view.pe_strike} IV-LTP Correlation: {view.pe_corr:.2f}"
+        )
+        self.correlation_prediction.config(text=f"Correlation Analysis: {view.correlation_prediction}")
+
+    def apply_pressure(self, view):
+        self.pressure_text.delete(1.0, tk.END)
+        self.pressure_text.insert(tk.END, view.text)
+
+    def apply_summary(self, view):
+        # Add to text widget and scroll
+        self.summary_text.insert(tk.END, view.text)
+        self.summary_text.see(tk.END)
+        
+        # Keep last 8 reports
+        content = self.summary_text.get("1.0", tk.END).split("===")
+        if len(content) > 16:
+            self.summary_text.delete("1.0", tk.END)
+            self.summary_text.insert(tk.END, "===".join(content[-16:]))
+
+    def apply_notice(self, view):
+        # A modal messagebox would stall the UI bridge until dismissed
+        self.status_label.config(text=f"{view.title}: {view.message}")
+        if self.alerts is not None:
+            self.alerts.notify(view.title, view.message)
 
     async def cleanup(self):
         """Cleanup resources"""
@@ -796,14 +1036,8 @@ class OptionMonitor:
                 pe_oi = df[df['option_type'] == 'PE']['total_oi'].iloc[0]
                 pcr = pe_oi / ce_oi if ce_oi > 0 else 0
                 
-                # Update OI and PCR labels
-                self.total_ce_oi_label.config(text=f"Total CE OI: {ce_oi:,.0f}")
-                self.total_pe_oi_label.config(text=f"Total PE OI: {pe_oi:,.0f}")
-                self.pcr_label.config(text=f"PCR: {pcr:.2f}")
-                
-                # Generate and update PCR prediction
+                # Generate PCR prediction
                 pcr_prediction = self.generate_pcr_prediction(pcr)
-                self.pcr_prediction.config(text=pcr_prediction)
                 
                 # Calculate correlations for highest volume strikes
                 ce_corr, ce_strike = self.calculate_correlation(conn, 'CE')
@@ -819,17 +1053,12 @@ class OptionMonitor:
                 ''', (current_time, ce_corr, pe_corr, ce_strike, pe_strike))
                 conn.commit()
                 
-                # Update GUI labels
-                self.ce_correlation_label.config(
-                    text=f"CE {ce_strike} IV-LTP Correlation: {ce_corr:.2f}"
-                )
-                self.pe_correlation_label.config(
-                    text=f"PE {pe_strike} IV-LTP Correlation: {pe_corr:.2f}"
-                )
-                
-                # Generate prediction
+                # Generate prediction and hand everything to the GUI
                 prediction = self.generate_market_prediction(pcr, ce_corr, pe_corr)
-                self.correlation_prediction.config(text=f"Correlation Analysis: {prediction}")
+                self.ui.post(MetricsView(
+                    float(ce_oi), float(pe_oi), float(pcr), pcr_prediction,
+                    ce_strike, ce_corr, pe_strike, pe_corr, prediction
+                ))
                 
         except Exception as e:
             print(f"Error calculating metrics: {e}")
@@ -957,7 +1186,7 @@ class OptionMonitor:
         # Create matplotlib figure
         fig = plt.Figure(figsize=(6, 4))
         ax = fig.add_subplot(111)
-        canvas = FigureCanvasTkAgg(fig, left_frame)
+        canvas = backend_tkagg.FigureCanvasTkAgg(fig, left_frame)
         canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
         
         # Right frame for analysis
@@ -1316,7 +1545,7 @@ class OptionMonitor:
                 fig.tight_layout()
                 
                 # Create canvas
-                canvas = FigureCanvasTkAgg(fig, graph_window)
+                canvas = backend_tkagg.FigureCanvasTkAgg(fig, graph_window)
                 canvas.draw()
                 canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
                 
@@ -1502,21 +1731,21 @@ class OptionMonitor:
                 else:
                     summary += "• Higher PE volume indicates bearish interest\n"
 
-                # Add to text widget and scroll
-                self.summary_text.insert(tk.END, summary)
-                self.summary_text.see(tk.END)
-                
-                # Keep last 8 reports
-                content = self.summary_text.get("1.0", tk.END).split("===")
-                if len(content) > 16:
-                    self.summary_text.delete("1.0", tk.END)
-                    self.summary_text.insert(tk.END, "===".join(content[-16:]))
+                self.ui.post(SummaryView(summary))
                 
         except Exception as e:
             print(f"Error generating summary: {e}")
 
     def show_ltp_analysis(self):
         """Show detailed analysis graphs for highest volume CE and PE"""
+        # Reuse the open window: only rows newer than the last plotted
+        # snapshot are queried and appended to the existing lines
+        if self.ltp_view and self.ltp_view['window'].winfo_exists():
+            self.ltp_view['window'].lift()
+            self.refresh_ltp_analysis()
+            return
+        self.cancel_view_refresh(self.ltp_view)
+
         graph_window = tk.Toplevel(self.root)
         graph_window.title("Option Analysis")
         graph_window.geometry("1800x1000")
@@ -1533,6 +1762,77 @@ class OptionMonitor:
         status_frame = ttk.LabelFrame(main_container, text="Market Analysis", padding=10)
         status_frame.pack(side=tk.RIGHT, fill=tk.Y, padx=5, pady=5, ipadx=20)
         
+        chart = live_chart.LiveChart(graph_frame, figsize=(10, 12), panels=[
+            {'title': 'Open Interest Comparison', 'ylabel': 'Open Interest',
+             'series': [('ce_oi', 'CE OI', 'b'), ('pe_oi', 'PE OI', 'r')]},
+            {'title': 'LTP Comparison', 'ylabel': 'LTP',
+             'series': [('ce_ltp', 'CE LTP', 'b'), ('pe_ltp', 'PE LTP', 'r')]},
+            {'title': 'IV Comparison', 'ylabel': 'IV',
+             'series': [('ce_iv', 'CE IV', 'b'), ('pe_iv', 'PE IV', 'r')]},
+        ])
+        
+        # Status text with increased width
+        status_text = tk.Text(status_frame, width=50, height=40, wrap=tk.WORD, 
+                            font=("Helvetica", 11))
+        status_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+        self.ltp_view = {
+            'window': graph_window,
+            'chart': chart,
+            'status_text': status_text,
+            'strikes': None,
+            'last_time': '',
+            'ce_data': pd.DataFrame(),
+            'pe_data': pd.DataFrame(),
+            'after_id': None
+        }
+        graph_window.bind('<Destroy>', lambda event: self.on_view_destroyed(event, 'ltp_view'))
+        self.refresh_ltp_analysis()
+        self.schedule_view_refresh(self.ltp_view, self.auto_refresh_ltp_analysis)
+
+    def schedule_view_refresh(self, view, callback):
+        view['after_id'] = self.root.after(LIVE_CHART_REFRESH_MS, callback)
+
+    def cancel_view_refresh(self, view):
+        """Stop a window's pending auto-refresh so reopening never stacks loops"""
+        if view and view.get('after_id'):
+            try:
+                self.root.after_cancel(view['after_id'])
+            except tk.TclError:
+                pass
+            view['after_id'] = None
+
+    def on_view_destroyed(self, event, attr):
+        """<Destroy> of an analysis window (the binding also fires for its children)"""
+        view = getattr(self, attr)
+        if view and event.widget is view['window']:
+            self.cancel_view_refresh(view)
+            setattr(self, attr, None)
+
+    def show_view_error(self, view, text_key, message, auto):
+        """Dialog when the user asked for the refresh; on auto-refresh, text in the window"""
+        if not auto:
+            messagebox.showerror("Error", message)
+            return
+        text = view[text_key]
+        text.config(state=tk.NORMAL)
+        text.delete(1.0, tk.END)
+        text.insert(tk.END, f"{datetime.now().strftime('%H:%M:%S')} - {message}")
+        text.config(state=tk.DISABLED)
+
+    def auto_refresh_ltp_analysis(self):
+        """Keep the LTP window current while it is open"""
+        if self.ltp_view and self.ltp_view['window'].winfo_exists():
+            self.refresh_ltp_analysis(auto=True)
+            self.schedule_view_refresh(self.ltp_view, self.auto_refresh_ltp_analysis)
+        else:
+            self.ltp_view = None
+
+    @profiler.profiled('ltp_analysis')
+    def refresh_ltp_analysis(self, auto=False):
+        """Append new snapshots for the highest volume strikes to the LTP chart"""
+        view = self.ltp_view
+        chart = view['chart']
         try:
             with self.get_db_connection() as conn:
                 current_date = datetime.now().strftime('%Y-%m-%d')
@@ -1549,188 +1849,140 @@ class OptionMonitor:
                 
                 # Ensure we have data
                 if df_volume.empty:
-                    messagebox.showerror("Error", "No data available for analysis")
+                    self.show_view_error(view, 'status_text', "No data available for analysis", auto)
                     return
                     
                 ce_strike = df_volume[df_volume['option_type'] == 'CE'].iloc[0]['strike_price']
                 pe_strike = df_volume[df_volume['option_type'] == 'PE'].iloc[0]['strike_price']
                 
-                # Get data for both strikes with explicit columns
+                # The busiest strikes moved: start the series over
+                if view['strikes'] != (ce_strike, pe_strike):
+                    view['strikes'] = (ce_strike, pe_strike)
+                    view['last_time'] = ''
+                    view['ce_data'] = pd.DataFrame()
+                    view['pe_data'] = pd.DataFrame()
+                    chart.clear()
+                    view['window'].title(f"Option Analysis - CE {ce_strike} / PE {pe_strike}")
+                
+                # Only fetch rows newer than what is already plotted
                 data_query = f"""
                 SELECT date_time, strike_price, option_type, 
                        open_interest, ltp, iv
                 FROM nifty_option_chain_data
                 WHERE date_time LIKE '{current_date}%'
+                AND date_time > ?
                 AND strike_price IN ({ce_strike}, {pe_strike})
                 ORDER BY date_time
                 """
-                df = pd.read_sql_query(data_query, conn)
-                
-                # Check if we have data
-                if df.empty:
-                    messagebox.showerror("Error", "No data available for selected strikes")
-                    return
-                    
-                df['time'] = pd.to_datetime(df['date_time']).dt.strftime('%H:%M')
-                
-                # Modify figure size and layout
-                fig = plt.Figure(figsize=(10, 12))  # Reduced width, increased height
-                fig.subplots_adjust(hspace=0.3, top=0.95)  # Reduced space between plots, moved up
-                
-                # Filter data for CE and PE
-                ce_data = df[(df['option_type'] == 'CE') & (df['strike_price'] == ce_strike)]
-                pe_data = df[(df['option_type'] == 'PE') & (df['strike_price'] == pe_strike)]
-                
-                # Plot 1: Open Interest - adjusted position
-                ax1 = fig.add_subplot(311)
-                ax1.plot(ce_data['time'], ce_data['open_interest'], 'b-', label=f'CE {ce_strike} OI', linewidth=2)
-                ax1.plot(pe_data['time'], pe_data['open_interest'], 'r-', label=f'PE {pe_strike} OI', linewidth=2)
-                
-                oi_max = max(ce_data['open_interest'].max(), pe_data['open_interest'].max())
-                oi_min = min(ce_data['open_interest'].min(), pe_data['open_interest'].min())
-                margin = (oi_max - oi_min) * 0.2  # Increased margin
-                ax1.set_ylim(oi_min - margin, oi_max + margin)
-                
-                ax1.set_title('Open Interest Comparison', fontsize=12, pad=10)
-                ax1.set_xlabel('Time', fontsize=10)
-                ax1.set_ylabel('Open Interest', fontsize=10)
-                ax1.tick_params(axis='x', rotation=45)
-                ax1.legend(fontsize=10)
-                ax1.grid(True)
-                
-                # Plot 2: LTP - adjusted position
-                ax2 = fig.add_subplot(312)
-                ax2.plot(ce_data['time'], ce_data['ltp'], 'b-', label=f'CE {ce_strike} LTP', linewidth=2)
-                ax2.plot(pe_data['time'], pe_data['ltp'], 'r-', label=f'PE {pe_strike} LTP', linewidth=2)
-                
-                ltp_max = max(ce_data['ltp'].max(), pe_data['ltp'].max())
-                ltp_min = min(ce_data['ltp'].min(), pe_data['ltp'].min())
-                margin = (ltp_max - ltp_min) * 0.2  # Increased margin
-                ax2.set_ylim(ltp_min - margin, ltp_max + margin)
-                
-                ax2.set_title('LTP Comparison', fontsize=12, pad=10)
-                ax2.set_xlabel('Time', fontsize=10)
-                ax2.set_ylabel('LTP', fontsize=10)
-                ax2.tick_params(axis='x', rotation=45)
-                ax2.legend(fontsize=10)
-                ax2.grid(True)
-                
-                # Plot 3: IV - adjusted position
-                ax3 = fig.add_subplot(313)
-                ax3.plot(ce_data['time'], ce_data['iv'], 'b-', label=f'CE {ce_strike} IV', linewidth=2)
-                ax3.plot(pe_data['time'], pe_data['iv'], 'r-', label=f'PE {pe_strike} IV', linewidth=2)
-                
-                iv_max = max(ce_data['iv'].max(), pe_data['iv'].max())
-                iv_min = min(ce_data['iv'].min(), pe_data['iv'].min())
-                margin = (iv_max - iv_min) * 0.2  # Increased margin
-                ax3.set_ylim(iv_min - margin, iv_max + margin)
-                
-                ax3.set_title('IV Comparison', fontsize=12, pad=10)
-                ax3.set_xlabel('Time', fontsize=10)
-                ax3.set_ylabel('IV', fontsize=10)
-                ax3.tick_params(axis='x', rotation=45)
-                ax3.legend(fontsize=10)
-                ax3.grid(True)
-                
-                fig.tight_layout(rect=[0, 0, 1, 0.95])  # Adjust layout to move plots up
-                
-                # Create canvas with adjusted size
-                canvas = FigureCanvasTkAgg(fig, graph_frame)
-                canvas.draw()
-                canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-                
-                # Status text with increased width
-                status_text = tk.Text(status_frame, width=50, height=40, wrap=tk.WORD, 
-                                    font=("Helvetica", 11))
-                status_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-                
-                # Generate market analysis
-                def generate_market_analysis(ce_data, pe_data):
-                    analysis = []
-                    
-                    # Get latest values
-                    latest_ce = ce_data.iloc[-1]
-                    latest_pe = pe_data.iloc[-1]
-                    
-                    # OI Analysis
-                    ce_oi_change = latest_ce['open_interest'] - ce_data.iloc[-2]['open_interest']
-                    pe_oi_change = latest_pe['open_interest'] - pe_data.iloc[-2]['open_interest']
-                    
-                    analysis.append(f"=== Market Signals Analysis ===\n")
-                    
-                    # OI-based signals
-                    if ce_oi_change > 0 and pe_oi_change < 0:
-                        analysis.append("🔵 Strong Bullish Signal:")
-                        analysis.append("• CE writing with PE unwinding")
-                        analysis.append("• Potential upward breakout")
-                    elif ce_oi_change < 0 and pe_oi_change > 0:
-                        analysis.append("🔴 Strong Bearish Signal:")
-                        analysis.append("• PE writing with CE unwinding")
-                        analysis.append("• Potential downward breakout")
-                    
-                    # LTP Analysis
-                    ce_ltp_change = latest_ce['ltp'] - ce_data.iloc[-2]['ltp']
-                    pe_ltp_change = latest_pe['ltp'] - pe_data.iloc[-2]['ltp']
-                    
-                    analysis.append("\n=== Price Action Analysis ===")
-                    if ce_ltp_change > 0 and pe_ltp_change < 0:
-                        analysis.append("• Bullish price action")
-                        analysis.append("• CE gaining strength")
-                    elif ce_ltp_change < 0 and pe_ltp_change > 0:
-                        analysis.append("• Bearish price action")
-                        analysis.append("• PE gaining strength")
-                    
-                    # IV Analysis
-                    analysis.append("\n=== Volatility Analysis ===")
-                    if latest_ce['iv'] > latest_pe['iv']:
-                        analysis.append("• Higher CE volatility")
-                        analysis.append("• Potential upside movement")
-                    else:
-                        analysis.append("• Higher PE volatility")
-                        analysis.append("• Potential downside movement")
-                    
-                    # Premium Erosion Check
-                    analysis.append("\n=== Premium Analysis ===")
-                    if (ce_data['iv'].iloc[-3:].is_monotonic_decreasing and 
-                        pe_data['iv'].iloc[-3:].is_monotonic_decreasing):
-                        analysis.append("⚠️ Premium Erosion Alert:")
-                        analysis.append("• Both CE & PE IV declining")
-                        analysis.append("• Time decay acceleration")
-                    
-                    # Consolidation Check
-                    analysis.append("\n=== Pattern Analysis ===")
-                    ce_ltp_std = ce_data['ltp'].tail(5).std()
-                    pe_ltp_std = pe_data['ltp'].tail(5).std()
-                    if ce_ltp_std < ce_data['ltp'].mean() * 0.01 and pe_ltp_std < pe_data['ltp'].mean() * 0.01:
-                        analysis.append("📊 Consolidation Pattern:")
-                        analysis.append("• Low price volatility")
-                        analysis.append("• Breakout expected soon")
-                    
-                    # Breakout Analysis
-                    analysis.append("\n=== Breakout Analysis ===")
-                    ce_resistance = ce_data['ltp'].tail(10).max()
-                    ce_support = ce_data['ltp'].tail(10).min()
-                    pe_resistance = pe_data['ltp'].tail(10).max()
-                    pe_support = pe_data['ltp'].tail(10).min()
-                    
-                    if latest_ce['ltp'] > ce_resistance * 0.98:
-                        analysis.append("🔼 CE Breakout Potential:")
-                        analysis.append("• Near resistance level")
-                        analysis.append(f"• Resistance: {ce_resistance:.2f}")
-                    elif latest_pe['ltp'] > pe_resistance * 0.98:
-                        analysis.append("🔽 PE Breakout Potential:")
-                        analysis.append("• Near resistance level")
-                        analysis.append(f"• Resistance: {pe_resistance:.2f}")
-                    
-                    return "\n".join(analysis)
-                
-                # Generate and display analysis
-                analysis = generate_market_analysis(ce_data, pe_data)
+                df = pd.read_sql_query(data_query, conn, params=(view['last_time'],))
+                
+            if not df.empty:
+                new_ce = df[(df['option_type'] == 'CE') & (df['strike_price'] == ce_strike)]
+                new_pe = df[(df['option_type'] == 'PE') & (df['strike_price'] == pe_strike)]
+                view['ce_data'] = pd.concat([view['ce_data'], new_ce], ignore_index=True)
+                view['pe_data'] = pd.concat([view['pe_data'], new_pe], ignore_index=True)
+                view['last_time'] = df['date_time'].max()
+                
+                for prefix, new_rows in (('ce', new_ce), ('pe', new_pe)):
+                    chart.append(f'{prefix}_oi', new_rows['date_time'], new_rows['open_interest'])
+                    chart.append(f'{prefix}_ltp', new_rows['date_time'], new_rows['ltp'])
+                    chart.append(f'{prefix}_iv', new_rows['date_time'], new_rows['iv'])
+                chart.refresh()
+            elif view['ce_data'].empty:
+                self.show_view_error(view, 'status_text', "No data available for selected strikes", auto)
+                return
+            
+            # Generate and display analysis
+            status_text = view['status_text']
+            status_text.config(state=tk.NORMAL)
+            status_text.delete(1.0, tk.END)
+            if len(view['ce_data']) > 1 and len(view['pe_data']) > 1:
+                analysis = self.generate_ltp_market_analysis(view['ce_data'], view['pe_data'])
                 status_text.insert(tk.END, analysis)
-                status_text.config(state=tk.DISABLED)
+            status_text.config(state=tk.DISABLED)
                 
         except Exception as e:
-            messagebox.showerror("Error", f"Error creating analysis: {str(e)}")
+            self.show_view_error(view, 'status_text', f"Error creating analysis: {str(e)}", auto)
+
+    def generate_ltp_market_analysis(self, ce_data, pe_data):
+        """Generate market analysis text for the LTP window"""
+        analysis = []
+        
+        # Get latest values
+        latest_ce = ce_data.iloc[-1]
+        latest_pe = pe_data.iloc[-1]
+        
+        # OI Analysis
+        ce_oi_change = latest_ce['open_interest'] - ce_data.iloc[-2]['open_interest']
+        pe_oi_change = latest_pe['open_interest'] - pe_data.iloc[-2]['open_interest']
+        
+        analysis.append(f"=== Market Signals Analysis ===\n")
+        
+        # OI-based signals
+        if ce_oi_change > 0 and pe_oi_change < 0:
+            analysis.append("🔵 Strong Bullish Signal:")
+            analysis.append("• CE writing with PE unwinding")
+            analysis.append("• Potential upward breakout")
+        elif ce_oi_change < 0 and pe_oi_change > 0:
+            analysis.append("🔴 Strong Bearish Signal:")
+            analysis.append("• PE writing with CE unwinding")
+            analysis.append("• Potential downward breakout")
+        
+        # LTP Analysis
+        ce_ltp_change = latest_ce['ltp'] - ce_data.iloc[-2]['ltp']
+        pe_ltp_change = latest_pe['ltp'] - pe_data.iloc[-2]['ltp']
+        
+        analysis.append("\n=== Price Action Analysis ===")
+        if ce_ltp_change > 0 and pe_ltp_change < 0:
+            analysis.append("• Bullish price action")
+            analysis.append("• CE gaining strength")
+        elif ce_ltp_change < 0 and pe_ltp_change > 0:
+            analysis.append("• Bearish price action")
+            analysis.append("• PE gaining strength")
+        
+        # IV Analysis
+        analysis.append("\n=== Volatility Analysis ===")
+        if latest_ce['iv'] > latest_pe['iv']:
+            analysis.append("• Higher CE volatility")
+            analysis.append("• Potential upside movement")
+        else:
+            analysis.append("• Higher PE volatility")
+            analysis.append("• Potential downside movement")
+        
+        # Premium Erosion Check
+        analysis.append("\n=== Premium Analysis ===")
+        if (ce_data['iv'].iloc[-3:].is_monotonic_decreasing and 
+            pe_data['iv'].iloc[-3:].is_monotonic_decreasing):
+            analysis.append("⚠️ Premium Erosion Alert:")
+            analysis.append("• Both CE & PE IV declining")
+            analysis.append("• Time decay acceleration")
+        
+        # Consolidation Check
+        analysis.append("\n=== Pattern Analysis ===")
+        ce_ltp_std = ce_data['ltp'].tail(5).std()
+        pe_ltp_std = pe_data['ltp'].tail(5).std()
+        if ce_ltp_std < ce_data['ltp'].mean() * 0.01 and pe_ltp_std < pe_data['ltp'].mean() * 0.01:
+            analysis.append("📊 Consolidation Pattern:")
+            analysis.append("• Low price volatility")
+            analysis.append("• Breakout expected soon")
+        
+        # Breakout Analysis
+        analysis.append("\n=== Breakout Analysis ===")
+        ce_resistance = ce_data['ltp'].tail(10).max()
+        ce_support = ce_data['ltp'].tail(10).min()
+        pe_resistance = pe_data['ltp'].tail(10).max()
+        pe_support = pe_data['ltp'].tail(10).min()
+        
+        if latest_ce['ltp'] > ce_resistance * 0.98:
+            analysis.append("🔼 CE Breakout Potential:")
+            analysis.append("• Near resistance level")
+            analysis.append(f"• Resistance: {ce_resistance:.2f}")
+        elif latest_pe['ltp'] > pe_resistance * 0.98:
+            analysis.append("🔽 PE Breakout Potential:")
+            analysis.append("• Near resistance level")
+            analysis.append(f"• Resistance: {pe_resistance:.2f}")
+        
+        return "\n".join(analysis)
 
     def analyze_option_trends(self, ce_data, pe_data):
         """Analyze recent trends in option data"""
@@ -1811,6 +2063,13 @@ class OptionMonitor:
 
     def show_greeks_analysis(self):
         """Show Greeks analysis for highest volume strikes"""
+        # Reuse the open window; Greeks are only computed for new snapshots
+        if self.greeks_view and self.greeks_view['window'].winfo_exists():
+            self.greeks_view['window'].lift()
+            self.refresh_greeks_analysis()
+            return
+        self.cancel_view_refresh(self.greeks_view)
+
         graph_window = tk.Toplevel(self.root)
         graph_window.title("Option Greeks Analysis")
         graph_window.geometry("1800x1000")
@@ -1827,6 +2086,43 @@ class OptionMonitor:
         analysis_frame = ttk.LabelFrame(main_container, text="Greeks Analysis", padding=10)
         analysis_frame.pack(side=tk.RIGHT, fill=tk.Y, padx=5, pady=5, ipadx=20)
         
+        chart = live_chart.LiveChart(graph_frame, figsize=(10, 12), panels=[
+            {'title': 'CE Delta', 'ylabel': 'Delta', 'series': [('ce_delta', 'CE', 'b')]},
+            {'title': 'CE Theta', 'ylabel': 'Theta', 'series': [('ce_theta', 'CE', 'b')]},
+            {'title': 'PE Delta', 'ylabel': 'Delta', 'series': [('pe_delta', 'PE', 'r')]},
+            {'title': 'PE Theta', 'ylabel': 'Theta', 'series': [('pe_theta', 'PE', 'r')]},
+        ])
+        
+        analysis_text = tk.Text(analysis_frame, width=50, height=40, wrap=tk.WORD, 
+                              font=("Helvetica", 11))
+        analysis_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+        self.greeks_view = {
+            'window': graph_window,
+            'chart': chart,
+            'analysis_text': analysis_text,
+            'strikes': None,
+            'last_time': '',
+            'data': pd.DataFrame(),
+            'after_id': None
+        }
+        graph_window.bind('<Destroy>', lambda event: self.on_view_destroyed(event, 'greeks_view'))
+        self.refresh_greeks_analysis()
+        self.schedule_view_refresh(self.greeks_view, self.auto_refresh_greeks_analysis)
+
+    def auto_refresh_greeks_analysis(self):
+        """Keep the Greeks window current while it is open"""
+        if self.greeks_view and self.greeks_view['window'].winfo_exists():
+            self.refresh_greeks_analysis(auto=True)
+            self.schedule_view_refresh(self.greeks_view, self.auto_refresh_greeks_analysis)
+        else:
+            self.greeks_view = None
+
+    @profiler.profiled('greeks_analysis')
+    def refresh_greeks_analysis(self, auto=False):
+        """Compute Greeks for snapshots not yet plotted and append them"""
+        view = self.greeks_view
+        chart = view['chart']
         try:
             with self.get_db_connection() as conn:
                 # Get current date and expiry date
@@ -1854,16 +2150,27 @@ class OptionMonitor:
                 ce_strike = df_volume[df_volume['option_type'] == 'CE'].iloc[0]['strike_price']
                 pe_strike = df_volume[df_volume['option_type'] == 'PE'].iloc[0]['strike_price']
                 
-                # Get data for Greeks calculation
+                # The busiest strikes moved: start the series over
+                if view['strikes'] != (ce_strike, pe_strike):
+                    view['strikes'] = (ce_strike, pe_strike)
+                    view['last_time'] = ''
+                    view['data'] = pd.DataFrame()
+                    chart.clear()
+                    view['window'].title(f"Option Greeks Analysis - CE {ce_strike} / PE {pe_strike}")
+                
+                # Get data for Greeks calculation, new snapshots only
                 data_query = f"""
                 SELECT date_time, strike_price, option_type, 
                        underlying_value as spot_price, iv
                 FROM nifty_option_chain_data
                 WHERE date_time LIKE '{current_date}%'
+                AND date_time > ?
                 AND strike_price IN ({ce_strike}, {pe_strike})
                 ORDER BY date_time
                 """
-                df = pd.read_sql_query(data_query, conn)
+                df = pd.read_sql_query(data_query, conn, params=(view['last_time'],))
+            
+            if not df.empty:
                 df['time'] = pd.to_datetime(df['date_time']).dt.strftime('%H:%M')
                 
                 # Calculate time to expiry using actual expiry date
@@ -1884,73 +2191,32 @@ class OptionMonitor:
                         df.loc[idx, 'delta'] = 0
                         df.loc[idx, 'theta'] = 0
                 
-                # Plot CE Greeks
-                ce_data = df[df['option_type'] == 'CE']
-                pe_data = df[df['option_type'] == 'PE']
-                
-                # Create figure with subplots
-                fig = plt.Figure(figsize=(10, 12))
-                fig.subplots_adjust(hspace=0.4)
-                
-                # CE Delta
-                ax1 = fig.add_subplot(321)
-                ax1.plot(ce_data['time'], ce_data['delta'], 'b-', label=f'CE {ce_strike}')
-                ax1.set_title('CE Delta', fontsize=10)
-                ax1.set_xlabel('Time')
-                ax1.set_ylabel('Delta')
-                ax1.tick_params(axis='x', rotation=45)
-                ax1.legend(fontsize=8)
-                ax1.grid(True)
-                
-                # CE Theta
-                ax2 = fig.add_subplot(322)
-                ax2.plot(ce_data['time'], ce_data['theta'], 'b-', label=f'CE {ce_strike}')
-                ax2.set_title('CE Theta', fontsize=10)
-                ax2.set_xlabel('Time')
-                ax2.set_ylabel('Theta')
-                ax2.tick_params(axis='x', rotation=45)
-                ax2.legend(fontsize=8)
-                ax2.grid(True)
-                
-                # PE Delta
-                ax3 = fig.add_subplot(323)
-                ax3.plot(pe_data['time'], pe_data['delta'], 'r-', label=f'PE {pe_strike}')
-                ax3.set_title('PE Delta', fontsize=10)
-                ax3.set_xlabel('Time')
-                ax3.set_ylabel('Delta')
-                ax3.tick_params(axis='x', rotation=45)
-                ax3.legend(fontsize=8)
-                ax3.grid(True)
-                
-                # PE Theta
-                ax4 = fig.add_subplot(324)
-                ax4.plot(pe_data['time'], pe_data['theta'], 'r-', label=f'PE {pe_strike}')
-                ax4.set_title('PE Theta', fontsize=10)
-                ax4.set_xlabel('Time')
-                ax4.set_ylabel('Theta')
-                ax4.tick_params(axis='x', rotation=45)
-                ax4.legend(fontsize=8)
-                ax4.grid(True)
+                new_ce = df[(df['option_type'] == 'CE') & (df['strike_price'] == ce_strike)]
+                new_pe = df[(df['option_type'] == 'PE') & (df['strike_price'] == pe_strike)]
+                chart.append('ce_delta', new_ce['date_time'], new_ce['delta'])
+                chart.append('ce_theta', new_ce['date_time'], new_ce['theta'])
+                chart.append('pe_delta', new_pe['date_time'], new_pe['delta'])
+                chart.append('pe_theta', new_pe['date_time'], new_pe['theta'])
+                chart.refresh()
                 
-                fig.tight_layout()
-                
-                # Create canvas
-                canvas = FigureCanvasTkAgg(fig, graph_frame)
-                canvas.draw()
-                canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-                
-                # Generate and display analysis
-                analysis_text = tk.Text(analysis_frame, width=50, height=40, wrap=tk.WORD, 
-                                      font=("Helvetica", 11))
-                analysis_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-                
-                # Generate analysis
+                view['data'] = pd.concat([view['data'], df], ignore_index=True)
+                view['last_time'] = df['date_time'].max()
+            
+            data = view['data']
+            ce_data = data[data['option_type'] == 'CE'] if not data.empty else data
+            pe_data = data[data['option_type'] == 'PE'] if not data.empty else data
+            
+            # Generate and display analysis
+            analysis_text = view['analysis_text']
+            analysis_text.config(state=tk.NORMAL)
+            analysis_text.delete(1.0, tk.END)
+            if not ce_data.empty and not pe_data.empty:
                 analysis = self.analyze_greeks(ce_data.iloc[-1], pe_data.iloc[-1])
                 analysis_text.insert(tk.END, analysis)
-                analysis_text.config(state=tk.DISABLED)
+            analysis_text.config(state=tk.DISABLED)
                 
         except Exception as e:
-            messagebox.showerror("Error", f"Error in Greeks analysis: {str(e)}")
+            self.show_view_error(view, 'analysis_text', f"Error in Greeks analysis: {str(e)}", auto)
 
     def analyze_greeks(self, ce_data, pe_data):
         """Analyze Greeks and generate trading insights"""
@@ -2020,6 +2286,8 @@ class OptionMonitor:
         return "\n".join(analysis)
 
 if __name__ == "__main__":
+    profiler.configure_from_args()
+    metrics.serve(METRICS_PORT)
     root = ttk.Window(themename="darkly")
     app = OptionMonitor(root)
     
@@ -0,0 +1,214 @@
+"""
+Shared HTTP client for python-espncricinfo.
+
+Every request goes through one keep-alive ``requests.Session`` (connections
+are pooled per host and reused) with retries on connection errors, 429 and
+5xx responses. Successful GET responses are kept in an SQLite cache:
+
+* a cached response younger than its TTL is returned without a request,
+* an expired one is revalidated with If-None-Match / If-Modified-Since, and
+  a 304 just renews it,
+* the TTL depends on the resource: finished matches never expire, live
+  matches and scores only last seconds (see the TTL_* constants).
+
+The cache lives in ``$ESPNCRICINFO_CACHE`` (default
+``~/.cache/python-espncricinfo/http_cache.sqlite``); set it to ``off`` to
+disable caching, or install a client of your own with ``set_client``.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.retry import Retry
+
+from espncricinfo.parallel import MAX_WORKERS
+
+HEADERS = {'user-agent': 'Mozilla/5.0'}
+TIMEOUT = 30
+RETRIES = 3
+BACKOFF = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+CACHE_ENV = 'ESPNCRICINFO_CACHE'
+
+# Seconds a cached response is used without asking the server; None = forever
+TTL_FOREVER = None
+TTL_LIVE = 15
+TTL_DAY = 24 * 60 * 60
+TTL_DEFAULT = 60 * 60
+
+
+def default_cache_path():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'python-espncricinfo', 'http_cache.sqlite')
+
+
+class ResponseCache(object):
+    """
+    Response bodies and validators by URL in an SQLite file, shared by
+    every thread of the process.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('''
+        CREATE TABLE IF NOT EXISTS responses (
+            url TEXT PRIMARY KEY,
+            status INTEGER,
+            headers TEXT,
+            body BLOB,
+            fetched_at REAL,
+            expires_at REAL
+        )
+        ''')
+        self.conn.commit()
+
+    def get(self, url):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT status, headers, body, fetched_at, expires_at FROM responses WHERE url = ?",
+                (url,)).fetchone()
+        if row is None:
+            return None
+        status, headers, body, fetched_at, expires_at = row
+        return {'status': status, 'headers': json.loads(headers), 'body': body,
+                'fetched_at': fetched_at, 'expires_at': expires_at}
+
+    def put(self, url, status, headers, body, ttl):
+        now = time.time()
+        expires_at = None if ttl is TTL_FOREVER else now + ttl
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                              (url, status, json.dumps(dict(headers)), body, now, expires_at))
+
+    def renew(self, url, ttl):
+        now = time.time()
+        expires_at = None if ttl is TTL_FOREVER else now + ttl
+        with self.lock, self.conn:
+            self.conn.execute("UPDATE responses SET fetched_at = ?, expires_at = ? WHERE url = ?",
+                              (now, expires_at, url))
+
+    def clear(self):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM responses")
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def make_response(url, status, headers, body):
+    """A ``requests.Response`` holding an already read response"""
+    response = requests.Response()
+    response.url = url
+    response.status_code = status
+    response.headers = CaseInsensitiveDict(headers)
+    response._content = body
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    return response
+
+
+def cached_response(url, entry):
+    """A ``requests.Response`` rebuilt from a cache entry"""
+    response = make_response(url, entry['status'], entry['headers'], entry['body'])
+    response.from_cache = True
+    return response
+
+
+def is_fresh(entry):
+    return entry is not None and (entry['expires_at'] is None or entry['expires_at'] > time.time())
+
+
+def conditional_headers(entry, headers=None):
+    """``headers`` plus the validators of a stale cache entry"""
+    request_headers = dict(headers or {})
+    if entry is not None:
+        if entry['headers'].get('ETag'):
+            request_headers['If-None-Match'] = entry['headers']['ETag']
+        if entry['headers'].get('Last-Modified'):
+            request_headers['If-Modified-Since'] = entry['headers']['Last-Modified']
+    return request_headers
+
+
+def store_response(cache, url, response, ttl):
+    """Cache a fresh 200 response for its TTL"""
+    if response.status_code != 200:
+        return
+    lifetime = ttl(response) if callable(ttl) else ttl
+    if lifetime is TTL_FOREVER or lifetime > 0:
+        kept = {k: v for k, v in response.headers.items()
+                if k.lower() in ('content-type', 'etag', 'last-modified')}
+        cache.put(url, response.status_code, kept, response.content, lifetime)
+
+
+class HttpClient(object):
+
+    def __init__(self, cache=None, retries=RETRIES, timeout=TIMEOUT, pool_size=MAX_WORKERS):
+        self.cache = cache
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        retry = Retry(total=retries, backoff_factor=BACKOFF, status_forcelist=RETRY_STATUSES,
+                      allowed_methods=frozenset(['GET']), raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def get(self, url, headers=None, ttl=TTL_DEFAULT):
+        """
+        GET ``url`` through the cache. ``ttl`` is seconds, ``TTL_FOREVER``, or
+        a function of the fresh response returning either (so the lifetime
+        can depend on the content, e.g. whether a match has finished).
+        """
+        entry = self.cache.get(url) if self.cache else None
+        if is_fresh(entry):
+            return cached_response(url, entry)
+
+        response = self.session.get(url, headers=conditional_headers(entry, headers), timeout=self.timeout)
+
+        if response.status_code == 304 and entry is not None:
+            cached = cached_response(url, entry)
+            self.cache.renew(url, ttl(cached) if callable(ttl) else ttl)
+            return cached
+        if self.cache:
+            store_response(self.cache, url, response, ttl)
+        response.from_cache = False
+        return response
+
+    def close(self):
+        self.session.close()
+        if self.cache:
+            self.cache.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """The package-wide client, created on first use"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            path = os.environ.get(CACHE_ENV) or default_cache_path()
+            _client = HttpClient(None if path.lower() == 'off' else ResponseCache(path))
+        return _client
+
+
+def set_client(client):
+    """Use ``client`` for every later request (e.g. without a cache, or in tests)"""
+    global _client
+    with _client_lock:
+        _client = client
+
+
+def get(url, headers=None, ttl=TTL_DEFAULT):
+    return get_client().get(url, headers=headers, ttl=ttl)
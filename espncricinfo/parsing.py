@@ -0,0 +1,58 @@
+"""
+Targeted extraction from ESPNCricinfo pages.
+
+Match pages are large and only two things are read from them: the
+``__NEXT_DATA__`` JSON blob and, on fixture pages, the Scorecard links.
+Both are pulled out with a regex or lxml instead of building a full
+BeautifulSoup tree, which falls back in when the fast path finds nothing.
+See benchmarks/parse.py for the timings.
+"""
+import json
+import re
+
+import lxml.html
+from bs4 import BeautifulSoup
+
+NEXT_DATA = re.compile(rb'<script[^>]*\bid=["\']__NEXT_DATA__["\'][^>]*>(.*?)</script>', re.S | re.I)
+# Position of the data script in older pages without the id
+LEGACY_SCRIPT_INDEX = 15
+
+
+def _as_bytes(page):
+    return page.encode('utf-8') if isinstance(page, str) else page
+
+
+def next_data(page):
+    """The page's ``__NEXT_DATA__`` JSON, or None"""
+    match = NEXT_DATA.search(_as_bytes(page))
+    if match:
+        try:
+            return json.loads(match.group(1))
+        except ValueError:
+            pass
+    return next_data_soup(page)
+
+
+def next_data_soup(page):
+    """BeautifulSoup fallback for ``next_data``"""
+    soup = BeautifulSoup(page, 'html.parser')
+    script = soup.find('script', id='__NEXT_DATA__')
+    if script is None:
+        scripts = soup.find_all('script')
+        script = scripts[LEGACY_SCRIPT_INDEX] if len(scripts) > LEGACY_SCRIPT_INDEX else None
+    try:
+        return json.loads(script.string)
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def scorecard_match_ids(page):
+    """Match ids of the 'Scorecard' links on a fixtures page"""
+    try:
+        hrefs = lxml.html.fromstring(_as_bytes(page)).xpath("//a[@href][normalize-space(text())='Scorecard']/@href")
+    except (ValueError, lxml.etree.ParserError):
+        hrefs = []
+    if not hrefs:
+        soup = BeautifulSoup(page, 'html.parser')
+        hrefs = [a['href'] for a in soup.find_all('a', href=True, string='Scorecard')]
+    return [href.split('/', 4)[4].split('.')[0] for href in hrefs]
@@ -1,34 +1,44 @@
-import requests
 from bs4 import BeautifulSoup
+from espncricinfo import client
 from espncricinfo.exceptions import MatchNotFoundError, NoSeriesError
+from espncricinfo.parallel import MAX_WORKERS, fetch_all
 
 class Series(object):
 
-    def __init__(self, series_id):
-        self.series_id = series_id
-        self.json_url = "http://core.espnuk.org/v2/sports/cricket/leagues/{0}/".format(str(series_id))
-        self.events_url = "http://core.espnuk.org/v2/sports/cricket/leagues/{0}/events".format(str(series_id))
-        self.seasons_url = "http://core.espnuk.org/v2/sports/cricket/leagues/{0}/seasons".format(str(series_id))
-        self.headers = {'user-agent': 'Mozilla/5.0'}
+    def __init__(self, series_id, max_workers=MAX_WORKERS):
+        self._set_urls(series_id, max_workers)
         self.json = self.get_json(self.json_url)
         self.seasons = self._get_seasons()
         self.years = self._get_years_from_seasons()
         if self.json:
-            self.name = self.json['name']
-            self.short_name = self.json['shortName']
-            self.abbreviation = self.json['abbreviation']
-            self.slug = self.json['slug']
-            self.is_tournament = self.json['isTournament']
-            self.url = self.json['links'][0]['href']
+            self._set_fields()
             self.events_json = self._get_events()
 
         if self.events_json:
             self.events = self._build_events()
 
+    def _set_urls(self, series_id, max_workers=MAX_WORKERS):
+        self.series_id = series_id
+        self.max_workers = max_workers
+        self.json_url = "http://core.espnuk.org/v2/sports/cricket/leagues/{0}/".format(str(series_id))
+        self.events_url = "http://core.espnuk.org/v2/sports/cricket/leagues/{0}/events".format(str(series_id))
+        self.seasons_url = "http://core.espnuk.org/v2/sports/cricket/leagues/{0}/seasons".format(str(series_id))
+        self.headers = {'user-agent': 'Mozilla/5.0'}
+
+    def _set_fields(self):
+        self.name = self.json['name']
+        self.short_name = self.json['shortName']
+        self.abbreviation = self.json['abbreviation']
+        self.slug = self.json['slug']
+        self.is_tournament = self.json['isTournament']
+        self.url = self.json['links'][0]['href']
+
     def get_json(self, url):
-        r = requests.get(url,headers=self.headers)
+        return self._json_from(client.get(url, headers=self.headers), url)
+
+    def _json_from(self, r, url):
         if r.status_code == 404:
-            raise "Not Found"
+            raise NoSeriesError(url)
         else:
             return r.json()
 
@@ -39,7 +49,9 @@ class Series(object):
         return self.name
 
     def _get_seasons(self):
-        season_json = self.get_json(self.seasons_url)
+        return self._seasons_from(self.get_json(self.seasons_url))
+
+    def _seasons_from(self, season_json):
         if season_json:
             return [x['$ref'] for x in season_json['items']]
         else:
@@ -49,14 +61,19 @@ class Series(object):
         return [x.split('/')[9] for x in self.seasons]
 
     def _get_events(self):
-        events_json = self.get_json(self.events_url)
+        return self._events_from(self.get_json(self.events_url))
+
+    def _events_from(self, events_json):
         if events_json:
             return [x for x in events_json['items']]
         else:
             return None
 
     def _build_events(self):
-        events = []
-        for event in self.events_json:
-            events.append(self.get_json(event['$ref']))
+        """
+        Event JSON in the order of ``events_json``, downloaded concurrently.
+        Events that fail to load are left out and their errors kept in
+        ``self.errors`` ($ref -> exception).
+        """
+        events, self.errors = fetch_all(self.get_json, [event['$ref'] for event in self.events_json], self.max_workers)
         return events
@@ -0,0 +1,126 @@
+"""
+Record and replay HTTP responses, for tests and benchmarks without a network.
+
+Both are ``requests`` transport adapters mounted on the shared client's
+session, so the code under test runs unchanged:
+
+    # once, online: save every response to fixtures/
+    client.set_client(recording_client('fixtures'))
+    Match('857713').description
+
+    # offline, deterministic, optionally with 50 ms of simulated latency
+    client.set_client(replay_client('fixtures', latency=0.05))
+
+A fixture is one JSON file per URL (named by a hash of it) holding the URL,
+status, headers and body.
+"""
+import base64
+import hashlib
+import json
+import os
+import time
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from espncricinfo.client import HttpClient
+
+
+class FixtureNotFoundError(requests.ConnectionError):
+    """
+    Exception raised when replaying a URL that was never recorded.
+    """
+    pass
+
+
+def fixture_path(directory, url):
+    return os.path.join(directory, hashlib.sha1(url.encode('utf-8')).hexdigest()[:20] + '.json')
+
+
+def write_fixture(directory, url, status, headers, body):
+    os.makedirs(directory, exist_ok=True)
+    fixture = {'url': url, 'status': status, 'headers': dict(headers)}
+    try:
+        fixture['body'] = body.decode('utf-8')
+    except UnicodeDecodeError:
+        fixture['body_base64'] = base64.b64encode(body).decode('ascii')
+    with open(fixture_path(directory, url), 'w') as fh:
+        json.dump(fixture, fh, indent=1)
+
+
+def read_fixture(directory, url):
+    try:
+        with open(fixture_path(directory, url)) as fh:
+            fixture = json.load(fh)
+    except FileNotFoundError:
+        return None
+    if 'body_base64' in fixture:
+        fixture['body'] = base64.b64decode(fixture['body_base64'])
+    else:
+        fixture['body'] = fixture['body'].encode('utf-8')
+    return fixture
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Sends requests as usual and saves every response under ``directory``"""
+
+    def __init__(self, directory, **kwargs):
+        super(RecordingAdapter, self).__init__(**kwargs)
+        self.directory = directory
+
+    def send(self, request, **kwargs):
+        response = super(RecordingAdapter, self).send(request, **kwargs)
+        # Read the body now so it is stored whole
+        body = response.content
+        headers = {k: v for k, v in response.headers.items()
+                   if k.lower() not in ('content-encoding', 'transfer-encoding', 'content-length')}
+        write_fixture(self.directory, request.url, response.status_code, headers, body)
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """Answers requests from recorded fixtures, waiting ``latency`` seconds each"""
+
+    def __init__(self, directory, latency=0.0):
+        super(ReplayAdapter, self).__init__()
+        self.directory = directory
+        self.latency = latency
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append(request.url)
+        fixture = read_fixture(self.directory, request.url)
+        if fixture is None:
+            raise FixtureNotFoundError("No fixture for {0} in {1}".format(request.url, self.directory),
+                                       request=request)
+        if self.latency:
+            time.sleep(self.latency)
+        response = requests.Response()
+        response.status_code = fixture['status']
+        response.headers = CaseInsensitiveDict(fixture['headers'])
+        response._content = fixture['body']
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.reason = 'Replayed'
+        return response
+
+    def close(self):
+        pass
+
+
+def _mount(http_client, adapter):
+    http_client.session.mount('http://', adapter)
+    http_client.session.mount('https://', adapter)
+    return http_client
+
+
+def recording_client(directory, cache=None):
+    """An HttpClient that records everything it fetches into ``directory``"""
+    return _mount(HttpClient(cache), RecordingAdapter(directory))
+
+
+def replay_client(directory, latency=0.0, cache=None):
+    """An HttpClient that only serves recorded fixtures from ``directory``"""
+    return _mount(HttpClient(cache), ReplayAdapter(directory, latency))
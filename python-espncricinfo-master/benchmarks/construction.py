@@ -0,0 +1,121 @@
+"""
+Construction time of Match, Summary, Series and Player, fully offline.
+
+Responses are replayed from fixtures (see espncricinfo.transport) with a
+simulated network latency, so the numbers show how many round trips each
+path costs and how much of it is parsing:
+
+    python benchmarks/construction.py                       # synthetic fixtures
+    python benchmarks/construction.py --latency 0.1 --matches 50
+    python benchmarks/construction.py --fixtures fixtures --match-ids 857713
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from espncricinfo import client
+from espncricinfo.match import Match
+from espncricinfo.player import Player
+from espncricinfo.series import Series
+from espncricinfo.summary import Summary
+from espncricinfo.transport import replay_client, write_fixture
+
+from parse import synthetic_page
+
+SERIES_ID = 9
+PLAYER_ID = 277916
+JSON = {'Content-Type': 'application/json'}
+
+
+def match_json(match_id):
+    return {'description': 'Team {0} v Team {1}'.format(match_id, match_id + 1),
+            'series': [{'series_name': 'Synthetic League', 'core_recreation_id': str(SERIES_ID)}],
+            'match': {'match_status': 'complete', 'international_class_card': 'Twenty20',
+                      'toss_winner_team_id': '1'},
+            'team': [{'team_id': '1', 'team_abbreviation': 'A', 'player': []},
+                     {'team_id': '2', 'team_abbreviation': 'B', 'player': []}],
+            'innings': []}
+
+
+def write_synthetic(directory, matches):
+    """Fixtures for ``matches`` match ids, one series, one player and the live feed"""
+    def put(url, body, headers=JSON):
+        write_fixture(directory, url, 200, headers, body if isinstance(body, bytes) else json.dumps(body).encode())
+
+    match_ids = list(range(1000, 1000 + matches))
+    page = synthetic_page()
+    for match_id in match_ids:
+        put("https://www.espncricinfo.com/matches/engine/match/{0}.json".format(match_id), match_json(match_id))
+        put("https://www.espncricinfo.com/matches/engine/match/{0}.html".format(match_id), page,
+            {'Content-Type': 'text/html; charset=utf-8'})
+    items = ''.join('<item><link>http://www.cricinfo.com/ci/engine/match/{0}.html</link></item>'.format(m)
+                    for m in match_ids)
+    put("http://static.cricinfo.com/rss/livescores.xml", '<rss><channel>{0}</channel></rss>'.format(items).encode(),
+        {'Content-Type': 'text/xml'})
+
+    base = "http://core.espnuk.org/v2/sports/cricket/leagues/{0}/".format(SERIES_ID)
+    put(base, {'name': 'Synthetic League', 'shortName': 'SL', 'abbreviation': 'SL', 'slug': 'sl',
+               'isTournament': True, 'links': [{'href': 'u'}]})
+    put(base + 'seasons', {'items': [{'$ref': base + 'seasons/2024'}]})
+    put(base + 'events', {'items': [{'$ref': base + 'events/{0}'.format(m)} for m in match_ids]})
+    for match_id in match_ids:
+        put(base + 'events/{0}'.format(match_id), {'id': str(match_id)})
+
+    put("https://www.espncricinfo.com/player/player-name-{0}".format(PLAYER_ID), b'<html></html>',
+        {'Content-Type': 'text/html'})
+    put("http://core.espnuk.org/v2/sports/cricket/athletes/{0}".format(PLAYER_ID),
+        {'name': 'A Player', 'firstName': 'A', 'fullName': 'A Player', 'dateOfBirth': None, 'age': 30,
+         'position': 'Batter', 'style': []})
+    put("https://hs-consumer-api.espncricinfo.com/v1/pages/player/home?playerId={0}".format(PLAYER_ID),
+        {'content': {'teams': []}})
+    return match_ids
+
+
+def timed(label, fn, requests_before):
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    adapter = client.get_client().session.get_adapter('https://')
+    print("{0:<44} {1:>8.1f} ms  {2:>4} requests".format(label, elapsed * 1000,
+                                                        len(adapter.requests) - requests_before))
+    return len(adapter.requests)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--fixtures', help="Recorded fixture directory (default: synthetic fixtures)")
+    parser.add_argument('--match-ids', nargs='*', type=int, help="Match ids recorded in --fixtures")
+    parser.add_argument('--matches', type=int, default=20, help="Synthetic matches")
+    parser.add_argument('--latency', type=float, default=0.05, help="Seconds added to every response")
+    args = parser.parse_args(argv)
+
+    directory = args.fixtures or tempfile.mkdtemp()
+    try:
+        match_ids = args.match_ids if args.fixtures else write_synthetic(directory, args.matches)
+        client.set_client(replay_client(directory, latency=args.latency))
+        print("{0} matches, {1:.0f} ms per response".format(len(match_ids), args.latency * 1000))
+        n = 0
+        n = timed("Match() x{0}".format(len(match_ids)), lambda: [Match(m) for m in match_ids], n)
+        n = timed("Match().description x{0}".format(len(match_ids)),
+                  lambda: [Match(m).description for m in match_ids], n)
+        n = timed("Match().comms_json x{0}".format(len(match_ids)),
+                  lambda: [Match(m).comms_json for m in match_ids], n)
+        n = timed("Match.get().description (registry miss)", lambda: [Match.get(m).description for m in match_ids], n)
+        n = timed("Match.get().description (registry hit)", lambda: [Match.get(m).description for m in match_ids], n)
+        if not args.fixtures:
+            n = timed("Summary()", Summary, n)
+            n = timed("Series() with {0} events".format(len(match_ids)), lambda: Series(SERIES_ID), n)
+            n = timed("Player()", lambda: Player(PLAYER_ID), n)
+    finally:
+        if not args.fixtures:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
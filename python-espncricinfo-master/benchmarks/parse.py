@@ -0,0 +1,58 @@
+"""
+Parse time of the match page extractors against a full BeautifulSoup parse.
+
+    python benchmarks/parse.py                      # synthetic match page
+    python benchmarks/parse.py fixtures/*.html      # recorded pages
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bs4 import BeautifulSoup
+
+from espncricinfo import parsing
+
+
+def synthetic_page(balls=1200, scripts=20):
+    """A match-page-sized document: markup, scripts and a large __NEXT_DATA__"""
+    data = {'props': {'pageProps': {'data': {'pageData': {'content': {
+        'comments': [{'id': i, 'oversActual': i / 6, 'text': 'Short of a length, defended ' * 4}
+                     for i in range(balls)]}}}}}}
+    body = ''.join('<div class="ds-row"><span>{0}</span><a href="/x/{0}">link</a></div>'.format(i)
+                   for i in range(3000))
+    head = ''.join('<script src="/static/{0}.js"></script>'.format(i) for i in range(scripts))
+    return ('<html><head>{0}</head><body>{1}<script id="__NEXT_DATA__" type="application/json">{2}'
+            '</script></body></html>').format(head, body, json.dumps(data)).encode('utf-8')
+
+
+def soup_next_data(page):
+    soup = BeautifulSoup(page, 'html.parser')
+    return json.loads(soup.find('script', id='__NEXT_DATA__').string)
+
+
+def bench(label, page, repeat):
+    fast = min(timeit.repeat(lambda: parsing.next_data(page), number=1, repeat=repeat))
+    soup = min(timeit.repeat(lambda: soup_next_data(page), number=1, repeat=repeat))
+    print("{0:<40} {1:>8.0f} KB  regex {2:>8.2f} ms  soup {3:>8.2f} ms  {4:>6.1f}x".format(
+        label[-40:], len(page) / 1024, fast * 1000, soup * 1000, soup / fast))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('pages', nargs='*', help="Recorded match pages (default: a synthetic one)")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+    if args.pages:
+        for path in args.pages:
+            with open(path, 'rb') as fh:
+                bench(path, fh.read(), args.repeat)
+    else:
+        bench('synthetic match page', synthetic_page(), args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,373 @@
+"""
+asyncio counterparts of Match, Series, Player and Summary.
+
+The synchronous classes block while they download. Here each class is
+built with an awaitable ``fetch``; the result is an ordinary Match (Series,
+Player, Summary) with its data already loaded, so every attribute and the
+parsing behind it is shared with the synchronous API:
+
+    async with AsyncClient() as http:
+        match = await AsyncMatch.fetch('1384439', client=http)
+        print(match.description, match.status)
+        async for ball in match.live_commentary(innings=2):
+            ...
+
+One AsyncClient is one aiohttp session. Connections are pooled and kept
+alive (at most ``limit`` open, ``limit_per_host`` to one host) and at most
+``limit`` requests are in flight, so dozens of live matches can be followed
+with ``asyncio.gather`` on one event loop without flooding the site.
+Responses go through the same SQLite cache and TTLs as the synchronous
+client.
+
+Needs aiohttp: ``pip install python-espncricinfo[async]``.
+"""
+import asyncio
+import time
+import weakref
+
+import aiohttp
+
+from espncricinfo import client as sync_client
+from espncricinfo.client import (BACKOFF, HEADERS, RETRIES, RETRY_STATUSES, TIMEOUT, TTL_DAY, TTL_DEFAULT,
+                                 TTL_LIVE, cached_response, conditional_headers, is_fresh, make_response,
+                                 store_response)
+from espncricinfo.commentary import POLL_INTERVAL, ball_id, parse_page
+from espncricinfo.match import Match, lazy_property, match_json_ttl
+from espncricinfo.parallel import MAX_WORKERS
+from espncricinfo.player import Player
+from espncricinfo.series import Series
+from espncricinfo.summary import Summary
+from espncricinfo.transport import FixtureNotFoundError, read_fixture
+
+
+class AsyncClient(object):
+
+    def __init__(self, cache=None, limit=MAX_WORKERS, limit_per_host=MAX_WORKERS, retries=RETRIES,
+                 timeout=TIMEOUT):
+        self.cache = cache
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.retries = retries
+        self.timeout = timeout
+        self.session = None
+        self.semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def _session(self):
+        # Created on first use, inside the event loop it belongs to
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host,
+                                             ttl_dns_cache=300)
+            self.session = aiohttp.ClientSession(connector=connector, headers=HEADERS,
+                                                 timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self.session
+
+    async def request(self, url, headers):
+        """(status, headers, body) of one GET, retried like HttpClient"""
+        for attempt in range(self.retries + 1):
+            try:
+                async with self._session().get(url, headers=headers) as r:
+                    body = await r.read()
+                    if r.status not in RETRY_STATUSES or attempt == self.retries:
+                        return r.status, dict(r.headers), body
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt == self.retries:
+                    raise
+            await asyncio.sleep(BACKOFF * 2 ** attempt)
+
+    async def get(self, url, headers=None, ttl=TTL_DEFAULT):
+        """
+        GET ``url`` through the cache; the same contract as HttpClient.get.
+        Returns a ``requests.Response`` so the synchronous parsing applies.
+        """
+        loop = asyncio.get_running_loop()
+        entry = await loop.run_in_executor(None, self.cache.get, url) if self.cache else None
+        if is_fresh(entry):
+            return cached_response(url, entry)
+
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.limit)
+        async with self.semaphore:
+            status, response_headers, body = await self.request(url, conditional_headers(entry, headers))
+
+        if status == 304 and entry is not None:
+            cached = cached_response(url, entry)
+            await loop.run_in_executor(None, self.cache.renew, url, ttl(cached) if callable(ttl) else ttl)
+            return cached
+        response = make_response(url, status, response_headers, body)
+        if self.cache:
+            await loop.run_in_executor(None, store_response, self.cache, url, response, ttl)
+        response.from_cache = False
+        return response
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+
+
+class ReplayAsyncClient(AsyncClient):
+    """An AsyncClient that only serves fixtures recorded by ``transport``"""
+
+    def __init__(self, directory, latency=0.0, cache=None, limit=MAX_WORKERS):
+        super(ReplayAsyncClient, self).__init__(cache, limit)
+        self.directory = directory
+        self.latency = latency
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def request(self, url, headers):
+        self.requests.append(url)
+        fixture = read_fixture(self.directory, url)
+        if fixture is None:
+            raise FixtureNotFoundError("No fixture for {0} in {1}".format(url, self.directory))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        return fixture['status'], fixture['headers'], fixture['body']
+
+
+# One default client per event loop, since a session cannot change loops
+_clients = weakref.WeakKeyDictionary()
+
+
+def get_client():
+    """The running loop's default AsyncClient, sharing the synchronous client's cache"""
+    loop = asyncio.get_running_loop()
+    http = _clients.get(loop)
+    if http is None:
+        http = _clients[loop] = AsyncClient(sync_client.get_client().cache)
+    return http
+
+
+def set_client(http):
+    """Use ``http`` for every later request made on the running loop"""
+    _clients[asyncio.get_running_loop()] = http
+
+
+async def close():
+    """Close the running loop's default client"""
+    http = _clients.pop(asyncio.get_running_loop(), None)
+    if http is not None:
+        await http.close()
+
+
+async def gather_all(func, items):
+    """
+    Await ``func(item)`` for every item concurrently. Returns ``(results,
+    errors)`` like ``parallel.fetch_all``: results in the order of
+    ``items``, and each failed item mapped to its exception.
+    """
+    items = list(items)
+    outcomes = await asyncio.gather(*(func(item) for item in items), return_exceptions=True)
+    results = []
+    errors = {}
+    for item, outcome in zip(items, outcomes):
+        if isinstance(outcome, asyncio.CancelledError):
+            raise outcome
+        if isinstance(outcome, Exception):
+            errors[item] = outcome
+        else:
+            results.append(outcome)
+    return results, errors
+
+
+def _not_fetched(name):
+    def fail(self):
+        raise RuntimeError("{0} of {1!r} is not loaded; await fetch() or load_page() first".format(name, self))
+    return fail
+
+
+class AsyncMatch(Match):
+    """
+    A Match whose downloads are awaited. ``fetch`` loads the match JSON, so
+    every JSON attribute is then computed without I/O; ``load_page`` (or
+    ``fetch(..., page=True)``) adds the match page behind ``comms_json``,
+    ``html``, ``rosters``, ``all_innings`` and the scorecard indexes.
+    Reading either before it is loaded raises RuntimeError instead of
+    blocking the event loop.
+    """
+
+    json = lazy_property(_not_fetched('json'))
+    page = lazy_property(_not_fetched('page'))
+
+    def __init__(self, match_id, client=None):
+        super(AsyncMatch, self).__init__(match_id)
+        self.client = client or get_client()
+
+    @classmethod
+    async def fetch(cls, match_id, client=None, page=False):
+        match = cls(match_id, client)
+        await match.refresh()
+        if page:
+            await match.load_page()
+        return match
+
+    def _forget(self):
+        """Drop every downloaded or computed attribute"""
+        for name in [name for name in self.__dict__ if isinstance(getattr(type(self), name, None), lazy_property)]:
+            del self.__dict__[name]
+
+    async def refresh(self):
+        """
+        Download the match JSON again (live matches: at most every TTL_LIVE
+        seconds), and the match page too if it had been loaded, so the
+        scorecard attributes follow the match as well.
+        """
+        r = await self.client.get(self.json_url, headers=self.headers, ttl=match_json_ttl)
+        json = self._json_from(r)
+        page = await self._get_page() if 'page' in self.__dict__ else None
+        self._forget()
+        self.json = json
+        self.loaded_at = time.monotonic()
+        if page is not None:
+            self.page = page
+
+    async def _get_page(self):
+        r = await self.client.get(self.match_url, headers=self.headers, ttl=lambda r: self._cache_ttl())
+        return self._page_from(r)
+
+    async def load_page(self):
+        self.page = await self._get_page()
+
+    async def _comments(self, innings, page, ttl):
+        r = await self.client.get(self.innings_comms_url(innings, page), headers=self.headers, ttl=ttl)
+        r.raise_for_status()
+        return parse_page(r.json(), page)
+
+    async def commentary(self, innings=1):
+        """Every ball of ``innings``, page by page, prefetching the next page"""
+        ttl = lambda r: self._cache_ttl()
+        pending = asyncio.ensure_future(self._comments(innings, 1, ttl))
+        try:
+            while pending is not None:
+                comments, next_page = await pending
+                pending = None if next_page is None else asyncio.ensure_future(
+                    self._comments(innings, next_page, ttl))
+                for comment in comments:
+                    yield comment
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    async def _new_balls(self, innings, seen):
+        """``commentary.new_balls`` on the event loop"""
+        fresh = []
+        page = 1
+        while page is not None:
+            comments, page = await self._comments(innings, page, ttl=0)
+            unseen = [c for c in comments if ball_id(c) not in seen]
+            fresh.extend(unseen)
+            if len(unseen) < len(comments):
+                break
+        fresh.reverse()
+        return fresh
+
+    async def live_commentary(self, innings=1, interval=POLL_INTERVAL, since=None, max_polls=None):
+        """
+        New balls of a live innings as they arrive, as ``poll_innings``
+        does. The match JSON is refreshed after every poll, so the other
+        attributes follow the match too.
+        """
+        seen = set(since or ())
+        polls = 0
+        while max_polls is None or polls < max_polls:
+            polls += 1
+            for comment in await self._new_balls(innings, seen):
+                seen.add(ball_id(comment))
+                yield comment
+            await self.refresh()
+            if self.status != 'current':
+                for comment in await self._new_balls(innings, seen):
+                    yield comment
+                return
+            await asyncio.sleep(interval)
+
+
+class AsyncSeries(Series):
+
+    @classmethod
+    async def fetch(cls, series_id, client=None):
+        """
+        The series, its seasons and its event list are requested together,
+        then every event concurrently. Events that fail to load are left
+        out and listed in ``errors``.
+        """
+        series = cls.__new__(cls)
+        series._set_urls(series_id)
+        series.client = client or get_client()
+        series.json, season_json, events_json = await asyncio.gather(
+            series._get(series.json_url), series._get(series.seasons_url), series._get(series.events_url))
+        series.seasons = series._seasons_from(season_json)
+        series.years = series._get_years_from_seasons()
+        if series.json:
+            series._set_fields()
+            series.events_json = series._events_from(events_json)
+
+        if series.events_json:
+            series.events, series.errors = await gather_all(
+                series._get, [event['$ref'] for event in series.events_json])
+        return series
+
+    async def _get(self, url):
+        return self._json_from(await self.client.get(url, headers=self.headers), url)
+
+
+class AsyncPlayer(Player):
+
+    @classmethod
+    async def fetch(cls, player_id, client=None):
+        player = cls.__new__(cls)
+        player._set_urls(player_id)
+        player.client = client or get_client()
+        html, json, new_json = await asyncio.gather(*(
+            player.client.get(url, headers=player.headers, ttl=TTL_DAY)
+            for url in (player.url, player.json_url, player.new_json_url)))
+        player.parsed_html = player._html_from(html)
+        player.json = player._json_from(json)
+        player.new_json = player._json_from(new_json)
+        player._set_fields()
+        return player
+
+    async def _match(self, match_id):
+        return await AsyncMatch.fetch(match_id, self.client, page=True)
+
+    async def in_team_for_match(self, match_id):
+        return self.cricinfo_id in (await self._match(match_id)).player_ids
+
+    async def batting_for_match(self, match_id):
+        match = await self._match(match_id)
+        return [dict(stats) for stats in match.batting_index.get(self.cricinfo_id, [])]
+
+    async def bowling_for_match(self, match_id):
+        match = await self._match(match_id)
+        return [dict(stats) for stats in match.bowling_index.get(self.cricinfo_id, [])]
+
+
+class AsyncSummary(Summary):
+
+    @classmethod
+    async def fetch(cls, client=None):
+        """
+        The live scores feed and the JSON of every match in it, fetched
+        concurrently. Matches that fail to load are left out and listed in
+        ``errors``.
+        """
+        summary = cls.__new__(cls)
+        summary._set_urls()
+        summary.client = client or get_client()
+        summary.xml = summary._xml_from(await summary.client.get(summary.url, headers=summary.headers,
+                                                                 ttl=TTL_LIVE))
+        summary.match_ids = summary._match_ids()
+        summary.matches, summary.errors = await gather_all(
+            lambda match_id: AsyncMatch.fetch(match_id, summary.client), summary.match_ids)
+        return summary
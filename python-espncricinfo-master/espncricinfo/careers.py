@@ -0,0 +1,119 @@
+"""
+Career statistics for many players in one call.
+
+``Player.get_career_averages`` and friends scrape one stats page each and
+write its rows as raw text. ``career_dataset`` fetches the pages for every
+(player, format) pair concurrently, at no more than ``rate`` requests per
+second, parses the tables with lxml into typed columns and returns one row
+list that ``write_dataset`` saves as CSV, or Parquet when pandas and pyarrow
+are installed:
+
+    rows, errors = career_dataset(['253802', '277916'], match_formats=(1, 2, 3))
+    write_dataset(rows, 'squad_careers.parquet')
+"""
+import csv
+import re
+
+import lxml.html
+
+from espncricinfo import client
+from espncricinfo.parallel import MAX_WORKERS, RateLimiter, fetch_all
+
+STATS_URL = "https://stats.espncricinfo.com/ci/engine/player/{0}.html?class={1};template=results;type={2}"
+# Position of each table on the stats page, as read by Player
+TABLES = {'averages': 2, 'summary': 3}
+REQUESTS_PER_SECOND = 4.0
+
+_INT = re.compile(r'^-?\d+$')
+_FLOAT = re.compile(r'^-?\d*\.\d+$')
+
+
+def parse_value(text):
+    """
+    Cell text as int, float or str; '-' and empty cells are None. A
+    trailing '*' (not out) is dropped from numbers.
+    """
+    text = text.strip()
+    if text in ('', '-'):
+        return None
+    number = text.rstrip('*').replace(',', '')
+    if _INT.match(number):
+        return int(number)
+    if _FLOAT.match(number):
+        return float(number)
+    return text
+
+
+def parse_stats_table(html, table='summary'):
+    """(columns, rows) of one stats page table, rows as lists of typed values"""
+    tables = lxml.html.fromstring(html).xpath('//table')
+    index = TABLES[table]
+    if len(tables) <= index:
+        return [], []
+    rows = tables[index].xpath('.//tr')
+    if not rows:
+        return [], []
+    header = [cell.text_content().strip() for cell in rows[0].xpath('./th|./td')]
+    cells = [[parse_value(cell.text_content()) for cell in row.xpath('./td')] for row in rows[1:]]
+    cells = [values for values in cells if len(values) == len(header)]
+    # Unnamed columns are row labels or links; keep them only when they hold text
+    keep = [i for i, name in enumerate(header) if name or any(values[i] is not None for values in cells)]
+    columns = [header[i] or 'column_{0}'.format(i) for i in keep]
+    data = [[values[i] for i in keep] for values in cells]
+    return columns, data
+
+
+def fetch_career(player_id, match_format=11, data_type='allround', table='summary', view=None):
+    """Rows of one player's stats table as dicts, tagged with the request"""
+    url = STATS_URL.format(player_id, match_format, data_type)
+    if view:
+        url += ";view={0}".format(view)
+    r = client.get(url, headers={'user-agent': 'Mozilla/5.0'}, ttl=client.TTL_DAY)
+    r.raise_for_status()
+    columns, data = parse_stats_table(r.content, table)
+    base = {'player_id': str(player_id), 'match_format': match_format, 'data_type': data_type}
+    return [dict(base, **dict(zip(columns, values))) for values in data]
+
+
+def career_dataset(player_ids, match_formats=(11,), data_type='allround', table='summary', view=None,
+                   max_workers=MAX_WORKERS, rate=REQUESTS_PER_SECOND):
+    """
+    One table for every player and format, fetched concurrently.
+
+    Returns ``(rows, errors)``: rows in (player, format) order and a dict of
+    (player_id, match_format) -> exception for pages that failed.
+    """
+    limiter = RateLimiter(rate)
+
+    def fetch(key):
+        limiter.wait()
+        return fetch_career(key[0], key[1], data_type, table, view)
+
+    keys = [(str(player_id), match_format) for player_id in player_ids for match_format in match_formats]
+    results, errors = fetch_all(fetch, keys, max_workers)
+    return [row for rows in results for row in rows], errors
+
+
+def dataset_columns(rows):
+    """Union of the row keys, in first-seen order"""
+    columns = {}
+    for row in rows:
+        columns.update(dict.fromkeys(row))
+    return list(columns)
+
+
+def write_dataset(rows, path):
+    """
+    Save rows as Parquet (``.parquet``, needs pandas and pyarrow) or CSV.
+    Returns the path written.
+    """
+    columns = dataset_columns(rows)
+    if path.endswith('.parquet'):
+        import pandas as pd
+        pd.DataFrame(rows, columns=columns).to_parquet(path, index=False)
+        return path
+    with open(path, 'w', newline='') as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
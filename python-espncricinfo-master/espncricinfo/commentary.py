@@ -0,0 +1,97 @@
+"""
+Ball-by-ball commentary from the hsapi comments endpoint.
+
+``stream_innings`` walks the pages of one innings and yields every comment,
+downloading the next page while the current one is being consumed.
+``poll_innings`` follows a live innings: each poll reads pages only until it
+reaches a ball it has already yielded, then yields the new balls oldest
+first.
+
+    for ball in Match.get('1384439').commentary(innings=2):
+        ...
+    for ball in Match.get('1384439').live_commentary(innings=2, interval=10):
+        ...
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from espncricinfo import client
+
+POLL_INTERVAL = 15
+# Safety limit on pages per innings (a Test innings runs to a few dozen)
+MAX_PAGES = 200
+
+
+def ball_id(comment):
+    """Stable identity of a comment across polls"""
+    return comment.get('id') or (comment.get('inningNumber'), comment.get('oversUnique'),
+                                 comment.get('ballNumber'), comment.get('text'))
+
+
+def fetch_page(match, innings, page, ttl):
+    """(comments, next page or None) of one commentary page"""
+    r = client.get(match.innings_comms_url(innings, page), headers=match.headers, ttl=ttl)
+    r.raise_for_status()
+    return parse_page(r.json(), page)
+
+
+def parse_page(data, page):
+    """(comments, next page or None) of a commentary page's JSON"""
+    comments = data.get('comments') or []
+    next_page = data.get('nextPage')
+    if next_page is None and 'nextPage' not in data and comments:
+        next_page = page + 1
+    return comments, (next_page if comments and page < MAX_PAGES else None)
+
+
+def stream_innings(match, innings=1):
+    """Yield every comment of ``innings`` page by page, prefetching the next page"""
+    ttl = lambda r: match._cache_ttl()
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        pending = pool.submit(fetch_page, match, innings, 1, ttl)
+        while pending is not None:
+            comments, next_page = pending.result()
+            pending = None if next_page is None else pool.submit(fetch_page, match, innings, next_page, ttl)
+            for comment in comments:
+                yield comment
+
+
+def new_balls(match, innings, seen):
+    """
+    Comments not in ``seen``, oldest first. Pages are newest first, so
+    reading stops at the first page holding an already seen ball.
+    """
+    fresh = []
+    page = 1
+    while page is not None:
+        # Live pages change every ball; always ask the server
+        comments, page = fetch_page(match, innings, page, ttl=0)
+        unseen = [c for c in comments if ball_id(c) not in seen]
+        fresh.extend(unseen)
+        if len(unseen) < len(comments):
+            break
+    fresh.reverse()
+    return fresh
+
+
+def poll_innings(match, innings=1, interval=POLL_INTERVAL, since=None, max_polls=None):
+    """
+    Yield new balls of a live innings as they arrive.
+
+    ``since`` is a collection of ball ids already handled (e.g. from an
+    earlier run). Polling stops once the match is no longer live (after
+    one last read for the balls that ended it), after ``max_polls``
+    polls, or when the caller stops iterating.
+    """
+    seen = set(since or ())
+    polls = 0
+    while max_polls is None or polls < max_polls:
+        polls += 1
+        for comment in new_balls(match, innings, seen):
+            seen.add(ball_id(comment))
+            yield comment
+        if match.get_json()['match']['match_status'] != 'current':
+            for comment in new_balls(match, innings, seen):
+                yield comment
+            return
+        time.sleep(interval)
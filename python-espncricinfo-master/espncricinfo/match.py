@@ -1,87 +1,102 @@
-import json
-import requests
+import threading
+import time
+from collections import OrderedDict
 from bs4 import BeautifulSoup
+from espncricinfo import client, parsing
+from espncricinfo.commentary import POLL_INTERVAL, poll_innings, stream_innings
 from espncricinfo.exceptions import MatchNotFoundError, NoScorecardError
 
+
+class lazy_property(object):
+    """
+    Attribute computed by ``func`` on first access and then stored on the
+    instance, so later reads are plain attribute lookups. With
+    ``played_only`` the attribute does not exist for dormant matches.
+    """
+
+    def __init__(self, func, played_only=False):
+        self.func = func
+        self.played_only = played_only
+        self.__doc__ = func.__doc__
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        if self.played_only and obj.status == 'dormant':
+            raise AttributeError("'{0}' is not available for dormant matches".format(self.name))
+        value = self.func(obj)
+        obj.__dict__[self.name] = value
+        return value
+
+# Matches kept by Match.get, most recently used last
+MATCH_REGISTRY_SIZE = 256
+
+# Scorecard fields -> names used in Player.batting_for_match / bowling_for_match
+BATTING_STATS = {'balls': 'balls_faced', 'minutes': 'minutes', 'runs': 'runs', 'fours': 'fours',
+                 'sixes': 'sixes', 'strikerate': 'strike_rate'}
+BOWLING_STATS = {'overs': 'overs', 'maidens': 'maidens', 'conceded': 'conceded', 'wickets': 'wickets',
+                 'economy': 'economy_rate', 'dots': 'dots', 'fours': 'fours_conceded',
+                 'sixes': 'sixes_conceded', 'wides': 'wides', 'noballs': 'no_balls'}
+
+
+def status_ttl(status):
+    """How long match data stays cached: finished matches never change"""
+    if status == 'complete':
+        return client.TTL_FOREVER
+    if status == 'current':
+        return client.TTL_LIVE
+    return client.TTL_DEFAULT
+
+
+def match_json_ttl(response):
+    try:
+        return status_ttl(response.json()['match']['match_status'])
+    except (ValueError, KeyError, TypeError):
+        # 'Scorecard not yet available' and other placeholders
+        return client.TTL_LIVE
+
+
 class Match(object):
+    """
+    A match on ESPNCricinfo. Nothing is downloaded until an attribute needs
+    it: the match JSON on first use of a JSON attribute, the match page
+    only for ``page``, ``html``, ``comms_json`` (its embedded
+    ``__NEXT_DATA__``), ``rosters`` and ``all_innings``. The page is only
+    turned into a BeautifulSoup tree when ``html`` itself is read. Each
+    attribute is computed once.
+    """
+
+    _registry = OrderedDict()
+    _registry_lock = threading.Lock()
+
+    @classmethod
+    def get(cls, match_id):
+        """
+        The process-wide Match for ``match_id``, so every caller shares
+        one set of downloads and computed attributes. Matches that are not
+        complete are rebuilt once their data is older than ``status_ttl``
+        allows, so live matches keep moving.
+        """
+        key = str(match_id)
+        with cls._registry_lock:
+            match = cls._registry.pop(key, None)
+            if match is None or match._expired():
+                match = cls(match_id)
+            cls._registry[key] = match
+            while len(cls._registry) > MATCH_REGISTRY_SIZE:
+                cls._registry.popitem(last=False)
+        return match
 
     def __init__(self, match_id):
         self.match_id = match_id
         self.match_url = "https://www.espncricinfo.com/matches/engine/match/{0}.html".format(str(match_id))
         self.json_url = "https://www.espncricinfo.com/matches/engine/match/{0}.json".format(str(match_id))
         self.headers = {'user-agent': 'Mozilla/5.0'}
-        self.json = self.get_json()
-        self.html = self.get_html()
-        self.comms_json = self.get_comms_json()
-        if self.json:
-            self.__unicode__ = self._description()
-            self.status = self._status()
-            self.match_class = self._match_class()
-            self.season = self._season()
-            self.description = self._description()
-            self.legacy_scorecard_url = self._legacy_scorecard_url()
-            self.series = self._series()
-            self.series_name = self._series_name()
-            self.series_id = self._series_id()
-            self.event_url = "http://core.espnuk.org/v2/sports/cricket/leagues/{0}/events/{1}".format(str(self.series_id), str(match_id))
-            self.details_url = self._details_url()
-            self.officials = self._officials()
-            self.current_summary = self._current_summary()
-            self.present_datetime_local = self._present_datetime_local()
-            self.present_datetime_gmt = self._present_datetime_gmt()
-            self.start_datetime_local = self._start_datetime_local()
-            self.start_datetime_gmt = self._start_datetime_gmt()
-            self.cancelled_match = self._cancelled_match()
-            self.rain_rule = self._rain_rule()
-            self.date = self._date()
-            self.continent = self._continent()
-            self.town_area = self._town_area()
-            self.town_name = self._town_name()
-            self.town_id = self._town_id()
-            self.weather_location_code = self._weather_location_code()
-            self.match_title = self._match_title()
-            self.result = self._result()
-            self.ground_id = self._ground_id()
-            self.ground_name = self._ground_name()
-            self.lighting = self._lighting()
-            self.followon = self._followon()
-            self.scheduled_overs = self._scheduled_overs()
-            self.innings_list = self._innings_list()
-            self.innings = self._innings()
-            self.latest_batting = self._latest_batting()
-            self.latest_bowling = self._latest_bowling()
-            self.latest_innings = self._latest_innings()
-            self.latest_innings_fow = self._latest_innings_fow()
-            self.team_1 = self._team_1()
-            self.team_1_id = self._team_1_id()
-            self.team_1_abbreviation = self._team_1_abbreviation()
-            self.team_1_players = self._team_1_players()
-            self.team_1_innings = self._team_1_innings()
-            self.team_1_run_rate = self._team_1_run_rate()
-            self.team_1_overs_batted = self._team_1_overs_batted()
-            self.team_1_batting_result = self._team_1_batting_result()
-            self.team_2 = self._team_2()
-            self.team_2_id = self._team_2_id()
-            self.team_2_abbreviation = self._team_2_abbreviation()
-            self.team_2_players = self._team_2_players()
-            self.team_2_innings = self._team_2_innings()
-            self.team_2_run_rate = self._team_2_run_rate()
-            self.team_2_overs_batted = self._team_2_overs_batted()
-            self.team_2_batting_result = self._team_2_batting_result()
-            if not self.status == 'dormant':
-                self.home_team = self._home_team()
-                self.batting_first = self._batting_first()
-                self.match_winner = self._match_winner()
-                self.toss_winner = self._toss_winner()
-                self.toss_decision = self._toss_decision()
-                self.toss_decision_name = self._toss_decision_name()
-                self.toss_choice_team_id = self._toss_choice_team_id()
-                self.toss_winner_team_id = self._toss_winner_team_id()
-                self.espn_api_url = self._espn_api_url()
-                # from comms_json
-                self.rosters = self._rosters()
-                self.all_innings = self._all_innings()
-
+        # time.monotonic() of the download behind the ``json`` attribute
+        self.loaded_at = None
 
     def __str__(self):
         return self.description
@@ -90,7 +105,25 @@ class Match(object):
         return (f'{self.__class__.__name__}('f'{self.match_id!r})')
 
     def get_json(self):
-        r = requests.get(self.json_url,headers=self.headers)
+        """The match JSON as the site has it now; does not change ``json``"""
+        return self._json_from(client.get(self.json_url, headers=self.headers, ttl=match_json_ttl))
+
+    def _load_json(self):
+        json = self.get_json()
+        self.loaded_at = time.monotonic()
+        return json
+
+    def _expired(self):
+        """Whether the loaded data is older than the match status allows"""
+        if self.loaded_at is None or 'json' not in self.__dict__:
+            return False
+        try:
+            ttl = status_ttl(self.status)
+        except (KeyError, TypeError):
+            return True
+        return ttl is not client.TTL_FOREVER and time.monotonic() - self.loaded_at > ttl
+
+    def _json_from(self, r):
         if r.status_code == 404:
             raise MatchNotFoundError
         elif 'Scorecard not yet available' in r.text:
@@ -98,12 +131,25 @@ class Match(object):
         else:
             return r.json()
 
-    def get_html(self):
-        r = requests.get(self.match_url,headers=self.headers)
+    def get_page(self):
+        """Raw match page; parsed only by what needs it"""
+        return self._page_from(client.get(self.match_url, headers=self.headers, ttl=lambda r: self._cache_ttl()))
+
+    def _page_from(self, r):
         if r.status_code == 404:
             raise MatchNotFoundError
         else:
-            return BeautifulSoup(r.text, 'html.parser')
+            return r.content
+
+    def get_html(self):
+        return BeautifulSoup(self.page, 'html.parser')
+
+    json = lazy_property(_load_json)
+    page = lazy_property(get_page)
+    html = lazy_property(get_html)
+
+    def _cache_ttl(self):
+        return status_ttl(self.status)
 
     def match_json(self):
         return self.json['match']
@@ -111,12 +157,18 @@ class Match(object):
     def innings_comms_url(self, innings=1, page=1):
         return f"https://hsapi.espncricinfo.com/v1/pages/match/comments?lang=en&leagueId={self.series_id}&eventId={self.match_id}&period={innings}&page={page}&filter=full&liveTest=false"
 
+    def commentary(self, innings=1):
+        """Every ball of ``innings``, streamed page by page (see commentary.py)"""
+        return stream_innings(self, innings)
+
+    def live_commentary(self, innings=1, interval=POLL_INTERVAL, since=None, max_polls=None):
+        """New balls of a live innings as they arrive (see commentary.py)"""
+        return poll_innings(self, innings, interval, since, max_polls)
+
     def get_comms_json(self):
-        try:
-            text = self.html.find_all('script')[15].string
-            return json.loads(text)
-        except:
-            return None
+        return parsing.next_data(self.page)
+
+    comms_json = lazy_property(get_comms_json)
 
     def _espn_api_url(self):
         return "https://site.api.espn.com/apis/site/v2/sports/cricket/{0}/summary?event={1}".format(self.series_id, self.match_id)
@@ -124,6 +176,9 @@ class Match(object):
     def _legacy_scorecard_url(self):
         return "https://static.espncricinfo.com"+self.match_json()['legacy_url']
 
+    def _event_url(self):
+        return "http://core.espnuk.org/v2/sports/cricket/leagues/{0}/events/{1}".format(str(self.series_id), str(self.match_id))
+
     def _details_url(self, page=1, number=1000):
         return self.event_url+"/competitions/{0}/details?page_size={1}&page={2}".format(str(self.match_id), str(number), str(page))
 
@@ -426,12 +481,115 @@ class Match(object):
         except:
             return None
 
+    def _scorecard_innings(self):
+        """(innings number, innings) pairs of the comms scorecard"""
+        innings = self._all_innings() if self.comms_json else None
+        if isinstance(innings, dict):
+            return list(innings.items())
+        if isinstance(innings, list):
+            return [(str(inn.get('inningNumber', i + 1)), inn) for i, inn in enumerate(innings)]
+        return []
+
+    def _stats_index(self, key, fields):
+        """{player object id: [per-innings stats dict]} for batsmen or bowlers"""
+        index = {}
+        for innings, inn in self._scorecard_innings():
+            for entry in inn.get(key) or []:
+                player = entry.get('player') or {}
+                player_id = player.get('objectId', player.get('id'))
+                if player_id is None:
+                    continue
+                stats = {'innings': innings}
+                stats.update((name, entry.get(field)) for field, name in fields.items())
+                index.setdefault(str(player_id), []).append(stats)
+        return index
+
+    def _batting_index(self):
+        return self._stats_index('inningBatsmen', BATTING_STATS)
+
+    def _bowling_index(self):
+        return self._stats_index('inningBowlers', BOWLING_STATS)
+
+    def _player_ids(self):
+        return {str(p.get('object_id')) for p in self.team_1_players + self.team_2_players}
+
+    # Public attributes, each computed from its _method on first access
+    status = lazy_property(_status)
+    match_class = lazy_property(_match_class)
+    season = lazy_property(_season)
+    description = lazy_property(_description)
+    legacy_scorecard_url = lazy_property(_legacy_scorecard_url)
+    series = lazy_property(_series)
+    series_name = lazy_property(_series_name)
+    series_id = lazy_property(_series_id)
+    event_url = lazy_property(_event_url)
+    details_url = lazy_property(_details_url)
+    officials = lazy_property(_officials)
+    current_summary = lazy_property(_current_summary)
+    present_datetime_local = lazy_property(_present_datetime_local)
+    present_datetime_gmt = lazy_property(_present_datetime_gmt)
+    start_datetime_local = lazy_property(_start_datetime_local)
+    start_datetime_gmt = lazy_property(_start_datetime_gmt)
+    cancelled_match = lazy_property(_cancelled_match)
+    rain_rule = lazy_property(_rain_rule)
+    date = lazy_property(_date)
+    continent = lazy_property(_continent)
+    town_area = lazy_property(_town_area)
+    town_name = lazy_property(_town_name)
+    town_id = lazy_property(_town_id)
+    weather_location_code = lazy_property(_weather_location_code)
+    match_title = lazy_property(_match_title)
+    result = lazy_property(_result)
+    ground_id = lazy_property(_ground_id)
+    ground_name = lazy_property(_ground_name)
+    lighting = lazy_property(_lighting)
+    followon = lazy_property(_followon)
+    scheduled_overs = lazy_property(_scheduled_overs)
+    innings_list = lazy_property(_innings_list)
+    innings = lazy_property(_innings)
+    latest_batting = lazy_property(_latest_batting)
+    latest_bowling = lazy_property(_latest_bowling)
+    latest_innings = lazy_property(_latest_innings)
+    latest_innings_fow = lazy_property(_latest_innings_fow)
+    team_1 = lazy_property(_team_1)
+    team_1_id = lazy_property(_team_1_id)
+    team_1_abbreviation = lazy_property(_team_1_abbreviation)
+    team_1_players = lazy_property(_team_1_players)
+    team_1_innings = lazy_property(_team_1_innings)
+    team_1_run_rate = lazy_property(_team_1_run_rate)
+    team_1_overs_batted = lazy_property(_team_1_overs_batted)
+    team_1_batting_result = lazy_property(_team_1_batting_result)
+    team_2 = lazy_property(_team_2)
+    team_2_id = lazy_property(_team_2_id)
+    team_2_abbreviation = lazy_property(_team_2_abbreviation)
+    team_2_players = lazy_property(_team_2_players)
+    team_2_innings = lazy_property(_team_2_innings)
+    team_2_run_rate = lazy_property(_team_2_run_rate)
+    team_2_overs_batted = lazy_property(_team_2_overs_batted)
+    team_2_batting_result = lazy_property(_team_2_batting_result)
+    scorecard_innings = lazy_property(_scorecard_innings)
+    player_ids = lazy_property(_player_ids)
+    batting_index = lazy_property(_batting_index)
+    bowling_index = lazy_property(_bowling_index)
+
+    # Only for matches that are not dormant
+    home_team = lazy_property(_home_team, played_only=True)
+    batting_first = lazy_property(_batting_first, played_only=True)
+    match_winner = lazy_property(_match_winner, played_only=True)
+    toss_winner = lazy_property(_toss_winner, played_only=True)
+    toss_decision = lazy_property(_toss_decision, played_only=True)
+    toss_decision_name = lazy_property(_toss_decision_name, played_only=True)
+    toss_choice_team_id = lazy_property(_toss_choice_team_id, played_only=True)
+    toss_winner_team_id = lazy_property(_toss_winner_team_id, played_only=True)
+    espn_api_url = lazy_property(_espn_api_url, played_only=True)
+    rosters = lazy_property(_rosters, played_only=True)
+    all_innings = lazy_property(_all_innings, played_only=True)
+
     @staticmethod
     def get_recent_matches(date=None):
         if date:
             url = "https://www.espncricinfo.com/ci/engine/match/index.html?date=%sview=week" % date
         else:
             url = "https://www.espncricinfo.com/ci/engine/match/index.html?view=week"
-        r = requests.get(url,headers={'user-agent': 'Mozilla/5.0'})
-        soup = BeautifulSoup(r.text, 'html.parser')
-        return [x['href'].split('/',4)[4].split('.')[0] for x in soup.findAll('a', href=True, text='Scorecard')]
+        r = client.get(url, headers={'user-agent': 'Mozilla/5.0'}, ttl=client.TTL_LIVE)
+        return parsing.scorecard_match_ids(r.content)
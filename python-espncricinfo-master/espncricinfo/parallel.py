@@ -0,0 +1,46 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Requests in flight at once; every builder talks to a single host
+MAX_WORKERS = 8
+
+
+def fetch_all(func, items, max_workers=MAX_WORKERS):
+    """
+    Call ``func`` on every item from a bounded thread pool.
+
+    Returns ``(results, errors)``: ``results`` holds the successful results
+    in the order of ``items`` and ``errors`` maps each failed item to the
+    exception it raised, so one bad item does not lose the rest.
+    """
+    items = list(items)
+    if not items:
+        return [], {}
+    results = []
+    errors = {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+        futures = [pool.submit(func, item) for item in items]
+        for item, future in zip(items, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                errors[item] = e
+    return results, errors
+
+
+class RateLimiter(object):
+    """Spaces calls to ``wait`` at least 1 / ``rate`` seconds apart, across threads"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.next_time = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_time)
+            self.next_time = start + self.interval
+        if start > now:
+            time.sleep(start - now)
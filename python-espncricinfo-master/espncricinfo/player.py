@@ -1,6 +1,6 @@
-import requests
 from bs4 import BeautifulSoup
 import dateparser
+from espncricinfo import client
 from espncricinfo.exceptions import PlayerNotFoundError
 from espncricinfo.match import Match
 import csv
@@ -8,15 +8,21 @@ import csv
 class Player(object):
 
     def __init__(self, player_id):
+        self._set_urls(player_id)
+        self.parsed_html = self.get_html() 
+        self.json = self.get_json()       
+        self.new_json = self.get_new_json()
+        self._set_fields()
+
+    def _set_urls(self, player_id):
         self.player_id=player_id
         self.url = "https://www.espncricinfo.com/player/player-name-{0}".format(str(player_id))
         self.json_url = "http://core.espnuk.org/v2/sports/cricket/athletes/{0}".format(str(player_id))
         self.new_json_url = "https://hs-consumer-api.espncricinfo.com/v1/pages/player/home?playerId={0}".format(str(player_id))
         self.headers = {'user-agent': 'Mozilla/5.0'}
-        self.parsed_html = self.get_html() 
-        self.json = self.get_json()       
-        self.new_json = self.get_new_json()
-        self.cricinfo_id = str(player_id)
+
+    def _set_fields(self):
+        self.cricinfo_id = str(self.player_id)
         self.__unicode__ = self._full_name()
         self.name = self._name()
         self.first_name = self._first_name()
@@ -29,21 +35,21 @@ class Player(object):
         self.major_teams = self._major_teams()
 
     def get_html(self):
-        r = requests.get(self.url, headers=self.headers)
+        return self._html_from(client.get(self.url, headers=self.headers, ttl=client.TTL_DAY))
+
+    def _html_from(self, r):
         if r.status_code == 404:
             raise PlayerNotFoundError
         else:
             return BeautifulSoup(r.text, 'html.parser')
 
     def get_json(self):
-        r = requests.get(self.json_url, headers=self.headers)
-        if r.status_code == 404:
-            raise PlayerNotFoundError
-        else:
-            return r.json()
+        return self._json_from(client.get(self.json_url, headers=self.headers, ttl=client.TTL_DAY))
         
     def get_new_json(self):
-        r = requests.get(self.new_json_url, headers=self.headers)
+        return self._json_from(client.get(self.new_json_url, headers=self.headers, ttl=client.TTL_DAY))
+
+    def _json_from(self, r):
         if r.status_code == 404:
             raise PlayerNotFoundError
         else:
@@ -83,29 +89,15 @@ class Player(object):
         return next((x for x in self.json['style'] if x['type'] == 'bowling'), None)
 
     def in_team_for_match(self, match_id):
-        m = Match(match_id)
-        if next((p for p in m.team_1_players if p['object_id'] == self.cricinfo_id), None) or next((p for p in m.team_2_players if p['object_id'] == self.cricinfo_id), None):
-            return True
-        else:
-            return False
+        return self.cricinfo_id in Match.get(match_id).player_ids
 
     def batting_for_match(self, match_id):
-        batting_stats = []
-        m = Match(match_id)
-        for innings in list(m.full_scorecard['innings'].keys()):
-            stats = next((x for x in m.full_scorecard['innings'][innings]['batsmen'] if x['href'] == self.url), None)
-            if stats:
-                batting_stats.append({ 'innings': innings, 'balls_faced': next((x['value'] for x in stats['stats'] if x['name'] == 'ballsFaced'), None), 'minutes': next((x['value'] for x in stats['stats'] if x['name'] == 'minutes'), None), 'runs': next((x['value'] for x in stats['stats'] if x['name'] == 'runs'), None), 'fours': next((x['value'] for x in stats['stats'] if x['name'] == 'fours'), None), 'sixes': next((x['value'] for x in stats['stats'] if x['name'] == 'sixes'), None), 'strike_rate': next((x['value'] for x in stats['stats'] if x['name'] == 'strikeRate'), None) })
-        return batting_stats
+        """Batting stats dicts, one per innings, from the shared Match"""
+        return [dict(stats) for stats in Match.get(match_id).batting_index.get(self.cricinfo_id, [])]
 
     def bowling_for_match(self, match_id):
-        bowling_stats = []
-        m = Match(match_id)
-        for innings in list(m.full_scorecard['innings'].keys()):
-            stats = next((x for x in m.full_scorecard['innings'][innings]['bowlers'] if x['href'] == self.url), None)
-            if stats:
-                bowling_stats.append({ 'innings': innings, 'overs': next((x['value'] for x in stats['stats'] if x['name'] == 'overs')), 'maidens': next((x['value'] for x in stats['stats'] if x['name'] == 'maidens')), 'conceded': next((x['value'] for x in stats['stats'] if x['name'] == 'conceded')), 'wickets': next((x['value'] for x in stats['stats'] if x['name'] == 'wickets')), 'economy_rate': next((x['value'] for x in stats['stats'] if x['name'] == 'economyRate')), 'dots': next((x['value'] for x in stats['stats'] if x['name'] == 'dots'), None), 'fours_conceded': next((x['value'] for x in stats['stats'] if x['name'] == 'foursConceded'), None), 'sixes_conceded': next((x['value'] for x in stats['stats'] if x['name'] == 'sixesConceded'), None), 'wides': next((x['value'] for x in stats['stats'] if x['name'] == 'wides'), None), 'no_balls': next((x['value'] for x in stats['stats'] if x['name'] == 'noballs'), None)})
-        return bowling_stats
+        """Bowling stats dicts, one per innings, from the shared Match"""
+        return [dict(stats) for stats in Match.get(match_id).bowling_index.get(self.cricinfo_id, [])]
 
     def get_career_averages(self, file_name=None, match_format=11, data_type='allround') :
 
@@ -127,7 +119,7 @@ class Player(object):
             self.file_name = f"{self.player_id}_{self.match_format}_{self.data_type}_career_averages.csv"
 
         self.url=f"https://stats.espncricinfo.com/ci/engine/player/{self.player_id}.html?class={self.match_format};template=results;type={self.data_type}"
-        html_doc = requests.get(self.url, headers=self.headers)
+        html_doc = client.get(self.url, headers=self.headers, ttl=client.TTL_DAY)
         soup = BeautifulSoup(html_doc.text, 'html.parser')
         tables = soup.find_all("table")[2]
         table_rows = tables.find_all("tr")
@@ -159,7 +151,7 @@ class Player(object):
             self.file_name = f"{self.player_id}_{self.match_format}_{self.data_type}_career_summary.csv"
 
         self.url=f"https://stats.espncricinfo.com/ci/engine/player/{self.player_id}.html?class={self.match_format};template=results;type={self.data_type}"
-        html_doc = requests.get(self.url, headers=self.headers)
+        html_doc = client.get(self.url, headers=self.headers, ttl=client.TTL_DAY)
         soup = BeautifulSoup(html_doc.text, 'html.parser')
         tables = soup.find_all("table")[3]
         table_rows = tables.find_all("tr")
@@ -193,7 +185,7 @@ class Player(object):
             self.file_name = f"{self.player_id}_{self.match_format}_{self.data_type}_{self.view}.csv"
 
         self.url=f"https://stats.espncricinfo.com/ci/engine/player/{self.player_id}.html?class={self.match_format};template=results;type={self.data_type};view={self.view}"
-        html_doc = requests.get(self.url, headers=self.headers())
+        html_doc = client.get(self.url, headers=self.headers, ttl=client.TTL_DAY)
         soup = BeautifulSoup(html_doc.text, 'html.parser')
         tables = soup.find_all("table")[3]
         table_rows = tables.find_all("tr")
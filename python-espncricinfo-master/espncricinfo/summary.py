@@ -1,18 +1,26 @@
-import requests
 from bs4 import BeautifulSoup
+from espncricinfo import client
+from espncricinfo.exceptions import MatchNotFoundError
 from espncricinfo.match import Match
+from espncricinfo.parallel import MAX_WORKERS, fetch_all
 
 class Summary(object):
 
-    def __init__(self):
-        self.url = "http://static.cricinfo.com/rss/livescores.xml"
-        self.headers = {'user-agent': 'Mozilla/5.0'}
+    def __init__(self, max_workers=MAX_WORKERS):
+        self._set_urls(max_workers)
         self.xml = self.get_xml()
         self.match_ids = self._match_ids()
         self.matches = self._build_matches()
 
+    def _set_urls(self, max_workers=MAX_WORKERS):
+        self.url = "http://static.cricinfo.com/rss/livescores.xml"
+        self.headers = {'user-agent': 'Mozilla/5.0'}
+        self.max_workers = max_workers
+
     def get_xml(self):
-        r = requests.get(self.url, headers=self.headers)
+        return self._xml_from(client.get(self.url, headers=self.headers, ttl=client.TTL_LIVE))
+
+    def _xml_from(self, r):
         if r.status_code == 404:
             raise MatchNotFoundError
         else:
@@ -22,5 +30,16 @@ class Summary(object):
         matches = [x.link.text.split(".html")[0].split('/')[6] for x in self.xml.findAll('item')]
         return matches
 
+    def _load_match(self, match_id):
+        match = Match(match_id)
+        match.json
+        return match
+
     def _build_matches(self):
-        return [Match(m) for m in self.match_ids]
+        """
+        Matches in feed order, their JSON downloaded concurrently. Matches
+        that fail to load are left out and their errors kept in
+        ``self.errors`` (match_id -> exception).
+        """
+        matches, self.errors = fetch_all(self._load_match, self.match_ids, self.max_workers)
+        return matches
@@ -0,0 +1,311 @@
+"""
+Load matches, series and players into normalized SQLite tables.
+
+Questions across many matches become SQL over a local file instead of
+walking nested JSON again:
+
+    wh = Warehouse('cricket.sqlite')
+    wh.ingest_series(8048, deliveries=True)
+    wh.query('''SELECT player_name, SUM(runs) * 100.0 / SUM(balls_faced) AS strike_rate
+                FROM batting GROUP BY player_id ORDER BY strike_rate DESC''')
+
+Downloads and parsing run on a thread pool (``parallel.fetch_all``); rows
+are written by the calling thread, one transaction per match. Loading a
+match again replaces its rows, so ingestion is idempotent.
+"""
+import sqlite3
+
+from espncricinfo.commentary import ball_id, stream_innings
+from espncricinfo.match import Match
+from espncricinfo.parallel import MAX_WORKERS, fetch_all
+from espncricinfo.player import Player
+from espncricinfo.series import Series
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS series (
+    series_id TEXT PRIMARY KEY,
+    name TEXT,
+    short_name TEXT,
+    is_tournament INTEGER
+);
+CREATE TABLE IF NOT EXISTS matches (
+    match_id TEXT PRIMARY KEY,
+    series_id TEXT,
+    season TEXT,
+    description TEXT,
+    match_class TEXT,
+    status TEXT,
+    start_date TEXT,
+    ground_name TEXT,
+    town_name TEXT,
+    team_1_id TEXT,
+    team_1 TEXT,
+    team_2_id TEXT,
+    team_2 TEXT,
+    toss_winner_team_id TEXT,
+    winner_team_id TEXT,
+    result TEXT
+);
+CREATE TABLE IF NOT EXISTS innings (
+    match_id TEXT,
+    innings INTEGER,
+    batting_team_id TEXT,
+    bowling_team_id TEXT,
+    runs INTEGER,
+    wickets INTEGER,
+    overs REAL,
+    run_rate REAL,
+    target INTEGER,
+    PRIMARY KEY (match_id, innings)
+);
+CREATE TABLE IF NOT EXISTS batting (
+    match_id TEXT,
+    innings INTEGER,
+    player_id TEXT,
+    player_name TEXT,
+    runs INTEGER,
+    balls_faced INTEGER,
+    minutes INTEGER,
+    fours INTEGER,
+    sixes INTEGER,
+    strike_rate REAL,
+    PRIMARY KEY (match_id, innings, player_id)
+);
+CREATE TABLE IF NOT EXISTS bowling (
+    match_id TEXT,
+    innings INTEGER,
+    player_id TEXT,
+    player_name TEXT,
+    overs REAL,
+    maidens INTEGER,
+    conceded INTEGER,
+    wickets INTEGER,
+    economy_rate REAL,
+    dots INTEGER,
+    fours_conceded INTEGER,
+    sixes_conceded INTEGER,
+    wides INTEGER,
+    no_balls INTEGER,
+    PRIMARY KEY (match_id, innings, player_id)
+);
+CREATE TABLE IF NOT EXISTS fow (
+    match_id TEXT,
+    innings INTEGER,
+    wicket INTEGER,
+    player_id TEXT,
+    runs INTEGER,
+    overs REAL,
+    PRIMARY KEY (match_id, innings, wicket)
+);
+CREATE TABLE IF NOT EXISTS deliveries (
+    match_id TEXT,
+    innings INTEGER,
+    ball_id TEXT,
+    overs REAL,
+    over_number INTEGER,
+    ball_number INTEGER,
+    batsman_id TEXT,
+    bowler_id TEXT,
+    batsman_runs INTEGER,
+    total_runs INTEGER,
+    is_four INTEGER,
+    is_six INTEGER,
+    is_wicket INTEGER,
+    text TEXT,
+    PRIMARY KEY (match_id, innings, ball_id)
+);
+CREATE TABLE IF NOT EXISTS players (
+    player_id TEXT PRIMARY KEY,
+    name TEXT,
+    full_name TEXT,
+    date_of_birth TEXT,
+    playing_role TEXT,
+    batting_style TEXT,
+    bowling_style TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_matches_series ON matches (series_id);
+CREATE INDEX IF NOT EXISTS idx_batting_player ON batting (player_id);
+CREATE INDEX IF NOT EXISTS idx_bowling_player ON bowling (player_id);
+CREATE INDEX IF NOT EXISTS idx_deliveries_batsman ON deliveries (batsman_id);
+CREATE INDEX IF NOT EXISTS idx_deliveries_bowler ON deliveries (bowler_id);
+'''
+
+# Tables holding rows of one match, replaced together on reload
+MATCH_TABLES = ('innings', 'batting', 'bowling', 'fow', 'deliveries')
+
+
+def _player(entry):
+    player = entry.get('player') or {}
+    player_id = player.get('objectId', player.get('id'))
+    return (None if player_id is None else str(player_id)), player.get('longName', player.get('name'))
+
+
+def _safe(fn):
+    """Attribute value, or None when the match does not have it"""
+    try:
+        return fn()
+    except (AttributeError, KeyError, IndexError, TypeError):
+        return None
+
+
+def match_rows(match, deliveries=False):
+    """{table: [row dict]} for one Match; downloads what the rows need"""
+    mj = match.match_json()
+    rows = {'matches': [{
+        'match_id': str(match.match_id),
+        'series_id': _safe(lambda: str(match.series_id)),
+        'season': mj.get('season'),
+        'description': match.description,
+        'match_class': _safe(lambda: match.match_class),
+        'status': mj.get('match_status'),
+        'start_date': mj.get('start_date_raw'),
+        'ground_name': mj.get('ground_name'),
+        'town_name': mj.get('town_name'),
+        'team_1_id': _safe(lambda: match.team_1_id),
+        'team_1': _safe(lambda: match.team_1_abbreviation),
+        'team_2_id': _safe(lambda: match.team_2_id),
+        'team_2': _safe(lambda: match.team_2_abbreviation),
+        'toss_winner_team_id': mj.get('toss_winner_team_id'),
+        'winner_team_id': mj.get('winner_team_id'),
+        'result': _safe(lambda: match.result),
+    }]}
+    match_id = str(match.match_id)
+
+    rows['innings'] = [{
+        'match_id': match_id,
+        'innings': int(inn['innings_number']),
+        'batting_team_id': inn.get('batting_team_id'),
+        'bowling_team_id': inn.get('bowling_team_id'),
+        'runs': inn.get('runs'),
+        'wickets': inn.get('wickets'),
+        'overs': inn.get('overs'),
+        'run_rate': inn.get('run_rate'),
+        'target': inn.get('target'),
+    } for inn in (_safe(lambda: match.innings) or []) if inn.get('innings_number')]
+
+    for table, index, key in (('batting', match.batting_index, 'inningBatsmen'),
+                              ('bowling', match.bowling_index, 'inningBowlers')):
+        rows[table] = [dict(stats, match_id=match_id, player_id=player_id)
+                       for player_id, innings in index.items() for stats in innings]
+    names = {}
+    fows = []
+    for innings, inn in match.scorecard_innings:
+        for entry in (inn.get('inningBatsmen') or []) + (inn.get('inningBowlers') or []):
+            player_id, name = _player(entry)
+            names[player_id] = name
+        for number, entry in enumerate(inn.get('inningFallOfWickets') or [], 1):
+            fows.append({'match_id': match_id, 'innings': int(innings),
+                         'wicket': entry.get('fowWicketNum', number), 'player_id': _player(entry)[0],
+                         'runs': entry.get('fowRuns'), 'overs': entry.get('fowOvers')})
+    for table in ('batting', 'bowling'):
+        for row in rows[table]:
+            row['player_name'] = names.get(row['player_id'])
+            row['innings'] = int(row['innings'])
+    rows['fow'] = fows
+
+    rows['deliveries'] = []
+    if deliveries:
+        for innings in sorted({row['innings'] for row in rows['innings']} or {1, 2}):
+            for comment in stream_innings(match, innings):
+                rows['deliveries'].append(delivery_row(match_id, innings, comment))
+    return rows
+
+
+def delivery_row(match_id, innings, comment):
+    return {
+        'match_id': match_id,
+        'innings': comment.get('inningNumber', innings),
+        'ball_id': str(ball_id(comment)),
+        'overs': comment.get('oversActual'),
+        'over_number': comment.get('overNumber'),
+        'ball_number': comment.get('ballNumber'),
+        'batsman_id': _str(comment.get('batsmanPlayerId')),
+        'bowler_id': _str(comment.get('bowlerPlayerId')),
+        'batsman_runs': comment.get('batsmanRuns'),
+        'total_runs': comment.get('totalRuns'),
+        'is_four': comment.get('isFour'),
+        'is_six': comment.get('isSix'),
+        'is_wicket': comment.get('isWicket'),
+        'text': comment.get('text') or comment.get('title'),
+    }
+
+
+def _str(value):
+    return None if value is None else str(value)
+
+
+def _label(value):
+    """Readable text of an ESPN style/position object (or the value itself)"""
+    if isinstance(value, dict):
+        return value.get('description', value.get('name', value.get('shortDescription')))
+    return _str(value)
+
+
+def player_row(player):
+    return {
+        'player_id': str(player.player_id),
+        'name': player.name,
+        'full_name': player.full_name,
+        'date_of_birth': _str(_safe(lambda: player.date_of_birth)),
+        'playing_role': _label(_safe(lambda: player.playing_role)),
+        'batting_style': _label(player.batting_style),
+        'bowling_style': _label(player.bowling_style),
+    }
+
+
+class Warehouse(object):
+
+    def __init__(self, path='cricket.sqlite'):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def upsert(self, table, rows):
+        if not rows:
+            return
+        columns = list(rows[0])
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO {0} ({1}) VALUES ({2})".format(
+                table, ', '.join(columns), ', '.join('?' * len(columns))),
+            [[row.get(c) for c in columns] for row in rows])
+
+    def store_match(self, rows):
+        match_id = rows['matches'][0]['match_id']
+        with self.conn:
+            for table in MATCH_TABLES:
+                if table != 'deliveries' or rows['deliveries']:
+                    self.conn.execute("DELETE FROM {0} WHERE match_id = ?".format(table), (match_id,))
+            for table, table_rows in rows.items():
+                self.upsert(table, table_rows)
+
+    def ingest_matches(self, match_ids, deliveries=False, max_workers=MAX_WORKERS):
+        """
+        Load matches concurrently and store them. Returns a dict of
+        match_id -> exception for matches that could not be loaded.
+        """
+        results, errors = fetch_all(lambda m: match_rows(Match.get(m), deliveries), match_ids, max_workers)
+        for rows in results:
+            self.store_match(rows)
+        return errors
+
+    def ingest_series(self, series_id, deliveries=False, max_workers=MAX_WORKERS):
+        """Store the series and every match (event) in it"""
+        series = Series(series_id, max_workers)
+        with self.conn:
+            self.upsert('series', [{'series_id': str(series_id), 'name': series.name,
+                                    'short_name': series.short_name, 'is_tournament': series.is_tournament}])
+        errors = dict(series.errors)
+        errors.update(self.ingest_matches([str(event['id']) for event in series.events], deliveries, max_workers))
+        return errors
+
+    def ingest_players(self, player_ids, max_workers=MAX_WORKERS):
+        results, errors = fetch_all(Player, player_ids, max_workers)
+        with self.conn:
+            self.upsert('players', [player_row(player) for player in results])
+        return errors
+
+    def query(self, sql, params=()):
+        return self.conn.execute(sql, params).fetchall()
+
+    def close(self):
+        self.conn.close()
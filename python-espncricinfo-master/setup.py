@@ -8,6 +8,7 @@ setup(name="python-espncricinfo",
       description="ESPNCricInfo API client",
       license="MIT",
       install_requires=["requests", "bs4", "dateparser", "lxml"],
+      extras_require={"async": ["aiohttp"]},
       author="Derek Willis",
       author_email="dwillis@gmail.com",
       url="http://github.com/dwillis/python-espncricinfo",
@@ -1,6 +1,43 @@
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
 import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from espncricinfo import client
+from espncricinfo.commentary import new_balls, poll_innings
+from espncricinfo import match as match_module
 from espncricinfo.match import Match
+from espncricinfo.series import Series
+from espncricinfo.transport import FixtureNotFoundError, recording_client, replay_client, write_fixture
+from espncricinfo.warehouse import Warehouse
+
+try:
+    from espncricinfo.aio import AsyncMatch, AsyncSummary, ReplayAsyncClient
+except ImportError:
+    AsyncSummary = None
+
+# Recorded responses for the live-site tests; record them with
+# ESPNCRICINFO_RECORD=1 python tests.py
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def setUpModule():
+    if os.environ.get('ESPNCRICINFO_RECORD'):
+        client.set_client(recording_client(FIXTURES))
+    elif os.path.isdir(FIXTURES):
+        client.set_client(replay_client(FIXTURES))
+    else:
+        # The default client would create a response cache in the home directory
+        client.set_client(client.HttpClient(None))
 
+
+@unittest.skipUnless(os.path.isdir(FIXTURES) or os.environ.get('ESPNCRICINFO_RECORD'),
+                     'needs recorded fixtures (ESPNCRICINFO_RECORD=1 python tests.py)')
 class TestMatchMethods(unittest.TestCase):
 
     def setUp(self):
@@ -16,5 +53,341 @@ class TestMatchMethods(unittest.TestCase):
     def test_toss_winner(self):
         self.assertEqual(self.match.toss_winner, '5153')
 
+
+class FixtureServer(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        body = json.dumps({'path': self.path}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def batsman(player_id, name, runs, balls):
+    return {'player': {'objectId': player_id, 'longName': name}, 'runs': runs, 'balls': balls,
+            'minutes': None, 'fours': 0, 'sixes': 0, 'strikerate': round(runs * 100.0 / balls, 2)}
+
+
+def bowler(player_id, name, wickets, conceded):
+    return {'player': {'objectId': player_id, 'longName': name}, 'overs': 4, 'maidens': 0,
+            'conceded': conceded, 'wickets': wickets, 'economy': conceded / 4.0, 'dots': 10,
+            'fours': 1, 'sixes': 0, 'wides': 0, 'noballs': 0}
+
+
+class ReplayTestCase(unittest.TestCase):
+    """Tests served by a replay client from a fresh fixture directory"""
+
+    def setUp(self):
+        # Not get_client(), which creates the default client and its cache
+        self.previous = client._client
+        self.directory = tempfile.mkdtemp()
+        # Match.get would hand out matches built from another test's fixtures
+        Match._registry.clear()
+
+    def tearDown(self):
+        client.set_client(self.previous)
+        shutil.rmtree(self.directory)
+        Match._registry.clear()
+
+    def put(self, url, body, content_type='application/json'):
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode()
+        write_fixture(self.directory, url, 200, {'Content-Type': content_type}, body)
+
+    def write_match(self, match_id, status='complete'):
+        match_json = {'description': 'A v B at Lord\'s', 'series': [{'series_name': 'S', 'core_recreation_id': '9'}],
+                      'match': {'match_status': status, 'international_class_card': 'Test',
+                                'toss_winner_team_id': '1', 'toss_decision': '1', 'toss_decision_name': 'bat'},
+                      'team': [{'team_id': '1', 'team_abbreviation': 'A'}, {'team_id': '2', 'team_abbreviation': 'B'}],
+                      'innings': []}
+        self.put("https://www.espncricinfo.com/matches/engine/match/{0}.json".format(match_id), match_json)
+
+    def write_page(self, match_id, innings):
+        """Match page whose __NEXT_DATA__ holds the scorecard ``innings`` list"""
+        data = {'props': {'pageProps': {'data': {'pageData': {'content': {'scorecard': {'innings': innings}}}}}}}
+        page = '<html><body><script id="__NEXT_DATA__" type="application/json">{0}</script></body></html>'.format(
+            json.dumps(data))
+        self.put("https://www.espncricinfo.com/matches/engine/match/{0}.html".format(match_id), page.encode(),
+                 'text/html; charset=utf-8')
+
+
+class TestReplayTransport(ReplayTestCase):
+
+    def test_record_then_replay(self):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), FixtureServer)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = 'http://127.0.0.1:{0}/match/1.json'.format(server.server_port)
+        try:
+            recorded = recording_client(self.directory).get(url).json()
+        finally:
+            server.shutdown()
+            server.server_close()
+        replayed = replay_client(self.directory).get(url)
+        self.assertEqual(replayed.json(), recorded)
+        self.assertEqual(replayed.headers['Content-Type'], 'application/json')
+
+    def test_match_offline(self):
+        self.write_match(1)
+        client.set_client(replay_client(self.directory))
+        match = Match(1)
+        self.assertEqual(match.description, "A v B at Lord's")
+        self.assertEqual(match.match_class, 'Test')
+        self.assertEqual(match.toss_winner, '1')
+
+    def test_missing_fixture(self):
+        client.set_client(replay_client(self.directory))
+        with self.assertRaises(FixtureNotFoundError):
+            Match(2).description
+
+    def test_series_events_concurrent_with_latency(self):
+        base = "http://core.espnuk.org/v2/sports/cricket/leagues/9/"
+        refs = [base + "events/{0}".format(i) for i in range(20)]
+        fixtures = {
+            base: {'name': 'S', 'shortName': 'S', 'abbreviation': 'S', 'slug': 's', 'isTournament': True,
+                   'links': [{'href': 'u'}]},
+            base + "seasons": {'items': [{'$ref': base + 'seasons/2020'}]},
+            base + "events": {'items': [{'$ref': ref} for ref in refs]},
+        }
+        fixtures.update((ref, {'id': i}) for i, ref in enumerate(refs))
+        for url, body in fixtures.items():
+            write_fixture(self.directory, url, 200, {'Content-Type': 'application/json'}, json.dumps(body).encode())
+        client.set_client(replay_client(self.directory, latency=0.05))
+        started = time.perf_counter()
+        series = Series(9)
+        elapsed = time.perf_counter() - started
+        self.assertEqual([event['id'] for event in series.events], list(range(20)))
+        self.assertEqual(series.errors, {})
+        # 23 requests at 50 ms each would take over a second one at a time
+        self.assertLess(elapsed, 0.8)
+
+    @unittest.skipIf(AsyncSummary is None, 'aiohttp is not installed')
+    def test_async_summary_concurrency_limit(self):
+        items = ''.join('<item><link>http://www.cricinfo.com/ci/engine/match/{0}.html</link></item>'.format(i)
+                        for i in range(20))
+        write_fixture(self.directory, "http://static.cricinfo.com/rss/livescores.xml", 200,
+                      {'Content-Type': 'text/xml'}, '<rss><channel>{0}</channel></rss>'.format(items).encode())
+        for i in range(19):
+            self.write_match(i)
+        http = ReplayAsyncClient(self.directory, latency=0.05, limit=4)
+
+        async def fetch():
+            try:
+                return await AsyncSummary.fetch(http)
+            finally:
+                await http.close()
+
+        summary = asyncio.run(fetch())
+        self.assertEqual([match.match_id for match in summary.matches], [str(i) for i in range(19)])
+        self.assertEqual(list(summary.errors), ['19'])
+        self.assertEqual(summary.matches[3].match_class, 'Test')
+        self.assertEqual(http.max_in_flight, 4)
+
+    @unittest.skipIf(AsyncSummary is None, 'aiohttp is not installed')
+    def test_async_refresh_keeps_page(self):
+        self.write_match(1, status='current')
+        self.write_page(1, [{'inningNumber': 1, 'inningBatsmen': [batsman(11, 'Bat One', 40, 30)]}])
+        http = ReplayAsyncClient(self.directory)
+
+        async def fetch_and_refresh():
+            try:
+                match = await AsyncMatch.fetch(1, http, page=True)
+                await match.refresh()
+                return match
+            finally:
+                await http.close()
+
+        match = asyncio.run(fetch_and_refresh())
+        self.assertEqual(match.batting_index['11'][0]['runs'], 40)
+        self.assertEqual(http.requests.count("https://www.espncricinfo.com/matches/engine/match/1.html"), 2)
+
+
+class TestMatchRegistry(ReplayTestCase):
+
+    def setUp(self):
+        super(TestMatchRegistry, self).setUp()
+        client.set_client(replay_client(self.directory))
+
+    def test_get_shares_one_match(self):
+        self.write_match(1)
+        match = Match.get(1)
+        self.assertIs(Match.get('1'), match)
+        self.assertEqual(match.description, "A v B at Lord's")
+
+    def test_least_recently_used_evicted(self):
+        size = match_module.MATCH_REGISTRY_SIZE
+        match_module.MATCH_REGISTRY_SIZE = 2
+        try:
+            first = Match.get(1)
+            Match.get(2)
+            Match.get(1)
+            Match.get(3)
+            self.assertEqual(list(Match._registry), ['1', '3'])
+            self.assertIs(Match.get(1), first)
+        finally:
+            match_module.MATCH_REGISTRY_SIZE = size
+
+    def test_live_match_rebuilt_after_ttl(self):
+        self.write_match(1, status='current')
+        match = Match.get(1)
+        self.assertEqual(match.status, 'current')
+        self.assertIs(Match.get(1), match)
+        match.loaded_at -= client.TTL_LIVE + 1
+        self.assertIsNot(Match.get(1), match)
+
+    def test_poll_keeps_registry_expiry(self):
+        self.write_match(1, status='current')
+        self.put(Match.get(1).innings_comms_url(1, 1), {'comments': [], 'nextPage': None})
+        match = Match.get(1)
+        match.status
+        match.loaded_at -= client.TTL_LIVE + 1
+        # Polling reads the match status but does not refresh match.json
+        self.assertEqual(list(poll_innings(match, 1, interval=0, max_polls=1)), [])
+        self.assertIsNot(Match.get(1), match)
+
+    def test_complete_match_kept(self):
+        self.write_match(1)
+        match = Match.get(1)
+        match.status
+        match.loaded_at -= client.TTL_DAY
+        self.assertIs(Match.get(1), match)
+
+    def test_batting_and_bowling_index(self):
+        self.write_match(1)
+        self.write_page(1, [
+            {'inningNumber': 1, 'inningBatsmen': [batsman(11, 'Bat One', 40, 30), batsman(12, 'Bat Two', 5, 10)],
+             'inningBowlers': [bowler(21, 'Bowl One', 2, 30)]},
+            {'inningNumber': 2, 'inningBatsmen': [batsman(21, 'Bowl One', 12, 8)],
+             'inningBowlers': [bowler(11, 'Bat One', 1, 20), bowler(21, 'Bowl One', 0, 10)]},
+        ])
+        match = Match.get(1)
+        self.assertEqual(match.batting_index['11'], [{'innings': '1', 'balls_faced': 30, 'minutes': None, 'runs': 40,
+                                                       'fours': 0, 'sixes': 0, 'strike_rate': 133.33}])
+        self.assertEqual([stats['runs'] for stats in match.batting_index['21']], [12])
+        self.assertEqual([(stats['innings'], stats['wickets']) for stats in match.bowling_index['21']],
+                         [('1', 2), ('2', 0)])
+        self.assertEqual(match.bowling_index['11'][0]['economy_rate'], 5.0)
+        self.assertNotIn('12', match.bowling_index)
+
+
+def ball(number):
+    return {'id': number, 'inningNumber': 1, 'oversActual': number / 10.0, 'text': 'ball {0}'.format(number)}
+
+
+class TestCommentary(ReplayTestCase):
+
+    def setUp(self):
+        super(TestCommentary, self).setUp()
+        client.set_client(replay_client(self.directory))
+        self.write_match(1, status='current')
+        self.match = Match.get(1)
+
+    def write_comments(self, page, numbers, **next_page):
+        """Commentary page of ball ``numbers`` (newest first); ``nextPage`` only when given"""
+        self.put(self.match.innings_comms_url(1, page), dict(next_page, comments=[ball(n) for n in numbers]))
+
+    def pages_requested(self):
+        prefix = self.match.innings_comms_url(1, 1).split('&page=')[0]
+        return [int(url.split('&page=')[1].split('&')[0])
+                for url in client.get_client().session.get_adapter(prefix).requests if url.startswith(prefix)]
+
+    def test_stream_innings_pages(self):
+        self.write_comments(1, [6, 5], nextPage=2)
+        # No nextPage key: the following page is tried until one is empty
+        self.write_comments(2, [4, 3, 2])
+        self.write_comments(3, [1], nextPage=None)
+        self.assertEqual([c['id'] for c in self.match.commentary()], [6, 5, 4, 3, 2, 1])
+        self.assertEqual(self.pages_requested(), [1, 2, 3])
+
+    def test_new_balls_stop_at_seen_ball(self):
+        self.write_comments(1, [8, 7], nextPage=2)
+        self.write_comments(2, [6, 5], nextPage=3)
+        # Page 3 has no fixture, so reading it would raise
+        self.assertEqual([c['id'] for c in new_balls(self.match, 1, {5, 4, 3})], [6, 7, 8])
+        self.assertEqual(self.pages_requested(), [1, 2])
+
+    def test_poll_innings_yields_new_balls_in_order(self):
+        self.write_comments(1, [2, 1], nextPage=None)
+        balls = poll_innings(self.match, 1, interval=0, max_polls=2)
+        self.assertEqual([next(balls)['id'], next(balls)['id']], [1, 2])
+        self.write_comments(1, [5, 4, 3], nextPage=2)
+        self.write_comments(2, [2, 1], nextPage=None)
+        self.assertEqual([c['id'] for c in balls], [3, 4, 5])
+        self.assertEqual(self.pages_requested(), [1, 1, 2])
+
+    def test_poll_innings_reads_balls_after_match_ends(self):
+        self.write_comments(1, [2, 1], nextPage=None)
+        balls = poll_innings(self.match, 1, interval=0)
+        self.assertEqual([next(balls)['id'], next(balls)['id']], [1, 2])
+        # The winning ball reaches the commentary as the match finishes
+        self.write_match(1, status='complete')
+        self.write_comments(1, [3, 2, 1], nextPage=None)
+        self.assertEqual([c['id'] for c in balls], [3])
+
+    @unittest.skipIf(AsyncSummary is None, 'aiohttp is not installed')
+    def test_async_live_commentary_reads_balls_after_match_ends(self):
+        self.write_comments(1, [2, 1], nextPage=None)
+        http = ReplayAsyncClient(self.directory)
+
+        async def follow():
+            try:
+                match = await AsyncMatch.fetch(1, http)
+                ids = []
+                async for comment in match.live_commentary(1, interval=0):
+                    ids.append(comment['id'])
+                    if comment['id'] == 2:
+                        self.write_match(1, status='complete')
+                        self.write_comments(1, [3, 2, 1], nextPage=None)
+                return ids
+            finally:
+                await http.close()
+
+        self.assertEqual(asyncio.run(follow()), [1, 2, 3])
+
+
+class TestWarehouse(ReplayTestCase):
+
+    def setUp(self):
+        super(TestWarehouse, self).setUp()
+        client.set_client(replay_client(self.directory))
+        self.warehouse = Warehouse(':memory:')
+
+    def tearDown(self):
+        self.warehouse.close()
+        super(TestWarehouse, self).tearDown()
+
+    def write_scorecard(self, batsmen, out):
+        self.write_page(1, [{'inningNumber': 1, 'inningBatsmen': batsmen,
+                             'inningBowlers': [bowler(21, 'Bowl One', 1, 30)],
+                             'inningFallOfWickets': [{'player': {'objectId': out}, 'fowWicketNum': 1,
+                                                      'fowRuns': 25, 'fowOvers': 4.2}]}])
+
+    def test_reingest_replaces_match_rows(self):
+        self.write_match(1)
+        self.write_scorecard([batsman(11, 'Bat One', 40, 30), batsman(12, 'Bat Two', 5, 10)], out=12)
+        self.assertEqual(self.warehouse.ingest_matches(['1']), {})
+        self.assertEqual(self.warehouse.query('SELECT player_id, player_name, runs FROM batting ORDER BY player_id'),
+                         [('11', 'Bat One', 40), ('12', 'Bat Two', 5)])
+
+        # The scorecard was corrected; loading the match again replaces its
+        # rows, so the wrongly credited batsman does not linger
+        Match._registry.clear()
+        self.write_scorecard([batsman(11, 'Bat One', 44, 31), batsman(13, 'Bat Three', 5, 10)], out=13)
+        self.assertEqual(self.warehouse.ingest_matches(['1']), {})
+        self.assertEqual(self.warehouse.query('SELECT player_id, player_name, runs FROM batting ORDER BY player_id'),
+                         [('11', 'Bat One', 44), ('13', 'Bat Three', 5)])
+        self.assertEqual(self.warehouse.query('SELECT player_id, player_name, innings, wickets FROM bowling'),
+                         [('21', 'Bowl One', 1, 1)])
+        self.assertEqual(self.warehouse.query('SELECT COUNT(*) FROM fow'), [(1,)])
+        self.assertEqual(self.warehouse.query('''
+            SELECT f.wicket, b.player_name, f.runs, f.overs FROM fow f
+            JOIN batting b USING (match_id, innings, player_id)'''), [(1, 'Bat Three', 25, 4.2)])
+        self.assertEqual(self.warehouse.query('SELECT match_id, match_class FROM matches'), [('1', 'Test')])
+
+
 if __name__ == '__main__':
     unittest.main()